@@ -3,68 +3,30 @@ import pandas as pd
 import sqlite3
 from datetime import datetime, date, timedelta
 from doorlock_as_init import init_db, init_master_data
-import io, os
-
-DB_PATH = "doorlock_as.db"
-
-# ==================== 대한민국 행정구역 데이터 (시/도 → 시·군·구) ====================
-KOREA_REGIONS = {
-    "서울특별시": [
-        "강남구","강동구","강북구","강서구","관악구","광진구","구로구","금천구","노원구","도봉구",
-        "동대문구","동작구","마포구","서대문구","서초구","성동구","성북구","송파구","양천구","영등포구",
-        "용산구","은평구","종로구","중구","중랑구"
-    ],
-    "부산광역시": [
-        "강서구","금정구","기장군","남구","동구","동래구","부산진구","북구","사상구","사하구",
-        "서구","수영구","연제구","영도구","중구","해운대구"
-    ],
-    "대구광역시": ["남구","달서구","달성군","동구","북구","서구","수성구","중구"],
-    "인천광역시": ["강화군","계양구","미추홀구","남동구","동구","부평구","서구","연수구","옹진군","중구"],
-    "광주광역시": ["광산구","남구","동구","북구","서구"],
-    "대전광역시": ["대덕구","동구","서구","유성구","중구"],
-    "울산광역시": ["남구","동구","북구","울주군","중구"],
-    "세종특별자치시": ["세종시"],
-    "경기도": [
-        "가평군","고양시 덕양구","고양시 일산동구","고양시 일산서구","과천시","광명시","광주시","구리시",
-        "군포시","김포시","남양주시","동두천시","부천시","성남시 분당구","성남시 수정구","성남시 중원구",
-        "수원시 권선구","수원시 영통구","수원시 장안구","수원시 팔달구","시흥시","안산시 단원구","안산시 상록구",
-        "안성시","안양시 동안구","안양시 만안구","양주시","양평군","여주시","연천군","오산시",
-        "용인시 기흥구","용인시 수지구","용인시 처인구","의왕시","의정부시","이천시","파주시","평택시",
-        "포천시","하남시","화성시"
-    ],
-    "강원특별자치도": [
-        "강릉시","고성군","동해시","삼척시","속초시","양구군","양양군","영월군","원주시","인제군",
-        "정선군","철원군","춘천시","태백시","평창군","홍천군","화천군","횡성군"
-    ],
-    "충청북도": [
-        "괴산군","단양군","보은군","영동군","옥천군","음성군","제천시","증평군","진천군",
-        "청주시 상당구","청주시 서원구","청주시 청원구","청주시 흥덕구","충주시"
-    ],
-    "충청남도": [
-        "계룡시","공주시","금산군","논산시","당진시","보령시","부여군","서산시","서천군",
-        "아산시","예산군","천안시 동남구","천안시 서북구","청양군","태안군","홍성군"
-    ],
-    "전라북도": [
-        "고창군","군산시","김제시","남원시","무주군","부안군","순창군","완주군",
-        "익산시","임실군","장수군","전주시 덕진구","전주시 완산구","정읍시","진안군"
-    ],
-    "전라남도": [
-        "강진군","고흥군","곡성군","광양시","구례군","나주시","담양군","목포시","무안군",
-        "보성군","순천시","신안군","여수시","영광군","영암군","완도군","장성군","장흥군",
-        "진도군","함평군","해남군","화순군"
-    ],
-    "경상북도": [
-        "경산시","경주시","고령군","구미시","군위군","김천시","문경시","봉화군","상주시",
-        "성주군","안동시","영덕군","영양군","영주시","영천시","예천군","울릉군","울진군",
-        "의성군","청도군","청송군","칠곡군","포항시 남구","포항시 북구"
-    ],
-    "경상남도": [
-        "거제시","거창군","고성군","김해시","남해군","밀양시","사천시","산청군","양산시",
-        "의령군","진주시","창녕군","창원시 마산합포구","창원시 마산회원구","창원시 성산구",
-        "창원시 의창구","창원시 진해구","통영시","하동군","함안군","함양군","합천군"
-    ],
-    "제주특별자치도": ["서귀포시","제주시"]
-}
+import doorlock_as_media as media
+import doorlock_as_notify as notify
+import doorlock_as_metrics as metrics
+import doorlock_as_profiler as profiler
+import doorlock_as_archive as archive
+import doorlock_as_dispatch as dispatch
+import doorlock_as_sla as sla
+import doorlock_as_reception as reception
+import doorlock_as_audit as audit
+import doorlock_as_anomaly as anomaly
+import doorlock_as_reports as reports
+import doorlock_as_jobs as jobs
+import doorlock_as_cache as cache
+import doorlock_as_import as bulk_import
+import doorlock_as_materials as material_cube
+from contextlib import contextmanager
+from doorlock_as_regions import KOREA_REGIONS, parse_region, backfill_regions
+from doorlock_as_schema import migrate
+from doorlock_as_address import open_index
+from doorlock_as_repeat import normalize_phone, backfill_phone_norm, prior_receptions, repeat_rate, REPEAT_GROUPS
+import io, os, json, time
+
+DB_PATH = os.getenv("DOORLOCK_AS_DB", "doorlock_as.db")
+JOBS_ENABLED = os.getenv("AS_JOBS", "1") == "1"  # 0 이면 이 서버에서는 예약 작업을 돌리지 않음
 
 # ==================== 공통 유틸 ====================
 @st.cache_resource
@@ -73,32 +35,69 @@ def get_connection():
     init_master_data(DB_PATH)
     conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.execute("PRAGMA foreign_keys = ON;")
+    migrate(conn)
+    backfill_regions(conn)
+    backfill_phone_norm(conn)
+    sla.backfill(conn)
+    material_cube.backfill(conn)
     return conn
 
-def run_query(query, params=(), to_df=False, fetch_one=False):
+def explain_query(query, params=()):
+    return get_connection().execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+
+@contextmanager
+def _tracked(query, params=()):
+    # 쿼리 지표(metrics) + 프로파일러 db 구간 안에서 실행한 커서
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(query, params)
-    if to_df:
-        if cur.description:
-            cols = [c[0] for c in cur.description]
-            rows = cur.fetchall()
-            return pd.DataFrame(rows, columns=cols)
-        return pd.DataFrame()
-    elif fetch_one:
-        return cur.fetchone()
-    else:
-        conn.commit()
-        return cur.lastrowid
+    with metrics.track("sqlite", query, explain=lambda: explain_query(query, params)) as t:
+        with profiler.phase("db"):
+            yield conn.execute(query, params), t
+
+def run_query(query, params=(), to_df=False):
+    # to_df: 목록/그리드용 DataFrame, 아니면 쓰기(INSERT/UPDATE/DELETE) 후 commit → lastrowid
+    with _tracked(query, params) as (cur, t):
+        if not to_df:
+            get_connection().commit()
+            t["rows"] = cur.rowcount
+            return cur.lastrowid
+        if not cur.description:
+            return pd.DataFrame()
+        cols = [c[0] for c in cur.description]
+        rows = cur.fetchall()
+        t["rows"] = len(rows)
+    with profiler.phase("dataframe"):
+        return pd.DataFrame(rows, columns=cols)
+
+def fetch_scalar(query, params=(), default=None):
+    # 첫 행 첫 컬럼 (COUNT(*), 존재 확인 등). 행이 없거나 NULL 이면 default
+    with _tracked(query, params) as (cur, t):
+        row = cur.fetchone()
+        t["rows"] = 1 if row else 0
+    return default if row is None or row[0] is None else row[0]
+
+def fetch_row(query, params=()):
+    # 한 행 → sqlite3.Row (row['컬럼'] / row[0], dict(row)). 없으면 None
+    with _tracked(query, params) as (cur, t):
+        cur.row_factory = sqlite3.Row
+        row = cur.fetchone()
+        t["rows"] = 1 if row else 0
+    return row
+
+def fetch_columns(query, params=()):
+    # 컬럼별 튜플 {컬럼: (값, ...)} — 선택 목록/매핑용. pd.DataFrame(...) 에 그대로 넣을 수 있다
+    with _tracked(query, params) as (cur, t):
+        rows = cur.fetchall()
+        cols = [c[0] for c in cur.description]
+        t["rows"] = len(rows)
+    return dict(zip(cols, zip(*rows))) if rows else {c: () for c in cols}
+
+def fetch_cached(tables, query, params=()):
+    # fetch_columns 결과를 프로세스 메모리에 캐시 (마스터 데이터 등). tables 중 하나라도 바뀌면 어느 레플리카에서 썼든 버림
+    return get_cache().get(("columns", query, tuple(params)), tables, lambda: fetch_columns(query, params))
 
 def generate_reception_number():
     today = date.today().strftime("%Y%m%d")
-    result = run_query(
-        "SELECT COUNT(*) as cnt FROM as_reception WHERE reception_number LIKE ?",
-        (f"{today}%",),
-        fetch_one=True
-    )
-    count = result[0] if result else 0
+    count = fetch_scalar("SELECT COUNT(*) FROM as_reception WHERE reception_number LIKE ?", (f"{today}%",), default=0)
     return f"{today}({count + 1})"
 
 def log_audit(user_id, action, table_name, record_id, old_value="", new_value=""):
@@ -107,16 +106,144 @@ def log_audit(user_id, action, table_name, record_id, old_value="", new_value=""
         (user_id, action, table_name, record_id, old_value, new_value)
     )
 
+BULK_CHUNK = 900  # SQLite 바인딩 변수 한도(구버전 999) 아래로 id 목록을 나눔
+
+def bulk_update_status(reception_ids, new_status, user):
+    # 선택 접수건 상태 일괄 변경: id BULK_CHUNK 개씩 UPDATE + 감사로그 executemany (전체가 한 트랜잭션)
+    # 완료일: '접수'로 되돌리면 비우고, 그 외에는 없을 때만 오늘 날짜 기록
+    ids = sorted(int(i) for i in reception_ids)
+    if not ids:
+        return 0
+    scope, scope_params = "status <> ?", [new_status]
+    if user['role'] != '관리자':
+        scope += " AND branch_id = ?"; scope_params.append(user['branch_id'])
+    conn = get_connection()
+    changed = 0
+    with metrics.track("sqlite", f"BULK_UPDATE as_reception SET status WHERE id IN (?) AND {scope}") as t, conn:
+        for i in range(0, len(ids), BULK_CHUNK):
+            chunk = ids[i:i + BULK_CHUNK]
+            where = f"id IN ({','.join('?' * len(chunk))}) AND {scope}"
+            params = [*chunk, *scope_params]
+            before = conn.execute(f"SELECT id, status FROM as_reception WHERE {where}", params).fetchall()
+            cur = conn.execute(f"""
+                UPDATE as_reception
+                SET status = ?,
+                    version = version + 1,
+                    complete_date = CASE WHEN ? = '접수' THEN NULL
+                                         WHEN complete_date IS NULL THEN ?
+                                         ELSE complete_date END,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE {where}
+            """, [new_status, new_status, str(date.today()), *params])
+            conn.executemany(
+                "INSERT INTO audit_log (user_id, action, table_name, record_id, old_value, new_value) VALUES (?, ?, ?, ?, ?, ?)",
+                [(user['id'], 'BULK_UPDATE', 'as_reception', rid, old, new_status) for rid, old in before]
+            )
+            sla.sync(conn, [rid for rid, _ in before])
+            dispatch.close_finished(conn, [rid for rid, _ in before])
+            changed += cur.rowcount
+        t["rows"] = changed
+    return changed
+
 def download_excel(df, filename="export.xlsx"):
+    with profiler.phase("export"):
+        return _build_excel(df)
+
+def _build_excel(df):
+    # df 하나 → Sheet1, {시트명: df} → 시트 여러 개
+    sheets = df if isinstance(df, dict) else {'Sheet1': df}
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
+        for name, frame in sheets.items():
+            frame.to_excel(writer, index=False, sheet_name=name)
     output.seek(0)
     return output
 
+@st.cache_resource
+def get_report_pool():
+    # 월말 지점별 보고서 렌더링 (서버 프로세스당 1개)
+    return reports.create_pool()
+
+@st.cache_resource
+def get_cache():
+    # 레플리카별 메모리 캐시 (서버 프로세스당 1개) — cache_version 테이블 버전으로 다른 프로세스의 쓰기도 감지
+    get_connection()  # cache_version 테이블/트리거 보장
+    return cache.VersionedCache(DB_PATH)
+
+@st.cache_resource
+def get_job_scheduler():
+    # 예약 작업 (서버 프로세스당 1개, rerun 과 무관한 백그라운드 스레드 — 레플리카 간에는 임대로 1곳만 실행)
+    get_connection()  # job_schedule 테이블 보장
+    scheduler = jobs.Scheduler(DB_PATH, jobs.default_jobs())
+    scheduler.start()
+    return scheduler
+
+@st.cache_resource
+def get_media_jobs():
+    # 썸네일/미리보기 생성 (프로세스 풀 + 파일별 진행/실패 상태, 서버 프로세스당 1개)
+    return media.DerivativeJobs(media.create_pool())
+
+@st.cache_resource
+def get_address_index():
+    # 오프라인 주소 인덱스 (파일이 없으면 None → 드롭다운 입력)
+    return open_index()
+
+def show_attachment(apath, key):
+    # 첨부파일: 미리보기만 먼저 전송, 원본은 요청 시에만 전송
+    apath = (apath or "").strip()
+    if not (apath and os.path.exists(apath)):
+        return
+    st.markdown("**📎 첨부파일**")
+    fname = os.path.basename(apath)
+    size_mb = os.path.getsize(apath) / 1024 / 1024
+    if media.is_previewable(apath):
+        jobs = get_media_jobs()
+        status = jobs.status(apath)
+        if status == "ready":
+            # 썸네일만 먼저, 미리보기(웹용 크기)는 펼칠 때 전송
+            paths = media.derived_paths(apath)
+            if st.toggle("크게 보기", key=f"{key}_preview"):
+                st.image(paths["preview"], use_column_width=True)
+            else:
+                st.image(paths["thumb"])
+        elif status == "failed":
+            error = jobs.take_error(apath)
+            if error:
+                st.warning(f"미리보기를 만들지 못했습니다: {error}")
+            else:
+                st.caption("미리보기 없음 — 원본 보기를 이용하세요.")
+            if st.button("🔁 미리보기 다시 만들기", key=f"{key}_retry"):
+                jobs.retry(apath)
+                st.caption("미리보기 생성 중입니다. 잠시 후 다시 열어 주세요.")
+        else:
+            # 이전에 업로드된 파일 등: 백그라운드 생성 후 다음 열람부터 표시 (진행 중이면 다시 제출하지 않음)
+            jobs.submit(apath)
+            st.caption("미리보기 생성 중입니다. 잠시 후 다시 열어 주세요.")
+    if st.toggle(f"원본 보기/다운로드 ({fname}, {size_mb:.1f}MB)", key=f"{key}_orig"):
+        with open(apath, "rb") as f:
+            st.download_button("첨부파일 다운로드", f, file_name=fname, key=f"{key}_download")
+        if os.path.splitext(apath)[1].lower() in media.IMAGE_EXTS:
+            st.image(apath, use_column_width=True)
+
+@st.cache_resource
+def get_notification_dispatcher():
+    # SMS 발송 디스패처 (서버 프로세스당 1개, 백그라운드 스레드)
+    dispatcher = notify.Dispatcher(DB_PATH, notify.providers_from_env())
+    dispatcher.start()
+    return dispatcher
+
 def send_sms_notification(phone, message):
-    print(f"📱 SMS 발송: {phone} - {message}")
-    pass
+    # 요청 경로에서는 outbox 적재만, 실제 발송은 디스패처가 처리
+    notify.enqueue(get_connection(), phone, message)
+    get_notification_dispatcher()
+
+@contextmanager
+def page_scope(name):
+    # 페이지/팝업 1회 실행 범위: 쿼리 계측 페이지명 + (켜져 있으면) 프로파일링
+    enabled = profiler.ENABLED or st.session_state.get('profiling', False)
+    capture = st.session_state.pop('profile_capture', False)
+    with metrics.page_context(name), profiler.profile_run(name, enabled=enabled, capture=capture):
+        yield
 
 # ==================== 로그인 ====================
 def init_session_state():
@@ -133,15 +260,14 @@ def login_page():
         password = st.text_input("비밀번호", type="password", placeholder="비밀번호를 입력하세요")
         submitted = st.form_submit_button("로그인", use_container_width=True)
         if submitted:
-            user = run_query(
+            user = fetch_row(
                 "SELECT * FROM users WHERE username=? AND password=? AND is_active=1",
-                (username, password),
-                to_df=True
+                (username, password)
             )
-            if not user.empty:
+            if user is not None:
                 st.session_state.logged_in = True
-                st.session_state.user = user.iloc[0].to_dict()
-                st.success(f"✅ {user.iloc[0]['name']}님 환영합니다!")
+                st.session_state.user = dict(user)
+                st.success(f"✅ {user['name']}님 환영합니다!")
                 st.rerun()
             else:
                 st.error("❌ 아이디 또는 비밀번호가 올바르지 않습니다.")
@@ -152,26 +278,32 @@ def logout():
     st.rerun()
 
 # ==================== 팝업: 접수 수정 ====================
-@st.dialog("접수 내역 수정", width="large")
+EDIT_WIDGET_KEYS = ("edit_customer","edit_phone","edit_order","edit_address","edit_address_detail","edit_model",
+                    "edit_symptom_cat","edit_symptom_code","edit_status","edit_payment","edit_install_date","edit_detail")
+
 def edit_reception_dialog(reception_number, user):
-    detail = run_query("SELECT * FROM as_reception WHERE reception_number=?", (reception_number,), to_df=True)
-    if detail.empty:
+    # 팝업을 새로 열 때만 기준 행을 비움 (팝업 안 rerun 은 처음 읽은 행·버전과 비교)
+    st.session_state.pop(f"edit_base_{reception_number}", None)
+    st.session_state.pop(f"edit_conflict_{reception_number}", None)
+    _edit_reception_dialog(reception_number, user)
+
+@st.dialog("접수 내역 수정", width="large")
+@page_scope("팝업: 접수 내역 수정")
+def _edit_reception_dialog(reception_number, user):
+    base_key, conflict_key = f"edit_base_{reception_number}", f"edit_conflict_{reception_number}"
+    if base_key not in st.session_state:
+        with metrics.track("sqlite", "SELECT (수정 컬럼) FROM as_reception WHERE reception_number = ?", normalize=False) as t:
+            st.session_state[base_key] = reception.load(get_connection(), reception_number)
+            t["rows"] = 1 if st.session_state[base_key] else 0
+    row = st.session_state[base_key]
+    if row is None:
         st.error("해당 접수 내역을 찾을 수 없습니다.")
         return
-    row = detail.iloc[0]
 
     st.info(f"**접수번호:** {row['reception_number']} | **등록자:** {row['registrant_name']} | **등록일:** {row['created_at']}")
 
     # 첨부파일 표시
-    apath = (row.get('attachment_path') or "").strip()
-    if apath and os.path.exists(apath):
-        st.markdown("**📎 첨부파일**")
-        fname = os.path.basename(apath)
-        with open(apath, "rb") as f:
-            st.download_button("첨부파일 다운로드", f, file_name=fname)
-        ext = os.path.splitext(apath)[1].lower()
-        if ext in [".png", ".jpg", ".jpeg", ".webp"]:
-            st.image(apath, use_column_width=True)
+    show_attachment(row['attachment_path'], key="edit_attach")
 
     st.markdown("### 📋 고객 정보")
     cols = st.columns(3)
@@ -180,23 +312,24 @@ def edit_reception_dialog(reception_number, user):
     e_order    = cols[2].text_input("주문번호", row['order_number'] or "", key="edit_order")
 
     e_address = st.text_input("주소", row['address'] or "", key="edit_address")
+    st.caption("※ 주소는 `시/도 시·군·구 상세주소` 형식으로 입력하세요. (지역별 통계에 사용)")
     e_address_detail = st.text_input("상세주소", row['address_detail'] or "", key="edit_address_detail")
 
     st.markdown("### 🔧 제품 및 증상")
     cols2 = st.columns(3)
-    models = run_query("SELECT model_code, model_name FROM product_model", to_df=True)
-    model_options = dict(zip(models['model_code'], models['model_name'])) if not models.empty else {}
+    models = fetch_cached(("product_model",), "SELECT model_code, model_name FROM product_model")
+    model_options = dict(zip(models['model_code'], models['model_name']))
     e_model = cols2[0].selectbox("제품 모델", list(model_options.keys()) if model_options else [],
                                  index=list(model_options.keys()).index(row['model_code']) if model_options and row['model_code'] in model_options else 0,
                                  format_func=lambda x: model_options.get(x, x), key="edit_model")
 
-    symptoms = run_query("SELECT category, code, description FROM symptom_code", to_df=True)
-    symptom_categories = sorted(symptoms['category'].unique(), key=lambda x: int(x.split('.')[0]) if isinstance(x,str) and '.' in x else 999) if not symptoms.empty else []
+    symptoms = fetch_cached(("symptom_code",), "SELECT category, code, description FROM symptom_code")
+    symptom_categories = sorted(dict.fromkeys(symptoms['category']), key=lambda x: int(x.split('.')[0]) if isinstance(x,str) and '.' in x else 999)
     e_symptom_cat = cols2[1].selectbox("증상 대분류", symptom_categories,
                                        index=symptom_categories.index(row['symptom_category']) if row['symptom_category'] in symptom_categories else 0,
                                        key="edit_symptom_cat")
-    filtered_symptoms = symptoms[symptoms['category'] == e_symptom_cat] if not symptoms.empty else pd.DataFrame()
-    symptom_options = dict(zip(filtered_symptoms['code'], filtered_symptoms['description'])) if not filtered_symptoms.empty else {}
+    symptom_options = {code: desc for cat, code, desc in zip(symptoms['category'], symptoms['code'], symptoms['description'])
+                       if cat == e_symptom_cat}
     e_symptom_code = cols2[2].selectbox("증상 상세", list(symptom_options.keys()) if symptom_options else [],
                                         index=list(symptom_options.keys()).index(row['symptom_code']) if symptom_options and row['symptom_code'] in symptom_options else 0,
                                         format_func=lambda x: f"{x} - {symptom_options.get(x,'')}", key="edit_symptom_code")
@@ -217,31 +350,87 @@ def edit_reception_dialog(reception_number, user):
 
     cols_btn = st.columns([1,1,2])
     if cols_btn[0].button("💾 저장", type="primary", use_container_width=True):
-        old_status = row['status']; complete_date = None
-        if e_status == '완료' and old_status != '완료':
+        old_status = row['status']; complete_date = row['complete_date']
+        e_sido, e_sgg = parse_region(e_address)
+        if e_status == '접수':
+            complete_date = None
+        elif (e_status == '완료' and old_status != '완료') or not complete_date:
             complete_date = str(date.today())
-        run_query("""
-            UPDATE as_reception
-            SET customer_name=?, phone=?, order_number=?, address=?, address_detail=?,
-                model_code=?, symptom_category=?, symptom_code=?, symptom_description=?,
-                detail_content=?, status=?, payment_type=?, install_date=?, complete_date=?,
-                updated_at=CURRENT_TIMESTAMP
-            WHERE reception_number=?
-        """, (e_customer, e_phone, e_order, e_address, e_address_detail, e_model, e_symptom_cat,
-              e_symptom_code, symptom_options.get(e_symptom_code, ""), e_detail, e_status, e_payment,
-              str(e_install_date) if e_install_date else None, complete_date, reception_number))
-        log_audit(user['id'], 'UPDATE', 'as_reception', row['id'], old_status, e_status)
-        st.success("✅ 수정 완료!"); st.rerun()
+        changes = reception.diff(row, {
+            "customer_name": e_customer, "phone": e_phone, "phone_norm": normalize_phone(e_phone),
+            "order_number": e_order, "address": e_address, "address_detail": e_address_detail,
+            "sido": e_sido or "", "sigungu": e_sgg or "", "model_code": e_model,
+            "symptom_category": e_symptom_cat, "symptom_code": e_symptom_code,
+            "symptom_description": symptom_options.get(e_symptom_code, ""), "detail_content": e_detail,
+            "status": e_status, "payment_type": e_payment,
+            "install_date": str(e_install_date) if e_install_date else None, "complete_date": complete_date,
+        })
+        if not changes:
+            st.info("변경된 내용이 없습니다.")
+        elif _save_reception(row, changes, user):
+            st.success("✅ 수정 완료!"); st.rerun()
+        else:
+            st.session_state[conflict_key] = {"current": reception.load(get_connection(), reception_number), "mine": changes}
     if cols_btn[1].button("❌ 취소", use_container_width=True):
         st.rerun()
+    if conflict_key in st.session_state:
+        merge_prompt(reception_number, user)
+
+def _save_reception(base, changes, user):
+    # 바뀐 필드만 UPDATE ... WHERE id=? AND version=? (0건이면 충돌)
+    with metrics.track("sqlite", "UPDATE as_reception SET (변경 필드), version = version + 1 WHERE id = ? AND version = ?",
+                       normalize=False) as t:
+        with profiler.phase("db"):
+            ok = reception.update(get_connection(), base, changes, user['id'])
+        t["rows"] = int(ok)
+    return ok
+
+def merge_prompt(reception_number, user):
+    # 저장 충돌: 열었을 때 / 다른 사용자 / 내 값 비교 → 충돌 필드만 선택 후 최신 버전 위에 다시 저장
+    base_key, conflict_key = f"edit_base_{reception_number}", f"edit_conflict_{reception_number}"
+    base = st.session_state[base_key]
+    current, mine = st.session_state[conflict_key]["current"], st.session_state[conflict_key]["mine"]
+    st.divider()
+    if current is None:
+        st.error("다른 사용자가 삭제했거나 보관 처리한 접수입니다.")
+        return
+    auto, conflicts = reception.merge(base, current, mine)
+    st.warning(f"⚠️ 다른 사용자가 먼저 저장했습니다. (버전 {base['version']} → {current['version']}) 변경 내용을 확인하세요.")
+    fields = [c for c in reception.FIELD_LABELS if c in mine or not reception.same(base[c], current[c])]
+    st.dataframe(pd.DataFrame([{
+        "항목": reception.FIELD_LABELS[c],
+        "열었을 때": base[c], "다른 사용자": current[c], "내 값": mine.get(c, base[c]),
+        "처리": "충돌" if c in conflicts else "내 값 반영" if c in auto else "다른 사용자 값 유지",
+    } for c in fields]).astype(str), use_container_width=True, hide_index=True)
+    chosen = dict(auto)
+    for c, (theirs, my) in conflicts.items():
+        pick = st.radio(f"{reception.FIELD_LABELS[c]}: 어느 값을 저장할까요?", [f"내 값: {my}", f"다른 사용자 값: {theirs}"],
+                        horizontal=True, key=f"merge_{c}")
+        if pick.startswith("내 값"):
+            chosen[c] = my
+    b1, b2, _ = st.columns([1, 1, 2])
+    if b1.button("🔀 병합 저장", type="primary", use_container_width=True):
+        if not chosen or _save_reception(current, chosen, user):
+            st.session_state.pop(conflict_key)
+            st.success("✅ 병합 저장 완료!"); st.rerun()
+        else:
+            st.session_state[conflict_key]["current"] = reception.load(get_connection(), reception_number)
+            st.rerun(scope="fragment")
+    if b2.button("🔄 최신 내용으로 다시 열기", use_container_width=True):
+        st.session_state[base_key] = current
+        st.session_state.pop(conflict_key)
+        for k in EDIT_WIDGET_KEYS:
+            st.session_state.pop(k, None)
+        st.rerun(scope="fragment")
+
 
 # ==================== 팝업: 처리 결과 등록 ====================
 @st.dialog("처리 결과 등록", width="large")
+@page_scope("팝업: 처리 결과 등록")
 def result_registration_dialog(reception_number, user):
-    detail = run_query("SELECT * FROM as_reception WHERE reception_number=?", (reception_number,), to_df=True)
-    if detail.empty:
+    row = fetch_row("SELECT * FROM as_reception WHERE reception_number=?", (reception_number,))
+    if row is None:
         st.error("해당 접수 내역을 찾을 수 없습니다."); return
-    row = detail.iloc[0]
 
     st.markdown("### 📋 접수 정보")
     c1,c2,c3 = st.columns(3)
@@ -250,32 +439,25 @@ def result_registration_dialog(reception_number, user):
     c3.success(f"**현재 상태**  \n{row['status']}")
 
     # 첨부파일 표시
-    apath = (row.get('attachment_path') or "").strip()
-    if apath and os.path.exists(apath):
-        st.markdown("**📎 첨부파일**")
-        fname = os.path.basename(apath)
-        with open(apath, "rb") as f:
-            st.download_button("첨부파일 다운로드", f, file_name=fname)
-        ext = os.path.splitext(apath)[1].lower()
-        if ext in [".png",".jpg",".jpeg",".webp"]:
-            st.image(apath, use_column_width=True)
+    show_attachment(row['attachment_path'], key="result_attach")
 
     payment_type = row['payment_type'] or ""
     st.markdown("### 🔧 처리 결과 입력")
     result_text = st.text_area("처리 내용", height=100, placeholder="작업 내용을 상세히 입력하세요", key="result_text")
 
     st.markdown("**사용 자재**")
-    materials = run_query("SELECT material_code, material_name, unit_price FROM material_code ORDER BY material_code", to_df=True)
+    materials = fetch_cached(("material_code",), "SELECT material_code, material_name, unit_price FROM material_code ORDER BY material_code")
+    opt = dict(zip(materials['material_code'], materials['material_name']))
+    prices = dict(zip(materials['material_code'], materials['unit_price']))
     selected_materials = []
     for i in range(5):
         cols = st.columns([3,1,2])
-        if not materials.empty:
-            opt = dict(zip(materials['material_code'], materials['material_name']))
+        if opt:
             selected_mat = cols[0].selectbox(f"자재 {i+1}", ["선택안함"] + list(opt.keys()),
                                              format_func=lambda x: opt.get(x, x), key=f"result_mat_{i}")
             if selected_mat != "선택안함":
                 qty = cols[1].number_input("수량", min_value=1, value=1, key=f"result_qty_{i}")
-                wholesale_price = materials.loc[materials['material_code']==selected_mat, 'unit_price'].values[0]
+                wholesale_price = prices[selected_mat] or 0
                 display_price = 0 if payment_type in ("무상","출장비유상/부품비무상") else wholesale_price
                 cols[2].metric("단가", f"{display_price:,.0f}원")
                 selected_materials.append({"code": selected_mat, "name": opt[selected_mat], "qty": qty, "price": display_price})
@@ -293,19 +475,29 @@ def result_registration_dialog(reception_number, user):
     b1,b2,_ = st.columns([1,1,2])
     if b1.button("✅ 저장하고 완료 처리", type="primary", use_container_width=True):
         try:
-            result_id = run_query("""
-                INSERT INTO as_result (reception_id, technician_id, technician_name, result, labor_cost, labor_reason, completed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (int(row['id']), user['id'], user['name'], result_text, labor_cost,
-                  None if labor_reason=="선택안함" else labor_reason, str(date.today())))
-            for m in selected_materials:
-                run_query("""
+            # 결과·자재·상태·배정·SLA·자재 큐브·감사로그를 한 트랜잭션으로 (중간에 실패하면 모두 롤백)
+            rid = int(row['id'])
+            conn = get_connection()
+            with metrics.track("sqlite", "RESULT_SAVE as_result/as_material_usage/as_reception WHERE id=?") as t, conn:
+                result_id = conn.execute("""
+                    INSERT INTO as_result (reception_id, technician_id, technician_name, result, labor_cost, labor_reason, completed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (rid, user['id'], user['name'], result_text, labor_cost,
+                      None if labor_reason=="선택안함" else labor_reason, str(date.today()))).lastrowid
+                conn.executemany("""
                     INSERT INTO as_material_usage (reception_id, material_code, material_name, quantity, unit_price)
                     VALUES (?, ?, ?, ?, ?)
-                """, (int(row['id']), m['code'], m['name'], m['qty'], m['price']))
-            run_query("UPDATE as_reception SET status='검수완료', complete_date=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
-                      (str(date.today()), int(row['id'])))
-            log_audit(user['id'], 'INSERT', 'as_result', result_id, '', reception_number)
+                """, [(rid, m['code'], m['name'], m['qty'], m['price']) for m in selected_materials])
+                conn.execute("UPDATE as_reception SET status='검수완료', complete_date=?, version=version+1, updated_at=CURRENT_TIMESTAMP WHERE id=?",
+                             (str(date.today()), rid))
+                dispatch.complete(conn, rid)
+                sla.sync(conn, [rid])
+                material_cube.sync(conn)
+                conn.execute(
+                    "INSERT INTO audit_log (user_id, action, table_name, record_id, old_value, new_value) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user['id'], 'INSERT', 'as_result', result_id, '', reception_number)
+                )
+                t["rows"] = 1 + len(selected_materials)
             st.success("✅ 처리 결과 저장 완료!"); st.balloons(); st.rerun()
         except Exception as e:
             st.error(f"❌ 저장 실패: {e}")
@@ -322,14 +514,14 @@ def main_app():
     st.sidebar.caption(f"소속: {user.get('branch_name', '본사')}")
     if role == '관리자':
         menu = st.sidebar.radio("메뉴", [
-            "📊 대시보드","📝 AS 접수 등록","📋 접수 내역 조회","🔧 접수 결과 등록",
+            "📊 대시보드","📝 AS 접수 등록","📥 접수 일괄 등록","📋 접수 내역 조회","🔧 접수 결과 등록","🗓️ 기사 배정",
             "🏢 지점 관리","📦 재고/입출고 관리","🏷️ 자재 코드 관리","💰 인건비 관리",
-            "📈 품질/VOC 통계","👤 사용자 관리"
+            "📈 품질/VOC 통계","🕒 처리 기간(SLA)","🧩 자재 소비/원가","👤 사용자 관리","🧾 감사 로그","⏲️ 예약 작업","📡 쿼리 메트릭","⏱️ 성능 패널"
         ])
     elif role == '지점':
         menu = st.sidebar.radio("메뉴", [
-            "📊 대시보드","📝 AS 접수 등록","📋 접수 내역 조회","🔧 접수 결과 등록",
-            "📦 재고 관리","📈 품질 통계"
+            "📊 대시보드","📝 AS 접수 등록","📥 접수 일괄 등록","📋 접수 내역 조회","🔧 접수 결과 등록","🗓️ 기사 배정",
+            "📦 재고 관리","📈 품질 통계","🕒 처리 기간(SLA)","🧩 자재 소비/원가"
         ])
     else:
         menu = st.sidebar.radio("메뉴", ["📋 내 작업 조회","🔧 작업 결과 입력"])
@@ -337,13 +529,23 @@ def main_app():
     # 로그아웃
     if st.sidebar.button("🚪 로그아웃", use_container_width=True): logout()
 
-    # 라우팅
+    # 라우팅 (쿼리 계측/프로파일링에 호출 페이지 기록)
+    with page_scope(menu):
+        route_page(menu, user, role, branch_id)
+
+def route_page(menu, user, role, branch_id):
     if   menu == "📊 대시보드":            page_dashboard(user, role, branch_id)
     elif menu == "📝 AS 접수 등록":        page_reception_register(user)
-    elif menu in ("📋 접수 내역 조회","📋 내 작업 조회"):
-        page_reception_list(user, role, branch_id)
+    elif menu == "📥 접수 일괄 등록":
+        if role in ('관리자', '지점'):
+            page_bulk_import(user, role, branch_id)
+        else:
+            st.error("접속 권한이 없습니다.")
+    elif menu == "📋 접수 내역 조회":     page_reception_list(user, role, branch_id)
+    elif menu == "📋 내 작업 조회":       page_my_queue(user)
     elif menu in ("🔧 접수 결과 등록","🔧 작업 결과 입력"):
         page_result_register(user, role, branch_id)
+    elif menu == "🗓️ 기사 배정":          page_dispatch(user, role, branch_id)
     elif menu == "🏢 지점 관리":            page_branch_manage()
     elif menu in ("📦 재고/입출고 관리","📦 재고 관리"):
         page_inventory_manage(user, role, branch_id)
@@ -351,26 +553,50 @@ def main_app():
     elif menu == "💰 인건비 관리":         page_labor_cost_manage()
     elif menu in ("📈 품질/VOC 통계","📈 품질 통계"):
         page_quality_stats(role, branch_id)
+    elif menu == "🕒 처리 기간(SLA)":      page_sla(role, branch_id)
+    elif menu == "🧩 자재 소비/원가":      page_material_cube(role, branch_id)
     elif menu == "👤 사용자 관리":
         # 관리자 아이디(admin)만 접근 허용
         if (user.get('username') or "").lower() == "admin":
             page_user_manage()
         else:
             st.error("접속 권한이 없습니다. (관리자 전용)")
+    elif menu == "📡 쿼리 메트릭":
+        if role == '관리자':
+            page_query_metrics()
+        else:
+            st.error("접속 권한이 없습니다. (관리자 전용)")
+    elif menu == "⏱️ 성능 패널":
+        if role == '관리자':
+            page_performance_panel()
+        else:
+            st.error("접속 권한이 없습니다. (관리자 전용)")
+    elif menu == "🧾 감사 로그":
+        if role == '관리자':
+            page_audit_log()
+        else:
+            st.error("접속 권한이 없습니다. (관리자 전용)")
+    elif menu == "⏲️ 예약 작업":
+        if role == '관리자':
+            page_jobs()
+        else:
+            st.error("접속 권한이 없습니다. (관리자 전용)")
 
 # ==================== 페이지 1: 대시보드 ====================
 def page_dashboard(user, role, branch_id):
     st.title("📊 대시보드")
     where_clause = "" if role == '관리자' else f"WHERE branch_id = {branch_id}"
     c1,c2,c3,c4 = st.columns(4)
-    total     = run_query(f"SELECT COUNT(*) as cnt FROM as_reception {where_clause}", to_df=True)
-    waiting   = run_query(f"SELECT COUNT(*) as cnt FROM as_reception {where_clause} {'AND' if where_clause else 'WHERE'} status='접수'", to_df=True)
-    complete  = run_query(f"SELECT COUNT(*) as cnt FROM as_reception {where_clause} {'AND' if where_clause else 'WHERE'} status='완료'", to_df=True)
-    inspected = run_query(f"SELECT COUNT(*) as cnt FROM as_reception {where_clause} {'AND' if where_clause else 'WHERE'} status='검수완료'", to_df=True)
-    c1.metric("전체 접수", f"{total['cnt'][0]}건")
-    c2.metric("접수 대기", f"{waiting['cnt'][0]}건")
-    c3.metric("완료",      f"{complete['cnt'][0]}건")
-    c4.metric("검수완료",  f"{inspected['cnt'][0]}건")
+    status_and = 'AND' if where_clause else 'WHERE'
+    total     = fetch_scalar(f"SELECT COUNT(*) FROM as_reception {where_clause}")
+    waiting   = fetch_scalar(f"SELECT COUNT(*) FROM as_reception {where_clause} {status_and} status='접수'")
+    complete  = fetch_scalar(f"SELECT COUNT(*) FROM as_reception {where_clause} {status_and} status='완료'")
+    inspected = fetch_scalar(f"SELECT COUNT(*) FROM as_reception {where_clause} {status_and} status='검수완료'")
+    archived  = archive.archived_counts(get_connection(), None if role == '관리자' else branch_id)  # 보관분은 모두 검수완료
+    c1.metric("전체 접수", f"{total + archived}건")
+    c2.metric("접수 대기", f"{waiting}건")
+    c3.metric("완료",      f"{complete}건")
+    c4.metric("검수완료",  f"{inspected + archived}건")
     st.divider()
     st.subheader("🕐 최근 접수 내역")
     recent_df = run_query(f"""
@@ -389,17 +615,14 @@ def page_dashboard(user, role, branch_id):
 def page_reception_register(user):
     st.title("📝 AS 접수 등록")
 
-    branches = run_query("SELECT id, branch_name FROM branch", to_df=True)
-    models   = run_query("SELECT model_code, model_name FROM product_model", to_df=True)
-    symptoms = run_query("SELECT category, code, description FROM symptom_code ORDER BY code", to_df=True)
+    branches = fetch_cached(("branch",), "SELECT id, branch_name FROM branch")
+    models   = fetch_cached(("product_model",), "SELECT model_code, model_name FROM product_model")
+    symptoms = fetch_cached(("symptom_code",), "SELECT category, code, description FROM symptom_code ORDER BY code")
 
-    if not symptoms.empty:
-        def extract_number(cat):
-            try: return int(cat.split('.')[0])
-            except: return 999
-        sorted_categories = sorted(symptoms['category'].unique(), key=extract_number)
-    else:
-        sorted_categories = []
+    def extract_number(cat):
+        try: return int(cat.split('.')[0])
+        except: return 999
+    sorted_categories = sorted(dict.fromkeys(symptoms['category']), key=extract_number)
 
     st.markdown("### 📋 고객 정보")
     cols1 = st.columns([2, 2, 2])
@@ -407,24 +630,43 @@ def page_reception_register(user):
     phone         = cols1[1].text_input("전화번호*", placeholder="010-1234-5678")
     order_number  = cols1[2].text_input("주문번호", placeholder="선택사항")
 
-    # ===== 주소: 시/도, 시·군·구 드롭다운 + 상세주소 자유 입력 =====
+    # ===== 주소: 오프라인 주소 검색(인덱스가 있을 때) → 없으면 시/도, 시·군·구 드롭다운 + 상세주소 =====
     st.markdown("### 🏠 주소")
-    caddr1, caddr2, caddr3 = st.columns([2,2,6])
-    sido_list = list(KOREA_REGIONS.keys())
-    sel_sido = caddr1.selectbox("시/도*", options=sido_list, index=0)
-    sgg_list = KOREA_REGIONS.get(sel_sido, [])
-    sel_sgg  = caddr2.selectbox("시·군·구*", options=sgg_list, index=0 if sgg_list else None)
-    addr_free = caddr3.text_input("상세주소(자유 입력)*", placeholder="도로명, 건물명/동·층·호 등")
+    addr_index = get_address_index()
+    picked = None
+    if addr_index:
+        addr_query = st.text_input("🔎 주소 검색", placeholder="도로명+건물번호 / 건물명 / 동+지번 (예: 테헤란로 152)")
+        if addr_query.strip():
+            suggestions = addr_index.suggest(addr_query)
+            if suggestions:
+                picked = st.selectbox("검색 결과", suggestions,
+                                      format_func=lambda a: f"[{a['zipcode']}] {a['road_address']}"
+                                                            + (f" ({a['bldg_name']})" if a['bldg_name'] else ""))
+            else:
+                st.caption("검색 결과가 없습니다. 아래에서 시/도·시·군·구를 직접 선택하세요.")
+    if picked:
+        sel_sido, sel_sgg = picked['sido'], picked['sigungu']
+        caddr1, caddr3 = st.columns([4,6])
+        caddr1.text_input("도로명주소", f"{picked['road_address']} (우편번호 {picked['zipcode']})", disabled=True)
+        addr_rest = caddr3.text_input("상세주소", placeholder="동·층·호 등")
+        addr_free = f"{picked['street']} {addr_rest}".strip()
+    else:
+        caddr1, caddr2, caddr3 = st.columns([2,2,6])
+        sido_list = list(KOREA_REGIONS.keys())
+        sel_sido = caddr1.selectbox("시/도*", options=sido_list, index=0)
+        sgg_list = KOREA_REGIONS.get(sel_sido, [])
+        sel_sgg  = caddr2.selectbox("시·군·구*", options=sgg_list, index=0 if sgg_list else None)
+        addr_free = caddr3.text_input("상세주소(자유 입력)*", placeholder="도로명, 건물명/동·층·호 등")
     st.caption("※ 주소는 저장 시 `시/도 시·군·구 상세주소`로 합쳐집니다.")
 
     st.markdown("### 🔧 제품 및 증상 정보")
     cols2 = st.columns([2, 2, 2])
-    model_options = dict(zip(models['model_code'], models['model_name'])) if not models.empty else {}
+    model_options = dict(zip(models['model_code'], models['model_name']))
     selected_model = cols2[0].selectbox("제품 모델*", options=list(model_options.keys()) if model_options else [],
                                         format_func=lambda x: model_options.get(x, x))
     symptom_category = cols2[1].selectbox("증상 대분류*", options=sorted_categories)
-    filtered_symptoms = symptoms[symptoms['category'] == symptom_category] if not symptoms.empty else pd.DataFrame()
-    symptom_options = dict(zip(filtered_symptoms['code'], filtered_symptoms['description'])) if not filtered_symptoms.empty else {}
+    symptom_options = {code: desc for cat, code, desc in zip(symptoms['category'], symptoms['code'], symptoms['description'])
+                       if cat == symptom_category}
     if symptom_options:
         selected_symptom_code = cols2[2].selectbox("증상 상세*", options=list(symptom_options.keys()),
                                                    format_func=lambda x: f"{x} - {symptom_options[x]}")
@@ -432,6 +674,10 @@ def page_reception_register(user):
         selected_symptom_code = None
         cols2[2].warning("증상 데이터가 없습니다")
 
+    # ===== 같은 전화번호의 이전 접수 (phone_norm 인덱스 조회) =====
+    if phone:
+        show_prior_receptions(phone, selected_model)
+
     with st.form("reception_form"):
         cols3 = st.columns([2, 2, 2])
         install_date = cols3[0].date_input("설치일자", value=None)
@@ -440,7 +686,7 @@ def page_reception_register(user):
         payment_type = cols3[2].selectbox("유무상 구분*", payment_options)
 
         if user['role'] == '관리자':
-            branch_options = dict(zip(branches['id'], branches['branch_name'])) if not branches.empty else {}
+            branch_options = dict(zip(branches['id'], branches['branch_name']))
             selected_branch = st.selectbox("담당 지점*", options=list(branch_options.keys()) if branch_options else [],
                                           format_func=lambda x: branch_options.get(x, str(x)))
         else:
@@ -465,19 +711,19 @@ def page_reception_register(user):
                     attachment_path = os.path.join("uploads", fname)
                     with open(attachment_path, "wb") as f:
                         f.write(uploaded_file.getbuffer())
+                    get_media_jobs().submit(attachment_path)
 
                 address = f"{sel_sido} {sel_sgg} {addr_free}".strip()
-                branch_name = run_query("SELECT branch_name FROM branch WHERE id=?", (selected_branch,), fetch_one=True)
-                branch_name = branch_name[0] if branch_name else ""
+                branch_name = fetch_scalar("SELECT branch_name FROM branch WHERE id=?", (selected_branch,), default="")
 
                 rid = run_query("""
                     INSERT INTO as_reception
-                    (order_number, reception_number, customer_name, phone, address, address_detail,
+                    (order_number, reception_number, customer_name, phone, phone_norm, address, address_detail, sido, sigungu,
                      model_code, symptom_category, symptom_code, symptom_description, detail_content,
                      branch_id, branch_name, registrant_id, registrant_name, request_date, install_date,
                      status, payment_type, attachment_path)
-                    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-                """, (order_number, reception_number, customer_name, phone, address, addr_free,
+                    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+                """, (order_number, reception_number, customer_name, phone, normalize_phone(phone), address, addr_free, sel_sido, sel_sgg,
                       selected_model, symptom_category, selected_symptom_code,
                       symptom_options.get(selected_symptom_code, ""),
                       detail_content, selected_branch, branch_name, user['id'], user['name'],
@@ -485,11 +731,29 @@ def page_reception_register(user):
                       '접수', payment_type, attachment_path))
 
                 log_audit(user['id'], 'INSERT', 'as_reception', rid, '', reception_number)
-                branch_phone = run_query("SELECT phone FROM branch WHERE id=?", (selected_branch,), fetch_one=True)
-                if branch_phone and branch_phone[0]:
-                    send_sms_notification(branch_phone[0], f"[AS접수] {reception_number} - {customer_name} ({phone})")
+                branch_phone = fetch_scalar("SELECT phone FROM branch WHERE id=?", (selected_branch,))
+                if branch_phone:
+                    send_sms_notification(branch_phone, f"[AS접수] {reception_number} - {customer_name} ({phone})")
                 st.success(f"✅ 접수 등록 완료! (접수번호: {reception_number})"); st.balloons()
 
+def show_prior_receptions(phone, model_code, repeat_days=30):
+    """등록 전 같은 번호의 이전 접수 표시 — 미처리 건이 있으면 중복, 같은 모델 최근 건이 있으면 재접수 경고"""
+    with metrics.track("sqlite", "prior_receptions(phone_norm)", normalize=False) as t:
+        prior = prior_receptions(get_connection(), phone)
+        t["rows"] = len(prior)
+    if prior.empty:
+        return
+    same_model = prior[prior['model_code'] == model_code]
+    open_same = same_model[same_model['status'] != '검수완료']
+    recent_cut = str(date.today() - timedelta(days=repeat_days))
+    if not open_same.empty:
+        st.warning(f"⚠️ 중복 접수 의심: 같은 번호·모델의 처리 중 접수가 있습니다 ({', '.join(open_same['reception_number'])})")
+    elif not same_model[same_model['request_date'] >= recent_cut].empty:
+        st.warning(f"🔁 재접수: 최근 {repeat_days}일 내 같은 번호·모델 접수 이력이 있습니다.")
+    with st.expander(f"📞 이 번호의 이전 접수 {len(prior)}건{' (최근 10건)' if len(prior) >= 10 else ''}",
+                     expanded=not same_model.empty):
+        st.dataframe(prior.drop(columns=['id']), use_container_width=True, hide_index=True)
+
 # ==================== 페이지 3: 접수 내역 조회 ====================
 def page_reception_list(user, role, branch_id):
     st.title("📋 접수 내역 조회")
@@ -509,23 +773,61 @@ def page_reception_list(user, role, branch_id):
     where.extend(["request_date >= ?", "request_date <= ?"]); params.extend([str(date_from), str(date_to)])
     if status_filter != "전체":
         where.append("status = ?"); params.append(status_filter)
-    if search_keyword:
+    if search_keyword and len(normalize_phone(search_keyword)) >= 9:
+        # 전체 전화번호 입력 → 표기(하이픈 등)와 무관하게 인덱스로 일치 검색
+        where.append("phone_norm = ?"); params.append(normalize_phone(search_keyword))
+    elif search_keyword:
         where.append("(customer_name LIKE ? OR phone LIKE ?)"); params.extend([f"%{search_keyword}%", f"%{search_keyword}%"])
     where_clause = "WHERE " + " AND ".join(where) if where else ""
 
-    total_count = run_query(f"SELECT COUNT(*) as cnt FROM as_reception {where_clause}", tuple(params), fetch_one=True)[0]
-    df = run_query(f"""
-        SELECT reception_number, customer_name, phone, address, model_code, 
-               symptom_code, symptom_description, branch_name, status, request_date, created_at
-        FROM as_reception
-        {where_clause}
-        ORDER BY created_at DESC
-        LIMIT ? OFFSET ?
-    """, tuple(params + [per_page, offset]), to_df=True)
+    # 기간이 보관 월에 걸리면 그 월만 붙여 조회 (보관 건은 조회만 가능)
+    with archive.span(get_connection(), "request_date", date_from, date_to) as src:
+        total_count = fetch_scalar(f"SELECT COUNT(*) FROM {src['as_reception']} {where_clause}", tuple(params))
+        df = run_query(f"""
+            SELECT id, reception_number, customer_name, phone, address, model_code, 
+                   symptom_code, symptom_description, branch_name, status, request_date, created_at
+            FROM {src['as_reception']}
+            {where_clause}
+            ORDER BY created_at DESC
+            LIMIT ? OFFSET ?
+        """, tuple(params + [per_page, offset]), to_df=True)
+    hot_ids = archive.is_hot(get_connection(), [int(i) for i in df['id']]) if src.months and not df.empty else None
 
     st.caption(f"총 {total_count}건 (현재 페이지: {page} / {(total_count + per_page - 1) // per_page})")
+    if src.months:
+        st.caption(f"🗄️ 보관 데이터 포함: {', '.join(sorted(src.months))}")
+    if src.skipped:
+        st.warning(f"보관 데이터는 한 번에 {archive.MAX_ATTACHED}개월까지 조회됩니다. 제외된 월: {', '.join(sorted(src.skipped))}")
+
+    # ===== 일괄 상태 변경 (선택은 페이지를 넘겨도 유지) =====
+    if 'bulk_selected' not in st.session_state:
+        st.session_state.bulk_selected = set(); st.session_state.bulk_gen = 0
+    selected = st.session_state.bulk_selected
+    if 'bulk_result' in st.session_state:
+        st.success(st.session_state.pop('bulk_result'))
+    with st.expander(f"✅ 일괄 상태 변경 (선택 {len(selected)}건)", expanded=bool(selected)):
+        bc = st.columns([2, 2, 2, 2])
+        bulk_options = ["접수","완료","검수완료"] if role == '관리자' else ["접수","완료"]
+        bulk_status = bc[0].selectbox("변경할 상태", bulk_options, key="bulk_status")
+        if bc[1].button(f"🔁 {len(selected)}건 일괄 변경", type="primary", disabled=not selected, use_container_width=True):
+            changed = bulk_update_status(selected, bulk_status, user)
+            st.session_state.bulk_selected = set(); st.session_state.bulk_gen += 1
+            st.session_state.bulk_result = f"✅ {changed}건 상태 변경 완료 (선택 {len(selected)}건, 이미 '{bulk_status}'인 건 제외)"
+            st.rerun()
+        if bc[2].button(f"☑️ 검색 결과 전체 선택 ({total_count}건)", use_container_width=True):
+            ids = fetch_columns(f"SELECT id FROM as_reception {where_clause}", tuple(params))
+            selected.update(ids['id']); st.session_state.bulk_gen += 1
+            st.rerun()
+        if bc[3].button("선택 해제", use_container_width=True):
+            st.session_state.bulk_selected = set(); st.session_state.bulk_gen += 1
+            st.rerun()
+
+    def toggle_selected(rid):
+        if rid in st.session_state.bulk_selected: st.session_state.bulk_selected.discard(rid)
+        else: st.session_state.bulk_selected.add(rid)
+
     if not df.empty:
-        excel_data = download_excel(df)
+        excel_data = download_excel(df.drop(columns=['id']))
         st.download_button(
             "📥 엑셀 다운로드",
             data=excel_data,
@@ -533,22 +835,27 @@ def page_reception_list(user, role, branch_id):
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
         st.markdown("### 📋 접수 목록 (✏️ 버튼 클릭 시 수정 팝업)")
-        header_cols = st.columns([1, 2, 1.5, 1.5, 1.5, 1.5, 1, 1, 0.8])
+        header_cols = st.columns([0.4, 1, 2, 1.5, 1.5, 1.5, 1.5, 1, 1, 0.8])
         for col, name in zip(header_cols,
-            ["접수번호","고객명","전화번호","모델","증상코드","지점","상태","요청일","수정"]):
+            ["선택","접수번호","고객명","전화번호","모델","증상코드","지점","상태","요청일","수정"]):
             col.markdown(f"**{name}**")
         st.divider()
         for _, row in df.iterrows():
-            cols = st.columns([1, 2, 1.5, 1.5, 1.5, 1.5, 1, 1, 0.8])
-            cols[0].write(row['reception_number'])
-            cols[1].write(row['customer_name'])
-            cols[2].write(row['phone'])
-            cols[3].write(row['model_code'])
-            cols[4].write(row['symptom_code'])
-            cols[5].write(row['branch_name'])
-            cols[6].write(row['status'])
-            cols[7].write(row['request_date'])
-            if cols[8].button("✏️", key=f"edit_{row['reception_number']}"):
+            cols = st.columns([0.4, 1, 2, 1.5, 1.5, 1.5, 1.5, 1, 1, 0.8])
+            rid = int(row['id'])
+            cols[0].checkbox("선택", value=rid in selected, key=f"bulk_{st.session_state.bulk_gen}_{rid}",
+                             on_change=toggle_selected, args=(rid,), label_visibility="collapsed")
+            cols[1].write(row['reception_number'])
+            cols[2].write(row['customer_name'])
+            cols[3].write(row['phone'])
+            cols[4].write(row['model_code'])
+            cols[5].write(row['symptom_code'])
+            cols[6].write(row['branch_name'])
+            cols[7].write(row['status'])
+            cols[8].write(row['request_date'])
+            if hot_ids is not None and rid not in hot_ids:
+                cols[9].write("🗄️")
+            elif cols[9].button("✏️", key=f"edit_{row['reception_number']}"):
                 edit_reception_dialog(row['reception_number'], user)
     else:
         st.info("조회된 데이터가 없습니다.")
@@ -665,8 +972,8 @@ def page_branch_manage():
 def page_inventory_manage(user, role, branch_id):
     st.title("📦 재고/입출고 관리")
     if role == '관리자':
-        branches = run_query("SELECT id, branch_name FROM branch", to_df=True)
-        branch_options = dict(zip(branches['id'], branches['branch_name'])) if not branches.empty else {}
+        branches = fetch_cached(("branch",), "SELECT id, branch_name FROM branch")
+        branch_options = dict(zip(branches['id'], branches['branch_name']))
         if not branch_options:
             st.warning("지점 데이터가 없습니다. 먼저 지점을 추가하세요.")
             return
@@ -692,19 +999,19 @@ def page_inventory_manage(user, role, branch_id):
 
     # 입고
     with tab2:
-        mats = run_query("SELECT material_code, material_name FROM material_code ORDER BY material_code", to_df=True)
-        if mats.empty:
+        mats = fetch_cached(("material_code",), "SELECT material_code, material_name FROM material_code ORDER BY material_code")
+        opt = dict(zip(mats['material_code'], mats['material_name']))
+        if not opt:
             st.info("자재 코드가 없습니다. '자재 코드 관리'에서 먼저 등록하세요.")
         else:
-            opt = dict(zip(mats['material_code'], mats['material_name']))
             with st.form("inbound_form"):
                 code = st.selectbox("자재 선택", list(opt.keys()), format_func=lambda x: opt.get(x, x), key="in_mat")
                 qty  = st.number_input("입고 수량", min_value=1, value=10, step=1, key="in_qty")
                 submit = st.form_submit_button("✅ 입고 처리")
             if submit:
-                current = run_query("SELECT quantity FROM inventory WHERE branch_id=? AND material_code=?",
-                                    (selected_branch, code), fetch_one=True)
-                before = int(current[0]) if current else 0
+                current = fetch_row("SELECT quantity FROM inventory WHERE branch_id=? AND material_code=?",
+                                    (selected_branch, code))
+                before = int(current['quantity'] or 0) if current else 0
                 after  = before + int(qty)
                 if current:
                     run_query("UPDATE inventory SET quantity=? WHERE branch_id=? AND material_code=?",
@@ -769,7 +1076,7 @@ def page_material_code_manage():
                 if not code or not name:
                     st.error("자재코드/자재명은 필수입니다.")
                 else:
-                    exists = run_query("SELECT id FROM material_code WHERE material_code=?", (code,), fetch_one=True)
+                    exists = fetch_scalar("SELECT id FROM material_code WHERE material_code=?", (code,))
                     if exists:
                         run_query("UPDATE material_code SET material_name=?, unit_price=? WHERE material_code=?",
                                   (name, int(price), code))
@@ -792,20 +1099,23 @@ def page_labor_cost_manage():
     last_day = monthrange(selected_year, selected_month)[1]
     start_date, end_date = f"{ym}-01", f"{ym}-{last_day}"
     st.info(f"📅 조회 기간: {start_date} ~ {end_date} (검수완료 기준)")
-
-    df = run_query("""
-        SELECT ar.branch_id, ar.branch_name, b.billing_type,
-               COUNT(DISTINCT ar.id) AS job_count,
-               SUM(COALESCE(asr.labor_cost,0)) AS total_labor_cost,
-               CASE WHEN b.billing_type='세금계산서' THEN SUM(COALESCE(asr.labor_cost,0))*1.1
-                    ELSE SUM(COALESCE(asr.labor_cost,0)) END AS final_amount
-        FROM as_reception ar
-        LEFT JOIN as_result asr ON ar.id = asr.reception_id
-        LEFT JOIN branch b ON ar.branch_id = b.id
-        WHERE ar.status='검수완료' AND ar.complete_date>=? AND ar.complete_date<=?
-        GROUP BY ar.branch_id, ar.branch_name, b.billing_type
-        ORDER BY ar.branch_name
-    """, (start_date, end_date), to_df=True)
+    monthly_report_export(ym)
+
+    with archive.span(get_connection(), "complete_date", start_date, end_date,
+                      tables=("as_reception", "as_result")) as src:
+        df = run_query(f"""
+            SELECT ar.branch_id, ar.branch_name, b.billing_type,
+                   COUNT(DISTINCT ar.id) AS job_count,
+                   SUM(COALESCE(asr.labor_cost,0)) AS total_labor_cost,
+                   CASE WHEN b.billing_type='세금계산서' THEN SUM(COALESCE(asr.labor_cost,0))*1.1
+                        ELSE SUM(COALESCE(asr.labor_cost,0)) END AS final_amount
+            FROM {src['as_reception']} ar
+            LEFT JOIN {src['as_result']} asr ON ar.id = asr.reception_id
+            LEFT JOIN branch b ON ar.branch_id = b.id
+            WHERE ar.status='검수완료' AND ar.complete_date>=? AND ar.complete_date<=?
+            GROUP BY ar.branch_id, ar.branch_name, b.billing_type
+            ORDER BY ar.branch_name
+        """, (start_date, end_date), to_df=True)
 
     if not df.empty:
         disp = df.copy()
@@ -829,24 +1139,26 @@ def page_labor_cost_manage():
             sel_branch_name = st.selectbox("지점 선택", branch_choices['branch_name'].tolist())
             sel_branch_id = int(branch_choices.loc[branch_choices['branch_name']==sel_branch_name, 'branch_id'].iloc[0])
 
-            detail_df = run_query("""
-                SELECT 
-                    ar.reception_number           AS 접수번호,
-                    DATE(ar.created_at)           AS 접수일자,
-                    ar.complete_date              AS 처리완료일자,
-                    DATE(ar.updated_at)           AS 검수일자,
-                    ar.customer_name              AS 고객명,
-                    COALESCE(asr.labor_cost,0)    AS 인건비,
-                    COALESCE(asr.labor_reason,'') AS 인건비사유,
-                    ar.symptom_description        AS 증상명
-                FROM as_reception ar
-                LEFT JOIN as_result asr ON asr.reception_id = ar.id
-                WHERE ar.status='검수완료'
-                  AND ar.complete_date >= ?
-                  AND ar.complete_date <= ?
-                  AND ar.branch_id = ?
-                ORDER BY ar.complete_date, ar.reception_number
-            """, (start_date, end_date, sel_branch_id), to_df=True)
+            with archive.span(get_connection(), "complete_date", start_date, end_date,
+                              tables=("as_reception", "as_result")) as src:
+                detail_df = run_query(f"""
+                    SELECT 
+                        ar.reception_number           AS 접수번호,
+                        DATE(ar.created_at)           AS 접수일자,
+                        ar.complete_date              AS 처리완료일자,
+                        DATE(ar.updated_at)           AS 검수일자,
+                        ar.customer_name              AS 고객명,
+                        COALESCE(asr.labor_cost,0)    AS 인건비,
+                        COALESCE(asr.labor_reason,'') AS 인건비사유,
+                        ar.symptom_description        AS 증상명
+                    FROM {src['as_reception']} ar
+                    LEFT JOIN {src['as_result']} asr ON asr.reception_id = ar.id
+                    WHERE ar.status='검수완료'
+                      AND ar.complete_date >= ?
+                      AND ar.complete_date <= ?
+                      AND ar.branch_id = ?
+                    ORDER BY ar.complete_date, ar.reception_number
+                """, (start_date, end_date, sel_branch_id), to_df=True)
 
             st.caption(f"총 {len(detail_df)}건")
             if not detail_df.empty:
@@ -867,9 +1179,37 @@ def page_labor_cost_manage():
         st.warning(f"⚠️ {ym}에 검수완료된 건이 없습니다.")
         st.info("💡 '검수완료' 상태로 변경된 건만 인건비에 집계됩니다.")
 
+def monthly_report_export(ym):
+    # 전 지점 정산서·VOC 요약을 프로세스 풀에서 만들어 zip 하나로 (같은 내용이면 월별 캐시 재사용)
+    with st.expander("📦 전 지점 일괄 출력 (정산서·VOC 요약 → zip)"):
+        c = st.columns(2)
+        kinds = c[0].multiselect("보고서", list(reports.REPORTS), default=list(reports.REPORTS),
+                                 format_func=lambda k: reports.REPORTS[k]["label"])
+        formats = c[1].multiselect("형식", list(reports.FORMATS), default=list(reports.FORMATS))
+        if st.button("🖨️ 생성", disabled=not (kinds and formats)):
+            bar = st.progress(0.0, text="준비 중…")
+            def progress(done, total, name):
+                bar.progress(done / total if total else 1.0, text=f"{done}/{total} {name}")
+            with profiler.phase("export"):
+                result = reports.build(get_connection(), ym, kinds, formats, pool=get_report_pool(), progress=progress)
+            st.session_state.report_bundle = (ym, result)
+        saved = st.session_state.get("report_bundle")
+        if not saved or saved[0] != ym:
+            return
+        result = saved[1]
+        for name, error in result["failed"].items():
+            st.warning(f"⚠️ {name}: {error}")
+        if result["zip"] is None:
+            st.info(f"{ym}에 출력할 데이터가 없습니다.")
+            return
+        st.caption(f"파일 {result['files']}개 (새로 생성 {result['rendered']}개, 나머지는 캐시)")
+        with open(result["zip"], "rb") as f:
+            st.download_button("📥 zip 다운로드", f.read(), file_name=f"월말보고서_{ym}.zip", mime="application/zip")
+
 # ==================== 페이지 9: 품질/VOC 통계 ====================
 def page_quality_stats(role, branch_id):
     st.title("📈 품질/VOC 통계")
+    show_symptom_alerts(None if role == '관리자' else branch_id)
 
     with st.expander("🔎 필터", expanded=True):
         # 기간 필터
@@ -878,17 +1218,15 @@ def page_quality_stats(role, branch_id):
         date_to   = c2.date_input("종료일", value=date.today())
 
         # 모델/증상 필터
-        model_df = run_query("SELECT DISTINCT model_code FROM as_reception", to_df=True)
-        models = ["전체"] + (model_df["model_code"].dropna().tolist() if not model_df.empty else [])
+        model_codes = fetch_cached(("as_reception",), "SELECT DISTINCT model_code FROM as_reception WHERE model_code IS NOT NULL")["model_code"]
+        models = ["전체", *model_codes]
         model_sel = c3.selectbox("모델", models, index=0)
 
-        sym_df = run_query("SELECT DISTINCT symptom_code, symptom_description FROM as_reception", to_df=True)
+        syms = fetch_cached(("as_reception",), "SELECT DISTINCT symptom_code, symptom_description FROM as_reception")
         sym_options = ["전체"]
-        if not sym_df.empty:
-            for _, r in sym_df.iterrows():
-                code = r["symptom_code"] or ""
-                desc = r["symptom_description"] or ""
-                sym_options.append(f"{code} - {desc}" if code else desc)
+        for code, desc in zip(syms["symptom_code"], syms["symptom_description"]):
+            code, desc = code or "", desc or ""
+            sym_options.append(f"{code} - {desc}" if code else desc)
         sym_sel = st.selectbox("증상", sym_options, index=0)
 
     where, params = ["request_date >= ?", "request_date <= ?"], [str(date_from), str(date_to)]
@@ -900,11 +1238,27 @@ def page_quality_stats(role, branch_id):
         where.append("symptom_code = ?"); params.append(sym_code)
 
     where_sql = "WHERE " + " AND ".join(where)
-    df = run_query(f"""
-        SELECT model_code, symptom_code, symptom_description, DATE(request_date) AS req_date
-        FROM as_reception
-        {where_sql}
-    """, tuple(params), to_df=True)
+    # 보관 월이 많으면 몇 개월씩 나눠 조회한 뒤 합친다
+    frames, region_frames = [], []
+    for src in archive.spans(get_connection(), "request_date", date_from, date_to):
+        frames.append(run_query(f"""
+            SELECT model_code, symptom_code, symptom_description, DATE(request_date) AS req_date
+            FROM {src['as_reception']}
+            {where_sql}
+        """, tuple(params), to_df=True))
+        # sido/sigungu 인덱스 컬럼으로 바로 집계 (주소 문자열 LIKE 검색 없음)
+        region_frames.append(run_query(f"""
+            SELECT COALESCE(NULLIF(sido,''),'미분류') AS 시도,
+                   COALESCE(NULLIF(sigungu,''),'미분류') AS 시군구,
+                   COUNT(*) AS count
+            FROM {src['as_reception']}
+            {where_sql}
+            GROUP BY 시도, 시군구
+        """, tuple(params), to_df=True))
+    df = pd.concat(frames, ignore_index=True)
+    region_df = pd.concat(region_frames, ignore_index=True)
+    if len(region_frames) > 1:
+        region_df = region_df.groupby(["시도", "시군구"], as_index=False)["count"].sum()
 
     if df.empty:
         st.info("데이터가 없습니다. 기간/필터를 조정해 보세요.")
@@ -928,6 +1282,19 @@ def page_quality_stats(role, branch_id):
     except Exception:
         pass
 
+    st.subheader("지역별 건수")
+    if not region_df.empty:
+        sido_count = region_df.groupby("시도", as_index=False)["count"].sum().sort_values("count", ascending=False)
+        rc1, rc2 = st.columns([1, 2])
+        rc1.dataframe(sido_count, use_container_width=True, hide_index=True)
+        sido_pick = rc2.selectbox("시/도 상세", sido_count["시도"].tolist())
+        sgg_count = region_df[region_df["시도"] == sido_pick][["시군구","count"]].sort_values("count", ascending=False)
+        rc2.dataframe(sgg_count, use_container_width=True, hide_index=True)
+        try:
+            rc2.bar_chart(sgg_count.set_index("시군구")["count"])
+        except Exception:
+            pass
+
     st.subheader("기간별 추이(일자)")
     daily = df.groupby("req_date").size().reset_index(name="count").sort_values("req_date")
     st.dataframe(daily, use_container_width=True, hide_index=True)
@@ -936,6 +1303,50 @@ def page_quality_stats(role, branch_id):
     except Exception:
         pass
 
+    st.subheader("재접수율 (같은 고객·모델)")
+    rc1, rc2 = st.columns([1, 1])
+    repeat_days = rc1.number_input("재접수 기준(일)", min_value=1, max_value=365, value=30, step=1)
+    repeat_by = rc2.selectbox("구분", list(REPEAT_GROUPS))
+    with metrics.track("sqlite", "repeat_rate(idx_as_reception_phone)", normalize=False) as t:
+        repeat_df = repeat_rate(get_connection(), str(date_from), str(date_to), int(repeat_days), repeat_by,
+                                None if role == '관리자' else branch_id)
+        t["rows"] = len(repeat_df)
+    if not repeat_df.empty:
+        total_n, repeat_n = int(repeat_df['접수'].sum()), int(repeat_df['재접수'].sum())
+        m1, m2, m3 = st.columns(3)
+        m1.metric("접수", f"{total_n:,}건")
+        m2.metric(f"{int(repeat_days)}일 내 재접수", f"{repeat_n:,}건", f"{100 * repeat_n / total_n:.1f}%", delta_color="off")
+        m3.metric("중복 의심(같은 날)", f"{int(repeat_df['중복의심'].sum()):,}건")
+        st.dataframe(repeat_df, use_container_width=True, hide_index=True)
+    st.caption("※ 보관(아카이브)된 접수는 재접수율 계산에서 제외됩니다.")
+
+def show_symptom_alerts(scope):
+    # (모델, 증상) 일별 시계열 전체를 한 번에 채점 → 최근 LOOKBACK_DAYS 일 안의 급증을 점수순으로
+    st.subheader("🚨 증상 급증 알림")
+    as_of = date.today()
+    start = anomaly.window_start(as_of)
+
+    def load():
+        with metrics.track("sqlite", "anomaly.daily_counts(idx_as_reception_daily)", normalize=False) as t:
+            daily = anomaly.daily_counts(get_connection(), start, as_of, scope)
+            t["rows"] = len(daily)
+        names = dict(zip(*fetch_cached(("symptom_code",), "SELECT code, description FROM symptom_code").values()))
+        return daily, anomaly.detect(daily, as_of, symptom_names=names)
+
+    # 접수/증상 코드가 바뀌기 전까지는 rerun·다른 세션에서 다시 채점하지 않음
+    daily, alert_df = get_cache().get(("anomaly", scope, as_of), ("as_reception", "symptom_code"), load)
+    st.caption(f"직전 {anomaly.GUARD_DAYS}일을 뺀 {anomaly.BASELINE_DAYS}일 평균을 기준선으로, "
+               f"하루 급증(z ≥ {anomaly.Z_THRESHOLD:g}) 또는 며칠 이어진 증가(EWMA ≥ {anomaly.EWMA_THRESHOLD:g})를 표시합니다. "
+               f"(최근 7일 {anomaly.MIN_COUNT}건 미만 제외)")
+    if alert_df.empty:
+        st.success(f"최근 {anomaly.LOOKBACK_DAYS}일 동안 급증한 모델·증상이 없습니다.")
+        return
+    st.dataframe(alert_df, use_container_width=True, hide_index=True)
+    labels = [f"{m} · {code} {name} ({kind}, 점수 {score})" for m, code, name, kind, score
+              in zip(alert_df["모델"], alert_df["증상"], alert_df["증상명"], alert_df["구분"], alert_df["점수"])]
+    pick = st.selectbox("급증 추이", range(len(alert_df)), format_func=labels.__getitem__)
+    st.line_chart(anomaly.series(daily, alert_df["모델"][pick], alert_df["증상"][pick], start, as_of))
+
 # ==================== 페이지 10: 사용자 관리 ====================
 def page_user_manage():
     st.title("👤 사용자 관리")
@@ -963,8 +1374,8 @@ def page_user_manage():
             name     = st.text_input("이름*", placeholder="홍길동")
             cols = st.columns(2)
             role = cols[0].selectbox("권한*", ["관리자", "지점", "기사"])
-            branches = run_query("SELECT id, branch_name FROM branch", to_df=True)
-            if not branches.empty:
+            branches = fetch_cached(("branch",), "SELECT id, branch_name FROM branch")
+            if branches['id']:
                 opt = {0: "선택안함"}
                 opt.update(dict(zip(branches['id'], branches['branch_name'])))
                 branch_id = cols[1].selectbox("소속 지점", list(opt.keys()), format_func=lambda x: opt[x])
@@ -983,9 +1394,494 @@ def page_user_manage():
                 else:
                     st.error("❌ 필수 항목을 입력하세요.")
 
+# ==================== 페이지 11: 쿼리 메트릭 (관리자) ====================
+def page_query_metrics():
+    st.title("📡 쿼리 메트릭")
+    st.caption(f"프로세스 기동/초기화 이후 누적 · 느린 쿼리 기준 {metrics.SLOW_QUERY_MS:.0f}ms → `{metrics.SLOW_QUERY_LOG}`"
+               f" · 실행계획 기록 {'ON' if metrics.EXPLAIN_SLOW_QUERIES else 'OFF'}")
+
+    # 발송 큐 상태도 게이지로 함께 노출
+    for status, cnt in notify.outbox_stats(get_connection()).items():
+        metrics.registry.set_gauge("doorlock_notification_outbox", cnt, "알림 outbox 상태별 건수", status=status)
+
+    # 메모리 캐시 적중/무효화 (레플리카별)
+    for stat, cnt in get_cache().stats.items():
+        metrics.registry.set_gauge("doorlock_cache", cnt, "메모리 캐시 적중·미스·무효화 누적", stat=stat)
+
+    stats = pd.DataFrame(metrics.registry.snapshot())
+    if stats.empty:
+        st.info("수집된 쿼리가 없습니다.")
+    else:
+        c1, c2, c3 = st.columns(3)
+        c1.metric("쿼리 수", f"{int(stats['count'].sum()):,}")
+        c2.metric("총 소요", f"{stats['total_ms'].sum() / 1000:,.2f}s")
+        c3.metric("오류", f"{int(stats['errors'].sum()):,}")
+
+        st.subheader("페이지별")
+        by_page = stats.groupby("page", as_index=False).agg(count=("count","sum"), total_ms=("total_ms","sum"), max_ms=("max_ms","max"))
+        st.dataframe(by_page.sort_values("total_ms", ascending=False), use_container_width=True, hide_index=True)
+
+        st.subheader("쿼리별 (총 소요 시간 순)")
+        backends = ["전체"] + sorted(stats['backend'].unique())
+        backend = st.selectbox("백엔드", backends)
+        view = stats if backend == "전체" else stats[stats['backend'] == backend]
+        st.dataframe(view, use_container_width=True, hide_index=True)
+
+    c1, c2 = st.columns(2)
+    c1.download_button("📥 Prometheus 텍스트 내보내기", metrics.render_prometheus(),
+                       file_name="doorlock_metrics.prom", mime="text/plain")
+    if c2.button("🧹 집계 초기화"):
+        metrics.registry.reset(); st.rerun()
+
+    if os.path.exists(metrics.SLOW_QUERY_LOG):
+        with st.expander("🐢 느린 쿼리 로그 (최근 50건)"):
+            with open(metrics.SLOW_QUERY_LOG, encoding="utf-8") as f:
+                lines = f.readlines()[-50:]
+            st.dataframe(pd.DataFrame([json.loads(l) for l in reversed(lines) if l.strip()]),
+                         use_container_width=True, hide_index=True)
+
+# ==================== 페이지 12: 성능 패널 (관리자) ====================
+def page_performance_panel():
+    st.title("⏱️ 성능 패널")
+    st.caption("페이지/팝업 rerun 1회를 DB·DataFrame 생성·엑셀 생성·렌더(나머지) 구간으로 나누어 측정합니다.")
+
+    c1, c2, c3 = st.columns(3)
+    if profiler.ENABLED:
+        c1.success("AS_PROFILE=1: 전체 세션 측정 중")
+    else:
+        st.session_state.profiling = c1.toggle("이 세션 프로파일링", value=st.session_state.get('profiling', False))
+    if c2.button("🔬 다음 rerun cProfile 캡처", use_container_width=True,
+                 help="다른 메뉴로 이동하거나 팝업을 열면 그 1회 실행이 캡처됩니다."):
+        st.session_state.profile_capture = True
+        st.info("다음 페이지/팝업 실행 1회를 캡처합니다.")
+    if c3.button("🧹 측정 초기화", use_container_width=True):
+        profiler.store.reset(); st.rerun()
+
+    summary = pd.DataFrame(profiler.store.summary())
+    if summary.empty:
+        st.info("측정된 실행이 없습니다. 프로파일링을 켜고 다른 메뉴를 사용해 보세요.")
+    else:
+        st.subheader(f"페이지별 (최근 {profiler.ROLLING_WINDOW}회, ms)")
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        try:
+            st.bar_chart(summary.set_index("page")[[f"avg_{p}_ms" for p in profiler.PHASES]])
+        except Exception:
+            pass
+
+    captures = list(profiler.store.captures)
+    if captures:
+        st.subheader("cProfile 캡처")
+        for i, cap in enumerate(captures):
+            with st.expander(f"{cap['at']} · {cap['page']} · {cap['total_ms']:,.1f}ms", expanded=(i == 0)):
+                st.code(cap['report'], language="text")
+                if os.path.exists(cap['path']):
+                    with open(cap['path'], "rb") as f:
+                        st.download_button("📥 .prof 다운로드 (snakeviz 등)", f.read(),
+                                           file_name=os.path.basename(cap['path']), key=f"prof_{i}")
+
+# ==================== 페이지 13: 기사 배정 ====================
+def page_dispatch(user, role, branch_id):
+    st.title("🗓️ 기사 배정")
+    conn = get_connection()
+    scope = None if role == '관리자' else branch_id
+    c = st.columns([2, 1, 2])
+    sched = str(c[0].date_input("배정일", value=date.today() + timedelta(days=1)))
+    per_tech = int(c[1].number_input("기사 1인 한도", min_value=1, max_value=30, value=dispatch.PER_TECH))
+    with metrics.track("sqlite", "dispatch.open_jobs+technicians", normalize=False) as t:
+        jobs = dispatch.open_jobs(conn, scope)
+        techs = dispatch.technicians(conn, sched, scope)
+        t["rows"] = len(jobs) + len(techs)
+    m1, m2, m3 = st.columns(3)
+    m1.metric("미배정 접수", f"{len(jobs):,}건")
+    m2.metric("기사", f"{len(techs)}명")
+    m3.metric(f"{sched} 기존 배정", f"{sum(t.load for t in techs):,}건")
+
+    if c[2].button("🧮 배정안 만들기", type="primary", use_container_width=True, disabled=not jobs or not techs):
+        st.session_state.dispatch_plan = dispatch.propose(jobs, techs, sched, per_tech)
+    plan = st.session_state.get('dispatch_plan')
+    if plan and plan.date == sched:
+        st.subheader(f"배정안: {plan.count:,}건 / 미배정 {len(plan.unassigned):,}건")
+        summary = pd.DataFrame([{
+            "기사": plan.technicians[tid].name,
+            "배정": len(items),
+            "오전": sum(1 for _, slot, _ in items if slot == dispatch.SLOTS[0]),
+            "오후": sum(1 for _, slot, _ in items if slot == dispatch.SLOTS[1]),
+            "지역": ", ".join(sorted({f"{j.sido} {j.sigungu}".strip() or "미분류" for j, _, _ in items})),
+        } for tid, items in plan.assigned.items()])
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        if plan.unassigned:
+            reasons = pd.Series([r for _, r in plan.unassigned]).value_counts()
+            st.caption("미배정 사유: " + ", ".join(f"{r} {n:,}건" for r, n in reasons.items()))
+        b1, b2, _ = st.columns([1, 1, 2])
+        if b1.button("✅ 배정 확정", type="primary", use_container_width=True):
+            n = dispatch.apply(conn, plan, user['id'])
+            st.session_state.pop('dispatch_plan')
+            st.success(f"✅ {n:,}건 배정 완료"); st.rerun()
+        if b2.button("❌ 배정안 취소", use_container_width=True):
+            st.session_state.pop('dispatch_plan'); st.rerun()
+
+    st.divider()
+    st.subheader(f"📋 {sched} 배정 현황")
+    where, params = ["a.status = '배정'", "a.scheduled_date = ?"], [sched]
+    if scope is not None:
+        where.append("ar.branch_id = ?"); params.append(scope)
+    current = run_query(f"""
+        SELECT a.id, a.technician_name AS 기사, a.slot AS 시간대, a.seq AS 순서,
+               ar.reception_number AS 접수번호, ar.customer_name AS 고객명, ar.address AS 주소,
+               ar.model_code AS 모델, ar.branch_name AS 지점
+        FROM as_assignment a
+        JOIN as_reception ar ON ar.id = a.reception_id
+        WHERE {' AND '.join(where)}
+        ORDER BY a.technician_name, a.seq
+    """, tuple(params), to_df=True)
+    if current.empty:
+        st.info("배정된 작업이 없습니다.")
+        return
+    st.dataframe(current.drop(columns=['id']), use_container_width=True, hide_index=True)
+    cc1, cc2 = st.columns([2, 1])
+    cancel_tech = cc1.selectbox("배정 취소할 기사", sorted(current['기사'].unique()))
+    if cc2.button("↩️ 해당 기사 배정 취소", use_container_width=True):
+        n = dispatch.cancel(conn, [int(i) for i in current.loc[current['기사'] == cancel_tech, 'id']])
+        st.success(f"✅ {n}건 배정 취소 (미배정으로 복귀)"); st.rerun()
+
+# ==================== 페이지 14: 내 작업 (기사) ====================
+def page_my_queue(user):
+    st.title("📋 내 작업 조회")
+    since = date.today() - timedelta(days=30)  # 지난 배정 중 처리 안 된 건도 표시
+    with metrics.track("sqlite", "dispatch.technician_queue(idx_as_assignment_queue)", normalize=False) as t:
+        queue = dispatch.technician_queue(get_connection(), user['id'], str(since))
+        t["rows"] = len(queue)
+    st.caption(f"배정된 작업 {len(queue)}건 · 배정 없이 처리할 지점 접수는 '🔧 작업 결과 입력'에서 확인하세요.")
+    if not queue:
+        st.info("배정된 작업이 없습니다.")
+        return
+    today = str(date.today())
+    current_group = None
+    for job in queue:
+        group = (job['scheduled_date'], job['slot'])
+        if group != current_group:
+            current_group = group
+            overdue = " ⚠️ 지연" if job['scheduled_date'] < today else ""
+            st.markdown(f"#### {job['scheduled_date']} {job['slot']}{overdue}")
+        cols = st.columns([0.4, 1.2, 1.2, 3, 1, 2, 0.6])
+        cols[0].write(job['seq'])
+        cols[1].write(job['reception_number'])
+        cols[2].write(job['customer_name'])
+        cols[3].write(job['address'])
+        cols[4].write(job['model_code'])
+        cols[5].write((job['symptom_description'] or "")[:20])
+        if cols[6].button("🔧", key=f"queue_{job['assignment_id']}"):
+            result_registration_dialog(job['reception_number'], user)
+
+# ==================== 페이지 15: 처리 기간(SLA) ====================
+def page_sla(role, branch_id):
+    st.title("🕒 처리 기간(SLA)")
+    conn = get_connection()
+    scope = None if role == '관리자' else branch_id
+    st.caption("완료 시점에 기록한 접수별 처리 기간의 월별 히스토그램으로 계산 (보관된 접수 포함)")
+
+    st.subheader("⏳ 미처리 경과 일수")
+    with metrics.track("sqlite", "sla.aging(status, request_date|complete_date)", normalize=False) as t:
+        aging = sla.aging(conn, date.today(), scope)
+        t["rows"] = len(aging)
+    a1, a2 = st.columns([1, 2])
+    a1.dataframe(aging, use_container_width=True)
+    a2.bar_chart(aging)
+
+    months = sla.months(conn)
+    if not months:
+        st.info("완료된 접수가 없습니다.")
+        return
+    st.divider()
+    c = st.columns(3)
+    month_from = c[0].selectbox("시작 월", months, index=max(0, len(months) - 3))
+    month_to = c[1].selectbox("종료 월", months, index=len(months) - 1)
+    models = list(fetch_cached(("product_model",), "SELECT model_code FROM product_model ORDER BY model_code")['model_code'])
+    model = c[2].selectbox("모델", ["전체"] + models)
+    model = None if model == "전체" else model
+
+    with metrics.track("sqlite", "sla.summary(sla_hist)", normalize=False) as t:
+        totals = {m: sla.summary(conn, m, month_from, month_to, scope, model) for m in sla.METRICS}
+        t["rows"] = sum(len(df) for df in totals.values())
+    for m, label in sla.METRICS.items():
+        cols = st.columns(4)
+        df = totals[m]
+        if df.empty:
+            cols[0].metric(label, "0건")
+            continue
+        r = df.iloc[0]
+        cols[0].metric(label, f"{r['건수']:,}건", f"평균 {r['평균']}일", delta_color="off")
+        for col, q in zip(cols[1:], ("p50", "p90", "p99")):
+            col.metric(q, f"{r[q]}일" if r[q] < sla.MAX_DAYS else f"{sla.MAX_DAYS}일+")
+
+    g1, g2 = st.columns([1, 3])
+    metric = g1.radio("지표", list(sla.METRICS), format_func=sla.METRICS.get)
+    group_by = g1.radio("구분", list(sla.SLA_GROUPS), index=1 if scope is None else 0)
+    grouped = sla.summary(conn, metric, month_from, month_to, scope, model, group_by)
+    if not grouped.empty and group_by == "지점":
+        names = dict(zip(*fetch_cached(("branch",), "SELECT id, branch_name FROM branch").values()))
+        grouped["지점"] = grouped["지점"].map(lambda b: names.get(b, "미지정"))
+    g2.dataframe(grouped, use_container_width=True, hide_index=True)
+
+    hist = sla.histogram(conn, metric, month_from, month_to, scope, model)
+    if not hist.empty:
+        st.bar_chart(hist.rename_axis("일수"))
+        st.caption(f"{sla.METRICS[metric]} 일수별 건수 (마지막 칸 {sla.MAX_DAYS}일은 그 이상 포함)")
+
+# ==================== 페이지 16: 감사 로그 (관리자) ====================
+AUDIT_TABLES = ["as_reception", "as_result", "users", "branch", "material_code", "inventory"]
+
+def page_audit_log():
+    st.title("🧾 감사 로그")
+    conn = get_connection()
+    mode = st.radio("조회", ["레코드 이력", "사용자 활동"], horizontal=True)
+    c = st.columns(3)
+    if mode == "레코드 이력":
+        table = c[0].selectbox("테이블", AUDIT_TABLES)
+        key = c[1].text_input("레코드 id" + (" 또는 접수번호" if table == "as_reception" else ""))
+        record_id = None
+        if key.strip().isdigit():
+            record_id = int(key.strip())
+        elif key.strip() and table == "as_reception":
+            record_id = fetch_scalar("SELECT id FROM as_reception WHERE reception_number=?", (key.strip(),))
+            if record_id is None:
+                st.warning("본 DB 에 없는 접수번호입니다. (보관된 접수는 id 로 조회)")
+        filters = (mode, table, record_id)
+        fetch = (lambda before: audit.history(conn, table, record_id, before)) if record_id is not None else None
+    else:
+        users = fetch_columns("SELECT id, name, username, role FROM users ORDER BY name")
+        labels = {uid: f"{name} ({username}, {role})"
+                  for uid, name, username, role in zip(users['id'], users['name'], users['username'], users['role'])}
+        user_id = c[0].selectbox("사용자", list(labels), format_func=labels.get) if labels else None
+        d_from = c[1].date_input("시작일", value=date.today() - timedelta(days=30))
+        d_to = c[2].date_input("종료일", value=date.today())
+        filters = (mode, user_id, str(d_from), str(d_to))
+        fetch = (lambda before: audit.activity(conn, user_id, str(d_from), str(d_to), before)) if user_id is not None else None
+
+    # 키셋 페이지: (created_at, id) 커서 스택 — 조건이 바뀌면 첫 페이지부터
+    if st.session_state.get('audit_filters') != filters:
+        st.session_state.audit_filters = filters
+        st.session_state.audit_cursors = [None]
+    if fetch is None:
+        st.info("조회 조건을 입력하세요.")
+    else:
+        cursors = st.session_state.audit_cursors
+        t0 = time.perf_counter()
+        with metrics.track("sqlite", f"audit.{'history' if mode == '레코드 이력' else 'activity'}(keyset)", normalize=False) as t:
+            rows, next_cursor = fetch(cursors[-1])
+            t["rows"] = len(rows)
+        st.caption(f"{len(cursors)}페이지 · {len(rows)}건 · {(time.perf_counter() - t0) * 1000:.1f}ms")
+        if rows:
+            st.dataframe(pd.DataFrame(rows)[["created_at", "action", "table_name", "record_id", "user_id", "old_value", "new_value"]]
+                         .rename(columns={"created_at": "일시", "action": "작업", "table_name": "테이블", "record_id": "레코드",
+                                          "user_id": "사용자", "old_value": "변경 전", "new_value": "변경 후"}),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.info("기록이 없습니다.")
+        p1, p2, _ = st.columns([1, 1, 3])
+        if p1.button("◀ 이전", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop(); st.rerun()
+        if p2.button("다음 ▶", disabled=next_cursor is None, use_container_width=True):
+            cursors.append(next_cursor); st.rerun()
+
+    with st.expander("🗄️ 파티션 / 보존 현황"):
+        st.caption(f"본 DB 에 {audit.AUDIT_HOT_DAYS}일치, 지난 달은 월별 파티션, {audit.AUDIT_COMPACT_DAYS}일 지난 파티션은 압축 "
+                   "(`python doorlock_as_audit.py retention`)")
+        parts = pd.DataFrame(audit.partitions(conn), columns=["월", "상태", "건수", "크기(B)", "이관", "압축", "경로"])
+        hot = fetch_scalar("SELECT COUNT(*) FROM audit_log")
+        st.metric("본 DB 감사 로그", f"{hot:,}건", f"파티션 {len(parts)}개월 · {int(parts['건수'].sum()):,}건", delta_color="off")
+        if not parts.empty:
+            st.dataframe(parts, use_container_width=True, hide_index=True)
+
+# ==================== 페이지 17: 예약 작업 (관리자) ====================
+def _job_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%m-%d %H:%M:%S") if ts else "-"
+
+def page_jobs():
+    st.title("⏲️ 예약 작업")
+    conn = get_connection()
+    scheduler = get_job_scheduler() if JOBS_ENABLED else None
+    if scheduler is None:
+        st.warning("이 서버는 예약 작업을 실행하지 않습니다 (AS_JOBS=0). 다른 서버가 실행하거나 `python doorlock_as_jobs.py run <작업>`")
+    else:
+        st.caption(f"실행자 `{scheduler.owner}` · {scheduler.poll_interval:g}초마다 확인 · 임대 {scheduler.lease_seconds:g}초")
+
+    rows = jobs.schedules(conn)
+    if not rows:
+        st.info("등록된 작업이 없습니다.")
+        return
+    now = time.time()
+    table = pd.DataFrame([{
+        "작업": name, "설명": desc, "cron": cron, "사용": bool(enabled),
+        "다음 실행": _job_time(nxt),
+        "상태": ("🔄 실행 중" if lease_until and lease_until > now else
+                 {"ok": "✅ 성공", "failed": "❌ 실패"}.get(last_status, "-")),
+        "최근 실행": _job_time(last_started), "소요(초)": round((ms or 0) / 1000, 2),
+        "실행": n, "실패": fails, "연속 실패": streak, "실행 서버": owner if lease_until and lease_until > now else "",
+    } for name, desc, cron, enabled, nxt, last_started, _, last_status, ms, n, fails, streak, owner, lease_until, _ in rows])
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    names = [r[0] for r in rows]
+    name = c1.selectbox("작업 선택", names)
+    enabled = bool(rows[names.index(name)][3])
+    if c2.button("▶️ 지금 실행", use_container_width=True):
+        jobs.run_now(conn, name)
+        st.success("다음 확인 주기에 실행됩니다.")
+    if c3.button("⏸️ 사용 중지" if enabled else "▶️ 다시 사용", use_container_width=True):
+        jobs.set_enabled(conn, name, not enabled)
+        st.rerun()
+    last_error = rows[names.index(name)][14]
+    if last_error:
+        with st.expander("최근 오류"):
+            st.code(last_error)
+
+    t1, t2 = st.tabs(["최근 실행", "실패만"])
+    for tab, failed_only in ((t1, False), (t2, True)):
+        history = jobs.runs(conn, None if failed_only else name, failed_only=failed_only)
+        with tab:
+            if history:
+                st.dataframe(pd.DataFrame([{
+                    "작업": n, "시작": _job_time(started), "종료": _job_time(finished), "소요(초)": round((ms or 0) / 1000, 2),
+                    "결과": status, "실행 서버": owner, "요약": result or "", "오류": (error or "").split("\n")[0],
+                } for n, started, finished, ms, status, owner, result, error in history]),
+                    use_container_width=True, hide_index=True)
+            else:
+                st.info("기록이 없습니다.")
+
+# ==================== 페이지 18: 접수 일괄 등록 (주문 채널 엑셀/CSV) ====================
+def page_bulk_import(user, role, branch_id):
+    st.title("📥 접수 일괄 등록")
+    st.caption("온라인몰 주문 내보내기(xlsx/csv)를 그대로 올리면 검증 후 접수로 등록합니다. 오류 행은 건너뛰고 보고서로 내려받을 수 있습니다.")
+    st.download_button("📄 양식 다운로드", bulk_import.template(get_connection()), file_name="접수_일괄등록_양식.xlsx",
+                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    with st.expander("컬럼 안내"):
+        st.dataframe(pd.DataFrame([{"컬럼": header, "다른 표기": ", ".join(others), "필수": "✔" if required else ""}
+                                   for _, header, others, required in bulk_import.FIELDS]),
+                     use_container_width=True, hide_index=True)
+
+    if role == '지점':
+        fixed_branch = branch_id
+        st.info(f"모든 행이 소속 지점({user.get('branch_name', '')})으로 등록됩니다. 지점코드 열은 무시합니다.")
+    else:
+        branches = fetch_cached(("branch",), "SELECT id, branch_name FROM branch")
+        options = {"파일의 지점코드 열 사용": None, **dict(zip(branches['branch_name'], branches['id']))}
+        fixed_branch = options[st.selectbox("등록 지점", list(options))]
+
+    uploaded = st.file_uploader("주문 파일", type=["xlsx", "csv"])
+    if uploaded is None:
+        return
+    c1, c2 = st.columns(2)
+    dry_run = c1.button("🔍 검증만", use_container_width=True)
+    if not (dry_run or c2.button("📥 등록", type="primary", use_container_width=True)):
+        return
+
+    bar = st.progress(0.0, text="읽는 중...")
+    def progress(done, total):
+        bar.progress(min(done / total, 1.0) if total else 0.0, text=f"{done:,}{f' / {total:,}' if total else ''}행 처리")
+    # 긴 쓰기 트랜잭션이 공용 커넥션을 쓰는 다른 세션과 섞이지 않게 전용 커넥션으로
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        result = bulk_import.run(conn, uploaded, uploaded.name, user, fixed_branch, dry_run=dry_run, progress=progress)
+    except ValueError as e:
+        bar.empty()
+        st.error(f"❌ {e}")
+        return
+    finally:
+        conn.close()
+    if not dry_run:
+        get_notification_dispatcher()  # 지점별 요약 SMS 는 outbox 에 적재만 되므로 디스패처를 띄워 둠
+    bar.progress(1.0, text=f"완료 ({result['seconds']:.1f}초)")
+
+    errors = result["errors"]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("전체 행", f"{result['rows']:,}")
+    m2.metric("검증 통과" if dry_run else "등록", f"{result['valid'] if dry_run else result['inserted']:,}")
+    m3.metric("오류 행", f"{errors['행'].nunique():,}")
+    if not dry_run and result["inserted"]:
+        st.success(f"✅ {result['inserted']:,}건 등록 (접수번호 {result['first']} ~ {result['last']})")
+    if not errors.empty:
+        st.dataframe(errors, use_container_width=True, hide_index=True)
+        st.download_button("📥 오류 보고서 다운로드", errors.to_csv(index=False).encode("utf-8-sig"),
+                           file_name=f"일괄등록_오류_{os.path.splitext(uploaded.name)[0]}.csv", mime="text/csv")
+
+# ==================== 페이지 19: 자재 소비/원가 ====================
+def page_material_cube(role, branch_id):
+    st.title("🧩 자재 소비/원가")
+    conn = get_connection()
+    scope = None if role == '관리자' else branch_id
+    st.caption("결과 등록 시 (월·지점·모델·증상·자재) 별로 누적한 사용 자재. 정가 원가 = 수량 × 현재 자재 단가, "
+               "무상 원가 = 청구 단가 0 으로 쓴 수량 × 정가 (보관된 접수 포함)")
+
+    months = material_cube.months(conn)
+    if not months:
+        st.info("사용 자재 기록이 없습니다.")
+        return
+    c = st.columns([1, 1, 2])
+    month_from = c[0].selectbox("시작 월", months, index=max(0, len(months) - 3))
+    month_to = c[1].selectbox("종료 월", months, index=len(months) - 1)
+    dims = [d for d in material_cube.DIMENSIONS if d != "월" and not (scope is not None and d == "지점")]
+    path = c[2].multiselect("드릴다운 순서", dims, default=[d for d in ("지점", "모델", "증상", "자재") if d in dims])
+    filters = {} if scope is None else {"지점": scope}
+
+    def query(group_by, flt):
+        with metrics.track("sqlite", "material_cube.summary(material_cube)", normalize=False) as t:
+            df = material_cube.summary(conn, month_from, month_to, group_by, flt)
+            t["rows"] = len(df)
+        return df
+
+    total = query([], filters)
+    if total.empty:
+        st.info("선택한 기간에 사용 자재 기록이 없습니다.")
+        return
+    r = total.iloc[0]
+    m = st.columns(4)
+    m[0].metric("사용 수량", f"{int(r['수량']):,}", f"{int(r['사용 건수']):,}건", delta_color="off")
+    m[1].metric("청구액", f"{int(r['청구액']):,}원")
+    m[2].metric("정가 원가", f"{int(r['정가 원가']):,}원")
+    m[3].metric("무상 원가", f"{int(r['무상 원가']):,}원", f"무상 {int(r['무상 수량']):,}개", delta_color="off")
+
+    # 단계마다 한 구분으로 묶어 보여 주고, 고른 값으로 다음 단계를 좁힌다
+    crumbs = []
+    for level, dim in enumerate(path):
+        df = query([dim], filters)
+        if df.empty:
+            break
+        st.subheader(" › ".join(crumbs + [dim]))
+        g1, g2 = st.columns([3, 2])
+        g1.dataframe(df, use_container_width=True, hide_index=True)
+        label = f"{dim}명" if f"{dim}명" in df else dim
+        g2.bar_chart(df.head(15).set_index(label)[["청구액", "무상 원가"]])
+        names = dict(zip(df[dim], df[label]))
+        pick = st.selectbox(f"{dim} 선택", ["전체"] + list(df[dim]), key=f"material_drill_{level}_{dim}",
+                            format_func=lambda v, names=names: v if v == "전체" or v not in names or names[v] == v else f"{v} {names[v]}")
+        if pick == "전체":
+            break
+        filters[dim] = pick
+        crumbs.append(f"{dim} {names[pick]}" if label != dim else f"{dim} {pick}")
+
+    trend = query(["월"], filters)
+    if len(trend) > 1:
+        st.subheader("월별 추이")
+        st.line_chart(trend.sort_values("월").set_index("월")[["청구액", "정가 원가", "무상 원가"]])
+
+    # 엑셀은 요청할 때만 만든다 (드릴다운 rerun 마다 만들지 않음). 같은 조건이면 만든 파일을 다시 내려줌
+    export_key = (month_from, month_to, tuple(filters.items()), tuple(path))
+    if st.button("📊 엑셀 만들기"):
+        detail = query(["월", "지점", "모델", "증상", "자재"], filters)
+        sheets = {"상세": detail, **{dim: query([dim], filters) for dim in path}}
+        st.session_state.material_cube_export = (export_key, len(detail), download_excel(sheets).getvalue())
+    saved = st.session_state.get("material_cube_export")
+    if saved and saved[0] == export_key:
+        st.download_button(f"📥 엑셀 다운로드 (상세 {saved[1]:,}행)", saved[2],
+                           file_name=f"자재소비_{month_from}_{month_to}.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
 # ==================== 메인 ====================
 def main():
     st.set_page_config(page_title="도어락 AS 관리", page_icon="🔧", layout="wide")
+    if JOBS_ENABLED:
+        get_job_scheduler()
     init_session_state()
     if not st.session_state.logged_in:
         login_page()
@@ -0,0 +1 @@
+"""도어락 AS 시스템 벤치마크 모음 (python -m benchmarks.<모듈>)"""
@@ -0,0 +1,107 @@
+# ==================== 벤치마크 CLI ====================
+"""
+    python -m benchmarks seed    --db bench.db --receptions 1000000 --branches 40
+    python -m benchmarks run     --db bench.db --backend sqlite supabase --out results/head.json
+    python -m benchmarks compare results/base.json results/head.json --threshold 0.1
+
+supabase 백엔드는 같은 DB 파일을 로컬 PostgREST 스텁(benchmarks.postgrest_stub)으로 띄워
+doorlock_as_supabase 를 그대로 붙여 측정한다(네트워크 왕복 = 로컬 HTTP + JSON 직렬화).
+mirror 백엔드는 같은 스텁을 로컬 미러(doorlock_as_mirror)로 1회 동기화한 뒤 같은 호출을 측정한다.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks import postgrest_stub
+from benchmarks.queries import derive_params, sqlite_scenarios, supabase_scenarios
+from benchmarks.report import build_report, compare, measure, save_report
+from benchmarks.seed import seed_database
+
+def cmd_seed(args):
+    t0 = time.perf_counter()
+    counts = seed_database(args.db, receptions=args.receptions, branches=args.branches, days=args.days,
+                           seed=args.seed, audit=not args.no_audit)
+    print(f"✅ 적재 완료 ({time.perf_counter() - t0:,.1f}s)")
+    for table, n in counts.items():
+        print(f"  {table:<20} {n:>12,}")
+
+def cmd_run(args):
+    conn = sqlite3.connect(args.db)
+    params = derive_params(conn)
+    results = {}
+    if "sqlite" in args.backend:
+        print("[sqlite]")
+        results["sqlite"] = measure(sqlite_scenarios(conn, params), args.repeat, args.warmup)
+    if {"supabase", "mirror"} & set(args.backend):
+        srv, base_url = postgrest_stub.serve_in_thread(args.db)
+        os.environ["SUPABASE_URL"] = base_url
+        os.environ["SUPABASE_KEY"] = postgrest_stub.STUB_KEY
+        os.environ["SUPABASE_MIRROR"] = "0"
+        import doorlock_as_supabase as sb  # 모듈 로드 시 클라이언트를 만들므로 환경변수 설정 후 import
+        try:
+            if "supabase" in args.backend:
+                print(f"[supabase → {base_url}]")
+                results["supabase"] = measure(supabase_scenarios(sb, params), args.repeat, args.warmup)
+            if "mirror" in args.backend:
+                from doorlock_as_mirror import Mirror
+                with tempfile.TemporaryDirectory() as tmp:
+                    sb.mirror = Mirror(sb.supabase, path=os.path.join(tmp, "mirror.db"))
+                    t0 = time.perf_counter()
+                    sb.mirror.sync_once()
+                    print(f"[mirror → 초기 동기화 {time.perf_counter() - t0:.1f}s]")
+                    try:
+                        results["mirror"] = measure(supabase_scenarios(sb, params), args.repeat, args.warmup)
+                    finally:
+                        sb.mirror = None
+        finally:
+            srv.shutdown()
+    conn.close()
+    report = build_report(args.db, results)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        save_report(report, args.out)
+        print(f"✅ 결과 저장: {args.out} ({report['meta']['git_sha']})")
+
+def cmd_compare(args):
+    regressions = compare(args.base, args.head, args.threshold, args.metric)
+    if regressions:
+        print(f"\n❌ {args.threshold:.0%} 이상 느려진 시나리오 {regressions}개")
+        sys.exit(1)
+    print("\n✅ 회귀 없음")
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="도어락 AS 성능 벤치마크")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("seed", help="합성 데이터 적재")
+    s.add_argument("--db", default="bench.db")
+    s.add_argument("--receptions", type=int, default=100_000)
+    s.add_argument("--branches", type=int, default=30)
+    s.add_argument("--days", type=int, default=730)
+    s.add_argument("--seed", type=int, default=42)
+    s.add_argument("--no-audit", action="store_true", help="감사 로그 생략 (적재 시간 단축)")
+    s.set_defaults(func=cmd_seed)
+
+    r = sub.add_parser("run", help="시나리오 실행")
+    r.add_argument("--db", default="bench.db")
+    r.add_argument("--backend", nargs="+", choices=["sqlite", "supabase", "mirror"], default=["sqlite"])
+    r.add_argument("--repeat", type=int, default=20)
+    r.add_argument("--warmup", type=int, default=2)
+    r.add_argument("--out", help="결과 JSON 경로")
+    r.set_defaults(func=cmd_run)
+
+    c = sub.add_parser("compare", help="두 결과 비교 (회귀 시 종료코드 1)")
+    c.add_argument("base")
+    c.add_argument("head")
+    c.add_argument("--threshold", type=float, default=0.10)
+    c.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p95_ms", "mean_ms", "min_ms"])
+    c.set_defaults(func=cmd_compare)
+
+    args = ap.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# ==================== 주소 자동완성 지연 벤치마크 ====================
+"""
+합성 도로명주소 원본(rnaddrkor 형식, CP949)으로 인덱스를 만들고
+자동완성 질의 유형별 지연을 측정한다. p95 가 목표(20ms)를 넘으면 종료코드 1.
+
+    python -m benchmarks.bench_address_suggest --rows 500000 --repeat 200
+
+질의 유형: 짧은 접두어(1~2글자), 도로명+건물번호, 시/도 지정, 읍면동+지번, 건물명
+여러 단어 시·군·구('수원시 장안구')와 시·군·구가 없는 세종 주소도 검색되는지 함께 확인한다.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import doorlock_as_address as address
+from doorlock_as_regions import KOREA_REGIONS
+
+TARGET_MS = 20.0
+ROAD_WORDS = ["테헤란", "세종", "중앙", "평화", "문화", "시민", "역삼", "한강", "남부순환", "경수대", "월드컵", "대학"]
+EMD_WORDS = ["역삼동", "신사동", "정자동", "조원동", "영화동", "반송동", "아름동", "삼성동", "서초동", "우만동"]
+BLDG_WORDS = ["래미안", "푸르지오", "자이", "힐스테이트", "아이파크", "e편한세상", "센트럴", "타워"]
+
+def make_source(path, rows, seed):
+    """rnaddrkor 형식 합성 원본 (23개 컬럼, '|' 구분, CP949)"""
+    rng = random.Random(seed)
+    regions = [(sido, sgg) for sido, sggs in KOREA_REGIONS.items() for sgg in sggs]
+    with open(path, "w", encoding="cp949") as f:
+        for i in range(rows):
+            sido, sgg = rng.choice(regions)
+            if sido == "세종특별자치시":
+                sgg = ""  # 원본에서 세종은 시·군·구 칸이 비어 있다
+            cols = [""] * 23
+            cols[0] = f"{i:025d}"
+            cols[2], cols[3] = sido, sgg
+            cols[4] = rng.choice(EMD_WORDS)
+            cols[6] = "1" if rng.random() < 0.03 else "0"
+            cols[7], cols[8] = str(rng.randint(1, 999)), str(rng.choice([0, 0, rng.randint(1, 30)]))
+            cols[10] = f"{rng.choice(ROAD_WORDS)}{rng.choice(['로', '길', '대로'])}{rng.choice(['', str(rng.randint(1, 80)) + '번길'])}"
+            cols[11] = "0"
+            cols[12], cols[13] = str(rng.randint(1, 400)), "0"
+            cols[16] = f"{rng.randint(1000, 63999):05d}"
+            cols[22] = f"{rng.choice(BLDG_WORDS)}{rng.randint(1, 30)}차" if rng.random() < 0.3 else ""
+            f.write("|".join(cols) + "\n")
+        # 검증용 고정 주소
+        fixed = [
+            ("경기도", "수원시 장안구", "송죽동", "1234", "수성로", "200", "16300", ""),
+            ("세종특별자치시", "", "고운동", "4321", "도움3로", "105", "30100", "세종 범지기마을"),
+        ]
+        for sido, sgg, emd, jibun, road, bno, zipcode, bldg in fixed:
+            cols = [""] * 23
+            cols[2], cols[3], cols[4], cols[6], cols[7], cols[8] = sido, sgg, emd, "0", jibun, "0"
+            cols[10], cols[11], cols[12], cols[13], cols[16], cols[22] = road, "0", bno, "0", zipcode, bldg
+            f.write("|".join(cols) + "\n")
+
+def time_queries(idx, queries, repeat):
+    out = {}
+    for name, q in queries:
+        idx.suggest(q)  # 워밍업
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            idx.suggest(q)
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        out[name] = {
+            "query": q,
+            "p50_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+            "max_ms": round(samples[-1], 3),
+            "results": len(idx.suggest(q)),
+        }
+    return out
+
+def run(rows, repeat, seed):
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "rnaddrkor_synthetic.txt")
+        make_source(src, rows, seed)
+        t0 = time.perf_counter()
+        address.build_index([src], os.path.join(tmp, "address_index.db"))
+        build_s = time.perf_counter() - t0
+        idx = address.open_index(os.path.join(tmp, "address_index.db"))
+
+        checks = {
+            "multiword_sigungu_jibun": any(r["sigungu"] == "수원시 장안구" for r in idx.suggest("송죽동 1234")),
+            "sejong_jibun": any(r["sido"] == "세종특별자치시" for r in idx.suggest("고운동 4321")),
+            "sido_filter_before_limit": len(idx.suggest("제주 테헤란", limit=5)) == 5,
+        }
+        queries = [
+            ("prefix_1char", "테"),
+            ("prefix_2char", "중앙"),
+            ("road_number", "테헤란로 12"),
+            ("sido_filtered", "제주 중앙로"),
+            ("dong_jibun", "역삼동 12"),
+            ("building", "래미안1"),
+        ]
+        timings = time_queries(idx, queries, repeat)
+        idx.conn.close()
+    return {
+        "rows": rows,
+        "build_seconds": round(build_s, 1),
+        "target_ms": TARGET_MS,
+        "checks": checks,
+        "queries": timings,
+    }
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    result = run(args.rows, args.repeat, args.seed)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    slow = [k for k, v in result["queries"].items() if v["p95_ms"] > TARGET_MS]
+    failed = [k for k, ok in result["checks"].items() if not ok]
+    if slow or failed:
+        print(f"❌ 목표 초과: {slow}  검증 실패: {failed}")
+        sys.exit(1)
+    print(f"✅ 모든 질의 p95 ≤ {TARGET_MS:.0f}ms")
@@ -0,0 +1,85 @@
+# ==================== 첨부파일 다이얼로그 페이로드 벤치마크 ====================
+"""
+수정/결과등록 다이얼로그가 열릴 때 브라우저로 보내는 첨부파일 바이트와
+첫 화면 표시까지의 시간을 원본 전송 방식과 미리보기 방식으로 비교한다.
+
+    python -m benchmarks.bench_attachment_payload --photos 5 --width 4032 --height 3024
+
+- 원본 방식: download_button + st.image 로 원본을 두 번 전송 (기존 동작)
+- 미리보기 방식: 썸네일 JPEG 만 전송 ('크게 보기' 시 preview, 원본은 토글 시에만)
+- 첫 렌더 시간: 서버 파일 읽기 + 이미지 디코딩(브라우저 디코딩 대용) 시간
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from PIL import Image
+
+import doorlock_as_media as media
+
+def make_photo(path, width, height, seed):
+    """휴대폰 사진 수준(5~12MB)의 노이즈 섞인 JPEG 생성"""
+    noise = Image.effect_noise((width, height), 64 + seed % 32).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    Image.blend(noise, gradient, 0.35).save(path, "JPEG", quality=97)
+
+def first_render_ms(path):
+    """파일 읽기 + 디코딩까지 걸린 시간(ms)"""
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+    return (time.perf_counter() - t0) * 1000
+
+def run(photos, width, height):
+    with tempfile.TemporaryDirectory() as tmp:
+        originals = []
+        for i in range(photos):
+            p = os.path.join(tmp, f"20240101({i + 1})_photo.jpg")
+            make_photo(p, width, height, i)
+            originals.append(p)
+
+        t0 = time.perf_counter()
+        with media.create_pool() as pool:
+            list(pool.map(media.generate_derivatives, originals))
+        pipeline_s = time.perf_counter() - t0
+
+        rows = []
+        for p in originals:
+            derived = media.derived_paths(p)
+            rows.append({
+                "original_bytes": os.path.getsize(p),
+                "dialog_bytes_before": os.path.getsize(p) * 2,
+                "dialog_bytes_after": os.path.getsize(derived["thumb"]),
+                "expand_bytes": os.path.getsize(derived["preview"]),
+                "render_ms_before": first_render_ms(p),
+                "render_ms_after": first_render_ms(derived["thumb"]),
+            })
+
+    def med(key):
+        return statistics.median(r[key] for r in rows)
+
+    return {
+        "photos": photos,
+        "resolution": f"{width}x{height}",
+        "pipeline_seconds": round(pipeline_s, 3),
+        "median_original_mb": round(med("original_bytes") / 1e6, 2),
+        "median_dialog_payload_mb_before": round(med("dialog_bytes_before") / 1e6, 2),
+        "median_dialog_payload_mb_after": round(med("dialog_bytes_after") / 1e6, 3),
+        "median_expand_preview_mb": round(med("expand_bytes") / 1e6, 3),
+        "median_first_render_ms_before": round(med("render_ms_before"), 1),
+        "median_first_render_ms_after": round(med("render_ms_after"), 1),
+    }
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--photos", type=int, default=5)
+    ap.add_argument("--width", type=int, default=4032)
+    ap.add_argument("--height", type=int, default=3024)
+    args = ap.parse_args()
+    print(json.dumps(run(args.photos, args.width, args.height), ensure_ascii=False, indent=2))
@@ -0,0 +1,99 @@
+# ==================== 조회 경로별 호출 오버헤드 벤치마크 ====================
+"""
+as_app 데이터 계층의 조회 경로(run_query(to_df=True) → DataFrame 꺼내기 vs
+fetch_scalar / fetch_row / fetch_columns)를 같은 쿼리로 번갈아 호출해 1회당 시간을 비교한다.
+계측(metrics.track, 프로파일러 구간)까지 포함한 실제 호출 경로 그대로 측정한다.
+
+    python -m benchmarks.bench_fetch_paths --receptions 20000 --repeat 500
+
+시나리오: 카운터(COUNT), 접수 1건(SELECT * ... WHERE reception_number=?), 로그인,
+마스터 목록(모델/자재 → 선택 목록), 검색 결과 전체 id. 새 경로가 DataFrame 경로보다 느리면 종료코드 1.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_database
+
+def _timed(fn, repeat):
+    fn()  # 워밍업
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1_000_000)
+    samples.sort()
+    return {"p50_us": round(statistics.median(samples), 1), "p95_us": round(samples[int(len(samples) * 0.95) - 1], 1)}
+
+def scenarios(app):
+    """(이름, 기존 DataFrame 경로, 새 경로) — 두 경로는 같은 값을 돌려준다"""
+    rn = app.fetch_scalar("SELECT reception_number FROM as_reception ORDER BY id DESC LIMIT 1")
+    branch = app.fetch_scalar("SELECT branch_id FROM as_reception GROUP BY branch_id ORDER BY COUNT(*) DESC LIMIT 1")
+    count_sql = "SELECT COUNT(*) AS cnt FROM as_reception WHERE status='접수'"
+    row_sql = "SELECT * FROM as_reception WHERE reception_number=?"
+    login_sql = "SELECT * FROM users WHERE username=? AND password=? AND is_active=1"
+    login = app.fetch_row("SELECT username, password FROM users WHERE is_active=1 LIMIT 1")
+    login = (login["username"], login["password"])
+    models_sql = "SELECT model_code, model_name FROM product_model"
+    mats_sql = "SELECT material_code, material_name, unit_price FROM material_code ORDER BY material_code"
+    ids_sql = "SELECT id FROM as_reception WHERE branch_id=?"
+    return [
+        ("count", lambda: int(app.run_query(count_sql, to_df=True)["cnt"][0]),
+                  lambda: app.fetch_scalar(count_sql)),
+        ("reception_row", lambda: app.run_query(row_sql, (rn,), to_df=True).iloc[0]["customer_name"],
+                          lambda: app.fetch_row(row_sql, (rn,))["customer_name"]),
+        ("login", lambda: app.run_query(login_sql, login, to_df=True).iloc[0].to_dict()["name"],
+                  lambda: dict(app.fetch_row(login_sql, login))["name"]),
+        ("model_options", lambda: (lambda df: dict(zip(df["model_code"], df["model_name"])))(app.run_query(models_sql, to_df=True)),
+                          lambda: (lambda c: dict(zip(c["model_code"], c["model_name"])))(app.fetch_columns(models_sql))),
+        ("material_options", lambda: (lambda df: dict(zip(df["material_code"], df["material_name"])))(app.run_query(mats_sql, to_df=True)),
+                             lambda: (lambda c: dict(zip(c["material_code"], c["material_name"])))(app.fetch_columns(mats_sql))),
+        ("branch_ids", lambda: {int(i) for i in app.run_query(ids_sql, (branch,), to_df=True)["id"]},
+                       lambda: set(app.fetch_columns(ids_sql, (branch,))["id"])),
+    ]
+
+def run(receptions, repeat, seed):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "doorlock_as.db")
+        seed_database(db, receptions=receptions, branches=30, seed=seed, audit=False, verbose=False)
+        os.environ["DOORLOCK_AS_DB"] = db
+        import as_app  # DB_PATH 는 모듈 로드 시 결정
+
+        out = {}
+        for name, old, new in scenarios(as_app):
+            old_value, new_value = old(), new()
+            if old_value != new_value:
+                raise SystemExit(f"❌ {name}: 두 경로의 결과가 다릅니다 ({old_value!r} != {new_value!r})")
+            before, after = _timed(old, repeat), _timed(new, repeat)
+            out[name] = {"dataframe": before, "fetch": after,
+                         "speedup": round(before["p50_us"] / max(after["p50_us"], 0.1), 1)}
+        as_app.get_connection().close()
+        return out
+
+def main():
+    ap = argparse.ArgumentParser(description="as_app 조회 경로별 호출 오버헤드")
+    ap.add_argument("--receptions", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    result = run(args.receptions, args.repeat, args.seed)
+    print(f"{'시나리오':<18}{'DataFrame p50':>16}{'fetch p50':>12}{'배수':>8}")
+    for name, r in result.items():
+        print(f"{name:<18}{r['dataframe']['p50_us']:>14,.1f}us{r['fetch']['p50_us']:>10,.1f}us{r['speedup']:>7.1f}x")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"receptions": args.receptions, "repeat": args.repeat, "scenarios": result},
+                      f, ensure_ascii=False, indent=2)
+    slower = [n for n, r in result.items() if r["fetch"]["p50_us"] > r["dataframe"]["p50_us"]]
+    if slower:
+        print(f"❌ DataFrame 경로보다 느린 시나리오: {', '.join(slower)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# ==================== 접수 일괄 등록 처리량 벤치마크 ====================
+"""
+합성 주문 내보내기(xlsx, csv)를 시드 DB 에 일괄 등록해 처리 시간을 잰다. 목표(60초) 초과 시 종료코드 1.
+
+    python -m benchmarks.bench_import --rows 50000 --receptions 100000
+
+오류 행(미등록 모델, 빈 전화번호, 중복 주문번호)을 약 2% 섞어 보고서 경로도 함께 측정한다.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import doorlock_as_import as imp
+from benchmarks.seed import seed_database
+from doorlock_as_regions import KOREA_REGIONS
+
+TARGET_SECONDS = 60.0
+STREETS = ["테헤란로", "중앙로", "세종대로", "시민로", "평화로", "역삼로"]
+
+def make_orders(conn, rows, seed):
+    """주문 채널 헤더 그대로의 DataFrame (약 2% 오류 행)"""
+    rng = random.Random(seed)
+    models = [r[0] for r in conn.execute("SELECT model_code FROM product_model")]
+    symptoms = [r[0] for r in conn.execute("SELECT code FROM symptom_code")]
+    branches = [r[0] for r in conn.execute("SELECT branch_code FROM branch")]
+    regions = [f"{sido} {sgg}" for sido, sggs in KOREA_REGIONS.items() for sgg in sggs]
+    data = []
+    for i in range(rows):
+        r = {
+            "주문번호": f"BENCH-{seed}-{i:07d}",
+            "수취인": f"고객{i}",
+            "연락처": f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            "배송지": f"{rng.choice(regions)} {rng.choice(STREETS)} {rng.randint(1, 300)}",
+            "배송지상세": f"{rng.randint(101, 120)}동 {rng.randint(101, 2504)}호",
+            "모델코드": rng.choice(models),
+            "증상코드": rng.choice(symptoms),
+            "주문일": f"2026.{rng.randint(1, 9):02d}.{rng.randint(1, 28):02d}",
+            "유무상": rng.choice(imp.PAYMENT_TYPES),
+            "지점코드": rng.choice(branches),
+        }
+        roll = rng.random()
+        if roll < 0.007:
+            r["모델코드"] = "UNKNOWN"
+        elif roll < 0.014:
+            r["연락처"] = ""
+        elif roll < 0.02 and i:
+            r["주문번호"] = data[-1]["주문번호"]
+        data.append(r)
+    return pd.DataFrame(data)
+
+def run(rows, receptions, seed):
+    out = {"rows": rows, "target_seconds": TARGET_SECONDS}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "bench.db")
+        seed_database(db, receptions=receptions, verbose=False)
+        conn = sqlite3.connect(db)
+        user = dict(zip(("id", "name"), conn.execute("SELECT id, name FROM users ORDER BY id LIMIT 1").fetchone()))
+        orders = make_orders(conn, rows, seed)
+        files = {"xlsx": os.path.join(tmp, "orders.xlsx"), "csv": os.path.join(tmp, "orders.csv")}
+        orders.to_excel(files["xlsx"], index=False)
+        orders.assign(주문번호=orders["주문번호"] + "C").to_csv(files["csv"], index=False, encoding="cp949")
+        for kind, path in files.items():
+            t0 = time.perf_counter()
+            with open(path, "rb") as f:
+                result = imp.run(conn, f, path, user)
+            out[kind] = {
+                "seconds": round(time.perf_counter() - t0, 2),
+                "inserted": result["inserted"],
+                "error_rows": int(result["errors"]["행"].nunique()),
+                "rows_per_second": round(rows / (time.perf_counter() - t0)),
+            }
+        out["receptions_after"] = conn.execute("SELECT COUNT(*) FROM as_reception").fetchone()[0]
+        conn.close()
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--receptions", type=int, default=100_000, help="시드 DB 기존 접수 건수")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    result = run(args.rows, args.receptions, args.seed)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    slow = [k for k in ("xlsx", "csv") if result[k]["seconds"] > TARGET_SECONDS]
+    if slow:
+        print(f"❌ 목표 초과: {slow}")
+        sys.exit(1)
+    print(f"✅ {args.rows:,}행 ≤ {TARGET_SECONDS:.0f}s")
@@ -0,0 +1,364 @@
+# ==================== 동시 세션 부하 테스트 (AppTest) ====================
+"""
+streamlit.testing.v1.AppTest 로 as_app.py 세션 N개를 한 프로세스에서 동시에 돌린다.
+st.cache_resource 가 프로세스 전역이므로 실제 서버처럼 모든 세션이 같은 SQLite 연결을 공유한다.
+
+세션 여정(역할별, 로그인 후 반복):
+- 지점: 접수 등록 → 목록 검색 → 수정 팝업 저장 → 결과 등록 팝업 저장 → 재고 입고
+- 기사: 내 작업(배정 순서)에서 결과 입력 → 결과 입력 목록 검색 → 작업 결과 입력
+
+동시 세션 수(단계)마다 처리량(rerun/s, 여정/s), rerun 지연 p50/p95/p99, 잠금 오류
+(database is locked/busy), 기타 오류를 집계한다.
+
+    python -m benchmarks seed --db bench.db --receptions 200000
+    python -m benchmarks.load_harness --db bench.db --levels 1 10 25 50 --duration 60 --out results/load.json
+
+- 시드 DB 는 임시 복사본에서 실행한다(--in-place 로 원본 사용).
+- AppTest 는 팝업(st.dialog) 안의 버튼만 누르면 팝업이 다시 그려지지 않으므로, 여는 버튼과
+  팝업 안 버튼을 같은 rerun 에 함께 누른다(실서버의 팝업 부분 rerun 보다 비용이 큰 쪽으로 측정됨).
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "critical")  # 스크립트 예외 traceback 은 집계로 대신
+
+from streamlit import config as st_config  # noqa: E402
+from streamlit.runtime import Runtime  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from benchmarks.report import _percentile, git_sha  # noqa: E402
+from benchmarks.schema import install_init_shim  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "as_app.py")
+LOCK_MARKERS = ("database is locked", "database table is locked", "database is busy")
+
+MENU = {
+    "지점": {"register": "📝 AS 접수 등록", "list": "📋 접수 내역 조회", "result": "🔧 접수 결과 등록", "inventory": "📦 재고 관리"},
+    "기사": {"queue": "📋 내 작업 조회", "list": "🔧 작업 결과 입력", "result": "🔧 작업 결과 입력"},
+}
+SEARCH_LABEL = {"지점": "통합검색 (고객명/전화번호)", "기사": "🔎 검색 (고객명/전화번호)"}
+JOURNEYS = {
+    "지점": ["register", "search", "edit", "result", "inventory"],
+    "기사": ["queue", "search", "result"],
+}
+
+def patch_apptest_for_threads():
+    """
+    AppTest 는 세션 하나를 순차 실행하는 용도라 여러 스레드에서 동시에 돌리면 충돌한다.
+    부하 테스트 프로세스 안에서만 다음을 고친다.
+
+    - rerun 마다 Runtime._instance 를 넣었다 None 으로 되돌림 → 다른 세션의 런타임이 지워짐
+      ("Runtime hasn't been created!"): 비어 있는 동안 마지막 목 런타임을 돌려준다.
+    - rerun 마다 새 ScriptCache 로 스크립트를 다시 컴파일 → 동시 ast.parse 가 CPython 에서
+      "AST constructor recursion depth mismatch" 로 실패: 바이트코드를 세션 간에 공유한다.
+      (실서버도 스크립트 컴파일 결과를 캐시하므로 측정 왜곡은 없다.)
+    """
+    last = {"runtime": None}
+
+    def instance(cls):
+        rt = cls._instance
+        if rt is not None:
+            last["runtime"] = rt
+            return rt
+        if last["runtime"] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last["runtime"]
+
+    def exists(cls):
+        return cls._instance is not None or last["runtime"] is not None
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+    compile_lock = threading.Lock()
+    compiled: Dict[str, Any] = {}
+    original = ScriptCache.get_bytecode
+
+    def get_bytecode(self, script_path):
+        key = os.path.abspath(script_path)
+        with compile_lock:
+            if key not in compiled:
+                compiled[key] = original(self, script_path)
+            return compiled[key]
+
+    ScriptCache.get_bytecode = get_bytecode
+    # 실행마다 켜졌다 꺼지는 설정도 동시 실행 중 꺼지지 않도록 고정
+    st_config.set_option("global.appTest", True)
+
+class Recorder:
+    """단계 하나(동시 세션 수 고정) 동안의 측정값"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.lock_errors = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.journeys = 0
+
+    def rerun(self, step: str, seconds: float):
+        with self.lock:
+            self.latencies[step].append(seconds)
+
+    def error(self, step: str, message: str):
+        with self.lock:
+            if any(m in message for m in LOCK_MARKERS):
+                self.lock_errors += 1
+            else:
+                self.errors[f"{step}: {message[:80]}"] += 1
+
+    def journey_done(self):
+        with self.lock:
+            self.journeys += 1
+
+    def summary(self, sessions: int, elapsed: float) -> Dict[str, Any]:
+        with self.lock:
+            all_ms = sorted(s * 1000 for v in self.latencies.values() for s in v)
+            steps = {k: sorted(s * 1000 for s in v) for k, v in self.latencies.items()}
+            return {
+                "sessions": sessions,
+                "elapsed_s": round(elapsed, 1),
+                "reruns": len(all_ms),
+                "journeys": self.journeys,
+                "reruns_per_s": round(len(all_ms) / elapsed, 2) if elapsed else 0.0,
+                "journeys_per_s": round(self.journeys / elapsed, 3) if elapsed else 0.0,
+                "p50_ms": round(_percentile(all_ms, 0.50), 1) if all_ms else 0.0,
+                "p95_ms": round(_percentile(all_ms, 0.95), 1) if all_ms else 0.0,
+                "p99_ms": round(_percentile(all_ms, 0.99), 1) if all_ms else 0.0,
+                "lock_errors": self.lock_errors,
+                "other_errors": dict(self.errors),
+                "steps_p95_ms": {k: round(_percentile(v, 0.95), 1) for k, v in steps.items()},
+            }
+
+class Session:
+    """AppTest 세션 1개 (사용자 1명)"""
+
+    def __init__(self, username: str, password: str, role: str, rec: Recorder, rng: random.Random,
+                 think: tuple, timeout: float):
+        self.username, self.password, self.role = username, password, role
+        self.rec, self.rng, self.think = rec, rng, think
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.seq = 0
+
+    # ---------- 공통 ----------
+    def _run(self, step: str):
+        t0 = time.perf_counter()
+        try:
+            self.at.run()
+        except Exception as e:  # AppTest 타임아웃 등
+            self.rec.error(step, f"{type(e).__name__}: {e}")
+            return False
+        self.rec.rerun(step, time.perf_counter() - t0)
+        failed = False
+        for el in list(self.at.exception) + list(self.at.error):
+            self.rec.error(step, str(el.value))
+            failed = True
+        return not failed
+
+    def _pause(self):
+        lo, hi = self.think
+        if hi > 0:
+            time.sleep(self.rng.uniform(lo, hi))
+
+    def _button(self, label: str):
+        return next(b for b in self.at.button if b.label == label)
+
+    def _text(self, label: str):
+        return next(w for w in self.at.text_input if w.label == label)
+
+    def _go(self, page: str, step: str) -> bool:
+        menu = MENU[self.role][page]
+        radio = self.at.sidebar.radio[0]
+        if radio.value == menu:
+            return True
+        radio.set_value(menu)
+        return self._run(step)
+
+    def _dialog(self, opener_prefix: str, action_label: str, step: str) -> bool:
+        """목록의 첫 행 팝업 열기 → 팝업 안 버튼 클릭"""
+        openers = [b for b in self.at.button if (b.key or "").startswith(opener_prefix)]
+        if not openers:
+            return True  # 처리할 건이 없음
+        key = self.rng.choice(openers[:5]).key
+        self.at.button(key=key).click()
+        if not self._run(f"{step}_open"):
+            return False
+        self._pause()
+        self.at.button(key=key).click()
+        self._button(action_label).click()
+        return self._run(f"{step}_save")
+
+    # ---------- 여정 단계 ----------
+    def login(self) -> bool:
+        if not self._run("login_page"):
+            return False
+        self._text("아이디").input(self.username)
+        self._text("비밀번호").input(self.password)
+        self._button("로그인").click()
+        return self._run("login") and bool(self.at.sidebar.radio)
+
+    def register(self) -> bool:
+        if not self._go("register", "register_page"):
+            return False
+        self._pause()
+        self.seq += 1
+        self._text("고객명*").input(f"부하{self.username[-5:]}{self.seq}")
+        self._text("전화번호*").input(f"010-9{self.rng.randint(100, 999)}-{self.rng.randint(1000, 9999)}")
+        self._text("상세주소(자유 입력)*").input(f"테스트로 {self.rng.randint(1, 300)}")
+        self._button("✅ 접수 등록").click()
+        return self._run("register")
+
+    def search(self) -> bool:
+        if not self._go("list", "list_page"):
+            return False
+        self._pause()
+        keyword = self.rng.choice(["부하", "김", "이", "010-9", ""])
+        self._text(SEARCH_LABEL[self.role]).input(keyword)
+        return self._run("search")
+
+    def edit(self) -> bool:
+        if not self._go("list", "list_page"):
+            return False
+        return self._dialog("edit_", "💾 저장", "edit")
+
+    def result(self) -> bool:
+        if not self._go("result", "result_page"):
+            return False
+        return self._dialog("result_", "✅ 저장하고 완료 처리", "result")
+
+    def queue(self) -> bool:
+        if not self._go("queue", "queue_page"):
+            return False
+        return self._dialog("queue_", "✅ 저장하고 완료 처리", "queue")
+
+    def inventory(self) -> bool:
+        if not self._go("inventory", "inventory_page"):
+            return False
+        self._pause()
+        self._button("✅ 입고 처리").click()
+        return self._run("inventory")
+
+    def loop(self, deadline: float):
+        if not self.login():
+            return
+        while time.perf_counter() < deadline:
+            for step in JOURNEYS[self.role]:
+                if time.perf_counter() >= deadline:
+                    return
+                try:
+                    getattr(self, step)()
+                except StopIteration:  # 오류 화면 등으로 기대한 위젯이 없음 → 다음 단계로
+                    self.rec.error(step, "widget not found")
+                self._pause()
+            self.rec.journey_done()
+
+def pick_users(db_path: str, sessions: int, tech_share: float, rng: random.Random) -> List[tuple]:
+    conn = sqlite3.connect(db_path)
+    branch = conn.execute("SELECT username, password FROM users WHERE role='지점' AND is_active=1 ORDER BY id").fetchall()
+    techs = conn.execute("SELECT username, password FROM users WHERE role='기사' AND is_active=1 ORDER BY id").fetchall()
+    conn.close()
+    if not branch:
+        raise SystemExit("❌ 지점 계정이 없습니다. python -m benchmarks seed 로 먼저 적재하세요.")
+    users = []
+    for i in range(sessions):
+        if techs and rng.random() < tech_share:
+            users.append((*techs[i % len(techs)], "기사"))
+        else:
+            users.append((*branch[i % len(branch)], "지점"))
+    return users
+
+def run_level(db_path: str, sessions: int, duration: float, think: tuple, tech_share: float,
+              timeout: float, seed: int, ramp: float) -> Dict[str, Any]:
+    rng = random.Random(seed + sessions)
+    rec = Recorder()
+    users = pick_users(db_path, sessions, tech_share, rng)
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = []
+    for i, (username, password, role) in enumerate(users):
+        s = Session(username, password, role, rec, random.Random(seed * 1000 + i), think, timeout)
+        th = threading.Thread(target=s.loop, args=(deadline,), name=f"session-{i}", daemon=True)
+        threads.append(th)
+        th.start()
+        if ramp:
+            time.sleep(ramp / sessions)  # 로그인이 한꺼번에 몰리지 않도록 분산
+    for th in threads:
+        th.join()
+    return rec.summary(sessions, time.perf_counter() - start)
+
+def preflight(timeout: float):
+    """세션 1개로 앱을 한 번 띄워 본다. 임포트/기동 오류면 측정 없이 종료코드 1"""
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    try:
+        at.run()
+    except Exception as e:
+        raise SystemExit(f"❌ as_app.py 실행 실패: {type(e).__name__}: {e}")
+    if at.exception:
+        raise SystemExit(f"❌ as_app.py 실행 실패: {at.exception[0].value}")
+    if not at.text_input:
+        raise SystemExit("❌ as_app.py 로그인 화면이 나오지 않습니다.")
+
+def print_level(r: Dict[str, Any]):
+    print(f"  세션 {r['sessions']:>3}  rerun {r['reruns']:>6} ({r['reruns_per_s']:>6.1f}/s)  여정 {r['journeys']:>4} "
+          f"({r['journeys_per_s']:>5.2f}/s)  p50 {r['p50_ms']:>7.1f}ms  p95 {r['p95_ms']:>7.1f}ms  "
+          f"p99 {r['p99_ms']:>7.1f}ms  잠금오류 {r['lock_errors']}  기타오류 {sum(r['other_errors'].values())}", flush=True)
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="as_app.py 동시 세션 부하 테스트")
+    ap.add_argument("--db", default="bench.db", help="python -m benchmarks seed 로 만든 DB")
+    ap.add_argument("--in-place", action="store_true", help="복사본 대신 원본 DB 에 직접 실행")
+    ap.add_argument("--levels", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    ap.add_argument("--duration", type=float, default=60.0, help="단계별 실행 시간(초)")
+    ap.add_argument("--think-min", type=float, default=0.5)
+    ap.add_argument("--think-max", type=float, default=2.0)
+    ap.add_argument("--tech-share", type=float, default=0.3, help="기사 세션 비율")
+    ap.add_argument("--ramp", type=float, default=5.0, help="세션 시작을 분산할 시간(초)")
+    ap.add_argument("--timeout", type=float, default=60.0, help="rerun 1회 제한 시간(초)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="결과 JSON 경로")
+    args = ap.parse_args(argv)
+
+    workdir = None
+    db_path = args.db
+    if not args.in_place:
+        workdir = tempfile.mkdtemp(prefix="as_load_")
+        db_path = os.path.join(workdir, os.path.basename(args.db))
+        shutil.copyfile(args.db, db_path)
+    # as_app.py 가 모듈 로드 시 읽는 설정 (주소 인덱스는 끄고 드롭다운 경로로 고정)
+    os.environ["DOORLOCK_AS_DB"] = db_path
+    os.environ.setdefault("ADDRESS_INDEX_PATH", os.path.join(workdir or tempfile.gettempdir(), "no_address_index.db"))
+
+    if install_init_shim():
+        print("ℹ️ doorlock_as_init 이 없어 benchmarks.schema.create_schema 기반 대체 모듈로 실행")
+    patch_apptest_for_threads()
+    print(f"as_app.py 부하 테스트: {db_path}  (think {args.think_min}~{args.think_max}s, 단계당 {args.duration:.0f}s)")
+    levels = []
+    try:
+        preflight(args.timeout)
+        for n in args.levels:
+            r = run_level(db_path, n, args.duration, (args.think_min, args.think_max), args.tech_share,
+                          args.timeout, args.seed, args.ramp)
+            print_level(r)
+            levels.append(r)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"git_sha": git_sha(), "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                                "db": args.db, "args": vars(args)}, "levels": levels}, f, ensure_ascii=False, indent=2)
+        print(f"✅ 결과 저장: {args.out}")
+
+if __name__ == "__main__":
+    main()
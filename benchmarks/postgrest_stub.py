@@ -0,0 +1,287 @@
+# ==================== 로컬 PostgREST 대용 서버 ====================
+"""
+SQLite 파일을 PostgREST 형식(/rest/v1/<table>)으로 노출하는 로컬 서버.
+doorlock_as_supabase(→ supabase-py/postgrest-py)가 네트워크 없이 그대로 붙을 수 있도록
+실제로 사용하는 기능만 구현한다.
+
+- GET/HEAD: select, 필터(eq/neq/gt/gte/lt/lte/like/ilike/in/is, not.), or=(...)/and=(...),
+  order, limit/offset 파라미터와 Range 헤더, Prefer: count=exact → Content-Range
+- POST: 단건/배열 삽입, Prefer: resolution=merge-duplicates(+on_conflict) → upsert
+- PATCH/DELETE: 필터 조건으로 수정/삭제
+- Prefer: return=minimal 이면 본문 없이 응답
+
+    python -m benchmarks.postgrest_stub --db bench.db --port 54321
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=stub.stub.stub ...
+"""
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+STUB_KEY = "stub.stub.stub"  # supabase-py 의 키 형식 검사를 통과하는 더미 JWT 모양
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_RESERVED = {"select", "order", "limit", "offset", "or", "and", "on_conflict", "columns"}
+_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "LIKE"}
+
+class StubError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _ident(name: str) -> str:
+    if not _IDENT.match(name):
+        raise StubError(400, f"잘못된 식별자: {name}")
+    return f'"{name}"'
+
+def _split_top(text: str) -> List[str]:
+    """괄호 바깥의 콤마로 분리"""
+    parts, depth, cur = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(cur))
+            cur = []
+        else:
+            cur.append(ch)
+    if cur:
+        parts.append("".join(cur))
+    return parts
+
+def _condition(col: str, expr: str) -> Tuple[str, List[Any]]:
+    """col + 'op.value' → SQL 조건"""
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, value = expr.partition(".")
+    if len(value) >= 2 and value[0] == value[-1] == '"':  # 예약 문자가 든 값은 큰따옴표로 감싸서 온다
+        value = value[1:-1]
+    c = _ident(col)
+    if op == "in":
+        items = [v.strip().strip('"') for v in _split_top(value.strip()[1:-1])] if value.strip() else []
+        sql = f"{c} IN ({', '.join('?' * len(items))})" if items else "0"
+        params: List[Any] = items
+    elif op == "is":
+        sql = f"{c} IS {'NULL' if value.lower() == 'null' else ('1' if value.lower() == 'true' else '0')}"
+        params = []
+    elif op in _OPS:
+        if op in ("like", "ilike"):
+            value = value.replace("*", "%")
+        sql, params = f"{c} {_OPS[op]} ?", [value]
+    else:
+        raise StubError(400, f"지원하지 않는 연산자: {op}")
+    return (f"NOT ({sql})", params) if negate else (sql, params)
+
+def _logic(kind: str, body: str) -> Tuple[str, List[Any]]:
+    """or=(a.eq.1,and(b.gt.2,c.lt.3)) 형식"""
+    clauses, params = [], []
+    for item in _split_top(body):
+        item = item.strip()
+        m = re.match(r"^(and|or)\((.*)\)$", item)
+        if m:
+            sql, p = _logic(m.group(1), m.group(2))
+        else:
+            col, _, expr = item.partition(".")
+            sql, p = _condition(col, expr)
+        clauses.append(f"({sql})")
+        params.extend(p)
+    return f" {kind.upper()} ".join(clauses) or "1", params
+
+def build_where(query: List[Tuple[str, str]]) -> Tuple[str, List[Any]]:
+    clauses, params = [], []
+    for key, value in query:
+        if key in ("or", "and"):
+            sql, p = _logic(key, value.strip()[1:-1])
+        elif key in _RESERVED:
+            continue
+        else:
+            sql, p = _condition(key, value)
+        clauses.append(f"({sql})")
+        params.extend(p)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def build_order(order: Optional[str]) -> str:
+    if not order:
+        return ""
+    parts = []
+    for item in order.split(","):
+        bits = item.split(".")
+        direction = "DESC" if "desc" in bits[1:] else "ASC"
+        nulls = " NULLS FIRST" if "nullsfirst" in bits[1:] else (" NULLS LAST" if "nullslast" in bits[1:] else "")
+        parts.append(f"{_ident(bits[0])} {direction}{nulls}")
+    return "ORDER BY " + ", ".join(parts)
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "PostgrestStub/1.0"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 지연 ACK 로 40ms 씩 밀리는 것 방지
+
+    # ---------- 공통 ----------
+    def _parse(self):
+        parts = urlsplit(self.path)
+        m = re.match(r"^/rest/v1/([A-Za-z_][A-Za-z0-9_]*)$", parts.path)
+        if not m:
+            raise StubError(404, f"경로 없음: {parts.path}")
+        query = parse_qsl(parts.query, keep_blank_values=True)  # 디코딩은 parse_qsl 에서 한 번만
+        prefer = {p.split("=", 1)[0].strip(): (p.split("=", 1)[1].strip() if "=" in p else "")
+                  for p in self.headers.get("Prefer", "").split(",") if p.strip()}
+        return m.group(1), query, prefer
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.server.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _send(self, status: int, payload: Any = None, headers: Optional[dict] = None):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _dispatch(self, fn):
+        try:
+            before = getattr(self.server, "before_request", None)
+            if before and before(self) is False:  # 장애 주입 훅이 직접 응답한 경우
+                return
+            fn(*self._parse())
+        except StubError as e:
+            self._send(e.status, {"message": str(e), "code": str(e.status), "details": None, "hint": None})
+        except sqlite3.Error as e:
+            self._send(400, {"message": str(e), "code": "SQLITE", "details": None, "hint": None})
+
+    def log_message(self, fmt, *args):
+        pass
+
+    # ---------- 조회 ----------
+    def _select(self, table, query, prefer):
+        q = dict(query)
+        cols = q.get("select", "*") or "*"
+        col_sql = "*" if cols.strip() == "*" else ", ".join(_ident(c.strip()) for c in cols.split(","))
+        where, params = build_where(query)
+        limit, offset = q.get("limit"), q.get("offset")
+        rng = self.headers.get("Range")
+        if rng and "-" in rng and limit is None:
+            start, end = rng.split("-", 1)
+            offset, limit = start, str(int(end) - int(start) + 1)
+        page = ""
+        if limit is not None:
+            page = f" LIMIT {int(limit)} OFFSET {int(offset or 0)}"
+        elif offset is not None:
+            page = f" LIMIT -1 OFFSET {int(offset)}"
+        with self._conn() as conn:
+            rows = [dict(r) for r in conn.execute(
+                f"SELECT {col_sql} FROM {_ident(table)} {where} {build_order(q.get('order'))}{page}", params)]
+            headers = {}
+            if prefer.get("count") in ("exact", "planned", "estimated"):
+                total = conn.execute(f"SELECT COUNT(*) FROM {_ident(table)} {where}", params).fetchone()[0]
+                start = int(offset or 0)
+                headers["Content-Range"] = f"{start}-{start + len(rows) - 1}/{total}" if rows else f"*/{total}"
+        self._send(200, rows, headers)
+
+    def do_GET(self):
+        self._dispatch(self._select)
+
+    def do_HEAD(self):
+        self._dispatch(self._select)
+
+    # ---------- 쓰기 ----------
+    def _returning(self, conn, table, rowids):
+        if not rowids:
+            return []
+        marks = ",".join("?" * len(rowids))
+        return [dict(r) for r in conn.execute(f"SELECT * FROM {_ident(table)} WHERE rowid IN ({marks})", rowids)]
+
+    def _insert(self, table, query, prefer):
+        data = self._body()
+        rows = data if isinstance(data, list) else [data]
+        if not rows:
+            return self._send(201, [])
+        cols = list(dict.fromkeys(k for r in rows for k in r))
+        col_sql = ", ".join(_ident(c) for c in cols)
+        sql = f"INSERT INTO {_ident(table)} ({col_sql}) VALUES ({', '.join('?' * len(cols))})"
+        if prefer.get("resolution") == "merge-duplicates":
+            conflict = [c.strip() for c in dict(query).get("on_conflict", "id").split(",")]
+            updates = ", ".join(f"{_ident(c)}=excluded.{_ident(c)}" for c in cols if c not in conflict)
+            sql += f" ON CONFLICT ({', '.join(_ident(c) for c in conflict)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        elif prefer.get("resolution") == "ignore-duplicates":
+            sql = sql.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+        if prefer.get("return") == "minimal":  # 대량 적재 경로: 반환 행이 필요 없으면 한 번에
+            with self._conn() as conn:
+                conn.executemany(sql, [[r.get(c) for c in cols] for r in rows])
+            return self._send(201)
+        rowids = []
+        with self._conn() as conn:
+            for r in rows:
+                cur = conn.execute(sql + " RETURNING rowid", [r.get(c) for c in cols])
+                got = cur.fetchone()
+                if got:
+                    rowids.append(got[0])
+            result = self._returning(conn, table, rowids)
+        self._send(201, result)
+
+    def _update(self, table, query, prefer):
+        data = self._body() or {}
+        where, params = build_where(query)
+        sets = ", ".join(f"{_ident(c)}=?" for c in data)
+        with self._conn() as conn:
+            rowids = [r[0] for r in conn.execute(f"SELECT rowid FROM {_ident(table)} {where}", params)]
+            if rowids and sets:
+                marks = ",".join("?" * len(rowids))
+                conn.execute(f"UPDATE {_ident(table)} SET {sets} WHERE rowid IN ({marks})", [*data.values(), *rowids])
+            result = self._returning(conn, table, rowids) if prefer.get("return") != "minimal" else None
+        self._send(200, result)
+
+    def _delete(self, table, query, prefer):
+        where, params = build_where(query)
+        with self._conn() as conn:
+            rows = [dict(r) for r in conn.execute(f"SELECT * FROM {_ident(table)} {where}", params)]
+            conn.execute(f"DELETE FROM {_ident(table)} {where}", params)
+        self._send(200, rows if prefer.get("return") != "minimal" else None)
+
+    def do_POST(self):
+        self._dispatch(self._insert)
+
+    def do_PATCH(self):
+        self._dispatch(self._update)
+
+    def do_DELETE(self):
+        self._dispatch(self._delete)
+
+def make_server(db_path: str, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """서버 생성 (port=0 이면 빈 포트 자동 선택)"""
+    srv = ThreadingHTTPServer((host, port), StubHandler)
+    srv.daemon_threads = True
+    srv.db_path = db_path
+    srv.before_request = None
+    return srv
+
+def serve_in_thread(db_path: str, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드로 서버 실행 → (서버, base URL)"""
+    srv = make_server(db_path, host, port)
+    threading.Thread(target=srv.serve_forever, name="postgrest-stub", daemon=True).start()
+    return srv, f"http://{host}:{srv.server_address[1]}"
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="로컬 PostgREST 대용 서버")
+    ap.add_argument("--db", required=True)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=54321)
+    args = ap.parse_args()
+    print(f"✅ PostgREST 스텁: http://{args.host}:{args.port}/rest/v1/  (SUPABASE_KEY={STUB_KEY})")
+    make_server(args.db, args.host, args.port).serve_forever()
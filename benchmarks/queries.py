@@ -0,0 +1,240 @@
+# ==================== 페이지별 대표 쿼리 ====================
+"""
+as_app.py 각 페이지가 본 DB 에 실행하는 SQL(보관 월 ATTACH 는 빼고 같은 문장)과, 같은 화면을 Supabase 경로
+(doorlock_as_supabase)로 조회할 때의 호출을 시나리오로 정의한다.
+파라미터는 적재된 데이터에서 뽑으므로(가장 최근 달, 가장 큰 지점 등) 시드가 같으면 매번 같다.
+
+as_app.py 의 쿼리를 바꾸면 여기 SQL 도 같이 바꿔야 비교 결과가 의미를 가진다.
+"""
+import sqlite3
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.seed import GIVEN
+from doorlock_as_repeat import normalize_phone
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[[], int]  # 실행 후 반환 행 수
+
+def derive_params(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """데이터 기준 파라미터 (실행일과 무관하게 고정)"""
+    last_day = conn.execute("SELECT MAX(request_date) FROM as_reception").fetchone()[0]
+    today = date.fromisoformat(last_day)
+    branch_id = conn.execute(
+        "SELECT branch_id FROM as_reception GROUP BY branch_id ORDER BY COUNT(*) DESC, branch_id LIMIT 1"
+    ).fetchone()[0]
+    ym = conn.execute("""
+        SELECT substr(complete_date,1,7) FROM as_reception WHERE status='검수완료' AND complete_date IS NOT NULL
+        ORDER BY complete_date DESC LIMIT 1
+    """).fetchone()[0]
+    y, m = map(int, ym.split("-"))
+    return {
+        "today": today,
+        "branch_id": branch_id,
+        "start_date": f"{ym}-01",
+        "end_date": f"{ym}-{monthrange(y, m)[1]}",
+        "keyword": GIVEN[0],  # 시드 이름 목록의 이름 → 성과 무관하게 약 1/len(GIVEN) 건이 걸림
+        "phone_tail": conn.execute("SELECT substr(phone,-4) FROM as_reception ORDER BY id LIMIT 1").fetchone()[0],
+        "phone": conn.execute("SELECT phone FROM as_reception ORDER BY request_date DESC, id LIMIT 1").fetchone()[0],  # 최근 7일 목록에 걸리는 번호
+    }
+
+# ==================== SQLite (as_app.py 본 DB 조회) ====================
+
+def _list_where(p: Dict[str, Any], admin: bool, keyword: str = "") -> Tuple[str, List[Any]]:
+    where, params = [], []
+    if not admin:
+        where.append("branch_id = ?"); params.append(p["branch_id"])
+    where.extend(["request_date >= ?", "request_date <= ?"])
+    params.extend([str(p["today"] - timedelta(days=7)), str(p["today"])])
+    if keyword and len(normalize_phone(keyword)) >= 9:
+        where.append("phone_norm = ?"); params.append(normalize_phone(keyword))
+    elif keyword:
+        where.append("(customer_name LIKE ? OR phone LIKE ?)"); params.extend([f"%{keyword}%", f"%{keyword}%"])
+    return "WHERE " + " AND ".join(where), params
+
+def sqlite_scenarios(conn: sqlite3.Connection, p: Dict[str, Any]) -> List[Scenario]:
+    def q(sql, params=()):
+        return lambda: len(conn.execute(sql, params).fetchall())
+
+    def dashboard(admin):
+        where_clause = "" if admin else f"WHERE branch_id = {p['branch_id']}"
+        joiner = 'AND' if where_clause else 'WHERE'
+
+        def run():
+            n = 0
+            for extra in ("", f"{joiner} status='접수'", f"{joiner} status='완료'", f"{joiner} status='검수완료'"):
+                n += len(conn.execute(f"SELECT COUNT(*) FROM as_reception {where_clause} {extra}").fetchall())
+            n += len(conn.execute(f"""
+                SELECT reception_number, customer_name, phone, model_code, branch_name, status, request_date
+                FROM as_reception
+                {where_clause}
+                ORDER BY created_at DESC
+                LIMIT 10
+            """).fetchall())
+            return n
+        return run
+
+    def reception_list(admin, keyword="", page=1):
+        where_clause, params = _list_where(p, admin, keyword)
+
+        def run():
+            conn.execute(f"SELECT COUNT(*) FROM as_reception {where_clause}", params).fetchone()
+            return len(conn.execute(f"""
+                SELECT id, reception_number, customer_name, phone, address, model_code,
+                       symptom_code, symptom_description, branch_name, status, request_date, created_at
+                FROM as_reception
+                {where_clause}
+                ORDER BY created_at DESC
+                LIMIT ? OFFSET ?
+            """, params + [20, (page - 1) * 20]).fetchall())
+        return run
+
+    def result_queue(admin, keyword=""):
+        where_branch = "" if admin else f"AND branch_id = {p['branch_id']}"
+        search_clause, params = "", []
+        if keyword:
+            search_clause = "AND (customer_name LIKE ? OR phone LIKE ?)"
+            params = [f"%{keyword}%", f"%{keyword}%"]
+        return q(f"""
+            SELECT id, reception_number, customer_name, phone, model_code, symptom_description,
+                   branch_name, payment_type, request_date
+            FROM as_reception
+            WHERE status IN ('접수', '완료') {where_branch} {search_clause}
+            ORDER BY request_date ASC
+            LIMIT ?
+        """, tuple(params + [20]))
+
+    labor = q("""
+        SELECT ar.branch_id, ar.branch_name, b.billing_type,
+               COUNT(DISTINCT ar.id) AS job_count,
+               SUM(COALESCE(asr.labor_cost,0)) AS total_labor_cost,
+               CASE WHEN b.billing_type='세금계산서' THEN SUM(COALESCE(asr.labor_cost,0))*1.1
+                    ELSE SUM(COALESCE(asr.labor_cost,0)) END AS final_amount
+        FROM as_reception ar
+        LEFT JOIN as_result asr ON ar.id = asr.reception_id
+        LEFT JOIN branch b ON ar.branch_id = b.id
+        WHERE ar.status='검수완료' AND ar.complete_date>=? AND ar.complete_date<=?
+        GROUP BY ar.branch_id, ar.branch_name, b.billing_type
+        ORDER BY ar.branch_name
+    """, (p["start_date"], p["end_date"]))
+
+    labor_detail = q("""
+        SELECT
+            ar.reception_number           AS 접수번호,
+            DATE(ar.created_at)           AS 접수일자,
+            ar.complete_date              AS 처리완료일자,
+            DATE(ar.updated_at)           AS 검수일자,
+            ar.customer_name              AS 고객명,
+            COALESCE(asr.labor_cost,0)    AS 인건비,
+            COALESCE(asr.labor_reason,'') AS 인건비사유,
+            ar.symptom_description        AS 증상명
+        FROM as_reception ar
+        LEFT JOIN as_result asr ON asr.reception_id = ar.id
+        WHERE ar.status='검수완료'
+          AND ar.complete_date >= ?
+          AND ar.complete_date <= ?
+          AND ar.branch_id = ?
+        ORDER BY ar.complete_date, ar.reception_number
+    """, (p["start_date"], p["end_date"], p["branch_id"]))
+
+    stats_params = (str(p["today"] - timedelta(days=30)), str(p["today"]))
+
+    def quality_stats():
+        n = len(conn.execute("SELECT DISTINCT model_code FROM as_reception WHERE model_code IS NOT NULL").fetchall())
+        n += len(conn.execute("SELECT DISTINCT symptom_code, symptom_description FROM as_reception").fetchall())
+        where_sql = "WHERE request_date >= ? AND request_date <= ?"
+        n += len(conn.execute(f"""
+            SELECT model_code, symptom_code, symptom_description, DATE(request_date) AS req_date
+            FROM as_reception
+            {where_sql}
+        """, stats_params).fetchall())
+        n += len(conn.execute(f"""
+            SELECT COALESCE(NULLIF(sido,''),'미분류') AS 시도,
+                   COALESCE(NULLIF(sigungu,''),'미분류') AS 시군구,
+                   COUNT(*) AS count
+            FROM as_reception
+            {where_sql}
+            GROUP BY 시도, 시군구
+        """, stats_params).fetchall())
+        return n
+
+    inventory = q("SELECT material_code, material_name, quantity FROM inventory WHERE branch_id=? ORDER BY material_code",
+                  (p["branch_id"],))
+
+    return [
+        Scenario("dashboard_admin", dashboard(True)),
+        Scenario("dashboard_branch", dashboard(False)),
+        Scenario("list_admin_7d", reception_list(True)),
+        Scenario("list_branch_7d", reception_list(False)),
+        Scenario("list_admin_keyword", reception_list(True, p["keyword"])),
+        Scenario("list_admin_phone", reception_list(True, p["phone"])),
+        Scenario("list_admin_page50", reception_list(True, page=50)),
+        Scenario("result_queue_admin", result_queue(True)),
+        Scenario("result_queue_branch_phone", result_queue(False, p["phone_tail"])),
+        Scenario("labor_month", labor),
+        Scenario("labor_detail_branch", labor_detail),
+        Scenario("quality_stats_30d", quality_stats),
+        Scenario("inventory_branch", inventory),
+    ]
+
+# ==================== Supabase (doorlock_as_supabase) ====================
+
+def supabase_scenarios(sb, p: Dict[str, Any]) -> List[Scenario]:
+    """
+    sb: doorlock_as_supabase 모듈. 앱의 Supabase 경로가 노출하는 함수만 사용하므로
+    집계(대시보드 건수/인건비 합계)는 행을 받아 클라이언트에서 세는 현재 방식 그대로 측정된다.
+    """
+    d_from, d_to = str(p["today"] - timedelta(days=7)), str(p["today"])
+    bid = p["branch_id"]
+
+    def dashboard(branch_id):
+        def run():
+            n = 0
+            base = {} if branch_id is None else {"branch_id": bid}
+            for status in (None, "접수", "완료", "검수완료"):
+                filters = dict(base, **({"status": status} if status else {}))
+                n += len(sb.select_data("as_reception", columns="id", filters=filters, limit=1_000_000))
+            n += len(sb.select_data("as_reception", columns=[
+                "reception_number", "customer_name", "phone", "model_code", "branch_name", "status", "request_date"],
+                filters=base, order=("created_at", "desc"), limit=10))
+            return n
+        return run
+
+    def receptions(**kw):
+        return lambda: len(sb.get_receptions(date_from=d_from, date_to=d_to, to_df=False, **kw))
+
+    def labor():
+        rows = sb.select_data("as_reception", columns=["id", "branch_id", "branch_name"], filters={
+            "status": "검수완료", "complete_date__gte": p["start_date"], "complete_date__lte": p["end_date"]},
+            limit=1_000_000)
+        ids = [r["id"] for r in rows]
+        n = len(rows)
+        for i in range(0, len(ids), 500):  # URL 길이 제한 때문에 나눠서 조회
+            n += len(sb.select_data("as_result", columns=["reception_id", "labor_cost"],
+                                    filters={"reception_id__in": ids[i:i + 500]}))
+        return n
+
+    def quality_stats():
+        return len(sb.select_data("as_reception", columns=["model_code", "symptom_code", "symptom_description", "request_date", "sido", "sigungu"],
+                                  filters={"request_date__gte": str(p["today"] - timedelta(days=30)),
+                                           "request_date__lte": str(p["today"])}, limit=1_000_000))
+
+    return [
+        Scenario("dashboard_admin", dashboard(None)),
+        Scenario("dashboard_branch", dashboard(bid)),
+        Scenario("list_admin_7d", receptions()),
+        Scenario("list_branch_7d", receptions(branch_id=bid)),
+        Scenario("list_admin_keyword", receptions(keyword=p["keyword"])),
+        Scenario("list_admin_page50", receptions(offset=49 * 20)),
+        Scenario("result_queue_admin", lambda: len(sb.select_data(
+            "as_reception", filters={"status__in": ["접수", "완료"]}, order=("request_date", "asc"), limit=20))),
+        Scenario("labor_month", labor),
+        Scenario("quality_stats_30d", quality_stats),
+        Scenario("inventory_branch", lambda: len(sb.select_data(
+            "inventory", columns=["material_code", "material_name", "quantity"],
+            filters={"branch_id": bid}, order="material_code"))),
+    ]
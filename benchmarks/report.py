@@ -0,0 +1,98 @@
+# ==================== 벤치마크 실행/결과 비교 ====================
+"""
+시나리오를 반복 실행해 p50/p95/평균을 JSON 으로 남기고, 두 결과 파일을 비교한다.
+결과에는 git 커밋, SQLite 버전, 데이터 규모를 함께 기록해 어떤 조건의 수치인지 남긴다.
+"""
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+from typing import Any, Dict, List
+
+from benchmarks.queries import Scenario
+
+def git_sha() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+def measure(scenarios: List[Scenario], repeat: int = 20, warmup: int = 2, verbose: bool = True) -> Dict[str, Dict[str, Any]]:
+    """시나리오별 소요 시간 통계 (ms)"""
+    results = {}
+    for sc in scenarios:
+        for _ in range(warmup):
+            sc.run()
+        samples, rows = [], 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            rows = sc.run()
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        results[sc.name] = {
+            "p50_ms": round(_percentile(samples, 0.50), 3),
+            "p95_ms": round(_percentile(samples, 0.95), 3),
+            "mean_ms": round(statistics.fmean(samples), 3),
+            "min_ms": round(samples[0], 3),
+            "rows": rows,
+            "repeat": repeat,
+        }
+        if verbose:
+            r = results[sc.name]
+            print(f"  {sc.name:<28} p50 {r['p50_ms']:>9.2f}ms  p95 {r['p95_ms']:>9.2f}ms  rows {rows:,}", flush=True)
+    return results
+
+def build_report(db_path: str, backends: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    conn = sqlite3.connect(db_path)
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+              for t in ("branch", "as_reception", "as_result", "audit_log")}
+    conn.close()
+    return {
+        "meta": {
+            "git_sha": git_sha(),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "db": db_path,
+            "counts": counts,
+        },
+        "results": backends,
+    }
+
+def save_report(report: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def compare(base_path: str, head_path: str, threshold: float = 0.10, metric: str = "p50_ms") -> int:
+    """
+    두 결과 비교 출력. threshold(비율) 이상 느려진 시나리오 수를 반환한다.
+    데이터 규모가 다르면 경고만 하고 비교는 계속한다.
+    """
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(head_path, encoding="utf-8") as f:
+        head = json.load(f)
+    print(f"base: {base['meta']['git_sha']} ({base['meta']['created_at']})  →  "
+          f"head: {head['meta']['git_sha']} ({head['meta']['created_at']})  [{metric}]")
+    if base["meta"]["counts"] != head["meta"]["counts"]:
+        print(f"⚠️ 데이터 규모가 다릅니다: {base['meta']['counts']} vs {head['meta']['counts']}")
+    regressions = 0
+    for backend, scenarios in head["results"].items():
+        print(f"\n[{backend}]")
+        for name, h in scenarios.items():
+            b = base["results"].get(backend, {}).get(name)
+            if not b:
+                print(f"  {name:<28} {'(신규)':>10} {h[metric]:>10.2f}")
+                continue
+            delta = (h[metric] - b[metric]) / b[metric] if b[metric] else 0.0
+            mark = "🔺" if delta >= threshold else ("🔻" if delta <= -threshold else "  ")
+            regressions += delta >= threshold
+            print(f"  {name:<28} {b[metric]:>10.2f} {h[metric]:>10.2f}  {delta:+7.1%} {mark}")
+    return regressions
@@ -0,0 +1,101 @@
+# ==================== 벤치마크용 기본 스키마 ====================
+"""
+doorlock_as_init 모듈이 저장소에 없으므로, as_app.py 가 읽고 쓰는 컬럼을 기준으로
+기본 테이블을 재구성한다. 그 위에 doorlock_as_schema.migrate() 로 앱과 같은 추가 스키마를 얹는다.
+"""
+import importlib.util
+import sqlite3
+import sys
+import types
+
+from doorlock_as_schema import migrate
+
+BASE_DDL = """
+CREATE TABLE IF NOT EXISTS branch (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    branch_code TEXT UNIQUE, branch_name TEXT, manager TEXT, phone TEXT,
+    address TEXT, region TEXT, billing_type TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE, password TEXT, name TEXT, role TEXT,
+    branch_id INTEGER REFERENCES branch(id), phone TEXT, is_active INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS product_model (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, model_code TEXT UNIQUE, model_name TEXT
+);
+CREATE TABLE IF NOT EXISTS symptom_code (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT, code TEXT UNIQUE, description TEXT
+);
+CREATE TABLE IF NOT EXISTS material_code (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, material_code TEXT UNIQUE, material_name TEXT,
+    unit_price INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS as_reception (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_number TEXT, reception_number TEXT UNIQUE, customer_name TEXT, phone TEXT,
+    address TEXT, address_detail TEXT, model_code TEXT, symptom_category TEXT,
+    symptom_code TEXT, symptom_description TEXT, detail_content TEXT,
+    branch_id INTEGER, branch_name TEXT, registrant_id INTEGER, registrant_name TEXT,
+    request_date DATE, install_date DATE, complete_date DATE,
+    status TEXT DEFAULT '접수', payment_type TEXT, attachment_path TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS as_result (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reception_id INTEGER REFERENCES as_reception(id), technician_id INTEGER, technician_name TEXT,
+    result TEXT, labor_cost INTEGER DEFAULT 0, labor_reason TEXT, completed_at DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS as_material_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reception_id INTEGER REFERENCES as_reception(id), material_code TEXT, material_name TEXT,
+    quantity INTEGER, unit_price INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    branch_id INTEGER, material_code TEXT, material_name TEXT, quantity INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS inventory_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    branch_id INTEGER, material_code TEXT, material_name TEXT, type TEXT,
+    quantity INTEGER, before_qty INTEGER, after_qty INTEGER, user_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER, action TEXT, table_name TEXT, record_id INTEGER,
+    old_value TEXT, new_value TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+def create_schema(conn: sqlite3.Connection):
+    """기본 스키마 + 앱 추가 스키마"""
+    conn.executescript(BASE_DDL)
+    migrate(conn)
+
+def install_init_shim() -> bool:
+    """
+    doorlock_as_init 이 없으면 create_schema 기반 대체 모듈을 sys.modules 에 등록한다 (as_app.py 를 띄우는 벤치마크용).
+    마스터 데이터는 시드 DB 에 이미 있으므로 init_master_data 는 아무것도 하지 않는다. 등록했으면 True
+    """
+    if "doorlock_as_init" in sys.modules or importlib.util.find_spec("doorlock_as_init") is not None:
+        return False
+    shim = types.ModuleType("doorlock_as_init")
+
+    def init_db(path: str):
+        conn = sqlite3.connect(path)
+        try:
+            create_schema(conn)
+        finally:
+            conn.close()
+
+    shim.init_db = init_db
+    shim.init_master_data = lambda path: None
+    sys.modules["doorlock_as_init"] = shim
+    return True
@@ -0,0 +1,242 @@
+# ==================== 합성 데이터 생성 ====================
+"""
+운영 규모의 합성 데이터를 SQLite 에 적재한다.
+
+- 지점/사용자(지점 계정 + 기사)/모델/증상/자재 마스터
+- as_reception: 모델·증상은 Zipf 분포(모델마다 주요 증상이 다름), 지역은 수도권 가중,
+  일부 고객은 재접수(같은 전화번호)
+- 검수완료 건의 as_result / as_material_usage, 지점별 재고와 입출고 로그, 감사 로그
+
+    python -m benchmarks seed --db bench.db --receptions 1000000 --branches 40
+"""
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List
+
+from doorlock_as_regions import KOREA_REGIONS
+from doorlock_as_repeat import normalize_phone
+from benchmarks.schema import create_schema
+
+SYMPTOM_CATEGORIES = ["1.전원", "2.모터", "3.키패드", "4.지문", "5.통신", "6.기구", "7.외관", "8.기타"]
+PAYMENT_TYPES = ["무상", "유상", "유무상현장확인", "출장비유상/부품비무상"]
+PAYMENT_WEIGHTS = [55, 30, 10, 5]
+LABOR_REASONS = [None, None, None, "야간1", "야간2", "파손", "장거리1", "장거리2", "주말", "기타"]
+SIDO_WEIGHTS = {"서울특별시": 22, "경기도": 30, "인천광역시": 6, "부산광역시": 7, "대구광역시": 5}
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = ["민수", "서연", "지훈", "하은", "도윤", "수아", "예준", "지우", "현우", "서윤", "준호", "은지"]
+
+def zipf_weights(n: int, s: float = 1.1) -> List[float]:
+    """Zipf 누적 가중치 (random.choices(cum_weights=...) 용)"""
+    return list(accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+class Generator:
+    """재현 가능한(seed 고정) 합성 데이터 생성기"""
+
+    def __init__(self, conn: sqlite3.Connection, branches: int = 30, models: int = 40, symptoms: int = 64,
+                 materials: int = 80, technicians_per_branch: int = 3, days: int = 730,
+                 repeat_rate: float = 0.08, seed: int = 42):
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self.n_branches, self.n_models, self.n_symptoms = branches, models, symptoms
+        self.n_materials, self.tech_per_branch = materials, technicians_per_branch
+        self.days, self.repeat_rate = days, repeat_rate
+        self.today = date.today()
+
+    # ---------- 마스터 ----------
+    def seed_master(self):
+        rng, c = self.rng, self.conn
+        c.executemany(
+            "INSERT INTO branch (branch_code, branch_name, manager, phone, address, region, billing_type) VALUES (?,?,?,?,?,?,?)",
+            [(f"B{i:03d}", f"지점{i:03d}", f"담당{i:03d}", f"02-{1000 + i}-0000", "", "",
+              "세금계산서" if i % 3 else "현금영수증") for i in range(1, self.n_branches + 1)],
+        )
+        users = [("admin", "admin123", "관리자", "관리자", None, "")]
+        for b in range(1, self.n_branches + 1):
+            users.append((f"branch{b:03d}", "1234", f"지점{b:03d}", "지점", b, ""))
+            for t in range(1, self.tech_per_branch + 1):
+                users.append((f"tech{b:03d}_{t}", "1234", f"기사{b:03d}-{t}", "기사", b, ""))
+        c.executemany("INSERT INTO users (username, password, name, role, branch_id, phone) VALUES (?,?,?,?,?,?)", users)
+        c.executemany("INSERT INTO product_model (model_code, model_name) VALUES (?,?)",
+                      [(f"M{i:03d}", f"도어락 모델 {i:03d}") for i in range(1, self.n_models + 1)])
+        self.symptoms = []
+        for i in range(1, self.n_symptoms + 1):
+            cat = SYMPTOM_CATEGORIES[(i - 1) % len(SYMPTOM_CATEGORIES)]
+            self.symptoms.append((cat, f"S{i:03d}", f"{cat.split('.')[1]} 증상 {i:03d}"))
+        c.executemany("INSERT INTO symptom_code (category, code, description) VALUES (?,?,?)", self.symptoms)
+        self.materials = [(f"{i:05d}", f"자재 {i:05d}", rng.choice([1500, 3000, 5000, 8000, 12000, 25000, 45000]))
+                          for i in range(1, self.n_materials + 1)]
+        c.executemany("INSERT INTO material_code (material_code, material_name, unit_price) VALUES (?,?,?)", self.materials)
+        c.commit()
+
+        self.models = [f"M{i:03d}" for i in range(1, self.n_models + 1)]
+        self.model_weights = zipf_weights(self.n_models)
+        # 모델마다 증상 순위를 다르게 (특정 모델에 특정 불량이 몰림)
+        base = [1.0 / (k ** 1.3) for k in range(1, self.n_symptoms + 1)]
+        self.symptom_weights: Dict[str, List[float]] = {}
+        for m in self.models:
+            order = list(range(self.n_symptoms))
+            rng.shuffle(order)
+            w = [0.0] * self.n_symptoms
+            for rank, idx in enumerate(order):
+                w[idx] = base[rank]
+            self.symptom_weights[m] = list(accumulate(w))
+        self.material_weights = zipf_weights(self.n_materials)
+        self.sidos = list(KOREA_REGIONS)
+        self.sido_weights = list(accumulate(SIDO_WEIGHTS.get(s, 2) for s in self.sidos))
+        techs = c.execute("SELECT id, name, branch_id FROM users WHERE role='기사'").fetchall()
+        self.techs_by_branch: Dict[int, list] = {}
+        for tid, name, bid in techs:
+            self.techs_by_branch.setdefault(bid, []).append((tid, name))
+        self.branch_users = dict(c.execute("SELECT branch_id, id FROM users WHERE role='지점'").fetchall())
+
+    # ---------- 접수/결과 ----------
+    def _phone(self, known: list) -> str:
+        if known and self.rng.random() < self.repeat_rate:
+            return self.rng.choice(known)
+        p = f"010-{self.rng.randint(1000, 9999)}-{self.rng.randint(1000, 9999)}"
+        if len(known) < 200_000:
+            known.append(p)
+        return p
+
+    def seed_receptions(self, count: int, batch_size: int = 20_000, audit: bool = True, progress=None):
+        rng, c = self.rng, self.conn
+        start_day = self.today - timedelta(days=self.days)
+        # 최근일수록 접수가 많도록 (연 20% 성장)
+        day_weights = list(accumulate(1.0 + 0.2 * d / 365 for d in range(self.days + 1)))
+        per_day: Dict[date, int] = {}
+        known_phones: list = []
+        branch_ids = list(range(1, self.n_branches + 1))
+        branch_weights = zipf_weights(self.n_branches, 0.6)
+        next_result_id = 1
+        rec_rows, res_rows, mat_rows, audit_rows = [], [], [], []
+        rid = c.execute("SELECT COALESCE(MAX(id), 0) FROM as_reception").fetchone()[0]
+        t0 = time.perf_counter()
+
+        def flush():
+            c.executemany("""
+                INSERT INTO as_reception
+                (id, order_number, reception_number, customer_name, phone, phone_norm, address, address_detail, sido, sigungu,
+                 model_code, symptom_category, symptom_code, symptom_description, detail_content,
+                 branch_id, branch_name, registrant_id, registrant_name, request_date, install_date, complete_date,
+                 status, payment_type, attachment_path, created_at, updated_at)
+                VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            """, rec_rows)
+            c.executemany("""
+                INSERT INTO as_result (id, reception_id, technician_id, technician_name, result, labor_cost, labor_reason, completed_at, created_at)
+                VALUES (?,?,?,?,?,?,?,?,?)
+            """, res_rows)
+            c.executemany("""
+                INSERT INTO as_material_usage (reception_id, material_code, material_name, quantity, unit_price, created_at)
+                VALUES (?,?,?,?,?,?)
+            """, mat_rows)
+            c.executemany("""
+                INSERT INTO audit_log (user_id, action, table_name, record_id, old_value, new_value, created_at)
+                VALUES (?,?,?,?,?,?,?)
+            """, audit_rows)
+            c.commit()
+            for lst in (rec_rows, res_rows, mat_rows, audit_rows):
+                lst.clear()
+
+        days_sample = rng.choices(range(self.days + 1), cum_weights=day_weights, k=count)
+        days_sample.sort()
+        for n, day_offset in enumerate(days_sample, 1):
+            rid += 1
+            req = start_day + timedelta(days=day_offset)
+            per_day[req] = per_day.get(req, 0) + 1
+            reception_number = f"{req.strftime('%Y%m%d')}({per_day[req]})"
+            model = rng.choices(self.models, cum_weights=self.model_weights)[0]
+            cat, code, desc = rng.choices(self.symptoms, cum_weights=self.symptom_weights[model])[0]
+            bid = rng.choices(branch_ids, cum_weights=branch_weights)[0]
+            sido = rng.choices(self.sidos, cum_weights=self.sido_weights)[0]
+            sgg = rng.choice(KOREA_REGIONS[sido])
+            free = f"테스트로{rng.randint(1, 300)}번길 {rng.randint(1, 120)}"
+            payment = rng.choices(PAYMENT_TYPES, weights=PAYMENT_WEIGHTS)[0]
+            age = (self.today - req).days
+            if age > 21:
+                status = rng.choices(["검수완료", "완료", "접수"], weights=[94, 4, 2])[0]
+            else:
+                status = rng.choices(["검수완료", "완료", "접수"], weights=[max(5, age * 3), 25, 60])[0]
+            complete = None
+            if status != "접수":
+                complete = min(self.today, req + timedelta(days=int(rng.expovariate(1 / 3.0))))
+            created = f"{req} {rng.randint(8, 19):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+            updated = f"{complete} 18:00:00" if complete else created
+            registrant = self.branch_users.get(bid, 1)
+            rec_rows.append((
+                rid, f"ORD{rid:09d}" if rng.random() < 0.4 else "", reception_number,
+                f"{rng.choice(SURNAMES)}{rng.choice(GIVEN)}", (phone := self._phone(known_phones)), normalize_phone(phone),
+                f"{sido} {sgg} {free}", free, sido, sgg,
+                model, cat, code, desc, "",
+                bid, f"지점{bid:03d}", registrant, f"지점{bid:03d}",
+                str(req), str(req - timedelta(days=rng.randint(30, 1500))), str(complete) if complete else None,
+                status, payment, "", created, updated,
+            ))
+            if audit:
+                audit_rows.append((registrant, "INSERT", "as_reception", rid, "", reception_number, created))
+            if status == "검수완료":
+                tid, tname = rng.choice(self.techs_by_branch.get(bid) or [(None, "")])
+                res_rows.append((next_result_id, rid, tid, tname, "처리 완료", rng.choice([0, 0, 20000, 30000, 50000]),
+                                 rng.choice(LABOR_REASONS), str(complete), updated))
+                if audit:
+                    audit_rows.append((tid, "INSERT", "as_result", next_result_id, "", reception_number, updated))
+                next_result_id += 1
+                free_job = payment in ("무상", "출장비유상/부품비무상")
+                for _ in range(rng.choices([0, 1, 2, 3], weights=[35, 40, 18, 7])[0]):
+                    mcode, mname, price = rng.choices(self.materials, cum_weights=self.material_weights)[0]
+                    mat_rows.append((rid, mcode, mname, rng.choice([1, 1, 1, 2]), 0 if free_job else price, updated))
+            if len(rec_rows) >= batch_size:
+                flush()
+                if progress:
+                    progress(n, count, time.perf_counter() - t0)
+        flush()
+
+    # ---------- 재고 ----------
+    def seed_inventory(self, logs_per_branch: int = 2000):
+        rng, c = self.rng, self.conn
+        inv, logs = [], []
+        for b in range(1, self.n_branches + 1):
+            qty = {}
+            for code, name, _ in self.materials:
+                qty[code] = rng.randint(0, 60)
+                inv.append((b, code, name, qty[code]))
+            for _ in range(logs_per_branch):
+                code, name, _ = rng.choices(self.materials, cum_weights=self.material_weights)[0]
+                kind = rng.choice(["입고", "출고", "출고"])
+                n = rng.randint(1, 10)
+                before = rng.randint(0, 80)
+                after = before + n if kind == "입고" else max(0, before - n)
+                day = self.today - timedelta(days=rng.randint(0, self.days))
+                logs.append((b, code, name, kind, n, before, after, self.branch_users.get(b, 1), f"{day} 10:00:00"))
+        c.executemany("INSERT INTO inventory (branch_id, material_code, material_name, quantity) VALUES (?,?,?,?)", inv)
+        c.executemany("""
+            INSERT INTO inventory_log (branch_id, material_code, material_name, type, quantity, before_qty, after_qty, user_id, created_at)
+            VALUES (?,?,?,?,?,?,?,?,?)
+        """, logs)
+        c.commit()
+
+def seed_database(db_path: str, receptions: int = 100_000, branches: int = 30, days: int = 730,
+                  seed: int = 42, audit: bool = True, verbose: bool = True, **kw) -> Dict[str, int]:
+    """빈 DB 파일에 스키마 생성 + 합성 데이터 적재. 테이블별 건수 반환"""
+    conn = sqlite3.connect(db_path)
+    create_schema(conn)
+    if conn.execute("SELECT COUNT(*) FROM as_reception").fetchone()[0]:
+        raise SystemExit(f"❌ 이미 데이터가 있는 DB 입니다: {db_path}")
+    conn.execute("PRAGMA synchronous = OFF")
+    gen = Generator(conn, branches=branches, days=days, seed=seed, **kw)
+    gen.seed_master()
+
+    def progress(n, total, elapsed):
+        if verbose:
+            print(f"  … {n:,}/{total:,} 접수 ({n / elapsed:,.0f}건/s)", flush=True)
+
+    gen.seed_receptions(receptions, audit=audit, progress=progress)
+    gen.seed_inventory()
+    conn.execute("ANALYZE")
+    conn.commit()
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in (
+        "branch", "users", "as_reception", "as_result", "as_material_usage", "inventory", "inventory_log", "audit_log")}
+    conn.close()
+    return counts
@@ -0,0 +1,258 @@
+# ==================== 오프라인 주소 검색 인덱스 ====================
+"""
+도로명주소 데이터(주소정보누리집 '도로명주소 한글' 전체분, rnaddrkor_*.txt)로
+로컬 주소 인덱스를 만들고 접두어 자동완성을 제공한다. 네트워크 없이 동작한다.
+
+인덱스는 단일 SQLite 파일이다.
+  - addr     : 주소 1건 = 1행 (우편번호, 정규화된 시/도·시·군·구, 도로명, 건물번호, 건물명)
+  - addr_key : (검색키, addr.id) WITHOUT ROWID B-tree → 접두어 범위 검색
+검색키는 공백을 제거한 '도로명+건물번호', '시군구+도로명+건물번호', '읍면동+지번', '건물명'.
+읽기 전용(immutable) + mmap 으로 열기 때문에 기동 시 로딩 비용이 없다.
+
+    python doorlock_as_address.py build rnaddrkor_seoul.txt ... --out address_index.db
+    python doorlock_as_address.py build 202401_도로명주소_한글_전체분.zip
+    python doorlock_as_address.py query "테헤란로 152"
+"""
+import argparse
+import codecs
+import io
+import os
+import sqlite3
+import time
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from doorlock_as_regions import normalize_sido
+
+ADDRESS_INDEX_PATH = os.getenv("ADDRESS_INDEX_PATH", "address_index.db")
+MMAP_SIZE = 1 << 31
+
+# 도로명주소 한글(rnaddrkor) 파일 컬럼 위치 ('|' 구분)
+JUSO_COLUMNS = {
+    "sido": 2,
+    "sigungu": 3,
+    "emd": 4,
+    "ri": 5,
+    "is_mountain": 6,
+    "jibun_main": 7,
+    "jibun_sub": 8,
+    "road": 10,
+    "is_underground": 11,
+    "bldg_main": 12,
+    "bldg_sub": 13,
+    "zipcode": 16,
+    "bldg_name": 22,
+}
+
+_KEY_UPPER = "\U0010ffff"
+
+# ==================== 정규화 ====================
+
+def _compact(text: str) -> str:
+    """검색키 정규화: 공백 제거 + 소문자"""
+    return "".join(text.split()).lower()
+
+def _split_query(query: str) -> Tuple[Optional[str], str]:
+    """질의 앞의 시/도 표기를 분리 (예: '서울 테헤란로' → ('서울특별시', '테헤란로'))"""
+    parts = query.split(maxsplit=1)
+    if parts:
+        sido = normalize_sido(parts[0])
+        if sido:
+            return sido, (parts[1] if len(parts) > 1 else "")
+    return None, query
+
+def _number(main: str, sub: str) -> str:
+    return f"{main}-{sub}" if sub and sub != "0" else main
+
+# ==================== 원본 파일 읽기 ====================
+
+def _decode_lines(raw: io.BufferedIOBase, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """
+    청크 단위로 읽어 한 줄씩 반환 (파일 전체를 메모리에 올리지 않음).
+    인코딩은 첫 청크로 판정: UTF-8 우선, 실패 시 CP949 (배포 파일은 대부분 CP949)
+    """
+    chunk = raw.read(chunk_size)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(chunk, final=False)
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        encoding = "cp949"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    while chunk:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        chunk = raw.read(chunk_size)
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield pending.rstrip("\r")
+
+def _iter_source_lines(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zf:
+                for name in sorted(zf.namelist()):
+                    if name.lower().endswith(".txt"):
+                        with zf.open(name) as f:
+                            yield from _decode_lines(f)
+        elif os.path.isdir(path):
+            yield from _iter_source_lines(
+                os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith(".txt")
+            )
+        else:
+            with open(path, "rb") as f:
+                yield from _decode_lines(f)
+
+def parse_juso_line(line: str) -> Optional[Dict[str, str]]:
+    """rnaddrkor 한 줄 → 주소 dict (형식이 맞지 않으면 None)"""
+    cols = line.split("|")
+    if len(cols) <= max(JUSO_COLUMNS.values()):
+        return None
+    c = {k: cols[i].strip() for k, i in JUSO_COLUMNS.items()}
+    if not c["road"] or not c["bldg_main"]:
+        return None
+    sido = normalize_sido(c["sido"]) or c["sido"]
+    bldg_no = _number(c["bldg_main"], c["bldg_sub"])
+    road = f"{'지하 ' if c['is_underground'] == '1' else ''}{c['road']}"
+    jibun_no = ("산" if c["is_mountain"] == "1" else "") + _number(c["jibun_main"], c["jibun_sub"])
+    emd = f"{c['emd']} {c['ri']}".strip()
+    return {
+        "zipcode": c["zipcode"],
+        "sido": sido,
+        "sigungu": c["sigungu"],
+        "emd": emd,
+        "road": road,
+        "bldg_no": bldg_no,
+        "bldg_name": c["bldg_name"],
+        "street": f"{road} {bldg_no}",
+        "jibun_no": jibun_no,
+        "road_address": " ".join(p for p in (sido, c["sigungu"], road, bldg_no) if p),
+        "jibun_address": " ".join(p for p in (sido, c["sigungu"], emd, jibun_no) if p),
+    }
+
+def _keys_for(a: Dict[str, str]) -> List[str]:
+    keys = {
+        _compact(a["street"]),
+        _compact(f"{a['sigungu']} {a['street']}"),
+        # 읍면동(+리) + 지번 — 시·군·구가 여러 단어('수원시 장안구')이거나 없는(세종) 경우도 같은 형태
+        _compact(f"{a['emd']} {a['jibun_no']}") if a["emd"] else "",
+    }
+    if a["bldg_name"]:
+        keys.add(_compact(a["bldg_name"]))
+    return [k for k in keys if k]
+
+# ==================== 인덱스 생성 ====================
+
+_ADDR_COLUMNS = ("zipcode", "sido", "sigungu", "emd", "road", "bldg_no", "bldg_name",
+                 "street", "road_address", "jibun_address")
+
+def build_index(sources: List[str], out_path: str = ADDRESS_INDEX_PATH, batch_size: int = 20_000) -> int:
+    """원본 파일들로 인덱스 파일 생성 (임시 파일에 만든 뒤 교체). 적재 건수 반환"""
+    tmp_path = out_path + ".building"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(f"""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE addr (id INTEGER PRIMARY KEY, {", ".join(f"{c} TEXT" for c in _ADDR_COLUMNS)});
+        CREATE TABLE addr_key (key TEXT NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (key, id)) WITHOUT ROWID;
+        CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+    """)
+    insert_addr = f"INSERT INTO addr (id, {', '.join(_ADDR_COLUMNS)}) VALUES (?{', ?' * len(_ADDR_COLUMNS)})"
+    addr_rows, key_rows, count = [], [], 0
+    for line in _iter_source_lines(sources):
+        a = parse_juso_line(line)
+        if a is None:
+            continue
+        count += 1
+        addr_rows.append((count, *(a[c] for c in _ADDR_COLUMNS)))
+        key_rows.extend((k, count) for k in _keys_for(a))
+        if len(addr_rows) >= batch_size:
+            conn.executemany(insert_addr, addr_rows)
+            conn.executemany("INSERT OR IGNORE INTO addr_key VALUES (?, ?)", key_rows)
+            addr_rows, key_rows = [], []
+    conn.executemany(insert_addr, addr_rows)
+    conn.executemany("INSERT OR IGNORE INTO addr_key VALUES (?, ?)", key_rows)
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ("built_at", time.strftime("%Y-%m-%d %H:%M:%S")),
+        ("rows", str(count)),
+        ("sources", ", ".join(os.path.basename(s) for s in sources)),
+    ])
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, out_path)
+    return count
+
+# ==================== 검색 ====================
+
+class AddressIndex:
+    """읽기 전용 주소 인덱스 (스레드 간 공유 가능)"""
+
+    def __init__(self, path: str = ADDRESS_INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        self.conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        self.conn.execute("PRAGMA query_only = ON")
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """접두어 자동완성 (우편번호·정규화된 시/도·시·군·구 포함)"""
+        sido, rest = _split_query(query.strip())
+        prefix = _compact(rest)
+        if not prefix:
+            return []
+        # 시/도 조건은 LIMIT 전에 적용 (키 순서대로 훑다가 limit 건 채우면 중단)
+        sido_filter = "JOIN addr s ON s.id = addr_key.id AND s.sido = ?" if sido else ""
+        params = ((sido,) if sido else ()) + (prefix, prefix + _KEY_UPPER, limit)
+        cur = self.conn.execute(f"""
+            SELECT a.id, {", ".join(f"a.{c}" for c in _ADDR_COLUMNS)}
+            FROM (SELECT DISTINCT addr_key.id FROM addr_key {sido_filter}
+                  WHERE key >= ? AND key < ? LIMIT ?) k
+            JOIN addr a ON a.id = k.id
+        """, params)
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    def meta(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT name, value FROM meta").fetchall())
+
+def open_index(path: str = ADDRESS_INDEX_PATH) -> Optional[AddressIndex]:
+    """인덱스 파일이 있으면 열고, 없으면 None (기존 시/도 드롭다운으로 대체)"""
+    if not os.path.exists(path):
+        return None
+    return AddressIndex(path)
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="오프라인 주소 검색 인덱스")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="도로명주소 원본(txt/zip/폴더)으로 인덱스 생성")
+    b.add_argument("sources", nargs="+")
+    b.add_argument("--out", default=ADDRESS_INDEX_PATH)
+    q = sub.add_parser("query", help="자동완성 결과와 소요 시간 확인")
+    q.add_argument("text")
+    q.add_argument("--index", default=ADDRESS_INDEX_PATH)
+    q.add_argument("--limit", type=int, default=10)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        n = build_index(args.sources, args.out)
+        print(f"✅ {n:,}건 적재 → {args.out} ({time.perf_counter() - t0:.1f}s)")
+    else:
+        idx = open_index(args.index)
+        if idx is None:
+            raise SystemExit(f"❌ 인덱스 파일이 없습니다: {args.index}")
+        t0 = time.perf_counter()
+        rows = idx.suggest(args.text, args.limit)
+        elapsed = (time.perf_counter() - t0) * 1000
+        for r in rows:
+            print(f"[{r['zipcode']}] {r['road_address']} {r['bldg_name'] or ''}")
+        print(f"— {len(rows)}건, {elapsed:.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# ==================== 증상 급증(이상) 탐지 ====================
+"""
+(모델, 증상) 조합별 일별 접수 건수를 한 행렬(조합 × 일)로 만든 뒤 모든 시계열을 한 번에 채점한다.
+
+  - 기준선: 오늘 직전 GUARD_DAYS 일을 건너뛴 BASELINE_DAYS 일의 평균/분산 (누적합으로 전 조합 동시 계산).
+    건너뛰는 구간이 있어야 며칠째 이어지는 불량 물결이 기준선에 섞여 묻히지 않는다
+  - z 점수: 하루 급증. 분모는 max(분산, 평균, MIN_SIGMA²) 의 제곱근 (건수 데이터는 분산≈평균, 희소 조합 과민 방지)
+  - EWMA 관리도: 지수평활값이 기준선에서 벗어난 정도. 하루로는 약하지만 며칠 이어지는 증가를 잡는다
+  - 최근 7일 합계가 MIN_COUNT 미만이면 알림에서 제외 (1~2건짜리 잡음)
+
+본 DB 접수만 본다(보관 월은 검수완료가 끝난 옛 데이터라 최근 급증 탐지와 무관).
+
+    python doorlock_as_anomaly.py report doorlock_as.db --lookback 14
+"""
+import argparse
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BASELINE_DAYS = 28
+GUARD_DAYS = 7
+LOOKBACK_DAYS = 14
+EWMA_LAMBDA = 0.3
+Z_THRESHOLD = 3.0
+EWMA_THRESHOLD = 3.0
+MIN_SIGMA = 1.0
+MIN_COUNT = 3
+RECENT_DAYS = 7
+
+KEYS = ["model_code", "symptom_code"]
+
+# ==================== 일별 집계 ====================
+
+def daily_counts(conn: sqlite3.Connection, date_from: date, date_to: date,
+                 branch_id: Optional[int] = None) -> pd.DataFrame:
+    """[day, model_code, symptom_code, n] — (request_date, model_code, symptom_code, branch_id) 인덱스만 읽는다"""
+    where, params = "request_date >= ? AND request_date < ?", [str(date_from), str(date_to + timedelta(days=1))]
+    if branch_id is not None:
+        where += " AND branch_id = ?"
+        params.append(branch_id)
+    return pd.read_sql_query(f"""
+        SELECT DATE(request_date) AS day, COALESCE(model_code, '') AS model_code,
+               COALESCE(symptom_code, '') AS symptom_code, COUNT(*) AS n
+        FROM as_reception
+        WHERE {where}
+        GROUP BY day, model_code, symptom_code
+    """, conn, params=params)
+
+def to_matrix(daily: pd.DataFrame, date_from: date, date_to: date) -> Tuple[pd.DataFrame, pd.DatetimeIndex, np.ndarray]:
+    """(조합 키, 날짜, 건수 행렬[조합, 일]). 접수가 없는 날은 0"""
+    days = pd.date_range(date_from, date_to, freq="D")
+    if daily.empty:
+        return pd.DataFrame(columns=KEYS), days, np.zeros((0, len(days)))
+    # 조합 번호는 처음 나온 순서 (ngroup(sort=False) 와 drop_duplicates 순서가 같다)
+    codes = daily.groupby(KEYS, sort=False).ngroup().to_numpy()
+    keys = daily[KEYS].drop_duplicates(ignore_index=True)
+    col = (pd.to_datetime(daily["day"]).to_numpy() - days[0].to_datetime64()) // np.timedelta64(1, "D")
+    inside = (col >= 0) & (col < len(days))
+    counts = np.zeros((len(keys), len(days)))
+    np.add.at(counts, (codes[inside], col[inside]), daily["n"].to_numpy()[inside])
+    return keys, days, counts
+
+def window_start(as_of: date, lookback: int = LOOKBACK_DAYS) -> date:
+    """as_of 까지 lookback 일을 채점하는 데 필요한 첫날 (기준선 + 건너뛰는 구간 포함)"""
+    return as_of - timedelta(days=lookback + BASELINE_DAYS + GUARD_DAYS - 1)
+
+# ==================== 채점 ====================
+
+def _window_sum(cs: np.ndarray, end: np.ndarray, width: int) -> np.ndarray:
+    # cs[:, j] = 0..j-1 일 합계 → [end-width, end) 합계
+    return cs[:, end] - cs[:, end - width]
+
+def score(counts: np.ndarray, baseline: int = BASELINE_DAYS, guard: int = GUARD_DAYS,
+          lam: float = EWMA_LAMBDA) -> Dict[str, np.ndarray]:
+    """
+    모든 조합을 한 번에 채점. 반환 배열은 counts 와 같은 모양이고 기준선을 만들 만큼
+    지난 날이 없는 앞쪽 (baseline + guard) 일은 NaN
+    """
+    n_series, n_days = counts.shape
+    out = {k: np.full((n_series, n_days), np.nan) for k in ("mean", "sigma", "z", "ewma", "recent")}
+    if n_days <= baseline + guard:
+        return out
+    zero = np.zeros((n_series, 1))
+    cs = np.hstack([zero, counts.cumsum(axis=1)])
+    cs2 = np.hstack([zero, (counts ** 2).cumsum(axis=1)])
+    t = np.arange(baseline + guard, n_days)
+    mean = _window_sum(cs, t - guard, baseline) / baseline
+    var = np.maximum(_window_sum(cs2, t - guard, baseline) / baseline - mean ** 2, 0.0)
+    sigma = np.sqrt(np.maximum(np.maximum(var, mean), MIN_SIGMA ** 2))
+
+    # EWMA (adjust=False): e_t = λ·x_t + (1-λ)·e_{t-1}. 조합이 열이 되도록 전치해 pandas 한 번 호출
+    ewma = pd.DataFrame(counts.T).ewm(alpha=lam, adjust=False).mean().to_numpy().T
+    recent = _window_sum(cs, t + 1, min(RECENT_DAYS, baseline + guard + 1))
+
+    out["mean"][:, t], out["sigma"][:, t] = mean, sigma
+    out["z"][:, t] = (counts[:, t] - mean) / sigma
+    out["ewma"][:, t] = (ewma[:, t] - mean) / (sigma * np.sqrt(lam / (2 - lam)))
+    out["recent"][:, t] = recent
+    return out
+
+def detect(daily: pd.DataFrame, as_of: date, lookback: int = LOOKBACK_DAYS,
+           symptom_names: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    최근 lookback 일 안에 급증한 조합을 점수순으로.
+    daily 는 window_start(as_of, lookback) 부터 as_of 까지를 담고 있어야 한다
+    """
+    keys, days, counts = to_matrix(daily, window_start(as_of, lookback), as_of)
+    s = score(counts)
+    recent = slice(len(days) - lookback, len(days))
+    z, ew, n7 = s["z"][:, recent], s["ewma"][:, recent], s["recent"][:, recent]
+    stat = np.fmax(z, ew)
+    flagged = ((z >= Z_THRESHOLD) | (ew >= EWMA_THRESHOLD)) & (n7 >= MIN_COUNT)
+    stat = np.where(flagged, stat, -np.inf)
+    rows = np.flatnonzero(flagged.any(axis=1))
+    if not len(rows):
+        return pd.DataFrame(columns=["모델", "증상", "증상명", "최고일", "당일", "최근7일", "기준(일평균)",
+                                     "z", "EWMA", "점수", "구분"])
+    peak = stat[rows].argmax(axis=1)
+    col = recent.start + peak
+    out = pd.DataFrame({
+        "모델": keys["model_code"].to_numpy()[rows],
+        "증상": keys["symptom_code"].to_numpy()[rows],
+        "최고일": days[col].strftime("%Y-%m-%d"),
+        "당일": counts[rows, col].astype(int),
+        "최근7일": s["recent"][rows, col].astype(int),
+        "기준(일평균)": s["mean"][rows, col].round(2),
+        "z": z[rows, peak].round(1),
+        "EWMA": ew[rows, peak].round(1),
+    })
+    out["점수"] = out[["z", "EWMA"]].max(axis=1)
+    out["구분"] = np.where(out["z"] >= out["EWMA"], "하루 급증", "연속 증가")
+    out.insert(2, "증상명", out["증상"].map(symptom_names or {}).fillna(""))
+    return out.sort_values(["점수", "최근7일"], ascending=False, ignore_index=True)
+
+def alerts(conn: sqlite3.Connection, as_of: Optional[date] = None, lookback: int = LOOKBACK_DAYS,
+           branch_id: Optional[int] = None) -> pd.DataFrame:
+    """본 DB 에서 일별 집계 → detect. 증상명은 symptom_code 마스터에서"""
+    as_of = as_of or date.today()
+    names = dict(conn.execute("SELECT code, description FROM symptom_code").fetchall())
+    return detect(daily_counts(conn, window_start(as_of, lookback), as_of, branch_id), as_of, lookback, names)
+
+def series(daily: pd.DataFrame, model_code: str, symptom_code: str, date_from: date, date_to: date) -> pd.DataFrame:
+    """한 조합의 일별 건수 + 기준선 (차트용). index=날짜"""
+    one = daily[(daily["model_code"] == model_code) & (daily["symptom_code"] == symptom_code)]
+    _, days, counts = to_matrix(one, date_from, date_to)
+    if not len(counts):
+        counts = np.zeros((1, len(days)))
+    s = score(counts)
+    return pd.DataFrame({"건수": counts[0], "기준선": s["mean"][0],
+                         "기준+3σ": s["mean"][0] + Z_THRESHOLD * s["sigma"][0]}, index=days)
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="모델·증상별 접수 급증 탐지")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("report", help="최근 급증 알림 목록")
+    p.add_argument("db")
+    p.add_argument("--lookback", type=int, default=LOOKBACK_DAYS)
+    p.add_argument("--as-of", type=date.fromisoformat, default=None)
+    p.add_argument("--branch", type=int, default=None)
+    args = ap.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    out = alerts(conn, args.as_of, args.lookback, args.branch)
+    if out.empty:
+        print("급증 없음")
+    else:
+        print(out.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+# ==================== 완료 접수 월별 보관(아카이브) ====================
+"""
+검수완료 후 ARCHIVE_AFTER_DAYS 가 지난 접수를 요청월(request_date)별 보관 DB
+(ARCHIVE_DIR/as_YYYY_MM.db)로 옮긴다. 본 DB 에는 아직 손이 가는(hot) 행만 남는다.
+
+함께 옮기는 행: as_reception, as_result, as_material_usage·as_assignment(reception_id),
+audit_log(table_name 이 as_reception/as_result 이고 record_id 가 옮긴 행인 것)
+
+이관 순서 (배치 단위, 중간에 죽어도 다시 실행하면 이어서 끝난다)
+  1) archive_manifest 에 해당 월을 'copying' 으로 표시 (본 DB 커밋)
+  2) 보관 DB 로 INSERT OR REPLACE 복사 (보관 DB 커밋) — 이미 복사된 행은 덮어씀
+  3) 보관 DB 건수 검증
+  4) 본 DB 에서 삭제 + manifest/지점별 건수 갱신 (본 DB 한 트랜잭션)
+  5) 월 전체가 끝나면 'done'
+  WAL 에서는 ATTACH 한 DB 간 커밋이 원자적이지 않으므로 2)와 4)를 나눠 커밋한다.
+  2)~4) 사이에 죽으면 같은 행이 양쪽에 있으므로, 'copying' 월은 조회 시 본 DB 에
+  남아 있는 id 를 제외한다.
+
+조회: span() 이 날짜 범위에 걸리는 보관 월만 ATTACH 해 UNION ALL 소스를 만든다.
+범위가 보관 월에 걸리지 않으면 테이블 이름을 그대로 돌려준다(추가 비용 없음).
+
+    python doorlock_as_archive.py run    --db doorlock_as.db --older-than 365
+    python doorlock_as_archive.py status --db doorlock_as.db
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+DB_PATH = os.getenv("DOORLOCK_AS_DB", "doorlock_as.db")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+BATCH = 2000
+MAX_ATTACHED = 8  # SQLite 기본 ATTACH 한도(10) 안에서 여유를 둠
+
+ARCHIVED_TABLES = ("as_reception", "as_result", "as_material_usage", "as_assignment", "audit_log")
+DATE_COLUMNS = ("request_date", "complete_date")
+
+def archive_path(month: str, archive_dir: Optional[str] = None) -> str:
+    """'2024-03' → archive/as_2024_03.db"""
+    return os.path.join(archive_dir or ARCHIVE_DIR, f"as_{month.replace('-', '_')}.db")
+
+def _next_month(month: str) -> str:
+    y, m = int(month[:4]), int(month[5:7])
+    return f"{y + m // 12}-{m % 12 + 1:02d}"
+
+def _columns(conn: sqlite3.Connection, table: str, schema: str = "main") -> List[str]:
+    return [r[1] for r in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+# ==================== 보관 DB 스키마 ====================
+
+def _ensure_archive_schema(conn: sqlite3.Connection, schema: str):
+    """본 DB 테이블 정의를 보관 DB 에 복제하고, 이후 추가된 컬럼을 따라 붙인다"""
+    for table in ARCHIVED_TABLES:
+        cols = _columns(conn, table)
+        have = _columns(conn, table, schema)
+        if not have:
+            # 제약(FK 등) 없이 컬럼만 — 보관 DB 는 읽기 전용으로 쓰인다
+            decls = {r[1]: (r[2] or "") for r in conn.execute(f'PRAGMA main.table_info("{table}")')}
+            body = ", ".join(
+                f'"{c}" {decls[c]} PRIMARY KEY' if c == "id" else f'"{c}" {decls[c]}' for c in cols
+            )
+            conn.execute(f'CREATE TABLE {schema}."{table}" ({body})')
+        else:
+            for c in cols:
+                if c not in have:
+                    decl = next(r[2] for r in conn.execute(f'PRAGMA main.table_info("{table}")') if r[1] == c)
+                    conn.execute(f'ALTER TABLE {schema}."{table}" ADD COLUMN "{c}" {decl or ""}')
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_arc_reception_request ON as_reception(request_date)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_arc_reception_complete ON as_reception(complete_date)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_arc_result_reception ON as_result(reception_id)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_arc_usage_reception ON as_material_usage(reception_id)")
+    # 감사 로그 조회(doorlock_as_audit)와 같은 인덱스
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_audit_log_record ON audit_log(table_name, record_id)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_audit_log_user ON audit_log(user_id, created_at)")
+
+# ==================== 이관 ====================
+
+def candidate_months(conn: sqlite3.Connection, cutoff: str) -> List[str]:
+    """보관 대상이 남은 요청월 + 이관 도중 멈춘('copying') 월"""
+    rows = conn.execute("""
+        SELECT DISTINCT substr(request_date, 1, 7) FROM as_reception
+        WHERE status='검수완료' AND complete_date < ? AND request_date IS NOT NULL
+    """, (cutoff,)).fetchall()
+    months = {r[0] for r in rows}
+    months |= {r[0] for r in conn.execute("SELECT month FROM archive_manifest WHERE status='copying'")}
+    return sorted(months)
+
+def _archive_batch(conn: sqlite3.Connection, month: str, ids: Sequence[int]) -> int:
+    """한 배치 복사 → 검증 → 삭제. 삭제한 접수 건수 반환"""
+    conn.execute("DELETE FROM temp._arc_ids")
+    conn.executemany("INSERT INTO temp._arc_ids(id) VALUES (?)", [(i,) for i in ids])
+    conn.execute("DELETE FROM temp._arc_result_ids")
+    conn.execute("""
+        INSERT INTO temp._arc_result_ids(id)
+        SELECT id FROM main.as_result WHERE reception_id IN (SELECT id FROM temp._arc_ids)
+    """)
+    where = {
+        "as_reception": "id IN (SELECT id FROM temp._arc_ids)",
+        "as_result": "id IN (SELECT id FROM temp._arc_result_ids)",
+        "as_material_usage": "reception_id IN (SELECT id FROM temp._arc_ids)",
+        "as_assignment": "reception_id IN (SELECT id FROM temp._arc_ids)",
+        "audit_log": "(table_name='as_reception' AND record_id IN (SELECT id FROM temp._arc_ids))"
+                     " OR (table_name='as_result' AND record_id IN (SELECT id FROM temp._arc_result_ids))",
+    }
+
+    # 2) 복사 (보관 DB 커밋)
+    with conn:
+        expected = {}
+        for table in ARCHIVED_TABLES:
+            cols = ", ".join(f'"{c}"' for c in _columns(conn, table))
+            conn.execute(f"INSERT OR REPLACE INTO arc.{table} ({cols}) SELECT {cols} FROM main.{table} WHERE {where[table]}")
+            expected[table] = conn.execute(f"SELECT COUNT(*) FROM main.{table} WHERE {where[table]}").fetchone()[0]
+
+    # 3) 검증
+    for table in ARCHIVED_TABLES:
+        got = conn.execute(f"SELECT COUNT(*) FROM arc.{table} WHERE {where[table]}").fetchone()[0]
+        if got != expected[table]:
+            raise RuntimeError(f"{month} {table}: 보관 DB {got}건 ≠ 본 DB {expected[table]}건 — 삭제하지 않음")
+
+    # 4) 삭제 + manifest 갱신 (본 DB 한 트랜잭션)
+    with conn:
+        summary = conn.execute("""
+            SELECT COUNT(*), MIN(request_date), MAX(request_date), MIN(complete_date), MAX(complete_date)
+            FROM main.as_reception WHERE id IN (SELECT id FROM temp._arc_ids)
+        """).fetchone()
+        by_branch = conn.execute("""
+            SELECT branch_id, COUNT(*) FROM main.as_reception
+            WHERE id IN (SELECT id FROM temp._arc_ids) GROUP BY branch_id
+        """).fetchall()
+        for table in ("audit_log", "as_assignment", "as_material_usage", "as_result", "as_reception"):
+            conn.execute(f"DELETE FROM main.{table} WHERE {where[table]}")
+        conn.execute("""
+            UPDATE main.archive_manifest SET
+                rows = rows + ?,
+                min_request_date  = MIN(COALESCE(min_request_date, ?), ?),
+                max_request_date  = MAX(COALESCE(max_request_date, ?), ?),
+                min_complete_date = MIN(COALESCE(min_complete_date, ?), ?),
+                max_complete_date = MAX(COALESCE(max_complete_date, ?), ?),
+                archived_at = CURRENT_TIMESTAMP
+            WHERE month = ?
+        """, (summary[0], summary[1], summary[1], summary[2], summary[2],
+              summary[3], summary[3], summary[4], summary[4], month))
+        conn.executemany("""
+            INSERT INTO main.archive_branch_count (month, branch_id, rows) VALUES (?, ?, ?)
+            ON CONFLICT(month, branch_id) DO UPDATE SET rows = rows + excluded.rows
+        """, [(month, b, n) for b, n in by_branch])
+    return summary[0]
+
+def archive_month(conn: sqlite3.Connection, month: str, cutoff: str,
+                  archive_dir: Optional[str] = None, batch: int = BATCH) -> int:
+    """한 요청월의 보관 대상을 모두 옮긴다 (다시 실행해도 안전)"""
+    path = archive_path(month, archive_dir)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 1) copying 표시
+    with conn:
+        conn.execute("""
+            INSERT INTO archive_manifest (month, path, status) VALUES (?, ?, 'copying')
+            ON CONFLICT(month) DO UPDATE SET status='copying', path=excluded.path
+        """, (month, path))
+    conn.execute("ATTACH DATABASE ? AS arc", (path,))
+    try:
+        with conn:
+            _ensure_archive_schema(conn, "arc")
+        moved = 0
+        start, end = f"{month}-01", f"{_next_month(month)}-01"
+        while True:
+            ids = [r[0] for r in conn.execute("""
+                SELECT id FROM main.as_reception
+                WHERE request_date >= ? AND request_date < ?
+                  AND status='검수완료' AND complete_date < ?
+                ORDER BY id LIMIT ?
+            """, (start, end, cutoff, batch))]
+            if not ids:
+                break
+            moved += _archive_batch(conn, month, ids)
+        with conn:
+            conn.execute("UPDATE archive_manifest SET status='done' WHERE month=?", (month,))
+        return moved
+    finally:
+        conn.execute("DETACH DATABASE arc")
+
+def run_archive(db_path: Optional[str] = None, older_than_days: Optional[int] = None,
+                archive_dir: Optional[str] = None, batch: int = BATCH, verbose: bool = False) -> Dict[str, int]:
+    """보관 대상 전체 이관. {월: 옮긴 건수}"""
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = str(date.today() - timedelta(days=days))
+    conn = sqlite3.connect(db_path or DB_PATH, timeout=30)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _arc_ids (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _arc_result_ids (id INTEGER PRIMARY KEY)")
+    result = {}
+    try:
+        for month in candidate_months(conn, cutoff):
+            t0 = time.perf_counter()
+            result[month] = archive_month(conn, month, cutoff, archive_dir, batch)
+            if verbose:
+                print(f"  {month}  {result[month]:>8,}건  {time.perf_counter() - t0:6.2f}s  → {archive_path(month, archive_dir)}")
+    finally:
+        conn.close()
+    return result
+
+# ==================== 조회 ====================
+
+class ArchiveSource:
+    """span() 결과: 테이블별 FROM 소스와 포함/제외된 보관 월"""
+
+    def __init__(self, sources: Dict[str, str], months: List[str], skipped: List[str]):
+        self.sources = sources
+        self.months = months
+        self.skipped = skipped
+
+    def __getitem__(self, table: str) -> str:
+        return self.sources[table]
+
+class _Attached:
+    """연결 하나에 붙어 있는 보관 월 {month: schema} (LRU 순) 와 월별로 사용 중인 스레드 (span 1개당 1번)"""
+
+    __slots__ = ("schemas", "refs")
+
+    def __init__(self):
+        self.schemas: "OrderedDict[str, str]" = OrderedDict()
+        self.refs: Dict[str, List[int]] = {}
+
+    def busy(self, months) -> List[str]:
+        """months 밖에서 사용 중인 월"""
+        return [m for m, holders in self.refs.items() if holders and m not in months]
+
+# 잠금은 ATTACH/DETACH 와 참조 수 갱신에만 쓴다 (쿼리 실행 중에는 풀려 있음).
+# sqlite3.Connection 은 약한 참조를 지원하지 않으므로 연결 객체를 키로 두고, 닫힌 연결은 그때그때 정리한다.
+_attach_lock = threading.Condition(threading.RLock())
+_attached: Dict[sqlite3.Connection, _Attached] = {}
+
+def _is_open(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.total_changes
+    except sqlite3.ProgrammingError:
+        return False
+    return True
+
+def archived_months(conn: sqlite3.Connection, date_col: str = "request_date",
+                    date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[tuple]:
+    """날짜 범위와 겹치는 보관 월 [(month, path, status)]"""
+    if date_col not in DATE_COLUMNS:
+        raise ValueError(f"지원하지 않는 날짜 컬럼: {date_col}")
+    where, params = ["rows > 0"], []
+    if date_from:
+        where.append(f"max_{date_col} >= ?"); params.append(str(date_from))
+    if date_to:
+        # date_to 는 날짜(YYYY-MM-DD) 또는 그날 포함 — 시간값이 붙은 컬럼도 잡도록 다음날 미만으로 비교
+        where.append(f"min_{date_col} < ?"); params.append(str(date.fromisoformat(str(date_to)[:10]) + timedelta(days=1)))
+    return conn.execute(
+        f"SELECT month, path, status FROM archive_manifest WHERE {' AND '.join(where)} ORDER BY month DESC",
+        params,
+    ).fetchall()
+
+def _acquire(conn: sqlite3.Connection, needed: List[tuple]) -> Dict[str, str]:
+    """
+    필요한 월을 ATTACH 하고 참조 수를 올린다 (연결별 LRU, 한도를 넘으면 아무도 쓰지 않는 월부터 DETACH).
+    다른 span 이 쓰는 월 때문에 자리가 없으면 그 span 이 끝날 때까지 기다린다.
+    """
+    want = {m for m, _, _ in needed}
+    with _attach_lock:
+        for c in [c for c in _attached if c is not conn and not _is_open(c)]:
+            del _attached[c]
+        state = _attached.setdefault(conn, _Attached())
+        me = threading.get_ident()
+        while len(state.busy(want)) + len(want) > MAX_ATTACHED:
+            if all(set(state.refs[m]) == {me} for m in state.busy(want)):
+                raise RuntimeError(f"같은 스레드에서 겹쳐 연 span 이 보관 월 한도({MAX_ATTACHED})를 넘습니다.")
+            _attach_lock.wait()
+        for month, path, _ in needed:
+            if month not in state.schemas:
+                while len(state.schemas) >= MAX_ATTACHED:
+                    victim = next(m for m in state.schemas if not state.refs.get(m) and m not in want)
+                    conn.execute(f"DETACH DATABASE {state.schemas.pop(victim)}")
+                    state.refs.pop(victim, None)
+                schema = f"arc_{month.replace('-', '_')}"
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+                state.schemas[month] = schema
+            state.schemas.move_to_end(month)
+            state.refs.setdefault(month, []).append(me)
+        return {m: state.schemas[m] for m in want}
+
+def _release(conn: sqlite3.Connection, months: List[str]):
+    """참조 수만 내린다 (DETACH 는 자리가 필요할 때 _acquire 에서)"""
+    with _attach_lock:
+        state = _attached.get(conn)
+        if state:
+            for m in months:
+                state.refs[m].remove(threading.get_ident())
+        _attach_lock.notify_all()
+
+def _union(conn: sqlite3.Connection, table: str, schemas: List[tuple], include_main: bool = True) -> str:
+    """본 DB + 보관 월의 UNION ALL 서브쿼리 (컬럼은 본 DB 기준, 보관 DB 에 없으면 NULL)"""
+    cols = _columns(conn, table)
+    arms = [f"SELECT {', '.join(cols)} FROM main.{table}"] if include_main else []
+    for schema, status in schemas:
+        have = set(_columns(conn, table, schema))
+        select = ", ".join(c if c in have else f"NULL AS {c}" for c in cols)
+        arm = f"SELECT {select} FROM {schema}.{table}"
+        if status == "copying":
+            arm += f" WHERE id NOT IN (SELECT id FROM main.{table})"
+        arms.append(arm)
+    return "(" + " UNION ALL ".join(arms) + ")"
+
+def _source(conn: sqlite3.Connection, use: List[tuple], schemas: Dict[str, str], tables: Sequence[str],
+            skipped: List[str], include_main: bool = True) -> ArchiveSource:
+    arms = [(schemas[m], status) for m, _, status in use]
+    return ArchiveSource({t: _union(conn, t, arms, include_main) for t in tables}, [m for m, _, _ in use], skipped)
+
+@contextmanager
+def span(conn: sqlite3.Connection, date_col: str, date_from=None, date_to=None,
+         tables: Sequence[str] = ("as_reception",), limit: int = MAX_ATTACHED):
+    """
+    날짜 범위가 보관 월에 걸리면 그 월만 ATTACH 해 테이블별 UNION ALL 소스를 돌려준다.
+    with 블록 안에서 쿼리를 실행해야 한다(그동안 해당 월은 DETACH 되지 않음).
+    한 번에 limit 개월을 넘으면 최근 월부터 limit 개월만 포함하고 나머지는 skipped 에 담는다.
+    """
+    needed = archived_months(conn, date_col, date_from, date_to)
+    if not needed:
+        yield ArchiveSource({t: t for t in tables}, [], [])
+        return
+    limit = min(limit, MAX_ATTACHED)
+    use = needed[:limit]
+    schemas = _acquire(conn, use)
+    try:
+        yield _source(conn, use, schemas, tables, [m for m, _, _ in needed[limit:]])
+    finally:
+        _release(conn, list(schemas))
+
+def spans(conn: sqlite3.Connection, date_col: str, date_from=None, date_to=None,
+          tables: Sequence[str] = ("as_reception",), limit: int = MAX_ATTACHED):
+    """
+    집계용: 보관 월을 limit 개월씩 나눠 소스를 차례로 돌려준다 (첫 조각만 본 DB 포함).
+    조각별 결과를 합쳐 다시 집계하면 된다. 각 조각의 월은 다음 조각으로 넘어갈 때 놓는다.
+    """
+    needed = archived_months(conn, date_col, date_from, date_to)
+    if not needed:
+        yield ArchiveSource({t: t for t in tables}, [], [])
+        return
+    limit = min(limit, MAX_ATTACHED)
+    for i in range(0, len(needed), limit):
+        use = needed[i:i + limit]
+        schemas = _acquire(conn, use)
+        try:
+            yield _source(conn, use, schemas, tables, [], include_main=(i == 0))
+        finally:
+            _release(conn, list(schemas))
+
+def archived_counts(conn: sqlite3.Connection, branch_id: Optional[int] = None) -> int:
+    """보관된 접수 건수 (모두 검수완료)"""
+    if branch_id is None:
+        row = conn.execute("SELECT COALESCE(SUM(rows), 0) FROM archive_branch_count").fetchone()
+    else:
+        row = conn.execute("SELECT COALESCE(SUM(rows), 0) FROM archive_branch_count WHERE branch_id=?",
+                           (branch_id,)).fetchone()
+    return row[0]
+
+def is_hot(conn: sqlite3.Connection, ids: Sequence[int]) -> set:
+    """주어진 접수 id 중 본 DB 에 있는 것 (보관된 건은 수정 불가)"""
+    if not ids:
+        return set()
+    marks = ",".join("?" * len(ids))
+    return {r[0] for r in conn.execute(f"SELECT id FROM as_reception WHERE id IN ({marks})", list(ids))}
+
+# ==================== CLI ====================
+
+def cmd_run(args):
+    t0 = time.perf_counter()
+    moved = run_archive(args.db, args.older_than, args.archive_dir, args.batch, verbose=True)
+    print(f"✅ {len(moved)}개월, {sum(moved.values()):,}건 보관 ({time.perf_counter() - t0:.1f}s)")
+
+def cmd_status(args):
+    conn = sqlite3.connect(args.db)
+    rows = conn.execute("""
+        SELECT month, status, rows, min_complete_date, max_complete_date, path FROM archive_manifest ORDER BY month
+    """).fetchall()
+    hot = conn.execute("SELECT COUNT(*) FROM as_reception").fetchone()[0]
+    conn.close()
+    print(f"본 DB 접수 {hot:,}건, 보관 {sum(r[2] for r in rows):,}건 ({len(rows)}개월)")
+    for month, status, n, cmin, cmax, path in rows:
+        size = os.path.getsize(path) / 1e6 if os.path.exists(path) else 0.0
+        print(f"  {month}  {status:<8} {n:>8,}건  완료일 {cmin} ~ {cmax}  {size:7.1f}MB  {path}")
+
+def main():
+    ap = argparse.ArgumentParser(description="완료 접수 월별 보관")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="보관 대상 이관 (중단 후 다시 실행하면 이어서 진행)")
+    r.add_argument("--db", default=DB_PATH)
+    r.add_argument("--older-than", type=int, default=ARCHIVE_AFTER_DAYS, help="검수완료 후 경과 일수")
+    r.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    r.add_argument("--batch", type=int, default=BATCH)
+    r.set_defaults(func=cmd_run)
+    s = sub.add_parser("status", help="보관 현황")
+    s.add_argument("--db", default=DB_PATH)
+    s.set_defaults(func=cmd_status)
+    args = ap.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# ==================== 감사 로그 (인덱스 / 월별 파티션 / 보존 압축) ====================
+"""
+audit_log 는 본 DB 에 최근 AUDIT_HOT_DAYS 일치만 두고, 지난 달들은 작성월(created_at)별
+파티션 파일(ARCHIVE_DIR/audit_YYYY_MM.db)로 옮긴다. AUDIT_COMPACT_DAYS 가 지난 파티션은
+변경 전/후 값(old_value/new_value)을 BLOCK_ROWS 행씩 묶어 zlib 으로 압축한 파티션으로 다시 쓴다.
+압축 파티션도 (table_name, record_id), (user_id, created_at) 컬럼과 인덱스는 그대로라서
+조회 방식은 같고, 화면에 보여줄 행이 든 블록만 풀어서 돌려준다.
+
+  - audit_partition : 파티션 목록 (월, 경로, 상태 moving/open/compact, 건수, 크기)
+  - 이관 순서는 접수 보관(doorlock_as_archive)과 같다: 'moving' 표시 → 복사 → 건수 검증 → 본 DB 삭제 → 'open'
+  - 조회: 본 DB + 파티션 + 접수 보관 파일(as_YYYY_MM.db 의 audit_log)을 (created_at, id) 내림차순
+    키셋 페이지로 합친다. 사용자 활동은 작성월로 파티션을 걸러서 필요한 달만 연다.
+
+    python doorlock_as_audit.py retention --db doorlock_as.db
+    python doorlock_as_audit.py status    --db doorlock_as.db
+    python doorlock_as_audit.py history   --db doorlock_as.db --table as_reception --record 123
+"""
+import argparse
+import heapq
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DB_PATH = os.getenv("DOORLOCK_AS_DB", "doorlock_as.db")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+AUDIT_HOT_DAYS = int(os.getenv("AUDIT_HOT_DAYS", "90"))
+AUDIT_COMPACT_DAYS = int(os.getenv("AUDIT_COMPACT_DAYS", "365"))
+BATCH = 5000
+BLOCK_ROWS = 256  # 압축 블록 1개에 담는 행 수 (클수록 압축률↑, 조회 시 푸는 양↑)
+PAGE_SIZE = 50
+
+COLUMNS = ("id", "user_id", "action", "table_name", "record_id", "old_value", "new_value", "created_at")
+_KEYS = ("id", "user_id", "action", "table_name", "record_id", "created_at")  # 압축 파티션에서도 컬럼으로 남는 것
+
+Cursor = Tuple[str, int]  # (created_at, id) — 이 값보다 오래된 행부터
+
+def partition_path(month: str, archive_dir: Optional[str] = None) -> str:
+    """'2024-03' → archive/audit_2024_03.db"""
+    return os.path.join(archive_dir or ARCHIVE_DIR, f"audit_{month.replace('-', '_')}.db")
+
+def _next_month(month: str) -> str:
+    y, m = int(month[:4]), int(month[5:7])
+    return f"{y + m // 12}-{m % 12 + 1:02d}"
+
+def _index_sql(schema: str, table: str) -> List[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS {schema}.idx_{table}_record ON {table}(table_name, record_id)",
+        f"CREATE INDEX IF NOT EXISTS {schema}.idx_{table}_user ON {table}(user_id, created_at)",
+    ]
+
+# ==================== 파티션 이관 ====================
+
+def _move_month(conn: sqlite3.Connection, month: str, archive_dir: Optional[str], batch: int) -> int:
+    path = partition_path(month, archive_dir)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with conn:
+        conn.execute("""
+            INSERT INTO audit_partition (month, path, status) VALUES (?, ?, 'moving')
+            ON CONFLICT(month) DO UPDATE SET status = 'moving'
+        """, (month, path))
+    cols = ", ".join(COLUMNS)
+    where = "created_at >= ? AND created_at < ?"
+    bounds = (f"{month}-01", f"{_next_month(month)}-01")
+    conn.execute("ATTACH DATABASE ? AS part", (path,))
+    try:
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS part.audit_log ({', '.join(f'{c} INTEGER PRIMARY KEY' if c == 'id' else c for c in COLUMNS)})")
+            for sql in _index_sql("part", "audit_log"):
+                conn.execute(sql)
+        moved = 0
+        while True:
+            ids = [r[0] for r in conn.execute(
+                f"SELECT id FROM main.audit_log WHERE {where} ORDER BY id LIMIT ?", (*bounds, batch))]
+            if not ids:
+                break
+            lo, hi = ids[0], ids[-1]
+            scope = f"{where} AND id BETWEEN ? AND ?"
+            params = (*bounds, lo, hi)
+            with conn:
+                conn.execute(f"INSERT OR REPLACE INTO part.audit_log ({cols}) SELECT {cols} FROM main.audit_log WHERE {scope}", params)
+            expected = conn.execute(f"SELECT COUNT(*) FROM main.audit_log WHERE {scope}", params).fetchone()[0]
+            got = conn.execute(f"SELECT COUNT(*) FROM part.audit_log WHERE {scope}", params).fetchone()[0]
+            if got != expected:
+                raise RuntimeError(f"{month} audit_log: 파티션 {got}건 ≠ 본 DB {expected}건 — 삭제하지 않음")
+            with conn:
+                conn.execute(f"DELETE FROM main.audit_log WHERE {scope}", params)
+            moved += expected
+        with conn:
+            rows = conn.execute("SELECT COUNT(*) FROM part.audit_log").fetchone()[0]
+            conn.execute("UPDATE audit_partition SET status = 'open', rows = ?, moved_at = CURRENT_TIMESTAMP WHERE month = ?",
+                         (rows, month))
+        return moved
+    finally:
+        conn.execute("DETACH DATABASE part")
+
+def _pack(values: List[Tuple[Optional[str], Optional[str]]]) -> bytes:
+    return zlib.compress(json.dumps(values, ensure_ascii=False).encode("utf-8"), 9)
+
+def _unpack(data: bytes) -> List[List[Optional[str]]]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+def compact_partition(conn: sqlite3.Connection, month: str) -> int:
+    """open 파티션 → 압축 파티션 (임시 파일에 쓴 뒤 교체). 교체 후 파일 크기 반환"""
+    path = conn.execute("SELECT path FROM audit_partition WHERE month = ?", (month,)).fetchone()[0]
+    tmp = path + ".compact"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    with closing(sqlite3.connect(path)) as src, closing(sqlite3.connect(tmp)) as dst:
+        dst.executescript(f"""
+            PRAGMA journal_mode = OFF;
+            CREATE TABLE audit_z (id INTEGER PRIMARY KEY, user_id, action, table_name, record_id, created_at,
+                                  block INTEGER NOT NULL, pos INTEGER NOT NULL);
+            CREATE TABLE audit_block (id INTEGER PRIMARY KEY, data BLOB NOT NULL);
+            {";".join(s.replace("main.", "") for s in _index_sql("main", "audit_z"))};
+        """)
+        cur = src.execute(f"SELECT {', '.join(_KEYS)}, old_value, new_value FROM audit_log ORDER BY id")
+        block = 0
+        while True:
+            rows = cur.fetchmany(BLOCK_ROWS)
+            if not rows:
+                break
+            block += 1
+            dst.executemany("INSERT INTO audit_z VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(*r[:6], block, pos) for pos, r in enumerate(rows)])
+            dst.execute("INSERT INTO audit_block VALUES (?, ?)", (block, _pack([r[6:8] for r in rows])))
+        dst.commit()
+        expected = src.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        got = dst.execute("SELECT COUNT(*) FROM audit_z").fetchone()[0]
+        if got != expected:
+            raise RuntimeError(f"{month} 압축: {got}건 ≠ {expected}건 — 교체하지 않음")
+        dst.execute("VACUUM")
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.replace(tmp, path)
+    size = os.path.getsize(path)
+    with conn:
+        conn.execute("UPDATE audit_partition SET status = 'compact', bytes = ?, compacted_at = CURRENT_TIMESTAMP "
+                     "WHERE month = ?", (size, month))
+    return size
+
+def run_retention(db_path: Optional[str] = None, hot_days: Optional[int] = None,
+                  compact_days: Optional[int] = None, archive_dir: Optional[str] = None,
+                  batch: int = BATCH, verbose: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    보존 작업: 1) hot_days 이전의 지난 달들을 파티션으로 이관 2) compact_days 지난 파티션 압축
+    3) 접수 보관 파일의 audit_log 에 조회 인덱스 보장. {'moved': {월: 건수}, 'compacted': {월: 바이트}}
+    """
+    today = date.today()
+    hot_cutoff = str(today - timedelta(days=AUDIT_HOT_DAYS if hot_days is None else hot_days))[:7]
+    compact_cutoff = str(today - timedelta(days=AUDIT_COMPACT_DAYS if compact_days is None else compact_days))[:7]
+    conn = sqlite3.connect(db_path or DB_PATH, timeout=30)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    result: Dict[str, Dict[str, int]] = {"moved": {}, "compacted": {}}
+    try:
+        # 달 단위로만 옮김: 기준일이 속한 달은 본 DB 에 남김
+        months = [r[0] for r in conn.execute(
+            "SELECT DISTINCT substr(created_at, 1, 7) FROM audit_log WHERE created_at < ?", (f"{hot_cutoff}-01",))]
+        months += [r[0] for r in conn.execute("SELECT month FROM audit_partition WHERE status = 'moving'")]
+        for month in sorted(set(months)):
+            t0 = time.perf_counter()
+            result["moved"][month] = _move_month(conn, month, archive_dir, batch)
+            if verbose:
+                print(f"  이관 {month} {result['moved'][month]:>9,}건  {time.perf_counter() - t0:6.2f}s")
+        for (month,) in conn.execute(
+                "SELECT month FROM audit_partition WHERE status = 'open' AND month < ? ORDER BY month",
+                (compact_cutoff,)).fetchall():
+            t0 = time.perf_counter()
+            result["compacted"][month] = compact_partition(conn, month)
+            if verbose:
+                print(f"  압축 {month} {result['compacted'][month] / 1e6:8.1f}MB  {time.perf_counter() - t0:6.2f}s")
+        for (path,) in conn.execute("SELECT path FROM archive_manifest WHERE rows > 0").fetchall():
+            if os.path.exists(path):
+                with closing(sqlite3.connect(path)) as arc:
+                    if arc.execute("SELECT 1 FROM sqlite_master WHERE name = 'audit_log'").fetchone():
+                        for sql in _index_sql("main", "audit_log"):
+                            arc.execute(sql)
+                        arc.commit()
+    finally:
+        conn.close()
+    return result
+
+# ==================== 조회 ====================
+
+def _sources(conn: sqlite3.Connection, month_from: Optional[str] = None,
+             month_to: Optional[str] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """[(경로, 테이블, 작성월)] — 작성월 범위로 파티션을 거른다 (접수 보관 파일은 월 기준이 달라 항상 포함)"""
+    where, params = ["status IN ('open', 'compact')"], []
+    if month_from:
+        where.append("month >= ?"); params.append(month_from)
+    if month_to:
+        where.append("month <= ?"); params.append(month_to)
+    parts = conn.execute(
+        f"SELECT path, status, month FROM audit_partition WHERE {' AND '.join(where)} ORDER BY month DESC", params
+    ).fetchall()
+    out = [(path, "audit_z" if status == "compact" else "audit_log", month) for path, status, month in parts]
+    archived = conn.execute("SELECT path FROM archive_manifest WHERE rows > 0 ORDER BY month DESC").fetchall()
+    out += [(path, "audit_log", None) for (path,) in archived]
+    return [s for s in out if os.path.exists(s[0])]
+
+def _select(table: str) -> str:
+    # 압축 파티션은 (블록, 위치) → 값은 _with_values 에서 블록 단위로 푼다
+    if table == "audit_z":
+        return f"SELECT {', '.join(_KEYS)}, block, pos FROM audit_z"
+    return f"SELECT {', '.join(_KEYS)}, old_value, new_value FROM {table}"
+
+def _rows(conn: sqlite3.Connection, table: str, where: str, params: Sequence[Any], before: Optional[Cursor],
+          limit: int) -> List[tuple]:
+    clauses, args = [where], list(params)
+    if before:
+        clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+        args += [before[0], before[0], before[1]]
+    return conn.execute(
+        f"{_select(table)} WHERE {' AND '.join(clauses)} ORDER BY created_at DESC, id DESC LIMIT ?", [*args, limit]
+    ).fetchall()
+
+def _as_dict(row: tuple) -> Dict[str, Any]:
+    return {**dict(zip(_KEYS, row[:6])), "old_value": row[6], "new_value": row[7]}
+
+def _with_values(conn: sqlite3.Connection, rows: List[tuple]) -> List[tuple]:
+    """압축 파티션 행의 (block, pos) 를 (old_value, new_value) 로 — 필요한 블록만 1번씩 푼다"""
+    blocks = sorted({r[6] for r in rows})
+    if not blocks:
+        return rows
+    marks = ",".join("?" * len(blocks))
+    data = {b: _unpack(d) for b, d in conn.execute(f"SELECT id, data FROM audit_block WHERE id IN ({marks})", blocks)}
+    return [(*r[:6], *data[r[6]][r[7]]) for r in rows]
+
+def _newest(rows: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    return heapq.nlargest(limit, rows, key=lambda r: (r["created_at"] or "", r["id"]))
+
+def _page(conn: sqlite3.Connection, where: str, params: Sequence[Any], sources: List[tuple],
+          before: Optional[Cursor], limit: int) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+    """본 DB + 소스별로 limit 건씩 읽어 (created_at, id) 내림차순으로 합침. (행, 다음 커서)"""
+    found = [_as_dict(r) for r in _rows(conn, "audit_log", where, params, before, limit)]
+    for path, table, month in sources:
+        if month and len(found) >= limit and month < str(_newest(found, limit)[-1]["created_at"])[:7]:
+            continue  # 이 파티션의 행은 모두 이미 찾은 limit 건보다 오래됨
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as part:
+            rows = _rows(part, table, where, params, before, limit)
+            found += [_as_dict(r) for r in (_with_values(part, rows) if table == "audit_z" else rows)]
+    page = _newest(found, limit)
+    cursor = (page[-1]["created_at"], page[-1]["id"]) if len(page) == limit else None
+    return page, cursor
+
+def history(conn: sqlite3.Connection, table_name: str, record_id: int, before: Optional[Cursor] = None,
+            limit: int = PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+    """레코드 1건의 변경 이력 (최신순) — (table_name, record_id) 인덱스"""
+    return _page(conn, "table_name = ? AND record_id = ?", (table_name, int(record_id)),
+                 _sources(conn), before, limit)
+
+def activity(conn: sqlite3.Connection, user_id: int, date_from: Optional[str] = None, date_to: Optional[str] = None,
+             before: Optional[Cursor] = None, limit: int = PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+    """사용자 활동 (최신순) — (user_id, created_at) 인덱스, 기간 밖 파티션은 열지 않음"""
+    where, params = ["user_id = ?"], [int(user_id)]
+    if date_from:
+        where.append("created_at >= ?"); params.append(str(date_from))
+    if date_to:
+        where.append("created_at < ?"); params.append(str(date.fromisoformat(str(date_to)) + timedelta(days=1)))
+    month_to = str(before[0])[:7] if before else (str(date_to)[:7] if date_to else None)
+    sources = _sources(conn, str(date_from)[:7] if date_from else None, month_to)
+    return _page(conn, " AND ".join(where), params, sources, before, limit)
+
+def partitions(conn: sqlite3.Connection) -> List[tuple]:
+    return conn.execute("""
+        SELECT month, status, rows, bytes, moved_at, compacted_at, path FROM audit_partition ORDER BY month
+    """).fetchall()
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="감사 로그 파티션/보존")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("retention", help="지난 달 파티션 이관 + 오래된 파티션 압축")
+    r.add_argument("--db", default=DB_PATH)
+    r.add_argument("--hot-days", type=int, default=AUDIT_HOT_DAYS)
+    r.add_argument("--compact-days", type=int, default=AUDIT_COMPACT_DAYS)
+    r.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    s = sub.add_parser("status", help="파티션 현황")
+    s.add_argument("--db", default=DB_PATH)
+    h = sub.add_parser("history", help="레코드 변경 이력")
+    h.add_argument("--db", default=DB_PATH)
+    h.add_argument("--table", default="as_reception")
+    h.add_argument("--record", type=int, required=True)
+    h.add_argument("--limit", type=int, default=PAGE_SIZE)
+    args = ap.parse_args()
+
+    from doorlock_as_schema import migrate
+    if args.cmd == "retention":
+        with closing(sqlite3.connect(args.db)) as conn:
+            migrate(conn)
+        t0 = time.perf_counter()
+        result = run_retention(args.db, args.hot_days, args.compact_days, args.archive_dir, verbose=True)
+        print(f"✅ 이관 {sum(result['moved'].values()):,}건 ({len(result['moved'])}개월), "
+              f"압축 {len(result['compacted'])}개월 ({time.perf_counter() - t0:.1f}s)")
+        return
+    with closing(sqlite3.connect(args.db)) as conn:
+        migrate(conn)
+        if args.cmd == "status":
+            hot = conn.execute("SELECT COUNT(*), MIN(created_at) FROM audit_log").fetchone()
+            print(f"본 DB {hot[0]:,}건 (가장 오래된 {hot[1]})")
+            for month, status, rows, size, _, _, path in partitions(conn):
+                size = os.path.getsize(path) if os.path.exists(path) else size or 0
+                print(f"  {month}  {status:<8} {rows or 0:>9,}건  {size / 1e6:7.1f}MB  {path}")
+        else:
+            t0 = time.perf_counter()
+            rows, _ = history(conn, args.table, args.record, limit=args.limit)
+            for r in rows:
+                print(f"{r['created_at']}  {r['action']:<12} user={r['user_id']}  {r['old_value']} → {r['new_value']}")
+            print(f"— {len(rows)}건, {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    main()
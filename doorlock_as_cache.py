@@ -0,0 +1,117 @@
+# ==================== 레플리카 간 캐시 일관성 ====================
+"""
+같은 DB 를 쓰는 Streamlit 프로세스(레플리카)가 여럿일 때 프로세스별 메모리 캐시(마스터 데이터, 통계)를 맞춘다.
+
+- cache_version: 테이블별 버전. 감시 대상 테이블(doorlock_as_schema.CACHE_TABLES)의 INSERT/UPDATE/DELETE
+  트리거가 +1 → 화면·CLI·예약 작업 어디서 쓰든 빠짐없이 반영된다
+- VersionedCache: 전용 커넥션으로 PRAGMA data_version 을 확인. 마지막 확인 뒤 커밋이 없으면 여기서 끝나고,
+  있으면 cache_version(수십 바이트)을 읽어 버전이 오른 테이블에 걸린 항목만 버린다
+- 자기 프로세스의 쓰기도 같은 경로로 감지된다 (공용 커넥션과 다른 커넥션이라 data_version 이 바뀜)
+
+항목은 읽기 전용으로 다룬다 (꺼낸 값을 고치면 다른 세션에도 보인다).
+
+    python doorlock_as_cache.py status --db doorlock_as.db
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Sequence, Tuple
+
+DB_PATH = os.getenv("DOORLOCK_AS_DB", "doorlock_as.db")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+
+def versions(conn: sqlite3.Connection) -> Dict[str, int]:
+    return dict(conn.execute("SELECT table_name, version FROM cache_version"))
+
+class VersionedCache:
+    """{키: (의존 테이블, 값)} + 테이블 버전. 확인은 get 마다 (PRAGMA 1회)"""
+
+    def __init__(self, db_path: str, max_entries: int = CACHE_MAX_ENTRIES):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.max_entries = max_entries
+        self.entries: Dict[Hashable, Tuple[Tuple[str, ...], Any]] = {}
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0, "polls": 0}
+        self._lock = threading.Lock()
+        self._data_version = None
+        self.versions = versions(self.conn)
+        self.conn.commit()  # 읽기 트랜잭션을 남기지 않음 (WAL 스냅숏 고정 방지)
+
+    def poll(self) -> set:
+        """다른 커넥션의 커밋이 있었으면 버전이 바뀐 테이블을 찾아 해당 항목 제거. 바뀐 테이블 반환"""
+        with self._lock:
+            data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return set()
+            self._data_version = data_version
+            self.stats["polls"] += 1
+            current = versions(self.conn)
+            self.conn.commit()
+            changed = {t for t, v in current.items() if self.versions.get(t) != v}
+            self.versions = current
+            if changed:
+                stale = [k for k, (tables, _) in self.entries.items() if changed.intersection(tables)]
+                for k in stale:
+                    del self.entries[k]
+                self.stats["evicted"] += len(stale)
+            return changed
+
+    def get(self, key: Hashable, tables: Sequence[str], load: Callable[[], Any]) -> Any:
+        """캐시된 값, 없거나 의존 테이블이 바뀌었으면 load() 결과를 저장해 반환"""
+        self.poll()
+        with self._lock:
+            hit = self.entries.get(key)
+            if hit is not None:
+                self.stats["hits"] += 1
+                return hit[1]
+            before = self._data_version
+        # load 는 잠금 밖에서 (느린 쿼리가 다른 세션의 조회를 막지 않게)
+        value = load()
+        with self._lock:
+            self.stats["misses"] += 1
+            # load 중에 다른 항목 때문에 확인이 돌았으면 이 값이 이미 낡았을 수 있음 → 다음 get 에서 다시 읽음
+            if before == self._data_version:
+                if len(self.entries) >= self.max_entries:
+                    self.entries.pop(next(iter(self.entries)))
+                self.entries[key] = (tuple(tables), value)
+        return value
+
+    def invalidate(self, *tables: str):
+        """테이블에 걸린 항목을 즉시 제거 (트리거가 없는 테이블이나 테스트용)"""
+        with self._lock:
+            for k in [k for k, (ts, _) in self.entries.items() if set(tables).intersection(ts)]:
+                del self.entries[k]
+
+    def close(self):
+        self.conn.close()
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="테이블별 캐시 버전 조회/감시")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("status", help="테이블별 버전")
+    p.add_argument("--db", default=DB_PATH)
+    p = sub.add_parser("watch", help="버전이 바뀔 때마다 출력")
+    p.add_argument("--db", default=DB_PATH)
+    p.add_argument("--interval", type=float, default=0.5)
+    args = ap.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    if args.cmd == "status":
+        for table, version in sorted(versions(conn).items()):
+            print(f"{table:<16} {version:>10,}")
+        return
+    cache = VersionedCache(args.db)
+    try:
+        while True:
+            changed = cache.poll()
+            if changed:
+                print(time.strftime("%H:%M:%S"), ", ".join(f"{t}={cache.versions[t]}" for t in sorted(changed)))
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# ==================== 기사 배정 / 작업 큐 ====================
+"""
+미배정 접수(status='접수')를 지점 소속 기사에게 배정하는 배정안을 만들고 확정한다.
+
+배정안 (지점별, O(n log n))
+  1) 접수일이 오래된 순으로 지점 전체 수용량(기사 수 × 1일 한도 - 이미 배정된 건)만큼 고른다
+  2) 고른 건을 시·군·구 단위 묶음으로 나누고 큰 묶음부터
+     가장 덜 바쁜 기사(힙)에게 남은 한도만큼 통째로 준다 → 한 기사가 같은 동네를 돈다
+  3) 기사별로 (시·군·구, 주소) 순으로 방문 순서(seq)를 매기고 앞 절반은 오전, 나머지는 오후
+한도를 넘는 건과 기사가 없는 지점의 건은 사유와 함께 미배정으로 남긴다.
+
+as_assignment 는 (technician_id, status, scheduled_date, slot, seq) 인덱스로 기사별 작업 큐를 바로 읽는다.
+접수 1건에 진행 중('배정') 배정은 하나뿐이다(부분 UNIQUE 인덱스).
+
+    python doorlock_as_dispatch.py propose --db doorlock_as.db --date 2024-05-02 --per-tech 8
+    python doorlock_as_dispatch.py apply   --db doorlock_as.db --date 2024-05-02
+"""
+import argparse
+import heapq
+import sqlite3
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+PER_TECH = 8   # 기사 1인 1일 기본 한도
+SLOTS = ("오전", "오후")
+
+@dataclass
+class Job:
+    reception_id: int
+    branch_id: Optional[int]
+    request_date: str
+    sido: str
+    sigungu: str
+    address: str
+
+@dataclass
+class Technician:
+    id: int
+    name: str
+    branch_id: Optional[int]
+    load: int = 0  # 해당 일자에 이미 배정된 건수
+
+@dataclass
+class Plan:
+    """배정안: {technician_id: [(Job, slot, seq)]}, 미배정 [(Job, 사유)]"""
+    date: str
+    assigned: Dict[int, List[tuple]] = field(default_factory=dict)
+    unassigned: List[tuple] = field(default_factory=list)
+    technicians: Dict[int, Technician] = field(default_factory=dict)
+
+    @property
+    def count(self) -> int:
+        return sum(len(v) for v in self.assigned.values())
+
+# ==================== 조회 ====================
+
+def open_jobs(conn: sqlite3.Connection, branch_id: Optional[int] = None) -> List[Job]:
+    """진행 중 배정이 없는 '접수' 상태 건"""
+    where, params = ["ar.status = '접수'"], []
+    if branch_id is not None:
+        where.append("ar.branch_id = ?"); params.append(branch_id)
+    rows = conn.execute(f"""
+        SELECT ar.id, ar.branch_id, ar.request_date, COALESCE(ar.sido, ''), COALESCE(ar.sigungu, ''),
+               COALESCE(ar.address, '')
+        FROM as_reception ar
+        WHERE {' AND '.join(where)}
+          AND NOT EXISTS (SELECT 1 FROM as_assignment a WHERE a.reception_id = ar.id AND a.status = '배정')
+    """, params).fetchall()
+    return [Job(*r) for r in rows]
+
+def technicians(conn: sqlite3.Connection, scheduled_date: str, branch_id: Optional[int] = None) -> List[Technician]:
+    """활성 기사 + 해당 일자 기존 배정 건수"""
+    where, params = ["u.role = '기사'", "u.is_active = 1"], [str(scheduled_date)]
+    if branch_id is not None:
+        where.append("u.branch_id = ?"); params.append(branch_id)
+    rows = conn.execute(f"""
+        SELECT u.id, u.name, u.branch_id,
+               (SELECT COUNT(*) FROM as_assignment a
+                WHERE a.technician_id = u.id AND a.status = '배정' AND a.scheduled_date = ?)
+        FROM users u
+        WHERE {' AND '.join(where)}
+        ORDER BY u.id
+    """, params).fetchall()
+    return [Technician(*r) for r in rows]
+
+# ==================== 배정안 ====================
+
+def propose(jobs: Sequence[Job], techs: Sequence[Technician], scheduled_date: str,
+            per_tech: int = PER_TECH) -> Plan:
+    """지점별로 오래된 건 우선 + 시·군·구 묶음 단위로 가장 덜 바쁜 기사에게 배정"""
+    plan = Plan(str(scheduled_date), technicians={t.id: t for t in techs})
+    techs_by_branch: Dict[Optional[int], List[Technician]] = defaultdict(list)
+    for t in techs:
+        techs_by_branch[t.branch_id].append(t)
+    jobs_by_branch: Dict[Optional[int], List[Job]] = defaultdict(list)
+    for j in jobs:
+        jobs_by_branch[j.branch_id].append(j)
+
+    for branch, branch_jobs in jobs_by_branch.items():
+        staff = techs_by_branch.get(branch, [])
+        if not staff:
+            plan.unassigned.extend((j, "지점 소속 기사 없음") for j in branch_jobs)
+            continue
+        branch_jobs.sort(key=lambda j: (j.request_date or "", j.reception_id))
+        capacity = sum(max(0, per_tech - t.load) for t in staff)
+        plan.unassigned.extend((j, "일일 한도 초과") for j in branch_jobs[capacity:])
+
+        clusters: Dict[tuple, List[Job]] = defaultdict(list)
+        for j in branch_jobs[:capacity]:
+            clusters[(j.sido, j.sigungu)].append(j)
+        heap = [(t.load, t.id) for t in staff if t.load < per_tech]
+        heapq.heapify(heap)
+        picked: Dict[int, List[Job]] = defaultdict(list)
+        for key in sorted(clusters, key=lambda k: (-len(clusters[k]), k)):
+            rest = clusters[key]
+            while rest:
+                load, tech_id = heapq.heappop(heap)
+                take = min(per_tech - load, len(rest))
+                picked[tech_id].extend(rest[:take])
+                rest = rest[take:]
+                if load + take < per_tech:
+                    heapq.heappush(heap, (load + take, tech_id))
+
+        for tech_id, items in picked.items():
+            items.sort(key=lambda j: (j.sido, j.sigungu, j.address, j.reception_id))
+            base = plan.technicians[tech_id].load
+            half = (per_tech + 1) // 2
+            plan.assigned[tech_id] = [
+                (j, SLOTS[0] if base + i < half else SLOTS[1], base + i + 1) for i, j in enumerate(items)
+            ]
+    return plan
+
+def apply(conn: sqlite3.Connection, plan: Plan, user_id: Optional[int] = None) -> int:
+    """배정 확정 (한 트랜잭션). 그 사이 다른 사람이 배정한 접수는 건너뜀. 배정 건수 반환"""
+    rows = [
+        (j.reception_id, tech_id, plan.technicians[tech_id].name, plan.date, slot, seq, user_id)
+        for tech_id, items in plan.assigned.items() for j, slot, seq in items
+    ]
+    inserted = []
+    with conn:
+        for r in rows:
+            cur = conn.execute("""
+                INSERT OR IGNORE INTO as_assignment
+                (reception_id, technician_id, technician_name, scheduled_date, slot, seq, assigned_by)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, r)
+            if cur.rowcount:
+                inserted.append(r)
+        conn.executemany(
+            "INSERT INTO audit_log (user_id, action, table_name, record_id, old_value, new_value) VALUES (?, ?, ?, ?, ?, ?)",
+            [(user_id, 'ASSIGN', 'as_reception', r[0], '', f"{r[2]} {r[3]} {r[4]}") for r in inserted],
+        )
+    return len(inserted)
+
+def cancel(conn: sqlite3.Connection, assignment_ids: Sequence[int]) -> int:
+    """배정 취소 → 해당 접수는 다시 미배정"""
+    if not assignment_ids:
+        return 0
+    marks = ",".join("?" * len(assignment_ids))
+    with conn:
+        cur = conn.execute(
+            f"UPDATE as_assignment SET status='취소', updated_at=CURRENT_TIMESTAMP WHERE id IN ({marks}) AND status='배정'",
+            list(assignment_ids),
+        )
+    return cur.rowcount
+
+def complete(conn: sqlite3.Connection, reception_id: int):
+    """결과 등록 시 진행 중 배정 완료 처리 (커밋은 호출 측)"""
+    conn.execute(
+        "UPDATE as_assignment SET status='완료', updated_at=CURRENT_TIMESTAMP WHERE reception_id=? AND status='배정'",
+        (reception_id,),
+    )
+
+def close_finished(conn: sqlite3.Connection, reception_ids: Sequence[int]) -> int:
+    """
+    완료/검수완료가 된 접수의 진행 중 배정을 '완료'로 (일괄 상태 변경·수정 팝업, 커밋은 호출 측).
+    상태를 바꾼 같은 트랜잭션 안에서 부른다. 닫은 배정 수 반환
+    """
+    ids = [int(i) for i in reception_ids]
+    closed = 0
+    for i in range(0, len(ids), 900):
+        chunk = ids[i:i + 900]
+        closed += conn.execute(f"""
+            UPDATE as_assignment SET status='완료', updated_at=CURRENT_TIMESTAMP
+            WHERE status='배정' AND reception_id IN (
+                SELECT id FROM as_reception WHERE id IN ({','.join('?' * len(chunk))}) AND status IN ('완료', '검수완료'))
+        """, chunk).rowcount
+    return closed
+
+def technician_queue(conn: sqlite3.Connection, technician_id: int, date_from: Optional[str] = None) -> List[dict]:
+    """기사 작업 큐 (예정일·오전/오후·방문 순서). idx_as_assignment_queue 범위 검색"""
+    cur = conn.execute("""
+        SELECT a.id AS assignment_id, a.scheduled_date, a.slot, a.seq,
+               ar.reception_number, ar.customer_name, ar.phone, ar.address, ar.model_code,
+               ar.symptom_description, ar.payment_type, ar.request_date, ar.status
+        FROM as_assignment a
+        JOIN as_reception ar ON ar.id = a.reception_id
+        WHERE a.technician_id = ? AND a.status = '배정' AND a.scheduled_date >= ?
+        ORDER BY a.scheduled_date, a.slot, a.seq
+    """, (technician_id, str(date_from or "0000-00-00")))
+    cols = [c[0] for c in cur.description]
+    return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="기사 배정")
+    ap.add_argument("cmd", choices=["propose", "apply"])
+    ap.add_argument("--db", default="doorlock_as.db")
+    ap.add_argument("--date", required=True)
+    ap.add_argument("--branch", type=int)
+    ap.add_argument("--per-tech", type=int, default=PER_TECH)
+    args = ap.parse_args()
+
+    from doorlock_as_schema import migrate
+    conn = sqlite3.connect(args.db)
+    migrate(conn)
+    t0 = time.perf_counter()
+    jobs = open_jobs(conn, args.branch)
+    techs = technicians(conn, args.date, args.branch)
+    plan = propose(jobs, techs, args.date, args.per_tech)
+    elapsed = time.perf_counter() - t0
+    print(f"미배정 {len(jobs):,}건, 기사 {len(techs)}명 → 배정 {plan.count:,}건 / 남음 {len(plan.unassigned):,}건 ({elapsed:.2f}s)")
+    for tech_id, items in sorted(plan.assigned.items()):
+        areas = sorted({f"{j.sido} {j.sigungu}".strip() for j, _, _ in items})
+        print(f"  {plan.technicians[tech_id].name:<8} {len(items):>3}건  {', '.join(areas)}")
+    if args.cmd == "apply":
+        print(f"✅ {apply(conn, plan):,}건 배정")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
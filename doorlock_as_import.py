@@ -0,0 +1,392 @@
+# ==================== 접수 일괄 등록 (주문 채널 엑셀/CSV) ====================
+"""
+온라인몰 주문 내보내기(xlsx/csv)를 한 번에 접수로 등록한다.
+
+- 읽기: xlsx 는 openpyxl read-only 로 행을 흘려 읽고, csv 는 pandas chunksize 로 CHUNK 행씩 (파일 전체를 올리지 않음)
+- 검증: 묶음 단위 벡터 연산 — 필수값, 모델/증상/지점 코드(마스터), 전화번호, 날짜, 유무상 구분,
+  주소 → 시/도·시·군·구(같은 주소는 한 번만 해석), 주문번호 중복(파일 안 + 이미 등록된 접수)
+- 등록: 묶음마다 트랜잭션 1개(BEGIN IMMEDIATE) 안에서 접수번호 블록 할당 → executemany → 감사 로그 INSERT ... SELECT
+- 오류 행은 건너뛰고 (행, 필드, 값, 오류) 보고서로 반환. 지점별 등록 건수는 SMS 1건으로 요약 알림
+
+    python doorlock_as_import.py run orders.xlsx --db doorlock_as.db --branch B001 --errors errors.csv
+    python doorlock_as_import.py template 접수_일괄등록_양식.xlsx --db doorlock_as.db
+"""
+import argparse
+import codecs
+import io
+import os
+import sqlite3
+import time
+from datetime import date
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+import doorlock_as_notify as notify
+from doorlock_as_regions import parse_region
+
+DB_PATH = os.getenv("DOORLOCK_AS_DB", "doorlock_as.db")
+CHUNK = 5000
+PAYMENT_TYPES = ("무상", "유상", "유무상현장확인", "출장비유상/부품비무상")
+DEFAULT_PAYMENT = "무상"
+
+# (필드, 양식 헤더, 다른 표기, 필수) — 채널마다 헤더 이름이 달라 별칭으로 맞춘다
+FIELDS = [
+    ("order_number", "주문번호", ("주문 번호", "order_no"), False),
+    ("customer_name", "고객명", ("수취인", "수령인", "주문자", "고객"), True),
+    ("phone", "전화번호", ("연락처", "휴대폰", "휴대전화", "수취인연락처"), True),
+    ("address", "주소", ("배송지", "수취인주소", "배송지주소"), True),
+    ("address_detail", "상세주소", ("배송지상세",), False),
+    ("model_code", "모델코드", ("모델", "제품모델", "상품코드"), True),
+    ("symptom_code", "증상코드", ("증상",), True),
+    ("detail_content", "상세내용", ("요청사항", "배송메모", "메모"), False),
+    ("request_date", "요청일", ("주문일", "접수일"), False),
+    ("install_date", "설치일", ("설치일자",), False),
+    ("payment_type", "유무상", ("유무상구분",), False),
+    ("branch_code", "지점코드", ("지점",), False),
+]
+LABELS = {f: header for f, header, _, _ in FIELDS}
+_ALIASES = {a.replace(" ", "").lower(): f for f, header, others, _ in FIELDS for a in (header, *others)}
+
+INSERT_COLUMNS = ("order_number", "reception_number", "customer_name", "phone", "phone_norm", "address", "address_detail",
+                  "sido", "sigungu", "model_code", "symptom_category", "symptom_code", "symptom_description",
+                  "detail_content", "branch_id", "branch_name", "registrant_id", "registrant_name", "request_date",
+                  "install_date", "status", "payment_type")
+
+# ==================== 읽기 ====================
+
+def _text(v: Any) -> str:
+    # 엑셀 셀 → 문자열 (숫자로 저장된 코드/전화번호의 '.0' 제거)
+    if v is None:
+        return ""
+    if isinstance(v, float):
+        return "" if v != v else (str(int(v)) if v.is_integer() else str(v))
+    if hasattr(v, "strftime"):
+        return v.strftime("%Y-%m-%d")
+    return str(v).strip()
+
+def _map_header(header: List[Any]) -> Dict[int, str]:
+    """열 번호 → 필드. 필수 필드 헤더가 없으면 ValueError (파일 전체 오류)"""
+    mapping = {}
+    for i, h in enumerate(header):
+        f = _ALIASES.get(_text(h).replace(" ", "").lower())
+        if f and f not in mapping.values():
+            mapping[i] = f
+    missing = [LABELS[f] for f, _, _, required in FIELDS if required and f not in mapping.values()]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+    return mapping
+
+def _frame(rows: List[tuple], mapping: Dict[int, str], first_row: int) -> pd.DataFrame:
+    df = pd.DataFrame({f: [_text(r[i]) if i < len(r) else "" for r in rows] for i, f in mapping.items()})
+    for f, _, _, _ in FIELDS:
+        if f not in df:
+            df[f] = ""
+    df["_row"] = range(first_row, first_row + len(rows))
+    return df
+
+def _xlsx_chunks(source: BinaryIO, chunk: int) -> Iterator[Tuple[pd.DataFrame, Optional[int]]]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        total = (ws.max_row - 1) if ws.max_row else None
+        rows = ws.iter_rows(values_only=True)
+        mapping = _map_header(list(next(rows, ())))
+        buf, first = [], 2
+        for r in rows:
+            if not any(v is not None and v != "" for v in r):
+                first += not buf  # 앞쪽 빈 행은 번호만 넘김
+                continue
+            buf.append(r)
+            if len(buf) == chunk:
+                yield _frame(buf, mapping, first), total
+                first += len(buf)
+                buf = []
+        if buf:
+            yield _frame(buf, mapping, first), total
+    finally:
+        wb.close()
+
+def _detect_encoding(head: bytes) -> str:
+    # 엑셀에서 저장한 한글 CSV 는 cp949 인 경우가 많다
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp949"
+
+def _csv_chunks(source: BinaryIO, chunk: int) -> Iterator[Tuple[pd.DataFrame, Optional[int]]]:
+    head = source.read(64 * 1024)
+    source.seek(0)
+    reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk,
+                         encoding=_detect_encoding(head), skipinitialspace=True)
+    mapping, first = None, 2
+    for part in reader:
+        if mapping is None:
+            mapping = _map_header(list(part.columns))
+        yield _frame(list(part.itertuples(index=False, name=None)), mapping, first), None
+        first += len(part)
+
+def read_chunks(source: BinaryIO, filename: str, chunk: int = CHUNK) -> Iterator[Tuple[pd.DataFrame, Optional[int]]]:
+    """(묶음 DataFrame(필드 + _row), 전체 행 수 또는 None) — xlsx/csv"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return _xlsx_chunks(source, chunk)
+    if ext in (".csv", ".txt"):
+        return _csv_chunks(source, chunk)
+    raise ValueError(f"지원하지 않는 파일 형식: {ext} (xlsx/csv)")
+
+# ==================== 검증 ====================
+
+def load_master(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """검증용 마스터 (모델, 증상 → (대분류, 설명), 지점 코드 → (id, 이름))"""
+    return {
+        "models": {r[0] for r in conn.execute("SELECT model_code FROM product_model")},
+        "symptoms": {code: (cat, desc) for cat, code, desc in conn.execute(
+            "SELECT category, code, description FROM symptom_code")},
+        "branches": {code: (bid, name) for bid, code, name in conn.execute(
+            "SELECT id, branch_code, branch_name FROM branch")},
+        "branch_names": dict(conn.execute("SELECT id, branch_name FROM branch")),
+    }
+
+def _phone_digits(s: pd.Series) -> pd.Series:
+    """normalize_phone 의 벡터판 + 엑셀 숫자 셀에서 빠진 맨 앞 0 복원. 해석 불가는 ''"""
+    plus82 = s.str.lstrip().str.startswith("+")
+    d = s.str.replace(r"\D", "", regex=True)
+    d = d.where(~(plus82 & d.str.startswith("82")), "0" + d.str[2:])
+    d = d.where(~(d.str.startswith("1") & d.str.len().isin([9, 10])), "0" + d)  # 1012345678 → 01012345678
+    return d.where(d.str.len().between(8, 12), "")
+
+def _dates(s: pd.Series) -> pd.Series:
+    """'YYYY-MM-DD' 문자열 (빈 값 ''), 해석 불가는 NaN"""
+    parsed = pd.to_datetime(s, format="%Y-%m-%d", errors="coerce")
+    rest = parsed.isna() & s.ne("")
+    if rest.any():  # 2024.09.10 / 20240910 / 2024/9/10 등
+        parsed[rest] = pd.to_datetime(s[rest].str.replace(r"[./]", "-", regex=True), format="mixed", errors="coerce")
+    out = parsed.dt.strftime("%Y-%m-%d")
+    return out.where(s.ne(""), "")
+
+def validate(df: pd.DataFrame, master: Dict[str, Any], branch_id: Optional[int] = None,
+             known_orders: Optional[set] = None, seen_orders: Optional[set] = None,
+             today: Optional[date] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (등록할 행 — INSERT_COLUMNS 중 접수번호/등록자 외 채움, 오류 보고서(행, 필드, 값, 오류)).
+    known_orders: 이미 등록된 주문번호, seen_orders: 같은 파일 앞 묶음의 주문번호
+    """
+    today = today or date.today()
+    errors: List[pd.DataFrame] = []
+    bad = pd.Series(False, index=df.index)
+
+    def flag(mask: pd.Series, field: str, message: str):
+        nonlocal bad
+        if mask.any():
+            errors.append(pd.DataFrame({"행": df.loc[mask, "_row"], "필드": LABELS.get(field, field),
+                                        "값": df.loc[mask, field] if field in df else "", "오류": message}))
+            bad |= mask
+
+    for f, _, _, required in FIELDS:
+        if required:
+            flag(df[f].eq(""), f, "필수 값 없음")
+
+    out = pd.DataFrame(index=df.index)
+    for f in ("order_number", "customer_name", "address", "address_detail", "model_code", "symptom_code", "detail_content"):
+        out[f] = df[f]
+
+    flag(df["model_code"].ne("") & ~df["model_code"].isin(master["models"]), "model_code", "등록되지 않은 모델")
+    sym = df["symptom_code"].map(master["symptoms"])
+    flag(df["symptom_code"].ne("") & sym.isna(), "symptom_code", "등록되지 않은 증상 코드")
+    out["symptom_category"] = sym.str[0]
+    out["symptom_description"] = sym.str[1]
+
+    digits = _phone_digits(df["phone"])
+    flag(df["phone"].ne("") & digits.eq(""), "phone", "전화번호 형식 오류")
+    # 엑셀 숫자 셀(맨 앞 0 빠짐)은 복원한 번호로 저장
+    out["phone"] = df["phone"].where(~df["phone"].str.fullmatch(r"\d+"), digits)
+    out["phone_norm"] = digits
+
+    # 같은 주소는 한 번만 해석
+    regions = {a: parse_region(a) for a in df["address"].unique()}
+    parsed = df["address"].map(regions)
+    out["sido"], out["sigungu"] = parsed.str[0], parsed.str[1]
+    flag(df["address"].ne("") & out["sigungu"].isna(), "address", "시/도·시·군·구를 알 수 없는 주소")
+
+    for f in ("request_date", "install_date"):
+        out[f] = _dates(df[f])
+        flag(out[f].isna(), f, "날짜 형식 오류")
+    out["request_date"] = out["request_date"].mask(out["request_date"].eq(""), str(today))
+    out["install_date"] = out["install_date"].mask(out["install_date"].eq(""), None)
+
+    out["payment_type"] = df["payment_type"].mask(df["payment_type"].eq(""), DEFAULT_PAYMENT)
+    flag(~out["payment_type"].isin(PAYMENT_TYPES), "payment_type", f"유무상 구분은 {'/'.join(PAYMENT_TYPES)}")
+
+    if branch_id is not None:
+        out["branch_id"] = branch_id
+        out["branch_name"] = master["branch_names"].get(branch_id, "")
+    else:
+        br = df["branch_code"].map(master["branches"])
+        flag(br.isna(), "branch_code", "지점코드 없음/미등록")
+        out["branch_id"], out["branch_name"] = br.str[0], br.str[1]
+
+    orders = df["order_number"]
+    has_order = orders.ne("")
+    dup = orders.duplicated(keep="first") | (orders.isin(seen_orders) if seen_orders else False)
+    flag(has_order & dup, "order_number", "파일 안에서 중복된 주문번호")
+    if known_orders:
+        flag(has_order & ~dup & orders.isin(known_orders), "order_number", "이미 등록된 주문번호")
+
+    report = pd.concat(errors, ignore_index=True) if errors else pd.DataFrame(columns=["행", "필드", "값", "오류"])
+    valid = out[~bad].copy()
+    valid["branch_id"] = valid["branch_id"].astype(int)
+    return valid, report
+
+def registered_orders(conn: sqlite3.Connection, orders: pd.Series) -> set:
+    """이미 접수된 주문번호 (idx_as_reception_order)"""
+    values = [o for o in orders.unique() if o]
+    if not values:
+        return set()
+    return {r[0] for r in conn.execute(
+        "SELECT order_number FROM as_reception WHERE order_number IN (SELECT value FROM json_each(?))",
+        (pd.Series(values).to_json(orient="values", force_ascii=False),))}
+
+# ==================== 등록 ====================
+
+def _allocate(conn: sqlite3.Connection, day: date, n: int) -> List[str]:
+    """오늘 날짜 접수번호 n 개를 한 번에 (트랜잭션 안에서 호출 — 쓰기 잠금이 있어 다른 등록과 겹치지 않음)"""
+    prefix = day.strftime("%Y%m%d")
+    last = conn.execute("""
+        SELECT MAX(CAST(substr(reception_number, 10, length(reception_number) - 10) AS INTEGER))
+        FROM as_reception WHERE reception_number >= ? AND reception_number < ?
+    """, (f"{prefix}(", f"{prefix})")).fetchone()[0] or 0
+    return [f"{prefix}({i})" for i in range(last + 1, last + n + 1)]
+
+def _insert(conn: sqlite3.Connection, valid: pd.DataFrame, user: Dict[str, Any], filename: str,
+            today: date) -> Tuple[List[str], Dict[int, int]]:
+    """묶음 1개 등록 (트랜잭션 1개). (접수번호 목록, 지점별 건수)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        numbers = _allocate(conn, today, len(valid))
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM as_reception").fetchone()[0]
+        rows = valid.assign(reception_number=numbers, registrant_id=user["id"], registrant_name=user["name"],
+                            status="접수")
+        rows = rows[list(INSERT_COLUMNS)].astype(object).where(rows[list(INSERT_COLUMNS)].notna(), None)
+        conn.executemany(f"INSERT INTO as_reception ({', '.join(INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(INSERT_COLUMNS))})",
+                         rows.itertuples(index=False, name=None))
+        # 건별 감사 로그 (레코드 이력 조회용) — 방금 넣은 id 범위를 그대로 읽어서
+        conn.execute("""
+            INSERT INTO audit_log (user_id, action, table_name, record_id, old_value, new_value)
+            SELECT ?, 'IMPORT', 'as_reception', id, '', reception_number || ' (' || ? || ')'
+            FROM as_reception WHERE id > ?
+        """, (user["id"], filename, last_id))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return numbers, valid["branch_id"].astype(int).value_counts().to_dict()
+
+def run(conn: sqlite3.Connection, source: BinaryIO, filename: str, user: Dict[str, Any],
+        branch_id: Optional[int] = None, dry_run: bool = False, chunk: int = CHUNK,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+    """
+    파일 전체 처리. branch_id 를 주면 모든 행을 그 지점으로(지점 사용자), 아니면 행의 지점코드로.
+    {'rows', 'inserted', 'errors': DataFrame, 'first', 'last', 'by_branch', 'seconds'}
+    """
+    t0 = time.perf_counter()
+    today = date.today()
+    master = load_master(conn)
+    seen_orders: set = set()
+    errors, numbers, by_branch, total_rows = [], [], {}, 0
+    for df, total in read_chunks(source, filename, chunk):
+        known = registered_orders(conn, df["order_number"])
+        valid, report = validate(df, master, branch_id, known, seen_orders, today)
+        seen_orders.update(o for o in df["order_number"] if o)
+        errors.append(report)
+        if not dry_run and not valid.empty:
+            got, counts = _insert(conn, valid, user, os.path.basename(filename), today)
+            numbers += got
+            for b, n in counts.items():
+                by_branch[b] = by_branch.get(b, 0) + n
+        total_rows += len(df)
+        if progress:
+            progress(total_rows, total)
+
+    if by_branch:
+        phones = dict(conn.execute("SELECT id, phone FROM branch"))
+        for b, n in by_branch.items():
+            if phones.get(b):
+                notify.enqueue(conn, phones[b], f"[AS접수] 일괄 등록 {n:,}건 ({os.path.basename(filename)})")
+    report = pd.concat(errors, ignore_index=True) if errors else pd.DataFrame(columns=["행", "필드", "값", "오류"])
+    return {
+        "rows": total_rows,
+        "inserted": len(numbers),
+        "valid": total_rows - report["행"].nunique() if total_rows else 0,
+        "errors": report.sort_values("행", kind="stable").reset_index(drop=True),
+        "first": numbers[0] if numbers else None,
+        "last": numbers[-1] if numbers else None,
+        "by_branch": by_branch,
+        "seconds": time.perf_counter() - t0,
+    }
+
+def template(conn: Optional[sqlite3.Connection] = None) -> bytes:
+    """양식 xlsx (헤더 + 예시 1행). conn 을 주면 예시 코드를 실제 마스터에서"""
+    example = {"주문번호": "ORD-0001", "고객명": "홍길동", "전화번호": "010-1234-5678",
+               "주소": "서울특별시 강남구 테헤란로 152", "상세주소": "10층", "모델코드": "DL-100", "증상코드": "S001",
+               "상세내용": "", "요청일": str(date.today()), "설치일": "", "유무상": DEFAULT_PAYMENT, "지점코드": "B001"}
+    if conn is not None:
+        for header, sql in (("모델코드", "SELECT model_code FROM product_model ORDER BY model_code LIMIT 1"),
+                            ("증상코드", "SELECT code FROM symptom_code ORDER BY code LIMIT 1"),
+                            ("지점코드", "SELECT branch_code FROM branch ORDER BY id LIMIT 1")):
+            row = conn.execute(sql).fetchone()
+            if row and row[0]:
+                example[header] = row[0]
+    buf = io.BytesIO()
+    pd.DataFrame([example], columns=[header for _, header, _, _ in FIELDS]).to_excel(buf, index=False)
+    return buf.getvalue()
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="주문 채널 엑셀/CSV → 접수 일괄 등록")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("run", help="파일 등록 (오류 행은 건너뛰고 보고서로)")
+    p.add_argument("path")
+    p.add_argument("--db", default=DB_PATH)
+    p.add_argument("--branch", help="모든 행을 이 지점코드로 (없으면 파일의 지점코드 열)")
+    p.add_argument("--user", default="admin", help="등록자 아이디")
+    p.add_argument("--dry-run", action="store_true", help="검증만")
+    p.add_argument("--errors", help="오류 보고서 CSV 경로")
+    p = sub.add_parser("template", help="양식 xlsx 저장")
+    p.add_argument("out")
+    p.add_argument("--db", default=DB_PATH)
+    args = ap.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    if args.cmd == "template":
+        with open(args.out, "wb") as f:
+            f.write(template(conn))
+        print(f"✅ {args.out}")
+        return
+
+    user = conn.execute("SELECT id, name FROM users WHERE username=?", (args.user,)).fetchone()
+    if not user:
+        raise SystemExit(f"❌ 사용자 없음: {args.user}")
+    branch_id = None
+    if args.branch:
+        row = conn.execute("SELECT id FROM branch WHERE branch_code=?", (args.branch,)).fetchone()
+        if not row:
+            raise SystemExit(f"❌ 지점코드 없음: {args.branch}")
+        branch_id = row[0]
+    with open(args.path, "rb") as f:
+        result = run(conn, f, args.path, {"id": user[0], "name": user[1]}, branch_id, args.dry_run,
+                     progress=lambda done, total: print(f"\r  {done:,}{f' / {total:,}' if total else ''}행", end=""))
+    print()
+    print(f"{'검증' if args.dry_run else '등록'} {result['valid' if args.dry_run else 'inserted']:,} / {result['rows']:,}행"
+          f"  오류 {result['errors']['행'].nunique():,}행  {result['seconds']:.1f}s"
+          + (f"  접수번호 {result['first']} ~ {result['last']}" if result["first"] else ""))
+    if args.errors and not result["errors"].empty:
+        result["errors"].to_csv(args.errors, index=False, encoding="utf-8-sig")
+        print(f"📝 오류 보고서: {args.errors}")
+
+if __name__ == "__main__":
+    main()
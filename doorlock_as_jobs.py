@@ -0,0 +1,385 @@
+# ==================== 예약 작업 스케줄러 ====================
+"""
+Streamlit rerun 과 무관하게 서버 프로세스 안에서 주기 작업(월 마감, 통계 재계산, uploads 정리 등)을 돌린다.
+
+- job_schedule: 작업별 cron·다음 실행 시각·임대(lease)·최근 결과 (영속)
+- job_run: 실행 이력 (작업별 최근 JOB_RUN_KEEP 건만 유지)
+- Scheduler: 폴링 스레드 + 워커 스레드 풀. 실행할 작업은 UPDATE ... RETURNING 한 번으로 임대해서
+  같은 DB 를 쓰는 여러 서버(레플리카) 중 하나만 실행한다. 실행 중에는 폴링마다 임대를 연장하고,
+  프로세스가 죽으면 임대가 끝난 뒤 다른 서버가 가져간다
+- 놓친 실행은 몰아서 하지 않는다: 끝나면 '지금' 이후의 다음 cron 시각으로 넘어간다
+
+cron 은 5필드(분 시 일 월 요일, 요일 0=일요일)이며 *, 목록(1,15), 범위(1-5), 간격(*/10, 0-30/5)을 지원한다.
+
+    python doorlock_as_jobs.py status --db doorlock_as.db
+    python doorlock_as_jobs.py run month_close --db doorlock_as.db
+"""
+import argparse
+import glob
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+DB_PATH = os.getenv("DOORLOCK_AS_DB", "doorlock_as.db")
+POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "15"))
+LEASE_SECONDS = float(os.getenv("JOBS_LEASE_SECONDS", "300"))
+JOB_RUN_KEEP = 200
+UPLOADS_DIR = os.getenv("UPLOADS_DIR", "uploads")
+
+# ==================== cron ====================
+
+_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6))
+
+def _parse_field(expr: str, lo: int, hi: int) -> frozenset:
+    out = set()
+    for part in expr.split(","):
+        rng, _, step = part.partition("/")
+        if rng == "*":
+            a, b = lo, hi
+        elif "-" in rng:
+            a, b = map(int, rng.split("-"))
+        else:
+            a = b = int(rng)
+            if step:
+                b = hi
+        if not (lo <= a <= b <= hi or (hi == 6 and b == 7)):
+            raise ValueError(f"cron 범위 오류: {part}")
+        out.update(range(a, b + 1, int(step) if step else 1))
+    return frozenset(v % 7 if hi == 6 else v for v in out)
+
+class Cron:
+    """5필드 cron. next_after(t) 는 t 이후(초과) 첫 실행 시각(분 단위)"""
+
+    __slots__ = ("expr", "minute", "hour", "day", "month", "weekday", "any_day", "any_weekday")
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 은 5필드여야 합니다: {expr!r}")
+        self.expr = expr
+        for (name, lo, hi), part in zip(_FIELDS, parts):
+            setattr(self, name, _parse_field(part, lo, hi))
+        self.any_day, self.any_weekday = parts[2] == "*", parts[4] == "*"
+
+    def _day_ok(self, t: datetime) -> bool:
+        # 일·요일이 둘 다 지정되면 어느 한쪽만 맞아도 실행 (표준 cron)
+        dom, dow = t.day in self.day, (t.weekday() + 1) % 7 in self.weekday
+        if self.any_day or self.any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, t: datetime) -> datetime:
+        t = t.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.month:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_ok(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hour:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minute:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"실행 시각이 없는 cron: {self.expr!r}")
+
+# ==================== 작업 등록 ====================
+
+@dataclass
+class Job:
+    name: str
+    cron: Cron
+    fn: Callable[[str], Any]   # fn(db_path) → 결과 요약(선택)
+    description: str = ""
+
+def _month_close(db_path: str):
+    # 지난달 지점별 정산서·VOC 요약 미리 생성 (화면에서 받을 때는 캐시에서 바로)
+    import doorlock_as_reports as reports
+
+    last_month = (date.today().replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        result = reports.build(conn, last_month)
+    finally:
+        conn.close()
+    return {"month": last_month, "files": result["files"], "rendered": result["rendered"], "failed": len(result["failed"])}
+
+def _sla_rebuild(db_path: str):
+    # 누락 보정 + 히스토그램 전체 재계산 (증분 갱신이 어긋나도 하루 안에 맞춰짐)
+    import doorlock_as_sla as sla
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        filled = sla.backfill(conn)
+        with conn:
+            sla.rebuild_histogram(conn)
+    finally:
+        conn.close()
+    return {"backfilled": filled}
+
+def _audit_retention(db_path: str):
+    import doorlock_as_audit as audit
+
+    return {k: len(v) for k, v in audit.run_retention(db_path).items()}
+
+def _archive(db_path: str):
+    import doorlock_as_archive as archive
+
+    return archive.run_archive(db_path)
+
+def _uploads_cleanup(db_path: str, min_age_days: int = 1):
+    # 원본이 없어진 미리보기/썸네일, 중단된 쓰기의 임시 파일만 지운다 (원본 첨부는 건드리지 않음)
+    import doorlock_as_media as media
+
+    cutoff = time.time() - min_age_days * 86400
+    derived = os.path.join(UPLOADS_DIR, media.DERIVED_DIR_NAME)
+    removed = 0
+    for path in glob.glob(os.path.join(derived, "*")) + glob.glob(os.path.join(UPLOADS_DIR, "*.tmp")):
+        if os.path.getmtime(path) > cutoff:
+            continue
+        original = os.path.join(UPLOADS_DIR, os.path.basename(path).rsplit(".", 2)[0])
+        if path.endswith(".tmp") or not os.path.exists(original):
+            os.remove(path)
+            removed += 1
+    return {"removed": removed}
+
+def _db_optimize(db_path: str):
+    # 통계(sqlite_stat1) 갱신 + WAL 체크포인트
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA optimize")
+        busy, log, done = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    finally:
+        conn.close()
+    return {"wal_busy": busy, "checkpointed": done}
+
+def default_jobs() -> Dict[str, Job]:
+    """기본 작업 (cron 은 JOB_CRON_<이름> 환경변수로 바꿀 수 있다)"""
+    spec = [
+        ("month_close", "0 2 1 * *", _month_close, "월 마감: 지난달 지점별 정산서·VOC 요약 생성"),
+        ("sla_rebuild", "0 4 * * *", _sla_rebuild, "처리 기간(SLA) 히스토그램 재계산"),
+        ("audit_retention", "10 3 * * *", _audit_retention, "감사 로그 월 파티션 이관·압축"),
+        ("archive", "30 3 * * 0", _archive, "오래된 검수완료 접수 월별 보관"),
+        ("uploads_cleanup", "0 5 * * *", _uploads_cleanup, "uploads/ 고아 미리보기·임시 파일 정리"),
+        ("db_optimize", "45 4 * * *", _db_optimize, "SQLite 통계 갱신 + WAL 체크포인트"),
+    ]
+    return {name: Job(name, Cron(os.getenv(f"JOB_CRON_{name.upper()}", cron)), fn, desc)
+            for name, cron, fn, desc in spec}
+
+# ==================== 스케줄러 ====================
+
+class Scheduler:
+    """job_schedule 폴링 → 임대 → 워커 풀에서 실행 → 결과 기록 (서버 프로세스당 1개)"""
+
+    def __init__(self, db_path: str, jobs: Dict[str, Job], workers: int = 2,
+                 poll_interval: float = POLL_INTERVAL, lease_seconds: float = LEASE_SECONDS,
+                 owner: Optional[str] = None):
+        self.db_path = db_path
+        self.jobs = jobs
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-worker")
+        self._running: Dict[str, float] = {}  # 이름 → 임대 만료 시각
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def start(self):
+        if self._thread is None:
+            self.sync()
+            self._thread = threading.Thread(target=self._loop, name="job-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.pool.shutdown(wait=wait)
+
+    def sync(self, now: Optional[float] = None):
+        """등록된 작업을 job_schedule 에 반영. 새 작업이거나 cron 이 바뀌었으면 다음 실행 시각을 다시 계산"""
+        now = time.time() if now is None else now
+        rows = [(j.name, j.cron.expr, j.cron.next_after(datetime.fromtimestamp(now)).timestamp(), j.description)
+                for j in self.jobs.values()]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO job_schedule (name, cron, next_run_at, description) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        next_run_at = CASE WHEN cron <> excluded.cron THEN excluded.next_run_at ELSE next_run_at END,
+                        cron = excluded.cron, description = excluded.description
+                """, rows)
+        finally:
+            conn.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.renew()
+                self.run_once()
+            except sqlite3.OperationalError as e:  # DB 잠김 등 → 다음 주기에 재시도
+                print(f"⚠️ 작업 스케줄러 오류: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _claim(self, now: float) -> List[str]:
+        """실행 시각이 된(또는 임대가 끝난) 내 작업을 임대. 다른 서버가 임대 중인 작업은 가져오지 않는다"""
+        names = [n for n in self.jobs if n not in self._running]
+        if not names:
+            return []
+        conn = self._connect()
+        try:
+            with conn:
+                rows = conn.execute(f"""
+                    UPDATE job_schedule
+                    SET lease_owner=?, lease_until=?, last_started_at=?
+                    WHERE name IN ({','.join('?' * len(names))}) AND enabled = 1 AND next_run_at <= ?
+                      AND (lease_until IS NULL OR lease_until < ?)
+                    RETURNING name
+                """, (self.owner, now + self.lease_seconds, now, *names, now, now)).fetchall()
+        finally:
+            conn.close()
+        return [r[0] for r in rows]
+
+    def run_once(self, now: Optional[float] = None) -> List[str]:
+        """1회 임대 + 워커에 제출. 제출한 작업 이름 반환"""
+        now = time.time() if now is None else now
+        with self._lock:
+            claimed = self._claim(now)
+            for name in claimed:
+                self._running[name] = now + self.lease_seconds
+        for name in claimed:
+            self.pool.submit(self._run, name, now)
+        return claimed
+
+    def renew(self):
+        """실행 중인 작업의 임대 연장 (내가 아직 임대 중인 것만)"""
+        with self._lock:
+            running = list(self._running)
+        if not running:
+            return
+        until = time.time() + self.lease_seconds
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("UPDATE job_schedule SET lease_until=? WHERE name=? AND lease_owner=?",
+                                 [(until, n, self.owner) for n in running])
+        finally:
+            conn.close()
+
+    def _run(self, name: str, started: float):
+        job = self.jobs[name]
+        status, error, result = "ok", None, None
+        t0 = time.perf_counter()
+        try:
+            result = job.fn(self.db_path)
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}"
+        duration_ms = (time.perf_counter() - t0) * 1000
+        finished = time.time()
+        next_run = job.cron.next_after(datetime.fromtimestamp(finished)).timestamp()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    UPDATE job_schedule
+                    SET next_run_at=?, lease_owner=NULL, lease_until=NULL, last_finished_at=?, last_status=?,
+                        last_error=?, last_duration_ms=?, runs=runs+1,
+                        failures=failures+?, consecutive_failures=CASE WHEN ? THEN consecutive_failures+1 ELSE 0 END
+                    WHERE name=? AND lease_owner=?
+                """, (next_run, finished, status, error, duration_ms, int(error is not None), error is not None,
+                      name, self.owner))
+                conn.execute("""
+                    INSERT INTO job_run (name, owner, started_at, finished_at, duration_ms, status, error, result)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (name, self.owner, started, finished, duration_ms, status, error,
+                      None if result is None else json.dumps(result, ensure_ascii=False, default=str)))
+                conn.execute("""
+                    DELETE FROM job_run WHERE name=? AND id <= (
+                        SELECT id FROM job_run WHERE name=? ORDER BY id DESC LIMIT 1 OFFSET ?)
+                """, (name, name, JOB_RUN_KEEP))
+        finally:
+            conn.close()
+            with self._lock:
+                self._running.pop(name, None)
+
+# ==================== 조회 / 관리 ====================
+
+def schedules(conn: sqlite3.Connection) -> List[tuple]:
+    return conn.execute("""
+        SELECT name, description, cron, enabled, next_run_at, last_started_at, last_finished_at, last_status,
+               last_duration_ms, runs, failures, consecutive_failures, lease_owner, lease_until, last_error
+        FROM job_schedule ORDER BY name
+    """).fetchall()
+
+def runs(conn: sqlite3.Connection, name: Optional[str] = None, failed_only: bool = False,
+         limit: int = 50) -> List[tuple]:
+    where, params = [], []
+    if name:
+        where.append("name = ?"); params.append(name)
+    if failed_only:
+        where.append("status = 'failed'")
+    sql = "SELECT name, started_at, finished_at, duration_ms, status, owner, result, error FROM job_run"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return conn.execute(sql + " ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+
+def run_now(conn: sqlite3.Connection, name: str):
+    """다음 폴링에 실행 (어느 서버든 먼저 임대한 쪽이 실행)"""
+    with conn:
+        conn.execute("UPDATE job_schedule SET next_run_at=? WHERE name=?", (time.time(), name))
+
+def set_enabled(conn: sqlite3.Connection, name: str, enabled: bool):
+    with conn:
+        conn.execute("UPDATE job_schedule SET enabled=? WHERE name=?", (int(enabled), name))
+
+# ==================== CLI ====================
+
+def _ts(v: Optional[float]) -> str:
+    return datetime.fromtimestamp(v).strftime("%Y-%m-%d %H:%M") if v else "-"
+
+def main():
+    ap = argparse.ArgumentParser(description="예약 작업 상태/수동 실행")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("status", help="작업별 다음 실행·최근 결과")
+    p.add_argument("--db", default=DB_PATH)
+    p = sub.add_parser("run", help="작업 1개를 지금 이 프로세스에서 실행 (임대를 잡고 실행)")
+    p.add_argument("name")
+    p.add_argument("--db", default=DB_PATH)
+    args = ap.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    if args.cmd == "status":
+        for r in schedules(conn):
+            name, _, cron, enabled, nxt, _, fin, status, ms, n, fails, streak, owner, _, _ = r
+            print(f"{name:<16} {cron:<14} {'on ' if enabled else 'off'} 다음 {_ts(nxt)}  최근 {_ts(fin)} "
+                  f"{status or '-':<6} {(ms or 0):>9,.0f}ms  실행 {n} / 실패 {fails} (연속 {streak})"
+                  + (f"  실행 중: {owner}" if owner else ""))
+    else:
+        jobs = default_jobs()
+        if args.name not in jobs:
+            raise SystemExit(f"❌ 알 수 없는 작업: {args.name} ({', '.join(jobs)})")
+        scheduler = Scheduler(args.db, {args.name: jobs[args.name]}, workers=1)
+        scheduler.sync()
+        run_now(conn, args.name)
+        if not scheduler.run_once():
+            raise SystemExit("❌ 다른 서버가 실행 중입니다.")
+        scheduler.pool.shutdown(wait=True)
+        print(runs(conn, args.name, limit=1)[0])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# ==================== 자재 소비/원가 큐브 ====================
+"""
+as_material_usage 를 (사용월, 지점, 모델, 증상, 자재) 별로 미리 합산해 두고 자재 소비량·청구액·정가 원가를 조회한다.
+
+  - material_cube       : 칸마다 사용 건수, 수량, 무상 수량(청구 단가 0), 청구액(수량×청구 단가)
+  - material_cube_state : 마지막으로 합산한 as_material_usage.id. sync 는 그 뒤의 행만 더한다 (결과 등록마다 호출)
+
+정가 원가는 조회 시 수량 × material_code.unit_price (현재 정가)로 계산한다. 무상 건은 청구 단가 0 으로 저장되므로
+'무상 원가' = 무상 수량 × 정가. 사용월은 접수 완료월(없으면 사용 기록일), 보관된 접수의 사용 기록도 큐브에 남는다.
+
+    python doorlock_as_materials.py sync doorlock_as.db
+    python doorlock_as_materials.py report doorlock_as.db --from 2024-01 --to 2024-06 --by 모델 증상
+"""
+import argparse
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# 구분 → (큐브 컬럼, 이름 컬럼)
+DIMENSIONS = {
+    "월": ("c.month", None),
+    "지점": ("c.branch_id", "COALESCE(b.branch_name, '미지정')"),
+    "모델": ("c.model_code", "pm.model_name"),
+    "증상": ("c.symptom_code", "sc.description"),
+    "자재": ("c.material_code", "mc.material_name"),
+}
+MEASURES = ("사용 건수", "수량", "무상 수량", "청구액", "정가 원가", "무상 원가")
+
+# ==================== 증분 합산 ====================
+
+def sync(conn: sqlite3.Connection) -> int:
+    """워터마크 뒤의 사용 기록을 큐브에 더함 (커밋은 호출 측). 더한 행 수 반환"""
+    # INSERT 가 쓰기 잠금을 먼저 잡으므로 같은 트랜잭션의 워터마크 갱신과 사이에 끼어드는 사용 기록이 없다
+    conn.execute("""
+        INSERT INTO material_cube (month, branch_id, model_code, symptom_code, material_code,
+                                   lines, quantity, free_quantity, charged)
+        SELECT substr(COALESCE(ar.complete_date, mu.created_at), 1, 7), COALESCE(ar.branch_id, 0),
+               COALESCE(ar.model_code, ''), COALESCE(ar.symptom_code, ''), COALESCE(mu.material_code, ''),
+               COUNT(*), SUM(mu.quantity),
+               SUM(CASE WHEN COALESCE(mu.unit_price, 0) = 0 THEN mu.quantity ELSE 0 END),
+               SUM(mu.quantity * COALESCE(mu.unit_price, 0))
+        FROM as_material_usage mu
+        LEFT JOIN as_reception ar ON ar.id = mu.reception_id
+        WHERE mu.id > (SELECT last_usage_id FROM material_cube_state WHERE id = 1)
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (month, branch_id, model_code, symptom_code, material_code) DO UPDATE SET
+            lines = lines + excluded.lines, quantity = quantity + excluded.quantity,
+            free_quantity = free_quantity + excluded.free_quantity, charged = charged + excluded.charged
+    """)
+    added = conn.execute("""
+        SELECT COUNT(*) FROM as_material_usage WHERE id > (SELECT last_usage_id FROM material_cube_state WHERE id = 1)
+    """).fetchone()[0]
+    conn.execute("""
+        UPDATE material_cube_state SET last_usage_id = (SELECT COALESCE(MAX(id), last_usage_id) FROM as_material_usage)
+        WHERE id = 1
+    """)
+    return added
+
+def backfill(conn: sqlite3.Connection) -> int:
+    """기동 시 호출: 합산하지 않은 사용 기록을 모두 더하고 커밋"""
+    n = sync(conn)
+    conn.commit()
+    return n
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    """큐브를 비우고 본 DB 의 사용 기록으로 다시 합산 (보관으로 옮긴 사용 기록은 빠짐). 커밋은 호출 측"""
+    conn.execute("DELETE FROM material_cube")
+    conn.execute("UPDATE material_cube_state SET last_usage_id = 0 WHERE id = 1")
+    return sync(conn)
+
+# ==================== 조회 ====================
+
+def months(conn: sqlite3.Connection) -> List[str]:
+    return [r[0] for r in conn.execute("SELECT DISTINCT month FROM material_cube ORDER BY month")]
+
+def _where(month_from: str, month_to: str, filters: Dict[str, object]) -> Tuple[str, list]:
+    where, params = ["c.month >= ?", "c.month <= ?"], [month_from, month_to]
+    for dim, value in filters.items():
+        where.append(f"{DIMENSIONS[dim][0]} = ?"); params.append(value)
+    return " AND ".join(where), params
+
+def summary(conn: sqlite3.Connection, month_from: str, month_to: str, group_by: Sequence[str] = (),
+            filters: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+    """
+    group_by(DIMENSIONS 키) 별 MEASURES, 정가 원가 큰 순. filters: {구분: 코드} (드릴다운 경로).
+    이름이 있는 구분은 '<구분>명' 컬럼을 함께 반환
+    """
+    where, params = _where(month_from, month_to, filters or {})
+    keys, names = [], []
+    for dim in group_by:
+        col, name = DIMENSIONS[dim]
+        keys.append(f"{col} AS \"{dim}\"")
+        if name:
+            names.append(f"MAX({name}) AS \"{dim}명\"")
+    select = ", ".join(keys + names + [""])
+    group = f"GROUP BY {', '.join(str(i + 1) for i in range(len(keys)))}" if keys else ""
+    df = pd.read_sql_query(f"""
+        SELECT {select}
+               SUM(c.lines) AS "사용 건수", SUM(c.quantity) AS "수량", SUM(c.free_quantity) AS "무상 수량",
+               SUM(c.charged) AS "청구액",
+               SUM(c.quantity * COALESCE(mc.unit_price, 0)) AS "정가 원가",
+               SUM(c.free_quantity * COALESCE(mc.unit_price, 0)) AS "무상 원가"
+        FROM material_cube c
+        LEFT JOIN material_code mc ON mc.material_code = c.material_code
+        LEFT JOIN branch b ON b.id = c.branch_id
+        LEFT JOIN product_model pm ON pm.model_code = c.model_code
+        LEFT JOIN symptom_code sc ON sc.code = c.symptom_code
+        WHERE {where}
+        {group}
+        ORDER BY "정가 원가" DESC, "사용 건수" DESC
+    """, conn, params=params)
+    return df[df["사용 건수"].fillna(0) > 0].reset_index(drop=True)  # 전체 합계(구분 없음)에서 빈 결과는 NULL 1행
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="자재 소비/원가 큐브")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("sync", help="합산하지 않은 사용 기록 더하기")
+    s.add_argument("db")
+    s.add_argument("--rebuild", action="store_true", help="큐브를 비우고 처음부터 (보관된 사용 기록은 빠짐)")
+    r = sub.add_parser("report", help="구분별 수량/청구액/정가 원가")
+    r.add_argument("db")
+    r.add_argument("--from", dest="month_from", required=True)
+    r.add_argument("--to", dest="month_to", required=True)
+    r.add_argument("--by", nargs="*", choices=list(DIMENSIONS), default=["모델"])
+    r.add_argument("--top", type=int, default=30)
+    args = ap.parse_args()
+
+    from doorlock_as_schema import migrate
+    conn = sqlite3.connect(args.db)
+    migrate(conn)
+    if args.cmd == "sync":
+        n = rebuild(conn) if args.rebuild else sync(conn)
+        conn.commit()
+        print(f"✅ 사용 기록 {n:,}건 합산")
+    else:
+        df = summary(conn, args.month_from, args.month_to, args.by)
+        print(f"자재 소비 {args.month_from}~{args.month_to}")
+        print(df.head(args.top).to_string(index=False) if not df.empty else "(데이터 없음)")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
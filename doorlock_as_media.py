@@ -0,0 +1,222 @@
+# ==================== 첨부파일 썸네일/미리보기 생성 ====================
+"""
+업로드된 첨부파일(사진/PDF)로부터 썸네일과 웹용 미리보기 이미지를 만든다.
+
+- 이미지: EXIF 회전 보정 후 썸네일(THUMB_SIZE)과 미리보기(PREVIEW_MAX_EDGE) JPEG 생성
+- PDF: 첫 페이지를 PNG로 렌더링한 뒤 같은 방식으로 썸네일/미리보기 생성
+- 생성 작업은 프로세스 풀에서 실행되므로 요청(스크립트 rerun) 스레드를 막지 않는다.
+- DerivativeJobs: 파일별 진행 중/실패 상태를 기억해 같은 작업을 중복 제출하지 않는다.
+  실패 이력은 FAILED_TTL 초가 지나거나 원본 파일이 바뀌면 지우고, 최대 FAILED_MAX 건만 보관한다.
+
+Streamlit에 의존하지 않으므로 프로세스 풀 워커에서 그대로 import 된다.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+DERIVED_DIR_NAME = ".derived"
+THUMB_SIZE = (320, 320)
+PREVIEW_MAX_EDGE = 1600
+JPEG_QUALITY = 82
+PDF_RENDER_DPI = 110
+FAILED_TTL = float(os.getenv("MEDIA_FAILED_TTL", "3600"))  # 실패 이력 보관(초) — 지나면 다음 열람 때 다시 생성
+FAILED_MAX = 1000
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+PDF_EXTS = (".pdf",)
+
+# ==================== 경로 ====================
+
+def derived_paths(path: str) -> Dict[str, str]:
+    """원본 경로 → 썸네일/미리보기/PDF 첫 페이지 경로"""
+    folder, fname = os.path.split(path)
+    base = os.path.join(folder, DERIVED_DIR_NAME, fname)
+    return {
+        "thumb": f"{base}.thumb.jpg",
+        "preview": f"{base}.preview.jpg",
+        "page1": f"{base}.page1.png",
+    }
+
+def is_previewable(path: str) -> bool:
+    """미리보기 생성 대상 여부"""
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTS + PDF_EXTS
+
+def has_derivatives(path: str) -> bool:
+    """썸네일/미리보기가 이미 생성되어 있는지"""
+    paths = derived_paths(path)
+    return os.path.exists(paths["thumb"]) and os.path.exists(paths["preview"])
+
+# ==================== 생성 (워커 프로세스에서 실행) ====================
+
+def _write_atomic(out_path: str, write):
+    """같은 폴더의 고유 임시 파일에 쓴 뒤 rename 으로 교체 (동시 작업끼리 덮어쓰지 않음)"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(out_path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _save_jpeg(img, out_path: str, max_size):
+    """비율 유지 축소 후 JPEG 저장"""
+    from PIL import Image
+
+    im = img.copy()
+    im.thumbnail(max_size, Image.LANCZOS)
+    if im.mode not in ("RGB", "L"):
+        im = im.convert("RGB")
+    _write_atomic(out_path, lambda tmp: im.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True))
+
+def _render_pdf_first_page(path: str, out_path: str):
+    """PDF 첫 페이지 → PNG"""
+    try:
+        import pymupdf
+    except ImportError:
+        raise RuntimeError("PDF 미리보기에는 PyMuPDF(pymupdf) 설치가 필요합니다.")
+    with pymupdf.open(path) as doc:
+        if doc.page_count == 0:
+            raise RuntimeError("페이지가 없는 PDF 입니다.")
+        pix = doc.load_page(0).get_pixmap(dpi=PDF_RENDER_DPI)
+        _write_atomic(out_path, lambda tmp: pix.save(tmp, output="png"))
+
+def generate_derivatives(path: str) -> Dict[str, str]:
+    """
+    첨부파일 하나에 대한 파생 이미지 생성.
+    생성된 파일 경로 dict 반환 (대상이 아니면 빈 dict, 생성 실패는 예외).
+    """
+    from PIL import Image, ImageOps
+
+    if not os.path.exists(path) or not is_previewable(path):
+        return {}
+    paths = derived_paths(path)
+    os.makedirs(os.path.dirname(paths["thumb"]), exist_ok=True)
+
+    source = path
+    result: Dict[str, str] = {}
+    if path.lower().endswith(PDF_EXTS):
+        _render_pdf_first_page(path, paths["page1"])
+        source = paths["page1"]
+        result["page1"] = paths["page1"]
+
+    with Image.open(source) as img:
+        img.draft("RGB", (PREVIEW_MAX_EDGE, PREVIEW_MAX_EDGE))  # JPEG는 디코딩 단계에서 축소
+        img = ImageOps.exif_transpose(img)
+        _save_jpeg(img, paths["preview"], (PREVIEW_MAX_EDGE, PREVIEW_MAX_EDGE))
+        _save_jpeg(img, paths["thumb"], THUMB_SIZE)
+    result["preview"] = paths["preview"]
+    result["thumb"] = paths["thumb"]
+    return result
+
+# ==================== 프로세스 풀 ====================
+
+def create_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """미리보기 생성용 프로세스 풀"""
+    return ProcessPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1))
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+class DerivativeJobs:
+    """
+    풀에 넘긴 생성 작업을 파일 경로별로 기억한다 (서버 프로세스당 1개).
+    진행 중인 파일은 다시 제출하지 않고, 실패한 파일은 오류를 보관해 재제출하지 않는다.
+    실패 이력은 failed_ttl 초가 지나거나 원본이 바뀌면(mtime) 버리고, max_failed 건을 넘으면 오래된 것부터 버린다.
+    """
+
+    def __init__(self, pool: ProcessPoolExecutor, failed_ttl: float = FAILED_TTL, max_failed: int = FAILED_MAX):
+        self.pool = pool
+        self.failed_ttl = failed_ttl
+        self.max_failed = max_failed
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._failed: "OrderedDict[str, Tuple[Optional[float], float, str]]" = OrderedDict()  # 경로 → (mtime, 실패 시각, 사유)
+        self._reported = set()
+
+    def submit(self, path: str) -> Optional[Future]:
+        """생성 작업 제출 (대상 아님/진행 중/실패 이력이면 제출하지 않음)"""
+        if not is_previewable(path):
+            return None
+        with self._lock:
+            if path in self._pending or self._failure(path) is not None:
+                return self._pending.get(path)
+            future = self.pool.submit(generate_derivatives, path)
+            self._pending[path] = future
+        future.add_done_callback(lambda f, p=path: self._done(p, f))
+        return future
+
+    def _done(self, path: str, future: Future):
+        error = future.exception()
+        if error is not None:
+            message = str(error) or type(error).__name__
+        elif not future.result():
+            message = "미리보기를 만들 수 없는 파일입니다."
+        else:
+            message = None
+        with self._lock:
+            self._pending.pop(path, None)
+            if message is None:
+                return
+            self._failed[path] = (_mtime(path), time.time(), message)
+            self._failed.move_to_end(path)
+            while len(self._failed) > self.max_failed:
+                self._reported.discard(self._failed.popitem(last=False)[0])
+
+    def _failure(self, path: str) -> Optional[str]:
+        """유효한 실패 사유 (만료/원본 변경이면 이력을 지우고 None). 잠금 안에서 호출"""
+        entry = self._failed.get(path)
+        if entry is None:
+            return None
+        mtime, failed_at, message = entry
+        if time.time() - failed_at > self.failed_ttl or _mtime(path) != mtime:
+            self._failed.pop(path)
+            self._reported.discard(path)
+            return None
+        return message
+
+    def status(self, path: str) -> str:
+        """'ready' | 'pending' | 'failed' | 'missing' (아직 제출 전)"""
+        if has_derivatives(path):
+            return "ready"
+        with self._lock:
+            if self._failure(path) is not None:
+                return "failed"
+            return "pending" if path in self._pending else "missing"
+
+    def take_error(self, path: str) -> Optional[str]:
+        """실패 사유 (처음 한 번만 반환, 이후 None)"""
+        with self._lock:
+            message = self._failure(path)
+            if message is None or path in self._reported:
+                return None
+            self._reported.add(path)
+            return message
+
+    def retry(self, path: str) -> Optional[Future]:
+        """실패 이력을 지우고 다시 제출 (미리보기 '다시 만들기')"""
+        with self._lock:
+            self._failed.pop(path, None)
+            self._reported.discard(path)
+        return self.submit(path)
+
+if __name__ == "__main__":
+    # 기존 uploads/ 일괄 생성: python doorlock_as_media.py [uploads]
+    import sys
+
+    folder = sys.argv[1] if len(sys.argv) > 1 else "uploads"
+    targets = [os.path.join(folder, f) for f in sorted(os.listdir(folder))
+               if os.path.isfile(os.path.join(folder, f)) and is_previewable(f)]
+    with create_pool() as pool:
+        futures = [(p, pool.submit(generate_derivatives, p)) for p in targets]
+        for p, future in futures:
+            error = future.exception()
+            print(f"✅ {p}" if error is None else f"⚠️ {p}: {error}")
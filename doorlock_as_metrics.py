@@ -0,0 +1,303 @@
+# ==================== 쿼리 계측 / 메트릭 ====================
+"""
+데이터 계층(as_app.run_query·fetch_*, doorlock_as_supabase)에서 실행되는 모든 쿼리의
+정규화된 SQL(또는 PostgREST 요청), 소요 시간, 행 수, 호출 페이지를 기록한다.
+
+- 훅(hook) 방식: add_hook(fn) 으로 QueryEvent 를 받는 함수를 추가할 수 있다.
+- 기본 훅: 메모리 집계(카운터/히스토그램) + 느린 쿼리 로그(회전 파일)
+- 느린 쿼리는 선택적으로 EXPLAIN QUERY PLAN 을 함께 기록 (EXPLAIN_SLOW_QUERIES=1)
+- Prometheus 텍스트 포맷 내보내기 (render_prometheus / write_textfile)
+
+설정(환경변수): SLOW_QUERY_MS(기본 200), SLOW_QUERY_LOG(기본 logs/slow_query.log),
+EXPLAIN_SLOW_QUERIES(기본 0)
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join("logs", "slow_query.log"))
+EXPLAIN_SLOW_QUERIES = os.getenv("EXPLAIN_SLOW_QUERIES", "0") == "1"
+
+# 히스토그램 버킷 (ms)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current_page: ContextVar[str] = ContextVar("current_page", default="-")
+
+@dataclass
+class QueryEvent:
+    backend: str          # sqlite / supabase
+    statement: str        # 정규화된 SQL 또는 PostgREST 요청
+    duration_ms: float
+    rows: Optional[int]
+    page: str
+    error: Optional[str] = None
+    plan: Optional[List[Any]] = None
+
+# ==================== 호출 페이지 ====================
+
+@contextmanager
+def page_context(name: str) -> Iterator[None]:
+    """현재 페이지/팝업 이름 지정 (with 문 또는 데코레이터로 사용)"""
+    token = _current_page.set(name)
+    try:
+        yield
+    finally:
+        _current_page.reset(token)
+
+def current_page() -> str:
+    return _current_page.get()
+
+# ==================== SQL 정규화 ====================
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_RE_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_SPACE = re.compile(r"\s+")
+
+def normalize_sql(sql: str) -> str:
+    """리터럴 → ?, IN (?, ?, ...) → IN (...), 공백 정리"""
+    sql = _RE_STRING.sub("?", sql)
+    sql = _RE_NUMBER.sub("?", sql)
+    sql = _RE_IN_LIST.sub("(...)", sql)
+    return _RE_SPACE.sub(" ", sql).strip()
+
+def query_id(statement: str) -> str:
+    return hashlib.sha1(statement.encode("utf-8")).hexdigest()[:12]
+
+# ==================== 집계 ====================
+
+@dataclass
+class QueryStat:
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+
+    def observe(self, e: QueryEvent):
+        self.count += 1
+        self.total_ms += e.duration_ms
+        self.max_ms = max(self.max_ms, e.duration_ms)
+        self.rows += e.rows or 0
+        if e.error:
+            self.errors += 1
+        for i, bound in enumerate(BUCKETS_MS):
+            if e.duration_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """히스토그램 기반 근사 분위수 (버킷 상한)"""
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+class MetricsRegistry:
+    """프로세스 단위 메모리 집계"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries: Dict[Tuple[str, str, str], QueryStat] = {}
+        self.gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.gauge_help: Dict[str, str] = {}
+        self.started_at = time.time()
+
+    def observe(self, e: QueryEvent):
+        key = (e.backend, e.page, e.statement)
+        with self.lock:
+            stat = self.queries.get(key)
+            if stat is None:
+                stat = self.queries[key] = QueryStat()
+            stat.observe(e)
+
+    def set_gauge(self, name: str, value: float, help_text: str = "", **labels: str):
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = float(value)
+            if help_text:
+                self.gauge_help[name] = help_text
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """쿼리별 집계 목록 (총 소요 시간 내림차순)"""
+        with self.lock:
+            items = [(k, QueryStat(s.count, s.errors, s.total_ms, s.max_ms, s.rows, list(s.buckets)))
+                     for k, s in self.queries.items()]
+        rows = []
+        for (backend, page, statement), s in items:
+            rows.append({
+                "backend": backend,
+                "page": page,
+                "query_id": query_id(statement),
+                "statement": statement,
+                "count": s.count,
+                "errors": s.errors,
+                "total_ms": round(s.total_ms, 1),
+                "avg_ms": round(s.total_ms / s.count, 2) if s.count else 0.0,
+                "p95_ms": s.quantile(0.95),
+                "max_ms": round(s.max_ms, 1),
+                "avg_rows": round(s.rows / s.count, 1) if s.count else 0.0,
+            })
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def reset(self):
+        with self.lock:
+            self.queries.clear()
+            self.started_at = time.time()
+
+registry = MetricsRegistry()
+
+# ==================== 느린 쿼리 로그 ====================
+
+_slow_logger: Optional[logging.Logger] = None
+_slow_lock = threading.Lock()
+
+def _get_slow_logger() -> logging.Logger:
+    global _slow_logger
+    with _slow_lock:
+        if _slow_logger is None:
+            os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or ".", exist_ok=True)
+            logger = logging.getLogger("doorlock_as.slow_query")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            _slow_logger = logger
+    return _slow_logger
+
+def log_slow_query(e: QueryEvent):
+    """임계값 초과 쿼리를 JSON 한 줄로 기록"""
+    if e.duration_ms < SLOW_QUERY_MS:
+        return
+    _get_slow_logger().info(json.dumps({
+        "ts": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "backend": e.backend,
+        "page": e.page,
+        "duration_ms": round(e.duration_ms, 1),
+        "rows": e.rows,
+        "error": e.error,
+        "statement": e.statement,
+        "plan": e.plan,
+    }, ensure_ascii=False, default=str))
+
+# ==================== 훅 ====================
+
+_hooks: List[Callable[[QueryEvent], None]] = [registry.observe, log_slow_query]
+
+def add_hook(fn: Callable[[QueryEvent], None]):
+    """QueryEvent 수신 함수 추가"""
+    if fn not in _hooks:
+        _hooks.append(fn)
+
+def remove_hook(fn: Callable[[QueryEvent], None]):
+    if fn in _hooks:
+        _hooks.remove(fn)
+
+def emit(e: QueryEvent):
+    for fn in list(_hooks):
+        try:
+            fn(e)
+        except Exception as ex:  # 계측 실패가 쿼리를 막지 않도록
+            print(f"⚠️ 쿼리 계측 훅 오류({getattr(fn, '__name__', fn)}): {ex}")
+
+@contextmanager
+def track(backend: str, statement: str, normalize: bool = True,
+          explain: Optional[Callable[[], List[Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    쿼리 실행 구간 계측. yield 된 dict 의 "rows" 에 결과 행 수를 넣는다.
+    explain: 느린 쿼리일 때만 호출되는 실행 계획 조회 함수 (EXPLAIN_SLOW_QUERIES=1 일 때)
+    """
+    info: Dict[str, Any] = {"rows": None}
+    error = None
+    start = time.perf_counter()
+    try:
+        yield info
+    except Exception as ex:
+        error = f"{type(ex).__name__}: {ex}"
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        plan = None
+        if explain is not None and EXPLAIN_SLOW_QUERIES and error is None and duration_ms >= SLOW_QUERY_MS:
+            try:
+                plan = explain()
+            except Exception as ex:
+                plan = [f"EXPLAIN 실패: {ex}"]
+        emit(QueryEvent(
+            backend=backend,
+            statement=normalize_sql(statement) if normalize else statement,
+            duration_ms=duration_ms,
+            rows=info.get("rows"),
+            page=current_page(),
+            error=error,
+            plan=plan,
+        ))
+
+# ==================== Prometheus 내보내기 ====================
+
+def _label_value(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**kw: str) -> str:
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in kw.items()) + "}"
+
+def render_prometheus() -> str:
+    """Prometheus 텍스트 포맷 (0.0.4)"""
+    with registry.lock:
+        queries = {k: QueryStat(s.count, s.errors, s.total_ms, s.max_ms, s.rows, list(s.buckets))
+                   for k, s in registry.queries.items()}
+        gauges = dict(registry.gauges)
+        gauge_help = dict(registry.gauge_help)
+
+    out = [
+        "# HELP doorlock_query_duration_seconds 쿼리 소요 시간",
+        "# TYPE doorlock_query_duration_seconds histogram",
+    ]
+    info_lines, rows_lines, err_lines = [], [], []
+    for (backend, page, statement), s in sorted(queries.items()):
+        qid = query_id(statement)
+        base = dict(backend=backend, page=page, query_id=qid)
+        cumulative = 0
+        for bound, n in zip(BUCKETS_MS, s.buckets):
+            cumulative += n
+            out.append(f"doorlock_query_duration_seconds_bucket{_labels(**base, le=str(bound / 1000))} {cumulative}")
+        out.append(f"doorlock_query_duration_seconds_bucket{_labels(**base, le='+Inf')} {s.count}")
+        out.append(f"doorlock_query_duration_seconds_sum{_labels(**base)} {s.total_ms / 1000:.6f}")
+        out.append(f"doorlock_query_duration_seconds_count{_labels(**base)} {s.count}")
+        rows_lines.append(f"doorlock_query_rows_total{_labels(**base)} {s.rows}")
+        err_lines.append(f"doorlock_query_errors_total{_labels(**base)} {s.errors}")
+        info_lines.append(f"doorlock_query_info{_labels(backend=backend, query_id=qid, statement=statement)} 1")
+
+    out += ["# HELP doorlock_query_rows_total 쿼리 결과 행 수 누계", "# TYPE doorlock_query_rows_total counter", *rows_lines]
+    out += ["# HELP doorlock_query_errors_total 쿼리 오류 수", "# TYPE doorlock_query_errors_total counter", *err_lines]
+    out += ["# HELP doorlock_query_info query_id ↔ 정규화 SQL", "# TYPE doorlock_query_info gauge", *sorted(set(info_lines))]
+
+    for name in sorted({n for n, _ in gauges}):
+        out.append(f"# HELP {name} {gauge_help.get(name, name)}")
+        out.append(f"# TYPE {name} gauge")
+        for (n, labels), value in sorted(gauges.items()):
+            if n == name:
+                out.append(f"{name}{_labels(**dict(labels)) if labels else ''} {value}")
+    return "\n".join(out) + "\n"
+
+def write_textfile(path: str):
+    """node_exporter textfile collector 용 파일 쓰기 (원자적 교체)"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
@@ -0,0 +1,341 @@
+# ==================== SQLite → Supabase 일괄 이관 ====================
+"""
+doorlock_as.db(as_app 의 DB_PATH)의 데이터를 Supabase(PostgREST)로 옮긴다.
+
+- 테이블마다 id keyset 으로 CHUNK 건씩 읽어(전체를 메모리에 올리지 않음) 배치 upsert
+- 업로드는 워커 스레드 WORKERS 개, 동시에 진행 중인 배치 수 제한
+- 일시 오류(네트워크/타임아웃, 5xx/429, DB 연결·교착·statement timeout)는 지수 백오프(+지터)로 재시도,
+  제약 위반·형식 오류 등(SQLSTATE 23/22/42)은 바로 중단
+- 체크포인트(JSON): 테이블별로 "여기까지는 빠짐없이 올라감"인 연속 구간의 마지막 id 를 저장
+  (배치가 순서 없이 끝나도 연속된 앞부분만 전진). 중단 후 다시 실행하면 그 뒤부터 이어감
+  upsert(on_conflict=id) 라 경계 부근 배치를 다시 보내도 중복되지 않는다.
+- 마지막에 테이블별 건수/체크섬(행 단위 해시의 합, 순서 무관) 비교
+
+    python doorlock_as_migrate.py run    --db doorlock_as.db --workers 4 --chunk 1000
+    python doorlock_as_migrate.py verify --db doorlock_as.db
+    python doorlock_as_migrate.py status
+
+id 를 그대로 넣으므로 이관 후 Postgres 시퀀스를 맞춰야 한다(실행 끝에 setval SQL 출력).
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import doorlock_as_metrics as metrics
+
+DB_PATH = os.getenv("DOORLOCK_AS_DB", "doorlock_as.db")
+CHECKPOINT_PATH = os.getenv("MIGRATE_CHECKPOINT", "migrate_checkpoint.json")
+CHUNK = 1000
+WORKERS = 4
+MAX_ATTEMPTS = 6
+
+# FK 순서 (목록에 없는 테이블은 뒤에 이름순)
+TABLE_ORDER = [
+    "branch", "users", "product_model", "symptom_code", "material_code",
+    "as_reception", "as_result", "as_material_usage", "inventory", "inventory_log", "audit_log",
+]
+SKIP_TABLES = {"notification_outbox", "archive_manifest", "archive_branch_count", "audit_partition",
+               "job_schedule", "job_run", "cache_version",
+               "sla_lead", "sla_hist", "material_cube", "material_cube_state"}
+# 로컬 발송 큐/보관·파티션 현황/예약 작업·캐시 상태, 원본에서 다시 만드는 집계(SLA, 자재 큐브)는 옮기지 않음
+
+# ==================== 타입 변환 ====================
+
+def convert_value(decl: str, v: Any) -> Any:
+    """SQLite 값 → PostgREST JSON 값 (선언 타입 기준)"""
+    if v is None:
+        return None
+    decl = (decl or "").upper()
+    if isinstance(v, bytes):
+        return "\\x" + v.hex()  # bytea
+    if isinstance(v, float) and (math.isnan(v) or math.isinf(v)):
+        return None
+    if "DATE" in decl or "TIME" in decl:
+        s = str(v).strip()
+        return s or None  # Postgres date/timestamp 는 빈 문자열을 받지 않음
+    if "INT" in decl and isinstance(v, str):
+        try:
+            return int(v)
+        except ValueError:
+            return v
+    if ("REAL" in decl or "FLOA" in decl or "DOUB" in decl) and isinstance(v, str):
+        try:
+            return float(v)
+        except ValueError:
+            return v
+    return v
+
+def canonical(v: Any) -> str:
+    """체크섬용 정규화: 양쪽 표현 차이(1 vs 1.0, 'T' vs ' ', +00:00)를 없앤다"""
+    if v is None or v == "":
+        return ""
+    if isinstance(v, bool):
+        return str(int(v))
+    if isinstance(v, (int, float)):
+        return str(int(v)) if float(v).is_integer() else repr(float(v))
+    s = str(v)
+    if len(s) >= 10 and s[4] == "-" and s[7] == "-":
+        try:
+            dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+            if dt.tzinfo is not None:
+                dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+            return dt.isoformat(sep=" ") if len(s) > 10 else dt.date().isoformat()
+        except ValueError:
+            pass
+    return s
+
+def row_hash(row: Dict[str, Any], columns: List[str]) -> int:
+    digest = hashlib.blake2b("\x1f".join(canonical(row.get(c)) for c in columns).encode("utf-8"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+# ==================== 체크포인트 ====================
+
+class Checkpoint:
+    """
+    테이블별 연속 완료 구간. 배치 (start, end] 가 끝나면 pending 에 두었다가
+    done_id 와 이어지는 것만 순서대로 흡수하고 파일을 원자적으로 교체한다.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pending: Dict[str, Dict[int, Tuple[int, int]]] = {}
+        self.data = {"source": os.path.abspath(source), "tables": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("source") != self.data["source"]:
+                raise SystemExit(f"❌ 체크포인트 원본이 다릅니다: {saved.get('source')} (--restart 로 새로 시작)")
+            self.data = saved
+
+    def table(self, name: str) -> Dict[str, Any]:
+        return self.data["tables"].setdefault(name, {"done_id": 0, "rows": 0, "complete": False})
+
+    def chunk_done(self, name: str, start: int, end: int, rows: int):
+        with self.lock:
+            t = self.table(name)
+            pend = self.pending.setdefault(name, {})
+            pend[start] = (end, rows)
+            advanced = False
+            while t["done_id"] in pend:
+                end_id, n = pend.pop(t["done_id"])
+                t["done_id"], t["rows"] = end_id, t["rows"] + n
+                advanced = True
+            if advanced:
+                self.save()
+
+    def mark_complete(self, name: str):
+        with self.lock:
+            self.table(name)["complete"] = True
+            self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+# ==================== 이관 ====================
+
+def _is_transient(e: Exception) -> bool:
+    """재시도할 오류인지 (분류 기준은 doorlock_as_transport 와 같음)"""
+    from doorlock_as_transport import is_transient
+
+    return is_transient(e)
+
+class Migrator:
+    def __init__(self, client, db_path: str = DB_PATH, checkpoint: Optional[Checkpoint] = None,
+                 chunk: int = CHUNK, workers: int = WORKERS, max_attempts: int = MAX_ATTEMPTS):
+        self.client = client
+        self.db_path = db_path
+        self.chunk = chunk
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.checkpoint = checkpoint or Checkpoint(CHECKPOINT_PATH, db_path)
+        self.src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    def tables(self, only: Optional[List[str]] = None) -> List[str]:
+        names = [r[0] for r in self.src.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+        names = [n for n in names if n not in SKIP_TABLES and (not only or n in only)]
+        return sorted(names, key=lambda n: (TABLE_ORDER.index(n) if n in TABLE_ORDER else len(TABLE_ORDER), n))
+
+    def columns(self, table: str) -> List[Tuple[str, str]]:
+        return [(r[1], r[2]) for r in self.src.execute(f'PRAGMA table_info("{table}")')]
+
+    def _read_chunks(self, table: str, after_id: int):
+        cols = self.columns(table)
+        col_sql = ", ".join(f'"{c}"' for c, _ in cols)
+        idx = [c for c, _ in cols].index("id")
+        last = after_id
+        while True:
+            rows = self.src.execute(f'SELECT {col_sql} FROM "{table}" WHERE id > ? ORDER BY id LIMIT ?',
+                                    (last, self.chunk)).fetchall()
+            if not rows:
+                return
+            payload = [{c: convert_value(decl, v) for (c, decl), v in zip(cols, r)} for r in rows]
+            start, last = last, rows[-1][idx]
+            yield start, last, payload
+
+    def _upload(self, table: str, rows: List[Dict[str, Any]]):
+        from postgrest.types import ReturnMethod
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with metrics.track("supabase", f"POST /{table}?upsert=id", normalize=False) as t:
+                    self.client.table(table).upsert(rows, on_conflict="id", returning=ReturnMethod.minimal).execute()
+                    t["rows"] = len(rows)
+                return
+            except Exception as e:
+                if attempt == self.max_attempts or not _is_transient(e):
+                    raise
+                time.sleep(random.uniform(0, min(30.0, 0.5 * 2 ** attempt)))  # full jitter
+
+    def migrate_table(self, table: str, progress=None) -> int:
+        if "id" not in [c for c, _ in self.columns(table)]:
+            print(f"⚠️ {table}: id 컬럼이 없어 건너뜀")
+            return 0
+        state = self.checkpoint.table(table)
+        if state["complete"]:
+            return 0
+        inflight = threading.BoundedSemaphore(self.workers * 2)
+        errors: List[BaseException] = []
+        sent = 0
+
+        def done(fut, start, end, n):
+            inflight.release()
+            if fut.exception():
+                errors.append(fut.exception())
+            else:
+                self.checkpoint.chunk_done(table, start, end, n)
+                if progress:
+                    progress(table, self.checkpoint.table(table)["rows"])
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"migrate-{table}") as pool:
+            try:
+                for start, end, payload in self._read_chunks(table, state["done_id"]):
+                    if errors:
+                        break
+                    inflight.acquire()
+                    fut = pool.submit(self._upload, table, payload)
+                    fut.add_done_callback(lambda f, s=start, e=end, n=len(payload): done(f, s, e, n))
+                    sent += len(payload)
+            except KeyboardInterrupt:
+                errors.append(KeyboardInterrupt())
+        if errors:
+            raise errors[0]
+        self.checkpoint.mark_complete(table)
+        return sent
+
+    # ---------- 검증 ----------
+    def local_summary(self, table: str) -> Tuple[int, int, List[str]]:
+        decls = self.columns(table)
+        cols = [c for c, _ in decls]
+        col_sql = ", ".join(f'"{c}"' for c in cols)
+        total, count = 0, 0
+        for r in self.src.execute(f'SELECT {col_sql} FROM "{table}"'):
+            row = {c: convert_value(decl, v) for (c, decl), v in zip(decls, r)}
+            total = (total + row_hash(row, cols)) % 2 ** 64
+            count += 1
+        return count, total, cols
+
+    def remote_summary(self, table: str, cols: List[str], page: int = 1000) -> Tuple[int, int]:
+        total, count, last = 0, 0, 0
+        select = ",".join(cols)
+        while True:
+            with metrics.track("supabase", f"GET /{table}?verify", normalize=False):
+                rows = self.client.table(table).select(select).gt("id", last).order("id").limit(page).execute().data or []
+            for r in rows:
+                total = (total + row_hash(r, cols)) % 2 ** 64
+            count += len(rows)
+            if len(rows) < page:
+                return count, total
+            last = rows[-1]["id"]
+
+    def remote_count(self, table: str) -> int:
+        from postgrest.types import CountMethod
+        return self.client.table(table).select("id", count=CountMethod.exact).limit(1).execute().count or 0
+
+    def verify(self, tables: List[str], checksum: bool = True) -> bool:
+        ok = True
+        for t in tables:
+            if checksum:
+                n_local, h_local, cols = self.local_summary(t)
+                n_remote, h_remote = self.remote_summary(t, cols)
+                match = n_local == n_remote and h_local == h_remote
+                print(f"  {'✅' if match else '❌'} {t:<20} 건수 {n_local:>10,} / {n_remote:>10,}  "
+                      f"체크섬 {h_local:016x} / {h_remote:016x}")
+            else:
+                n_local = self.src.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0]
+                n_remote = self.remote_count(t)
+                match = n_local == n_remote
+                print(f"  {'✅' if match else '❌'} {t:<20} 건수 {n_local:>10,} / {n_remote:>10,}")
+            ok &= match
+        return ok
+
+def setval_sql(tables: List[str]) -> str:
+    return "\n".join(
+        f"SELECT setval(pg_get_serial_sequence('{t}', 'id'), COALESCE((SELECT MAX(id) FROM {t}), 1));" for t in tables)
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="SQLite → Supabase 이관")
+    ap.add_argument("cmd", choices=["run", "verify", "status"])
+    ap.add_argument("--db", default=DB_PATH)
+    ap.add_argument("--tables", nargs="*", help="대상 테이블 (기본: 전체)")
+    ap.add_argument("--chunk", type=int, default=CHUNK)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    ap.add_argument("--restart", action="store_true", help="체크포인트 무시하고 처음부터")
+    ap.add_argument("--no-checksum", action="store_true", help="검증 시 건수만 비교")
+    args = ap.parse_args(argv)
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = Checkpoint(args.checkpoint, args.db)
+    if args.cmd == "status":
+        for name, t in checkpoint.data["tables"].items():
+            print(f"  {name:<20} {'완료' if t['complete'] else '진행 중':<6} {t['rows']:>10,}건 (id ≤ {t['done_id']})")
+        return
+
+    from doorlock_as_supabase import supabase  # 설정(secrets/환경변수)을 읽어 클라이언트 생성
+    m = Migrator(supabase, args.db, checkpoint, args.chunk, args.workers)
+    tables = m.tables(args.tables)
+
+    if args.cmd == "run":
+        last_print = [0.0]
+
+        def progress(table, rows):
+            if time.perf_counter() - last_print[0] > 2:
+                last_print[0] = time.perf_counter()
+                print(f"  … {table}: {rows:,}건", flush=True)
+
+        for t in tables:
+            t0 = time.perf_counter()
+            try:
+                n = m.migrate_table(t, progress)
+            except KeyboardInterrupt:
+                raise SystemExit(f"⏸️ 중단됨: {t} (id ≤ {checkpoint.table(t)['done_id']} 까지 완료, 다시 실행하면 이어서 진행)")
+            except Exception as e:
+                raise SystemExit(f"❌ {t} 실패: {e}\n   id ≤ {checkpoint.table(t)['done_id']} 까지 완료, 다시 실행하면 이어서 진행")
+            if n:
+                dt = time.perf_counter() - t0
+                print(f"✅ {t}: {n:,}건 ({dt:.1f}s, {n / dt:,.0f}건/s)")
+        print("\n검증:")
+    ok = m.verify(tables, checksum=not args.no_checksum)
+    if args.cmd == "run":
+        print("\n이관 후 Postgres 에서 실행 (id 시퀀스 맞추기):\n" + setval_sql(tables))
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
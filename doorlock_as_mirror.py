@@ -0,0 +1,425 @@
+# ==================== Supabase 로컬 미러 ====================
+"""
+Supabase 테이블을 로컬 SQLite 파일로 증분 동기화하고, 조회는 로컬에서 응답한다.
+(doorlock_as_supabase 에서 SUPABASE_MIRROR=1 일 때 사용)
+
+- as_reception : (updated_at, id) 워터마크 이후 변경분만 keyset 페이지로 가져옴
+                 (커밋 지연으로 늦게 보이는 행을 놓치지 않도록 LOOKBACK 초만큼 겹쳐 읽음)
+- as_result    : id 워터마크 이후 신규 행 (추가 전용)
+- inventory, 마스터(branch/product_model/symptom_code/material_code) : 주기적으로 전체 교체
+- users 는 미러하지 않는다(로그인/권한은 항상 서버 기준).
+- 로컬 테이블에는 본 DB 와 같은 조회용 인덱스를 만든다 (TableSpec.indexes)
+- 원격 삭제는 RECONCILE_EVERY 주기마다 id 목록을 비교해 반영
+- 쓰기는 Supabase 로 보내고, 응답으로 받은 행을 즉시 로컬에 반영(apply/remove)
+- 테이블이 한 번도 동기화되지 않았거나 지연이 MAX_LAG 를 넘으면 조회는 원격으로 보낸다
+- 지연(초)/행 수는 doorlock_mirror_lag_seconds / doorlock_mirror_rows 게이지로 노출
+
+    python doorlock_as_mirror.py sync      # 1회 동기화
+    python doorlock_as_mirror.py status
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import doorlock_as_metrics as metrics
+
+MIRROR_PATH = os.getenv("SUPABASE_MIRROR_PATH", "supabase_mirror.db")
+SYNC_INTERVAL = float(os.getenv("SUPABASE_MIRROR_INTERVAL", "15"))
+MAX_LAG = float(os.getenv("SUPABASE_MIRROR_MAX_LAG", "300"))
+PAGE_SIZE = 1000  # PostgREST 기본 max-rows
+LOOKBACK = 2.0
+RECONCILE_EVERY = 240  # 주기 (기본 간격이면 약 1시간)
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+@dataclass
+class TableSpec:
+    name: str
+    mode: str               # "updated_at" | "id" | "full"
+    refresh_every: int = 1  # full 모드: 몇 주기마다 전체 교체할지
+    indexes: Tuple[Tuple[str, ...], ...] = ()  # 로컬 인덱스 (컬럼이 모두 생긴 뒤 만든다)
+
+# 본 DB(doorlock_as_schema) 와 같은 조회 경로의 인덱스 — 미러 조회가 전체 스캔이 되지 않도록
+TABLES = [
+    TableSpec("as_reception", "updated_at", indexes=(
+        ("created_at",),
+        ("branch_id", "created_at"),
+        ("reception_number",),
+        ("order_number",),
+        ("status", "complete_date"),
+        ("request_date", "model_code", "symptom_code", "branch_id"),
+        ("sido", "sigungu", "model_code", "request_date"),
+        ("phone_norm", "model_code", "request_date"),
+    )),
+    TableSpec("as_result", "id", indexes=(("reception_id",),)),
+    TableSpec("inventory", "full", indexes=(("branch_id", "material_code"),)),
+    TableSpec("branch", "full", refresh_every=20),
+    TableSpec("product_model", "full", refresh_every=20, indexes=(("model_code",),)),
+    TableSpec("symptom_code", "full", refresh_every=20, indexes=(("code",),)),
+    TableSpec("material_code", "full", refresh_every=20, indexes=(("material_code",),)),
+]
+
+STATE_DDL = """
+CREATE TABLE IF NOT EXISTS _mirror_state (
+    table_name TEXT PRIMARY KEY,
+    wm_updated_at TEXT,
+    wm_id INTEGER,
+    synced_at REAL,
+    row_count INTEGER DEFAULT 0,
+    last_error TEXT
+)
+"""
+
+def _q(name: str) -> str:
+    if not _IDENT.match(name):
+        raise ValueError(f"잘못된 식별자: {name}")
+    return f'"{name}"'
+
+def _local_value(v: Any) -> Any:
+    return json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+
+def _shift_iso(ts: str, seconds: float) -> str:
+    """ISO 시각 문자열을 seconds 만큼 이동 (파싱 실패 시 그대로)"""
+    try:
+        shifted = datetime.fromisoformat(ts.replace("Z", "+00:00")) - timedelta(seconds=seconds)
+        return shifted.isoformat(sep="T" if "T" in ts else " ")  # 문자열 비교가 유지되도록 형식 보존
+    except ValueError:
+        return ts
+
+def _like_to_glob(pattern: str) -> str:
+    """PostgREST like(대소문자 구분) → SQLite GLOB"""
+    return pattern.replace("*", "%").replace("%", "*").replace("_", "?")
+
+class Mirror:
+    """Supabase → 로컬 SQLite 증분 동기화 + 로컬 조회"""
+
+    def __init__(
+        self,
+        client,
+        path: str = MIRROR_PATH,
+        tables: Sequence[TableSpec] = tuple(TABLES),
+        interval: float = SYNC_INTERVAL,
+        max_lag: float = MAX_LAG,
+        page_size: int = PAGE_SIZE,
+        reconcile_every: int = RECONCILE_EVERY,
+    ):
+        self.client = client
+        self.path = path
+        self.specs = {t.name: t for t in tables}
+        self.interval = interval
+        self.max_lag = max_lag
+        self.page_size = page_size
+        self.reconcile_every = reconcile_every
+        self.cycle = 0
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._columns: Dict[str, set] = {}
+        self._indexed: Dict[str, set] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(STATE_DDL)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """스레드별 연결 (WAL 이라 동기화 중에도 조회가 막히지 않음)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    # ---------- 백그라운드 동기화 ----------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="supabase-mirror", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.sync_once()
+            self._stop.wait(self.interval)
+
+    def sync_once(self) -> Dict[str, int]:
+        """한 주기 동기화. 테이블별 가져온 행 수 반환 (실패한 테이블은 last_error 에 기록)"""
+        fetched = {}
+        for spec in self.specs.values():
+            if spec.mode == "full" and self.cycle % spec.refresh_every and self._state(spec.name):
+                continue
+            started = time.time()
+            try:
+                if spec.mode == "full":
+                    fetched[spec.name] = self._sync_full(spec)
+                else:
+                    fetched[spec.name] = self._sync_incremental(spec)
+                    if self.reconcile_every and self.cycle and self.cycle % self.reconcile_every == 0:
+                        self._reconcile(spec)
+                self._set_state(spec.name, synced_at=started, last_error=None)
+            except Exception as e:  # 네트워크 오류 등 → 다음 주기에 재시도, 지연은 계속 증가
+                self._set_state(spec.name, last_error=f"{type(e).__name__}: {e}")
+                print(f"⚠️ 미러 동기화 실패 ({spec.name}): {e}")
+        self.cycle += 1
+        self.update_gauges()
+        return fetched
+
+    def _remote_page(self, spec: TableSpec, cursor: Tuple[Optional[str], int], columns: str = "*") -> List[Dict[str, Any]]:
+        ts, last_id = cursor
+        q = self.client.table(spec.name).select(columns)
+        if spec.mode == "updated_at":
+            if ts is not None:
+                q = q.or_(f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt.{last_id})')
+            q = q.order("updated_at").order("id")
+        else:
+            q = q.gt("id", last_id).order("id")
+        with metrics.track("supabase", f"GET /{spec.name}?mirror={spec.mode}", normalize=False) as t:
+            rows = q.limit(self.page_size).execute().data or []
+            t["rows"] = len(rows)
+        return rows
+
+    def _sync_incremental(self, spec: TableSpec) -> int:
+        state = self._state(spec.name) or {}
+        if spec.mode == "updated_at":
+            ts = state.get("wm_updated_at")
+            cursor = (_shift_iso(ts, LOOKBACK) if ts else None, 0)
+        else:
+            cursor = (None, state.get("wm_id") or 0)
+        total = 0
+        while True:
+            rows = self._remote_page(spec, cursor)
+            if not rows:
+                break
+            conn = self._conn()
+            with conn:
+                self._upsert(conn, spec.name, rows)
+                last = rows[-1]
+                cursor = (last.get("updated_at"), last["id"])
+                # 겹쳐 읽은 구간 때문에 워터마크가 뒤로 가지 않도록 최대값 유지
+                wm_ts = max(filter(None, [state.get("wm_updated_at"), cursor[0]]), default=None)
+                wm_id = max(state.get("wm_id") or 0, last["id"]) if spec.mode == "id" else last["id"]
+                state = {"wm_updated_at": wm_ts, "wm_id": wm_id}
+                self._set_state(spec.name, conn=conn, wm_updated_at=wm_ts, wm_id=wm_id)
+            total += len(rows)
+            if len(rows) < self.page_size:
+                break
+        return total
+
+    def _sync_full(self, spec: TableSpec) -> int:
+        rows, cursor = [], (None, 0)
+        while True:
+            page = self._remote_page(TableSpec(spec.name, "id"), cursor)
+            rows.extend(page)
+            if len(page) < self.page_size:
+                break
+            cursor = (None, page[-1]["id"])
+        conn = self._conn()
+        with conn:
+            self._ensure_table(conn, spec.name, {k for r in rows for k in r} | {"id"})
+            conn.execute(f"DELETE FROM {_q(spec.name)}")
+            self._upsert(conn, spec.name, rows)
+        return len(rows)
+
+    def _reconcile(self, spec: TableSpec):
+        """원격에서 삭제된 행 제거 (id 만 keyset 으로 훑음)"""
+        remote, cursor = set(), (None, 0)
+        while True:
+            page = self._remote_page(TableSpec(spec.name, "id"), cursor, columns="id")
+            remote.update(r["id"] for r in page)
+            if len(page) < self.page_size:
+                break
+            cursor = (None, page[-1]["id"])
+        conn = self._conn()
+        local = {r[0] for r in conn.execute(f"SELECT id FROM {_q(spec.name)}")}
+        gone = list(local - remote)
+        with conn:
+            for i in range(0, len(gone), 500):
+                chunk = gone[i:i + 500]
+                conn.execute(f"DELETE FROM {_q(spec.name)} WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+
+    # ---------- 로컬 저장 ----------
+    def _ensure_table(self, conn: sqlite3.Connection, table: str, columns: set):
+        with self._schema_lock:
+            known = self._columns.get(table)
+            if known is None:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {_q(table)} (id INTEGER PRIMARY KEY)")
+                known = {r[1] for r in conn.execute(f"PRAGMA table_info({_q(table)})")}
+                self._columns[table] = known
+            for col in sorted(columns - known):
+                conn.execute(f"ALTER TABLE {_q(table)} ADD COLUMN {_q(col)}")
+                known.add(col)
+            spec = self.specs.get(table)
+            indexed = self._indexed.setdefault(table, set())
+            for cols in (spec.indexes if spec else ()):
+                if cols not in indexed and set(cols) <= known:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {_q(f'idx_mirror_{table}_' + '_'.join(cols))} "
+                                 f"ON {_q(table)} ({', '.join(_q(c) for c in cols)})")
+                    indexed.add(cols)
+
+    def _upsert(self, conn: sqlite3.Connection, table: str, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        cols = list(dict.fromkeys(k for r in rows for k in r))
+        self._ensure_table(conn, table, set(cols))
+        updates = ", ".join(f"{_q(c)}=excluded.{_q(c)}" for c in cols if c != "id")
+        conn.executemany(
+            f"INSERT INTO {_q(table)} ({', '.join(_q(c) for c in cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT(id) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"),
+            [[_local_value(r.get(c)) for c in cols] for r in rows],
+        )
+
+    def _state(self, table: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM _mirror_state WHERE table_name=?", (table,)).fetchone()
+        return dict(row) if row else None
+
+    def _set_state(self, table: str, conn: Optional[sqlite3.Connection] = None, **values):
+        c = conn or self._conn()
+        c.execute("INSERT INTO _mirror_state (table_name) VALUES (?) ON CONFLICT(table_name) DO NOTHING", (table,))
+        sets = ", ".join(f"{k}=?" for k in values)
+        c.execute(f"UPDATE _mirror_state SET {sets} WHERE table_name=?", (*values.values(), table))
+        if conn is None:
+            c.commit()
+
+    # ---------- 쓰기 반영 (write-through) ----------
+    def apply(self, table: str, rows: List[Dict[str, Any]]):
+        """Supabase 쓰기 응답 행을 로컬에 즉시 반영"""
+        if table in self.specs and rows:
+            conn = self._conn()
+            with conn:
+                self._upsert(conn, table, [r for r in rows if "id" in r])
+
+    def remove(self, table: str, rows: List[Dict[str, Any]]):
+        ids = [r["id"] for r in rows if "id" in r]
+        if table in self.specs and ids:
+            conn = self._conn()
+            with conn:
+                conn.execute(f"DELETE FROM {_q(table)} WHERE id IN ({','.join('?' * len(ids))})", ids)
+
+    # ---------- 로컬 조회 ----------
+    def lag(self, table: str) -> Optional[float]:
+        state = self._state(table)
+        return time.time() - state["synced_at"] if state and state.get("synced_at") else None
+
+    def serves(self, table: str) -> bool:
+        spec = self.specs.get(table)
+        if spec is None:
+            return False
+        lag = self.lag(table)
+        # 드물게 교체하는 마스터 테이블은 교체 주기만큼 지연을 허용
+        return lag is not None and lag <= max(self.max_lag, self.interval * spec.refresh_every * 2)
+
+    def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order: Optional[Union[str, Tuple[str, str]]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        search: Optional[Tuple[Sequence[str], str]] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        select_data 와 같은 인자로 로컬 조회. 미러가 응답할 수 없으면 None (→ 원격 조회).
+        search=(컬럼들, 키워드) 는 컬럼별 ilike '%키워드%' 의 OR.
+        """
+        if not self.serves(table):
+            return None
+        try:
+            col_sql = "*" if columns.strip() == "*" else ", ".join(_q(c.strip()) for c in columns.split(","))
+            where, params = [], []
+            for key, val in (filters or {}).items():
+                if isinstance(val, tuple) and len(val) == 2 and isinstance(val[0], str):
+                    col, op = key, val[0].lower()
+                    val = val[1]
+                elif "__" in key:
+                    col, op = key.split("__", 1)
+                    op = op.lower()
+                else:
+                    col, op = key, "eq"
+                if op in _OPS:
+                    where.append(f"{_q(col)} {_OPS[op]} ?"); params.append(val)
+                elif op == "ilike":
+                    where.append(f"{_q(col)} LIKE ?"); params.append(str(val).replace("*", "%"))
+                elif op == "like":
+                    where.append(f"{_q(col)} GLOB ?"); params.append(_like_to_glob(str(val)))
+                elif op == "in":
+                    vals = list(val)
+                    where.append(f"{_q(col)} IN ({','.join('?' * len(vals))})" if vals else "0"); params.extend(vals)
+                else:
+                    return None
+            if search and search[1]:
+                cols, kw = search
+                where.append("(" + " OR ".join(f"{_q(c)} LIKE ?" for c in cols) + ")")
+                params.extend([f"%{kw}%"] * len(cols))
+            sql = f"SELECT {col_sql} FROM {_q(table)}"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            if order:
+                if isinstance(order, tuple):
+                    col, direction = order
+                elif "." in order:
+                    col, direction = order.split(".", 1)
+                else:
+                    col, direction = order, "asc"
+                desc = str(direction).lower() == "desc"
+                # PostgreSQL 기본: ASC 는 NULL 이 뒤, DESC 는 NULL 이 앞
+                sql += f" ORDER BY {_q(col)} {'DESC NULLS FIRST' if desc else 'ASC NULLS LAST'}"
+            if limit is not None or offset is not None:
+                sql += f" LIMIT {int(limit) if limit is not None else 100} OFFSET {int(offset or 0)}"
+            with metrics.track("mirror", sql) as t:
+                rows = [dict(r) for r in self._conn().execute(sql, params)]
+                t["rows"] = len(rows)
+            return rows
+        except (sqlite3.Error, ValueError):
+            return None  # 로컬에 없는 컬럼 등 → 원격으로
+
+    # ---------- 상태/지표 ----------
+    def status(self) -> List[Dict[str, Any]]:
+        out = []
+        for name in self.specs:
+            state = self._state(name) or {}
+            try:
+                rows = self._conn().execute(f"SELECT COUNT(*) FROM {_q(name)}").fetchone()[0]
+            except sqlite3.OperationalError:
+                rows = 0
+            lag = self.lag(name)
+            out.append({"table": name, "rows": rows, "lag_s": round(lag, 1) if lag is not None else None,
+                        "watermark": state.get("wm_updated_at") or state.get("wm_id"),
+                        "last_error": state.get("last_error")})
+        return out
+
+    def update_gauges(self):
+        for s in self.status():
+            metrics.registry.set_gauge("doorlock_mirror_rows", s["rows"], "로컬 미러 테이블 행 수", table=s["table"])
+            if s["lag_s"] is not None:
+                metrics.registry.set_gauge("doorlock_mirror_lag_seconds", s["lag_s"],
+                                           "로컬 미러 마지막 동기화 이후 경과(초)", table=s["table"])
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Supabase 로컬 미러")
+    ap.add_argument("cmd", choices=["sync", "status"])
+    ap.add_argument("--path", default=MIRROR_PATH)
+    args = ap.parse_args()
+    from doorlock_as_supabase import supabase
+    m = Mirror(supabase, path=args.path)
+    if args.cmd == "sync":
+        t0 = time.perf_counter()
+        for table, n in m.sync_once().items():
+            print(f"  {table:<16} +{n:,}")
+        print(f"✅ 동기화 완료 ({time.perf_counter() - t0:.1f}s)")
+    for s in m.status():
+        print(f"  {s['table']:<16} {s['rows']:>10,}행  지연 {s['lag_s']}s  워터마크 {s['watermark']}"
+              + (f"  ⚠️ {s['last_error']}" if s["last_error"] else ""))
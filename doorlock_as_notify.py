@@ -0,0 +1,443 @@
+# ==================== 알림(SMS) 발송 큐 ====================
+"""
+접수 등록 등 요청 처리 경로에서는 notification_outbox 테이블에 적재(enqueue)만 하고,
+실제 발송은 백그라운드 Dispatcher 가 담당한다.
+
+- outbox: 영속 큐 (status: pending → sending → sent / dead)
+- Dispatcher: 폴링 스레드 + 워커 풀, 공급자(provider)별 배치 발송
+- 공급자별 토큰 버킷 속도 제한
+- 실패 시 지수 백오프(+지터) 재시도, max_attempts 초과/영구 거부 시 dead-letter
+- 로컬 HTTP 스텁 게이트웨이 (개발/테스트용)
+
+    python doorlock_as_notify.py stub-gateway --port 8025 --fail-rate 0.2
+    SMS_GATEWAY_URL=http://127.0.0.1:8025 python doorlock_as_notify.py dispatch --db doorlock_as.db
+    python doorlock_as_notify.py status --db doorlock_as.db
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+DEFAULT_PROVIDER = os.getenv("SMS_PROVIDER", "gateway" if os.getenv("SMS_GATEWAY_URL") else "console")
+
+# 발송 결과
+SENT = "sent"
+RETRY = "retry"    # 일시 오류 → 백오프 후 재시도
+REJECT = "reject"  # 영구 오류(잘못된 번호 등) → 즉시 dead-letter
+
+@dataclass
+class OutboxMessage:
+    id: int
+    provider: str
+    recipient: str
+    message: str
+    attempts: int
+    lease: float = 0.0  # 선점 만료 시각 (next_attempt_at) — 연장/소유 확인용
+
+# ==================== 적재 ====================
+
+def enqueue(conn: sqlite3.Connection, recipient: str, message: str,
+            channel: str = "sms", provider: Optional[str] = None) -> int:
+    """발송 요청 적재 (즉시 반환)"""
+    cur = conn.execute(
+        "INSERT INTO notification_outbox (channel, provider, recipient, message, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+        (channel, provider or DEFAULT_PROVIDER, recipient, message, time.time()),
+    )
+    conn.commit()
+    return cur.lastrowid
+
+def outbox_stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    """상태별 건수"""
+    return dict(conn.execute("SELECT status, COUNT(*) FROM notification_outbox GROUP BY status").fetchall())
+
+def requeue_dead(conn: sqlite3.Connection) -> int:
+    """dead-letter 건을 다시 발송 대기로"""
+    cur = conn.execute(
+        "UPDATE notification_outbox SET status='pending', attempts=0, next_attempt_at=? WHERE status='dead'",
+        (time.time(),),
+    )
+    conn.commit()
+    return cur.rowcount
+
+# ==================== 공급자 ====================
+
+class RateLimiter:
+    """토큰 버킷 (초당 rate 건, 최대 burst 건)"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n: int = 1):
+        n = min(n, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+class Provider(ABC):
+    """
+    발송 공급자 기본형: send 는 (결과, 오류메시지), send_batch 는 {message_id: (결과, 오류메시지)} 반환.
+    배치 API 가 없는 공급자는 send 만 구현하면 send_batch 가 건별로 호출한다.
+    """
+
+    name = "base"
+
+    def __init__(self, batch_size: int = 50, rate_per_sec: float = 20.0):
+        self.batch_size = batch_size
+        self.limiter = RateLimiter(rate_per_sec, burst=max(batch_size, rate_per_sec))
+
+    @abstractmethod
+    def send(self, message: OutboxMessage) -> tuple:
+        ...
+
+    def send_batch(self, messages: List[OutboxMessage]) -> Dict[int, tuple]:
+        results = {}
+        for m in messages:
+            try:
+                results[m.id] = self.send(m)
+            except Exception as e:  # 한 건 오류가 배치 전체를 재시도시키지 않도록
+                results[m.id] = (RETRY, f"{type(e).__name__}: {e}")
+        return results
+
+class ConsoleProvider(Provider):
+    """게이트웨이 미설정 시 콘솔 출력 (기존 스텁 동작)"""
+
+    name = "console"
+
+    def send(self, message):
+        print(f"📱 SMS 발송: {message.recipient} - {message.message}")
+        return SENT, None
+
+class HttpSmsProvider(Provider):
+    """
+    HTTP SMS 게이트웨이 (배치 API)
+      POST {url}/send  {"messages": [{"id", "to", "text"}]}
+      → {"results": [{"id", "status": "ok"|"retry"|"reject", "error"}]}
+    """
+
+    name = "gateway"
+
+    def __init__(self, url: str, api_key: str = "", timeout: float = 5.0, **kw):
+        super().__init__(**kw)
+        self.url = url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def send(self, message):
+        return self.send_batch([message])[message.id]
+
+    def send_batch(self, messages):
+        body = json.dumps({"messages": [{"id": m.id, "to": m.recipient, "text": m.message} for m in messages]})
+        req = urllib.request.Request(
+            f"{self.url}/send", data=body.encode("utf-8"), method="POST",
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                payload = json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            outcome = REJECT if 400 <= e.code < 500 and e.code != 429 else RETRY
+            return {m.id: (outcome, f"HTTP {e.code}") for m in messages}
+        except (urllib.error.URLError, TimeoutError, ConnectionError, ValueError) as e:
+            return {m.id: (RETRY, str(e)) for m in messages}
+
+        status_map = {"ok": SENT, "retry": RETRY, "reject": REJECT}
+        results = {r["id"]: (status_map.get(r.get("status"), RETRY), r.get("error")) for r in payload.get("results", [])}
+        # 응답에 빠진 건은 재시도
+        return {m.id: results.get(m.id, (RETRY, "응답 누락")) for m in messages}
+
+def providers_from_env() -> Dict[str, Provider]:
+    """환경변수로 공급자 구성 (SMS_GATEWAY_URL 없으면 콘솔만)"""
+    providers: Dict[str, Provider] = {"console": ConsoleProvider()}
+    url = os.getenv("SMS_GATEWAY_URL", "").strip()
+    if url:
+        providers["gateway"] = HttpSmsProvider(
+            url,
+            api_key=os.getenv("SMS_GATEWAY_KEY", ""),
+            batch_size=int(os.getenv("SMS_BATCH_SIZE", "100")),
+            rate_per_sec=float(os.getenv("SMS_RATE_PER_SEC", "10")),
+        )
+    return providers
+
+# ==================== 디스패처 ====================
+
+class Dispatcher:
+    """outbox 폴링 → 공급자별 배치 발송 → 결과 기록"""
+
+    def __init__(
+        self,
+        db_path: str,
+        providers: Dict[str, Provider],
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        claim_limit: int = 500,
+        claim_timeout: float = 300.0,
+        max_attempts: int = 6,
+        base_delay: float = 2.0,
+        max_delay: float = 900.0,
+    ):
+        self.db_path = db_path
+        self.providers = providers
+        self.poll_interval = poll_interval
+        self.claim_limit = claim_limit
+        self.claim_timeout = claim_timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sms-worker")
+        self.inflight = threading.BoundedSemaphore(workers * 2)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="sms-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.pool.shutdown(wait=wait)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_once()
+            except sqlite3.OperationalError as e:  # DB 잠김 등 → 다음 주기에 재시도
+                print(f"⚠️ SMS 디스패처 오류: {e}")
+                claimed = 0
+            if claimed < self.claim_limit:
+                self._stop.wait(self.poll_interval)
+
+    def _claim(self) -> List[OutboxMessage]:
+        """
+        발송 대상 선점: 선점 시 next_attempt_at 을 claim_timeout 뒤로 미뤄 두므로
+        프로세스가 죽어도 그 시간이 지나면 다른 디스패처가 다시 가져간다.
+        속도 제한 대기 중 만료되지 않도록 실제 발송 직전에 _renew 로 연장한다.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                rows = conn.execute("""
+                    UPDATE notification_outbox
+                    SET status='sending', next_attempt_at=?
+                    WHERE id IN (
+                        SELECT id FROM notification_outbox
+                        WHERE status IN ('pending','sending') AND next_attempt_at <= ?
+                        ORDER BY next_attempt_at LIMIT ?
+                    )
+                    RETURNING id, provider, recipient, message, attempts
+                """, (now + self.claim_timeout, now, self.claim_limit)).fetchall()
+        finally:
+            conn.close()
+        return [OutboxMessage(*r, lease=now + self.claim_timeout) for r in rows]
+
+    def _renew(self, batch: List[OutboxMessage]) -> List[OutboxMessage]:
+        """
+        발송 직전 선점 연장. 아직 내가 선점한 건(next_attempt_at 이 선점 당시 값 그대로)만 연장해서 반환하고,
+        그 사이 만료되어 다른 디스패처가 가져간 건은 제외한다 (중복 발송 방지).
+        """
+        lease = time.time() + self.claim_timeout
+        owned = []
+        conn = self._connect()
+        try:
+            with conn:
+                for m in batch:
+                    cur = conn.execute(
+                        "UPDATE notification_outbox SET next_attempt_at=? WHERE id=? AND status='sending' AND next_attempt_at=?",
+                        (lease, m.id, m.lease),
+                    )
+                    if cur.rowcount:
+                        m.lease = lease
+                        owned.append(m)
+        finally:
+            conn.close()
+        return owned
+
+    def run_once(self) -> int:
+        """1회 선점 + 배치 분배. 선점 건수 반환"""
+        messages = self._claim()
+        by_provider: Dict[str, List[OutboxMessage]] = {}
+        for m in messages:
+            by_provider.setdefault(m.provider, []).append(m)
+        for name, items in by_provider.items():
+            provider = self.providers.get(name)
+            if provider is None:
+                self._record({m.id: (REJECT, f"알 수 없는 공급자: {name}") for m in items}, items)
+                continue
+            for i in range(0, len(items), provider.batch_size):
+                batch = items[i:i + provider.batch_size]
+                self.inflight.acquire()
+                future = self.pool.submit(self._send, provider, batch)
+                future.add_done_callback(lambda _f: self.inflight.release())
+        return len(messages)
+
+    def _send(self, provider: Provider, batch: List[OutboxMessage]):
+        provider.limiter.acquire(len(batch))
+        batch = self._renew(batch)
+        if not batch:
+            return
+        try:
+            results = provider.send_batch(batch)
+        except Exception as e:  # 공급자 구현 오류도 재시도 대상으로
+            results = {m.id: (RETRY, f"{type(e).__name__}: {e}") for m in batch}
+        self._record(results, batch)
+
+    def _backoff(self, attempts: int) -> float:
+        """지수 백오프 + full jitter"""
+        return random.uniform(self.base_delay, min(self.max_delay, self.base_delay * (2 ** attempts)))
+
+    def _record(self, results: Dict[int, tuple], batch: List[OutboxMessage]):
+        now = time.time()
+        sent, retry, dead = [], [], []
+        for m in batch:
+            outcome, error = results[m.id]
+            if outcome == SENT:
+                sent.append((m.id,))
+            elif outcome == RETRY and m.attempts + 1 < self.max_attempts:
+                retry.append((now + self._backoff(m.attempts + 1), error, m.id))
+            else:
+                dead.append((error, m.id))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    UPDATE notification_outbox
+                    SET status='sent', attempts=attempts+1, last_error=NULL, sent_at=CURRENT_TIMESTAMP
+                    WHERE id=?
+                """, sent)
+                conn.executemany("""
+                    UPDATE notification_outbox
+                    SET status='pending', attempts=attempts+1, next_attempt_at=?, last_error=?
+                    WHERE id=?
+                """, retry)
+                conn.executemany("""
+                    UPDATE notification_outbox
+                    SET status='dead', attempts=attempts+1, last_error=?
+                    WHERE id=?
+                """, dead)
+        finally:
+            conn.close()
+
+# ==================== 로컬 스텁 게이트웨이 ====================
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = "SmsStub/1.0"
+
+    def _json(self, code: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        srv = self.server
+        if self.path != "/send":
+            return self._json(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length", 0))
+        messages = json.loads(self.rfile.read(length) or b"{}").get("messages", [])
+        if srv.latency:
+            time.sleep(srv.latency)
+        if random.random() < srv.fail_rate:
+            return self._json(503, {"error": "injected failure"})
+        results = []
+        with srv.lock:
+            for m in messages:
+                if random.random() < srv.reject_rate:
+                    results.append({"id": m["id"], "status": "reject", "error": "injected reject"})
+                else:
+                    srv.received.append(m)
+                    results.append({"id": m["id"], "status": "ok"})
+            srv.batches += 1
+        self._json(200, {"results": results})
+
+    def do_GET(self):
+        srv = self.server
+        if self.path == "/messages":
+            with srv.lock:
+                return self._json(200, {"batches": srv.batches, "messages": list(srv.received)})
+        self._json(404, {"error": "not found"})
+
+    def log_message(self, fmt, *args):
+        pass
+
+def make_stub_gateway(host: str = "127.0.0.1", port: int = 8025, fail_rate: float = 0.0,
+                      reject_rate: float = 0.0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """
+    스텁 게이트웨이 서버 생성 (serve_forever 는 호출 측에서).
+    fail_rate 비율로 503, reject_rate 비율로 건별 reject, latency 초 지연을 주입한다.
+    GET /messages 로 수신 내역 확인.
+    """
+    srv = ThreadingHTTPServer((host, port), _StubHandler)
+    srv.fail_rate, srv.reject_rate, srv.latency = fail_rate, reject_rate, latency
+    srv.lock = threading.Lock()
+    srv.received, srv.batches = [], 0
+    return srv
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="SMS 발송 큐")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    g = sub.add_parser("stub-gateway", help="로컬 스텁 게이트웨이 실행")
+    g.add_argument("--host", default="127.0.0.1")
+    g.add_argument("--port", type=int, default=8025)
+    g.add_argument("--fail-rate", type=float, default=0.0)
+    g.add_argument("--reject-rate", type=float, default=0.0)
+    g.add_argument("--latency", type=float, default=0.0)
+    d = sub.add_parser("dispatch", help="디스패처 단독 실행")
+    d.add_argument("--db", default="doorlock_as.db")
+    d.add_argument("--workers", type=int, default=4)
+    s = sub.add_parser("status", help="outbox 상태별 건수")
+    s.add_argument("--db", default="doorlock_as.db")
+    s.add_argument("--requeue-dead", action="store_true")
+    args = ap.parse_args()
+
+    if args.cmd == "stub-gateway":
+        srv = make_stub_gateway(args.host, args.port, args.fail_rate, args.reject_rate, args.latency)
+        print(f"✅ SMS 스텁 게이트웨이: http://{args.host}:{args.port}")
+        srv.serve_forever()
+    elif args.cmd == "dispatch":
+        dispatcher = Dispatcher(args.db, providers_from_env(), workers=args.workers)
+        dispatcher.start()
+        print("✅ SMS 디스패처 실행 중 (Ctrl+C 종료)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            dispatcher.stop()
+    else:
+        conn = sqlite3.connect(args.db)
+        if args.requeue_dead:
+            print(f"🔁 {requeue_dead(conn)}건 재발송 대기로 변경")
+        print(outbox_stats(conn))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# ==================== 페이지 rerun 프로파일러 ====================
+"""
+페이지/팝업 함수 1회 실행(rerun)을 측정하고 시간을 구간(phase)별로 나눈다.
+
+- db        : SQL 실행 + fetch (run_query, fetch_scalar/fetch_row/fetch_columns)
+- dataframe : 조회 결과 → DataFrame 생성
+- export    : 엑셀 등 파일 생성 (download_excel)
+- render    : 나머지 (위젯 구성, pandas 가공 등)
+
+구간은 배타적으로 측정한다(중첩되면 바깥 구간은 멈춤). 페이지 안에서 열린 팝업도 마찬가지로
+팝업 쪽에만 기록하고 페이지는 자기 시간(self time)만 남긴다. 페이지별 최근 ROLLING_WINDOW 회의
+분위수(p50/p90/p99)를 유지하고, 요청 시 한 번의 rerun 을 cProfile 로 캡처해 .prof 로 남긴다.
+측정은 opt-in 이며(AS_PROFILE=1 또는 세션별 토글), 꺼져 있으면 phase() 는 거의 비용이 없다.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List
+
+ENABLED = os.getenv("AS_PROFILE", "0") == "1"
+ROLLING_WINDOW = int(os.getenv("AS_PROFILE_WINDOW", "200"))
+PROFILE_DIR = os.getenv("AS_PROFILE_DIR", os.path.join("logs", "profiles"))
+PHASES = ("db", "dataframe", "export", "render")
+
+class _Frame:
+    """실행 중인 페이지 1회분 측정 상태"""
+
+    __slots__ = ("name", "start", "phases", "stack", "nested")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.stack: List[List[Any]] = []  # [구간명, 시작시각]
+        self.nested = 0.0  # 안쪽 profile_run(팝업) 이 쓴 시간 — 이 페이지 합계에서 제외
+
+_frames: ContextVar[tuple] = ContextVar("profile_frames", default=())
+
+# ==================== 구간 측정 ====================
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """현재 페이지 측정에 구간 시간 누적 (측정 중이 아니면 아무것도 하지 않음)"""
+    frames = _frames.get()
+    if not frames:
+        yield
+        return
+    frame = frames[-1]
+    now = time.perf_counter()
+    if frame.stack:  # 바깥 구간 일시 정지
+        outer = frame.stack[-1]
+        frame.phases[outer[0]] += now - outer[1]
+    frame.stack.append([name, now])
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        inner = frame.stack.pop()
+        frame.phases[inner[0]] += now - inner[1]
+        if frame.stack:
+            frame.stack[-1][1] = now
+
+# ==================== 집계 ====================
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+class ProfileStore:
+    """페이지별 최근 실행 기록 (프로세스 단위)"""
+
+    def __init__(self, window: int = ROLLING_WINDOW):
+        self.lock = threading.Lock()
+        self.window = window
+        self.runs: Dict[str, Deque[Dict[str, float]]] = {}
+        self.captures: Deque[Dict[str, Any]] = deque(maxlen=10)
+
+    def add(self, name: str, sample: Dict[str, float]):
+        with self.lock:
+            if name not in self.runs:
+                self.runs[name] = deque(maxlen=self.window)
+            self.runs[name].append(sample)
+
+    def add_capture(self, capture: Dict[str, Any]):
+        with self.lock:
+            self.captures.appendleft(capture)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """페이지별 총 소요 분위수 + 구간별 평균 (ms)"""
+        with self.lock:
+            runs = {k: list(v) for k, v in self.runs.items()}
+        rows = []
+        for name, samples in runs.items():
+            totals = sorted(s["total"] for s in samples)
+            n = len(samples)
+            row = {
+                "page": name,
+                "runs": n,
+                "p50_ms": round(_percentile(totals, 0.50) * 1000, 1),
+                "p90_ms": round(_percentile(totals, 0.90) * 1000, 1),
+                "p99_ms": round(_percentile(totals, 0.99) * 1000, 1),
+                "max_ms": round(totals[-1] * 1000, 1),
+            }
+            for p in PHASES:
+                row[f"avg_{p}_ms"] = round(sum(s.get(p, 0.0) for s in samples) / n * 1000, 1)
+            rows.append(row)
+        return sorted(rows, key=lambda r: r["p90_ms"], reverse=True)
+
+    def reset(self):
+        with self.lock:
+            self.runs.clear()
+
+store = ProfileStore()
+
+# ==================== 페이지 실행 측정 ====================
+
+def _capture_path(name: str) -> str:
+    safe = re.sub(r"[^\w가-힣]+", "_", name).strip("_") or "page"
+    return os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{safe}.prof")
+
+@contextmanager
+def profile_run(name: str, enabled: bool = False, capture: bool = False) -> Iterator[None]:
+    """
+    페이지/팝업 1회 실행 측정.
+    enabled=False 면 측정하지 않는다. capture=True 면 cProfile 로 전체 호출을 기록한다.
+    """
+    if not (enabled or capture):
+        yield
+        return
+    frame = _Frame(name)
+    parents = _frames.get()
+    token = _frames.set(parents + (frame,))
+    profiler = cProfile.Profile() if capture else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        _frames.reset(token)
+        elapsed = time.perf_counter() - frame.start
+        total = elapsed - frame.nested
+        if parents:  # 바깥 페이지에서는 이 시간을 빼서 두 번 세지 않음
+            parent = parents[-1]
+            parent.nested += elapsed
+            if parent.stack:
+                parent.stack[-1][1] += elapsed
+        sample = {p: frame.phases.get(p, 0.0) for p in PHASES if p != "render"}
+        sample["render"] = max(0.0, total - sum(sample.values()))
+        sample["total"] = total
+        store.add(name, sample)
+        if profiler:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = _capture_path(name)
+            profiler.dump_stats(path)
+            buf = io.StringIO()
+            pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(30)
+            store.add_capture({
+                "page": name,
+                "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "total_ms": round(total * 1000, 1),
+                "path": path,
+                "report": buf.getvalue(),
+            })
@@ -0,0 +1,98 @@
+# ==================== 접수 수정 (낙관적 동시성) ====================
+"""
+수정 팝업을 열 때 읽은 행(기준)과 입력값을 비교해 바뀐 필드만 저장한다.
+
+  - as_reception.version: 저장할 때마다 +1. UPDATE ... WHERE id=? AND version=? 가 0건이면
+    그 사이 다른 사용자가 저장한 것(충돌) → 최신 행을 다시 읽어 병합 화면을 보여준다
+  - 병합: 다른 사용자만 바꾼 필드는 그대로 두고, 나만 바꾼 필드는 자동 반영,
+    둘 다 다르게 바꾼 필드만 사용자에게 고르게 한다
+  - 감사 로그에는 바뀐 필드만 {필드: 값} JSON 으로 old_value/new_value 에 남긴다
+"""
+import json
+import sqlite3
+from typing import Any, Dict, Optional, Tuple
+
+import doorlock_as_dispatch as dispatch
+import doorlock_as_sla as sla
+
+# 수정 팝업이 읽는 컬럼 (표시용 + 비교 대상)
+EDIT_COLUMNS = (
+    "id", "version", "reception_number", "registrant_name", "created_at", "attachment_path",
+    "customer_name", "phone", "phone_norm", "order_number", "address", "address_detail", "sido", "sigungu",
+    "model_code", "symptom_category", "symptom_code", "symptom_description",
+    "detail_content", "status", "payment_type", "install_date", "complete_date",
+)
+
+FIELD_LABELS = {
+    "customer_name": "고객명", "phone": "전화번호", "phone_norm": "전화번호(숫자)", "order_number": "주문번호",
+    "address": "주소", "address_detail": "상세주소", "sido": "시/도", "sigungu": "시·군·구",
+    "model_code": "제품 모델", "symptom_category": "증상 대분류", "symptom_code": "증상 상세",
+    "symptom_description": "증상명", "detail_content": "상세 내용", "status": "상태",
+    "payment_type": "유무상", "install_date": "설치일자", "complete_date": "완료일",
+}
+
+def _norm(v: Any) -> str:
+    # None / '' / NaN 은 같은 값
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    return str(v)
+
+def same(a: Any, b: Any) -> bool:
+    return _norm(a) == _norm(b)
+
+def load(conn: sqlite3.Connection, reception_number: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        f"SELECT {', '.join(EDIT_COLUMNS)} FROM as_reception WHERE reception_number=?", (reception_number,)
+    ).fetchone()
+    return dict(zip(EDIT_COLUMNS, row)) if row else None
+
+def diff(base: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+    """기준 행과 다른 필드만 {필드: 새 값}"""
+    return {c: v for c, v in values.items() if not same(base.get(c), v)}
+
+def update(conn: sqlite3.Connection, base: Dict[str, Any], changes: Dict[str, Any],
+           user_id: Optional[int]) -> bool:
+    """
+    바뀐 필드만 저장 + 감사 로그 (한 트랜잭션). base['version'] 이 그대로일 때만 반영.
+    충돌(그 사이 다른 저장)이면 False
+    """
+    if not changes:
+        return True
+    unknown = set(changes) - set(FIELD_LABELS)
+    if unknown:
+        raise ValueError(f"수정할 수 없는 컬럼: {sorted(unknown)}")
+    sets = ", ".join(f"{c}=?" for c in changes)
+    with conn:
+        cur = conn.execute(
+            f"UPDATE as_reception SET {sets}, version=version+1, updated_at=CURRENT_TIMESTAMP "
+            f"WHERE id=? AND version=?",
+            [*changes.values(), base["id"], base["version"]],
+        )
+        if not cur.rowcount:
+            return False
+        sla.sync(conn, [base["id"]])
+        if "status" in changes:
+            dispatch.close_finished(conn, [base["id"]])
+        conn.execute(
+            "INSERT INTO audit_log (user_id, action, table_name, record_id, old_value, new_value) VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, 'UPDATE', 'as_reception', base["id"],
+             json.dumps({c: base.get(c) for c in changes}, ensure_ascii=False, default=str),
+             json.dumps(changes, ensure_ascii=False, default=str)),
+        )
+    return True
+
+def merge(base: Dict[str, Any], current: Dict[str, Any],
+          mine: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Tuple[Any, Any]]]:
+    """
+    (자동 반영할 내 변경, 충돌 {필드: (다른 사용자 값, 내 값)}).
+    다른 사용자가 같은 값으로 바꾼 필드는 어느 쪽에도 넣지 않는다
+    """
+    auto, conflicts = {}, {}
+    for c, v in mine.items():
+        if same(current.get(c), v):
+            continue
+        if same(base.get(c), current.get(c)):
+            auto[c] = v
+        else:
+            conflicts[c] = (current.get(c), v)
+    return auto, conflicts
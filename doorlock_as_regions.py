@@ -0,0 +1,147 @@
+# ==================== 대한민국 행정구역 ====================
+"""
+시/도 → 시·군·구 기준 데이터와 명칭 정규화.
+주소 검색 인덱스(doorlock_as_address)와 접수 화면이 같은 명칭을 쓰도록 여기서 통일한다.
+"""
+import sqlite3
+from typing import Optional, Tuple
+
+KOREA_REGIONS = {
+    "서울특별시": [
+        "강남구","강동구","강북구","강서구","관악구","광진구","구로구","금천구","노원구","도봉구",
+        "동대문구","동작구","마포구","서대문구","서초구","성동구","성북구","송파구","양천구","영등포구",
+        "용산구","은평구","종로구","중구","중랑구"
+    ],
+    "부산광역시": [
+        "강서구","금정구","기장군","남구","동구","동래구","부산진구","북구","사상구","사하구",
+        "서구","수영구","연제구","영도구","중구","해운대구"
+    ],
+    "대구광역시": ["남구","달서구","달성군","동구","북구","서구","수성구","중구"],
+    "인천광역시": ["강화군","계양구","미추홀구","남동구","동구","부평구","서구","연수구","옹진군","중구"],
+    "광주광역시": ["광산구","남구","동구","북구","서구"],
+    "대전광역시": ["대덕구","동구","서구","유성구","중구"],
+    "울산광역시": ["남구","동구","북구","울주군","중구"],
+    "세종특별자치시": ["세종시"],
+    "경기도": [
+        "가평군","고양시 덕양구","고양시 일산동구","고양시 일산서구","과천시","광명시","광주시","구리시",
+        "군포시","김포시","남양주시","동두천시","부천시","성남시 분당구","성남시 수정구","성남시 중원구",
+        "수원시 권선구","수원시 영통구","수원시 장안구","수원시 팔달구","시흥시","안산시 단원구","안산시 상록구",
+        "안성시","안양시 동안구","안양시 만안구","양주시","양평군","여주시","연천군","오산시",
+        "용인시 기흥구","용인시 수지구","용인시 처인구","의왕시","의정부시","이천시","파주시","평택시",
+        "포천시","하남시","화성시"
+    ],
+    "강원특별자치도": [
+        "강릉시","고성군","동해시","삼척시","속초시","양구군","양양군","영월군","원주시","인제군",
+        "정선군","철원군","춘천시","태백시","평창군","홍천군","화천군","횡성군"
+    ],
+    "충청북도": [
+        "괴산군","단양군","보은군","영동군","옥천군","음성군","제천시","증평군","진천군",
+        "청주시 상당구","청주시 서원구","청주시 청원구","청주시 흥덕구","충주시"
+    ],
+    "충청남도": [
+        "계룡시","공주시","금산군","논산시","당진시","보령시","부여군","서산시","서천군",
+        "아산시","예산군","천안시 동남구","천안시 서북구","청양군","태안군","홍성군"
+    ],
+    "전라북도": [
+        "고창군","군산시","김제시","남원시","무주군","부안군","순창군","완주군",
+        "익산시","임실군","장수군","전주시 덕진구","전주시 완산구","정읍시","진안군"
+    ],
+    "전라남도": [
+        "강진군","고흥군","곡성군","광양시","구례군","나주시","담양군","목포시","무안군",
+        "보성군","순천시","신안군","여수시","영광군","영암군","완도군","장성군","장흥군",
+        "진도군","함평군","해남군","화순군"
+    ],
+    "경상북도": [
+        "경산시","경주시","고령군","구미시","군위군","김천시","문경시","봉화군","상주시",
+        "성주군","안동시","영덕군","영양군","영주시","영천시","예천군","울릉군","울진군",
+        "의성군","청도군","청송군","칠곡군","포항시 남구","포항시 북구"
+    ],
+    "경상남도": [
+        "거제시","거창군","고성군","김해시","남해군","밀양시","사천시","산청군","양산시",
+        "의령군","진주시","창녕군","창원시 마산합포구","창원시 마산회원구","창원시 성산구",
+        "창원시 의창구","창원시 진해구","통영시","하동군","함안군","함양군","합천군"
+    ],
+    "제주특별자치도": ["서귀포시","제주시"]
+}
+
+# 도로명주소 데이터/사용자 입력에서 나오는 시/도 표기 → KOREA_REGIONS 키
+SIDO_ALIASES = {
+    "서울": "서울특별시", "서울시": "서울특별시",
+    "부산": "부산광역시", "부산시": "부산광역시",
+    "대구": "대구광역시", "대구시": "대구광역시",
+    "인천": "인천광역시", "인천시": "인천광역시",
+    "광주": "광주광역시", "광주시": "광주광역시",
+    "대전": "대전광역시", "대전시": "대전광역시",
+    "울산": "울산광역시", "울산시": "울산광역시",
+    "세종": "세종특별자치시", "세종시": "세종특별자치시",
+    "경기": "경기도",
+    "강원": "강원특별자치도", "강원도": "강원특별자치도",
+    "충북": "충청북도", "충남": "충청남도",
+    "전북": "전라북도", "전북특별자치도": "전라북도",
+    "전남": "전라남도",
+    "경북": "경상북도", "경남": "경상남도",
+    "제주": "제주특별자치도", "제주도": "제주특별자치도",
+}
+
+def normalize_sido(name: Optional[str]) -> Optional[str]:
+    """시/도 표기 정규화 (알 수 없으면 None)"""
+    if not name:
+        return None
+    name = name.strip()
+    if name in KOREA_REGIONS:
+        return name
+    return SIDO_ALIASES.get(name)
+
+# ==================== 주소 → 시/도, 시·군·구 ====================
+
+# 시/도별 시·군·구 (긴 이름 우선: '고양시 덕양구'가 '고양시'보다 먼저 매칭되도록)
+_SGG_BY_LENGTH = {sido: sorted(sggs, key=len, reverse=True) for sido, sggs in KOREA_REGIONS.items()}
+
+def parse_region(address: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    주소 문자열 앞부분을 KOREA_REGIONS 기준으로 해석.
+    (시/도, 시·군·구) 반환, 해석 불가 부분은 None.
+    """
+    if not address:
+        return None, None
+    parts = address.strip().split(maxsplit=1)
+    sido = normalize_sido(parts[0]) if parts else None
+    if not sido:
+        return None, None
+    rest = parts[1] if len(parts) > 1 else ""
+    for sgg in _SGG_BY_LENGTH[sido]:
+        if rest == sgg or rest.startswith(sgg + " "):
+            return sido, sgg
+    if len(KOREA_REGIONS[sido]) == 1:  # 세종특별자치시: 시·군·구 생략 표기
+        return sido, KOREA_REGIONS[sido][0]
+    return sido, None
+
+def backfill_regions(conn: sqlite3.Connection, batch_size: int = 5000) -> int:
+    """
+    sido 가 비어 있는 기존 접수건의 address 를 해석해 sido/sigungu 채우기.
+    해석하지 못한 건은 '' 로 기록해 다음 실행에서 다시 읽지 않는다. 처리 건수 반환.
+    """
+    total = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, address FROM as_reception WHERE sido IS NULL LIMIT ?", (batch_size,)
+        ).fetchall()
+        if not rows:
+            return total
+        updates = []
+        for rid, address in rows:
+            sido, sgg = parse_region(address)
+            updates.append((sido or "", sgg or "", rid))
+        conn.executemany("UPDATE as_reception SET sido=?, sigungu=? WHERE id=?", updates)
+        conn.commit()
+        total += len(updates)
+
+if __name__ == "__main__":
+    # 기존 데이터 지역 컬럼 채우기: python doorlock_as_regions.py [doorlock_as.db]
+    import sys
+    from doorlock_as_schema import migrate
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "doorlock_as.db"
+    with sqlite3.connect(db_path) as _conn:
+        migrate(_conn)
+        print(f"✅ {backfill_regions(_conn):,}건 지역 정보 채움")
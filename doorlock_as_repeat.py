@@ -0,0 +1,123 @@
+# ==================== 재접수/중복 접수 탐지 ====================
+"""
+전화번호를 숫자만 남긴 phone_norm 컬럼과 (phone_norm, model_code, request_date) 인덱스로
+- 접수 등록 시 같은 번호(·모델)의 이전 접수 조회: 인덱스 탐색 O(log n)
+- 재접수율: 같은 고객+모델의 직전 접수와의 간격을 LAG 로 계산.
+  인덱스 순서로 한 번 훑으면 되므로 자기 조인/정렬이 없다.
+
+    python doorlock_as_repeat.py backfill doorlock_as.db
+    python doorlock_as_repeat.py report doorlock_as.db --days 30
+"""
+import argparse
+import re
+import sqlite3
+from typing import Optional
+
+import pandas as pd
+
+_NON_DIGIT = re.compile(r"\D")
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """'010-1234-5678' / '+82 10 1234 5678' / '(02)123-4567' → 숫자만 ('01012345678'). 해석 불가면 ''"""
+    if not phone:
+        return ""
+    digits = _NON_DIGIT.sub("", phone)
+    if digits.startswith("82") and phone.strip().startswith("+"):
+        digits = "0" + digits[2:]
+    return digits if 8 <= len(digits) <= 12 else ""
+
+def backfill_phone_norm(conn: sqlite3.Connection, batch_size: int = 5000) -> int:
+    """phone_norm 이 비어 있는 접수건 채우기 (해석 불가는 ''). 처리 건수 반환"""
+    total = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, phone FROM as_reception WHERE phone_norm IS NULL LIMIT ?", (batch_size,)
+        ).fetchall()
+        if not rows:
+            return total
+        conn.executemany("UPDATE as_reception SET phone_norm=? WHERE id=?",
+                         [(normalize_phone(phone), rid) for rid, phone in rows])
+        conn.commit()
+        total += len(rows)
+
+# ==================== 조회 ====================
+
+def prior_receptions(conn: sqlite3.Connection, phone: str, limit: int = 10) -> pd.DataFrame:
+    """같은 전화번호의 이전 접수 (최근순). 번호가 짧거나 해석 불가면 빈 결과"""
+    norm = normalize_phone(phone)
+    if not norm:
+        return pd.DataFrame()
+    return pd.read_sql_query("""
+        SELECT id, reception_number, request_date, model_code, symptom_code, symptom_description,
+               status, branch_name, customer_name
+        FROM as_reception
+        WHERE phone_norm = ?
+        ORDER BY request_date DESC, id DESC
+        LIMIT ?
+    """, conn, params=(norm, limit))
+
+REPEAT_GROUPS = {
+    "모델": "model_code",
+    "지점": "branch_name",
+    "증상": "symptom_code",
+    "월": "substr(request_date, 1, 7)",
+}
+
+def repeat_rate(conn: sqlite3.Connection, date_from: str, date_to: str, days: int = 30,
+                group_by: str = "모델", branch_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    기간 내 접수 중 같은 고객(phone_norm)+모델의 직전 접수가 days 일 이내인 비율.
+    직전 접수는 기간 시작 전(최대 days 일)까지 본다. 같은 요청일 재접수는 '중복 의심'으로 따로 센다.
+    """
+    key = REPEAT_GROUPS[group_by]
+    where, params = ["request_date >= ?", "request_date <= ?"], [str(date_from), str(date_to)]
+    if branch_id is not None:
+        where.append("branch_id = ?"); params.append(branch_id)
+    return pd.read_sql_query(f"""
+        WITH seq AS (
+            SELECT request_date, model_code, branch_id, branch_name, symptom_code,
+                   julianday(request_date) - julianday(
+                       LAG(request_date) OVER (PARTITION BY phone_norm, model_code ORDER BY request_date)
+                   ) AS gap
+            FROM as_reception INDEXED BY idx_as_reception_phone
+            WHERE phone_norm > '' AND request_date >= date(?, ?)
+        )
+        SELECT {key} AS 구분,
+               COUNT(*) AS 접수,
+               COUNT(CASE WHEN gap <= ? THEN 1 END) AS 재접수,
+               COUNT(CASE WHEN gap = 0 THEN 1 END) AS 중복의심,
+               ROUND(100.0 * COUNT(CASE WHEN gap <= ? THEN 1 END) / COUNT(*), 1) AS "재접수율(%)"
+        FROM seq
+        WHERE {' AND '.join(where)}
+        GROUP BY {key}
+        ORDER BY 재접수 DESC, 접수 DESC
+    """, conn, params=[str(date_from), f"-{int(days)} days", days, days] + params)
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="재접수/중복 접수 탐지")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("backfill", help="phone_norm 채우기")
+    b.add_argument("db", nargs="?", default="doorlock_as.db")
+    r = sub.add_parser("report", help="재접수율")
+    r.add_argument("db", nargs="?", default="doorlock_as.db")
+    r.add_argument("--from", dest="date_from", default="0000-01-01")
+    r.add_argument("--to", dest="date_to", default="9999-12-31")
+    r.add_argument("--days", type=int, default=30)
+    r.add_argument("--by", choices=list(REPEAT_GROUPS), default="모델")
+    args = ap.parse_args()
+
+    from doorlock_as_schema import migrate
+    conn = sqlite3.connect(args.db)
+    migrate(conn)
+    if args.cmd == "backfill":
+        print(f"✅ {backfill_phone_norm(conn):,}건 처리")
+    else:
+        backfill_phone_norm(conn)
+        pd.set_option("display.width", 160)
+        print(repeat_rate(conn, args.date_from, args.date_to, args.days, args.by).to_string(index=False))
+    conn.close()
+
+if __name__ == "__main__":
+    main()
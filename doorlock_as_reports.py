@@ -0,0 +1,348 @@
+# ==================== 월말 지점별 보고서 (PDF / 엑셀) ====================
+"""
+지점별 인건비 정산서와 VOC 요약을 PDF/xlsx 로 한꺼번에 만들어 zip 하나로 묶는다.
+
+  - 데이터는 본 프로세스에서 월 전체를 한 번에 조회(지점 수만큼 쿼리하지 않음)한 뒤 지점별로 나눈다
+  - 렌더링(PDF: PyMuPDF + 내장 CJK 글꼴 부분 임베드, xlsx: openpyxl write-only)은 프로세스 풀에서
+    지점×보고서×형식 단위로 병렬 실행. 워커는 결과 파일을 직접 쓰고 경로만 돌려준다
+  - 캐시: REPORT_DIR/YYYY-MM/ 아래에 내용 지문(digest)이 들어간 파일명으로 저장.
+    같은 데이터면 다시 만들지 않고, 늦게 검수된 건이 있으면 그 지점 파일만 새로 만든다
+
+    python doorlock_as_reports.py build doorlock_as.db --month 2026-09 --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import zipfile
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import doorlock_as_archive as archive
+
+REPORT_DIR = os.getenv("REPORT_DIR", "reports")
+VAT_RATE = 0.1
+FORMATS = ("pdf", "xlsx")
+
+# 보고서별 표 컬럼: (이름, 너비 비율, 정렬 l/r)
+REPORTS = {
+    "settlement": {
+        "label": "인건비 정산서",
+        "columns": [("접수번호", 1.4, "l"), ("접수일자", 1.0, "l"), ("처리완료일자", 1.1, "l"), ("검수일자", 1.0, "l"),
+                    ("고객명", 0.8, "l"), ("인건비", 0.9, "r"), ("인건비사유", 1.0, "l"), ("증상명", 1.6, "l")],
+    },
+    "voc": {
+        "label": "VOC 요약",
+        "columns": [("모델", 1.0, "l"), ("증상코드", 0.9, "l"), ("증상명", 2.6, "l"),
+                    ("건수", 0.7, "r"), ("검수완료", 0.8, "r"), ("비율(%)", 0.8, "r")],
+    },
+}
+
+# ==================== 데이터 (본 프로세스) ====================
+
+def _month_range(month: str):
+    y, m = map(int, month.split("-"))
+    return f"{month}-01", f"{month}-{monthrange(y, m)[1]:02d}"
+
+def _by_branch(rows: List[tuple]) -> Dict[int, List[tuple]]:
+    # rows 는 branch_id 순 정렬, 첫 컬럼이 branch_id
+    return {b: [r[1:] for r in grp] for b, grp in groupby(rows, key=lambda r: r[0])}
+
+def _settlement_rows(conn: sqlite3.Connection, start: str, end: str) -> Dict[int, List[tuple]]:
+    with archive.span(conn, "complete_date", start, end, tables=("as_reception", "as_result")) as src:
+        rows = conn.execute(f"""
+            SELECT ar.branch_id, ar.reception_number, DATE(ar.created_at), ar.complete_date, DATE(ar.updated_at),
+                   ar.customer_name, COALESCE(asr.labor_cost, 0), COALESCE(asr.labor_reason, ''),
+                   COALESCE(ar.symptom_description, '')
+            FROM {src['as_reception']} ar
+            LEFT JOIN {src['as_result']} asr ON asr.reception_id = ar.id
+            WHERE ar.status='검수완료' AND ar.complete_date >= ? AND ar.complete_date <= ?
+            ORDER BY ar.branch_id, ar.complete_date, ar.reception_number
+        """, (start, end)).fetchall()
+    return _by_branch(rows)
+
+def _voc_rows(conn: sqlite3.Connection, start: str, end: str) -> Dict[int, List[tuple]]:
+    with archive.span(conn, "request_date", start, end) as src:
+        rows = conn.execute(f"""
+            SELECT branch_id, COALESCE(model_code, ''), COALESCE(symptom_code, ''),
+                   COALESCE(MAX(symptom_description), ''), COUNT(*), SUM(status='검수완료')
+            FROM {src['as_reception']}
+            WHERE request_date >= ? AND request_date < DATE(?, '+1 day')
+            GROUP BY branch_id, model_code, symptom_code
+            ORDER BY branch_id, COUNT(*) DESC, model_code, symptom_code
+        """, (start, end)).fetchall()
+    return _by_branch(rows)
+
+def _settlement(branch: tuple, month: str, rows: List[tuple]) -> Dict[str, Any]:
+    _, code, name, billing = branch
+    subtotal = int(sum(r[5] for r in rows))
+    final = int(subtotal * (1 + VAT_RATE)) if billing == "세금계산서" else subtotal
+    return {
+        "title": f"{REPORTS['settlement']['label']} — {name}",
+        "meta": [("정산월", month), ("지점코드", code or ""), ("세금유형", billing or "")],
+        "rows": rows,
+        "totals": [("작업건수", f"{len(rows):,}건"), ("인건비 합계(공급가)", f"{subtotal:,}원"),
+                   ("부가세", f"{final - subtotal:,}원"), ("최종 정산금액", f"{final:,}원")],
+    }
+
+def _voc(branch: tuple, month: str, rows: List[tuple]) -> Dict[str, Any]:
+    _, code, name, _ = branch
+    total = sum(r[3] for r in rows)
+    done = sum(r[4] or 0 for r in rows)
+    table = [(*r[:4], r[4] or 0, round(100 * r[3] / total, 1)) for r in rows]
+    top = rows[0] if rows else None
+    return {
+        "title": f"{REPORTS['voc']['label']} — {name}",
+        "meta": [("접수월", month), ("지점코드", code or "")],
+        "rows": table,
+        "totals": [("총 접수", f"{total:,}건"), ("검수완료", f"{done:,}건"), ("처리 중", f"{total - done:,}건"),
+                   ("최다 증상", f"{top[0]} {top[1]} {top[2]} ({top[3]:,}건)" if top else "-")],
+    }
+
+def collect(conn: sqlite3.Connection, month: str, kinds: Sequence[str] = tuple(REPORTS),
+            branch_ids: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+    """지점×보고서별 내용 (워커로 넘길 수 있는 기본 타입만). 데이터가 없는 지점은 건너뛴다"""
+    start, end = _month_range(month)
+    branches = conn.execute("SELECT id, branch_code, branch_name, billing_type FROM branch ORDER BY branch_code, id").fetchall()
+    if branch_ids is not None:
+        branches = [b for b in branches if b[0] in set(branch_ids)]
+    data = {"settlement": (_settlement_rows, _settlement), "voc": (_voc_rows, _voc)}
+    out = []
+    for kind in kinds:
+        load, build = data[kind]
+        rows = load(conn, start, end)
+        for b in branches:
+            if rows.get(b[0]):
+                out.append({"kind": kind, "month": month, "branch_id": b[0], "branch_name": b[2],
+                            **build(b, month, rows[b[0]])})
+    return out
+
+def digest(report: Dict[str, Any]) -> str:
+    """내용 지문 (같으면 캐시 파일 재사용)"""
+    body = json.dumps([report["title"], report["meta"], report["rows"], report["totals"]],
+                      ensure_ascii=False, default=str)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()[:12]
+
+def report_path(report: Dict[str, Any], fmt: str, report_dir: Optional[str] = None) -> str:
+    folder = os.path.join(report_dir or REPORT_DIR, report["month"])
+    return os.path.join(folder, f"b{report['branch_id']}_{report['kind']}_{digest(report)}.{fmt}")
+
+# ==================== 렌더링 (워커 프로세스) ====================
+
+_FONT = None
+
+def _font():
+    # 내장 CJK 글꼴 (워커마다 한 번 로드)
+    global _FONT
+    if _FONT is None:
+        try:
+            import pymupdf
+        except ImportError:
+            raise RuntimeError("PDF 출력에는 PyMuPDF(pymupdf) 설치가 필요합니다.")
+        _FONT = pymupdf.Font("cjk")
+    return _FONT
+
+def _cell(v: Any) -> str:
+    if isinstance(v, float):
+        return f"{v:,.1f}"
+    if isinstance(v, int):
+        return f"{v:,}"
+    return "" if v is None else str(v)
+
+def _fit(text: str, width: float, size: float) -> str:
+    font = _font()
+    if font.text_length(text, size) <= width:
+        return text
+    while text and font.text_length(text + "…", size) > width:
+        text = text[:-1]
+    return text + "…"
+
+def _write_pdf(report: Dict[str, Any], path: str):
+    import pymupdf
+
+    font = _font()
+    W, H, M, ROW = 595, 842, 36, 14
+    columns = REPORTS[report["kind"]]["columns"]
+    scale = (W - 2 * M) / sum(w for _, w, _ in columns)
+    xs = [M]
+    for _, w, _ in columns:
+        xs.append(xs[-1] + w * scale)
+    rows = report["rows"]
+    first_rows = int((H - M - 150 - ROW) // ROW)
+    per_page = int((H - 2 * M - 20 - ROW) // ROW)
+    pages = [rows[:first_rows]] + [rows[i:i + per_page] for i in range(first_rows, len(rows), per_page)]
+    doc = pymupdf.open()
+
+    def line(tw, x, y, text, size=8, align="l", width=None):
+        if width is not None:
+            text = _fit(text, width - (12 if align == "r" else 6), size)
+        if align == "r":
+            x = x + width - 12 - font.text_length(text, size)
+        tw.append((x, y), text, font=font, fontsize=size)
+
+    for n, chunk in enumerate(pages):
+        page = doc.new_page(width=W, height=H)
+        tw = pymupdf.TextWriter(page.rect)
+        y = M + 14
+        if n == 0:
+            line(tw, M, y, report["title"], 16)
+            y += 22
+            line(tw, M, y, "   ".join(f"{k}: {v}" for k, v in report["meta"]), 9)
+            y += 18
+        page.draw_rect(pymupdf.Rect(M, y - 10, W - M, y + ROW - 10), color=None, fill=(0.9, 0.9, 0.9))
+        for (name, _, align), x0, x1 in zip(columns, xs, xs[1:]):
+            line(tw, x0 + 2, y, name, 8, align, x1 - x0)
+        for r in chunk:
+            y += ROW
+            for v, (_, _, align), x0, x1 in zip(r, columns, xs, xs[1:]):
+                line(tw, x0 + 2, y, _cell(v), 8, align, x1 - x0)
+        if n == len(pages) - 1:
+            if y + 20 + ROW * len(report["totals"]) > H - M:
+                tw.write_text(page)
+                page = doc.new_page(width=W, height=H)
+                tw, y = pymupdf.TextWriter(page.rect), M
+            y += 20
+            for k, v in report["totals"]:
+                line(tw, M, y, k, 10)
+                line(tw, M + 150, y, v, 10)
+                y += ROW
+        tw.write_text(page)
+    for i, page in enumerate(doc, 1):
+        tw = pymupdf.TextWriter(page.rect)
+        line(tw, M, H - M / 2, f"{report['title']} · {report['month']} · {i}/{doc.page_count}", 7)
+        tw.write_text(page, color=(0.4, 0.4, 0.4))
+    doc.subset_fonts()
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+def _write_xlsx(report: Dict[str, Any], path: str):
+    from openpyxl import Workbook
+
+    columns = REPORTS[report["kind"]]["columns"]
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(REPORTS[report["kind"]]["label"])
+    for i, (_, w, _) in enumerate(columns):
+        ws.column_dimensions[chr(ord("A") + i)].width = 12 * w
+    ws.append([report["title"]])
+    for k, v in report["meta"]:
+        ws.append([k, v])
+    ws.append([])
+    ws.append([name for name, _, _ in columns])
+    for r in report["rows"]:
+        ws.append(list(r))
+    ws.append([])
+    for k, v in report["totals"]:
+        ws.append([k, v])
+    wb.save(path)
+
+def render(report: Dict[str, Any], fmt: str, path: str) -> str:
+    """보고서 1개 → 파일 (임시 파일에 쓴 뒤 rename). 같은 지점·보고서의 이전 지문 파일은 지운다"""
+    if os.path.exists(path):
+        return path
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=f".{fmt}.tmp")
+    os.close(fd)
+    try:
+        (_write_pdf if fmt == "pdf" else _write_xlsx)(report, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    prefix = f"b{report['branch_id']}_{report['kind']}_"
+    for f in os.listdir(folder):
+        if f.startswith(prefix) and f.endswith(f".{fmt}") and os.path.join(folder, f) != path:
+            os.remove(os.path.join(folder, f))
+    return path
+
+# ==================== 일괄 생성 ====================
+
+def create_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """보고서 렌더링용 프로세스 풀"""
+    return ProcessPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1))
+
+def _zip_name(report: Dict[str, Any], fmt: str) -> str:
+    name = report["branch_name"].replace("/", "_")
+    return f"{name}/{REPORTS[report['kind']]['label']}_{report['month']}.{fmt}"
+
+def _call(fn, *args) -> Optional[BaseException]:
+    try:
+        fn(*args)
+    except Exception as e:
+        return e
+    return None
+
+def build(conn: sqlite3.Connection, month: str, kinds: Sequence[str] = tuple(REPORTS),
+          formats: Sequence[str] = FORMATS, branch_ids: Optional[Sequence[int]] = None,
+          pool: Optional[ProcessPoolExecutor] = None, report_dir: Optional[str] = None,
+          progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
+    """
+    지점별 보고서 생성 + zip. 캐시에 있는 파일은 건너뛴다. pool 이 없으면 이 프로세스에서 차례로 만든다.
+    progress(완료 수, 전체 수, 방금 끝난 파일) 를 파일마다 호출.
+    반환: {"zip": 경로 또는 None, "files": 개수, "rendered": 새로 만든 수, "failed": {파일: 오류}}
+    """
+    reports = collect(conn, month, kinds, branch_ids)
+    tasks = [(r, fmt, report_path(r, fmt, report_dir)) for r in reports for fmt in formats]
+    todo = [t for t in tasks if not os.path.exists(t[2])]
+    done, failed = len(tasks) - len(todo), {}
+    if progress:
+        progress(done, len(tasks), "")
+    if pool is None:
+        results = ((t, _call(render, *t)) for t in todo)
+    else:
+        futures = {pool.submit(render, *t): t for t in todo}
+        results = ((futures[f], f.exception()) for f in as_completed(futures))
+    for (r, fmt, _), error in results:
+        done += 1
+        if error is not None:
+            failed[_zip_name(r, fmt)] = str(error) or type(error).__name__
+        if progress:
+            progress(done, len(tasks), _zip_name(r, fmt))
+
+    ok = [(r, fmt, path) for r, fmt, path in tasks if os.path.exists(path)]
+    if not ok:
+        return {"zip": None, "files": 0, "rendered": 0, "failed": failed}
+    key = hashlib.sha1("|".join(p for _, _, p in ok).encode("utf-8")).hexdigest()[:12]
+    zip_path = os.path.join(report_dir or REPORT_DIR, month, f"bundle_{key}.zip")
+    if not os.path.exists(zip_path):
+        for f in os.listdir(os.path.dirname(zip_path)):
+            if f.startswith("bundle_") and f.endswith(".zip"):
+                os.remove(os.path.join(os.path.dirname(zip_path), f))
+        tmp = zip_path + ".tmp"
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z:
+            for r, fmt, path in ok:
+                z.write(path, _zip_name(r, fmt))
+        os.replace(tmp, zip_path)
+    return {"zip": zip_path, "files": len(ok), "rendered": len(todo) - len(failed), "failed": failed}
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="월말 지점별 정산서/VOC 요약 일괄 출력")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help="PDF/xlsx 생성 + zip")
+    p.add_argument("db")
+    p.add_argument("--month", required=True, help="YYYY-MM")
+    p.add_argument("--kind", nargs="+", choices=list(REPORTS), default=list(REPORTS))
+    p.add_argument("--format", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    p.add_argument("--branch", type=int, nargs="*")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--out", default=None, help=f"보고서 폴더 (기본 {REPORT_DIR})")
+    args = ap.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    with create_pool(args.workers) as pool:
+        result = build(conn, args.month, args.kind, args.format, args.branch, pool, args.out,
+                       progress=lambda d, n, name: print(f"\r{d}/{n} {name}"[:100].ljust(100), end="", flush=True))
+    print()
+    for name, error in result["failed"].items():
+        print(f"⚠️ {name}: {error}")
+    print(f"✅ {result['files']}개 파일 (새로 생성 {result['rendered']}개) → {result['zip']}")
+
+if __name__ == "__main__":
+    main()
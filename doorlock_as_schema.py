@@ -0,0 +1,250 @@
+# ==================== 추가 스키마 (마이그레이션) ====================
+"""
+doorlock_as_init 의 기본 스키마 위에 얹는 추가 컬럼/인덱스/테이블.
+get_connection() 에서 매 기동 시 호출되며, 여러 번 실행해도 안전하다(idempotent).
+"""
+import sqlite3
+from typing import Set
+
+def _columns(conn: sqlite3.Connection, table: str) -> Set[str]:
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, decl: str):
+    """컬럼이 없을 때만 추가"""
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone() is not None
+
+# 메모리 캐시에 올리는 데이터의 원본 테이블 — 쓰기마다 cache_version 을 올린다 (doorlock_as_cache)
+CACHE_TABLES = ("branch", "product_model", "symptom_code", "material_code", "users", "as_reception", "inventory")
+
+def migrate(conn: sqlite3.Connection):
+    """추가 스키마 적용"""
+    # 백그라운드 작업(알림 디스패처 등)이 별도 커넥션으로 쓰기 때문에 WAL 사용
+    conn.execute("PRAGMA journal_mode = WAL")
+
+    # 지역 정규화 컬럼 (시/도, 시·군·구) — 지역별 집계용
+    _add_column(conn, "as_reception", "sido", "TEXT")
+    _add_column(conn, "as_reception", "sigungu", "TEXT")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_as_reception_region
+        ON as_reception(sido, sigungu, model_code, request_date)
+    """)
+
+    # 접수일 + 모델/증상/지점 — 일별 급증 탐지 집계를 인덱스만으로 (doorlock_as_anomaly)
+    if {"request_date", "model_code", "symptom_code", "branch_id"} <= _columns(conn, "as_reception"):
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_as_reception_daily
+            ON as_reception(request_date, model_code, symptom_code, branch_id)
+        """)
+
+    # 숫자만 남긴 전화번호 — 재접수/중복 접수 조회 (doorlock_as_repeat)
+    _add_column(conn, "as_reception", "phone_norm", "TEXT")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_as_reception_phone
+        ON as_reception(phone_norm, model_code, request_date)
+    """)
+
+    # 주문번호 — 일괄 등록 중복 확인 (doorlock_as_import)
+    if "order_number" in _columns(conn, "as_reception"):
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_as_reception_order ON as_reception(order_number)")
+
+    # 행 버전 — 접수 수정 충돌 감지 (doorlock_as_reception)
+    _add_column(conn, "as_reception", "version", "INTEGER NOT NULL DEFAULT 0")
+
+    # 알림 발송 큐 (doorlock_as_notify)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel TEXT NOT NULL DEFAULT 'sms',
+            provider TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+        ON notification_outbox(status, next_attempt_at)
+    """)
+
+    # 검수완료 + 완료일 범위 (인건비 집계, 보관 대상 선별)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_as_reception_settled
+        ON as_reception(status, complete_date)
+    """)
+
+    # 월별 보관 현황 (doorlock_as_archive) — 보관 DB 파일별 건수/날짜 범위, 지점별 건수
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive_manifest (
+            month TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'copying',
+            rows INTEGER NOT NULL DEFAULT 0,
+            min_request_date TEXT,
+            max_request_date TEXT,
+            min_complete_date TEXT,
+            max_complete_date TEXT,
+            archived_at TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive_branch_count (
+            month TEXT NOT NULL,
+            branch_id INTEGER,
+            rows INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, branch_id)
+        )
+    """)
+
+    # 기사 배정 (doorlock_as_dispatch) — 접수 1건에 진행 중('배정') 배정은 하나
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS as_assignment (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reception_id INTEGER NOT NULL REFERENCES as_reception(id),
+            technician_id INTEGER NOT NULL,
+            technician_name TEXT,
+            scheduled_date DATE NOT NULL,
+            slot TEXT NOT NULL DEFAULT '오전',
+            seq INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT '배정',
+            assigned_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_as_assignment_active
+        ON as_assignment(reception_id) WHERE status = '배정'
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_as_assignment_queue
+        ON as_assignment(technician_id, status, scheduled_date, slot, seq)
+    """)
+
+    # 처리 기간(SLA) (doorlock_as_sla) — 완료 시점 기록 + (지표, 완료월, 지점, 모델, 일수) 히스토그램
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sla_lead (
+            reception_id INTEGER PRIMARY KEY,
+            month TEXT NOT NULL,
+            branch_id INTEGER NOT NULL DEFAULT 0,
+            model_code TEXT NOT NULL DEFAULT '',
+            request_date DATE,
+            complete_date DATE,
+            inspect_date DATE,
+            lead_days INTEGER NOT NULL,
+            inspect_days INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sla_hist (
+            metric TEXT NOT NULL,
+            month TEXT NOT NULL,
+            branch_id INTEGER NOT NULL DEFAULT 0,
+            model_code TEXT NOT NULL DEFAULT '',
+            days INTEGER NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (metric, month, branch_id, model_code, days)
+        ) WITHOUT ROWID
+    """)
+
+    # 감사 로그 조회 인덱스 + 월별 파티션 목록 (doorlock_as_audit)
+    if _has_table(conn, "audit_log"):
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_record ON audit_log(table_name, record_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_user ON audit_log(user_id, created_at)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit_partition (
+            month TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'moving',
+            rows INTEGER NOT NULL DEFAULT 0,
+            bytes INTEGER,
+            moved_at TIMESTAMP,
+            compacted_at TIMESTAMP
+        )
+    """)
+
+    # 예약 작업 (doorlock_as_jobs) — 작업별 다음 실행·임대(lease)·최근 결과 + 실행 이력
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_schedule (
+            name TEXT PRIMARY KEY,
+            description TEXT,
+            cron TEXT NOT NULL,
+            enabled INTEGER NOT NULL DEFAULT 1,
+            next_run_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_until REAL,
+            last_started_at REAL,
+            last_finished_at REAL,
+            last_status TEXT,
+            last_error TEXT,
+            last_duration_ms REAL,
+            runs INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            consecutive_failures INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_run (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            owner TEXT,
+            started_at REAL NOT NULL,
+            finished_at REAL,
+            duration_ms REAL,
+            status TEXT NOT NULL,
+            error TEXT,
+            result TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_job_run_name ON job_run(name, id)")
+
+    # 자재 소비 큐브 (doorlock_as_materials) — (월, 지점, 모델, 증상, 자재) 별 누적, as_material_usage id 워터마크로 증분
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS material_cube (
+            month TEXT NOT NULL,
+            branch_id INTEGER NOT NULL DEFAULT 0,
+            model_code TEXT NOT NULL DEFAULT '',
+            symptom_code TEXT NOT NULL DEFAULT '',
+            material_code TEXT NOT NULL DEFAULT '',
+            lines INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            free_quantity INTEGER NOT NULL DEFAULT 0,
+            charged INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, branch_id, model_code, symptom_code, material_code)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS material_cube_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_usage_id INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO material_cube_state (id) VALUES (1)")
+
+    # 테이블별 버전 — 레플리카별 메모리 캐시 무효화 (doorlock_as_cache). 어느 경로로 쓰든 트리거가 올림
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_version (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for table in CACHE_TABLES:
+        if not _has_table(conn, table):
+            continue
+        conn.execute("INSERT OR IGNORE INTO cache_version (table_name) VALUES (?)", (table,))
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_cache_version_{table}_{op.lower()} AFTER {op} ON {table}
+                BEGIN
+                    UPDATE cache_version SET version = version + 1 WHERE table_name = '{table}';
+                END
+            """)
+    conn.commit()
@@ -0,0 +1,236 @@
+# ==================== 처리 기간(SLA) ====================
+"""
+접수→완료(처리), 완료→검수완료(검수) 기간을 완료 시점에 접수별로 기록하고
+(지표, 완료월, 지점, 모델, 일수) 히스토그램을 증분으로 유지한다.
+p50/p90/p99 는 히스토그램 누적합으로 계산하므로 원본 접수를 다시 읽지 않는다(보관된 접수도 포함).
+
+  - sla_lead : 접수 1건 = 1행 (기록 당시 키·일수). 상태/완료일이 바뀌면 이전 값을 빼고 새 값을 더한다
+  - sla_hist : (metric, month, branch_id, model_code, days) → n. days 는 MAX_DAYS 에서 잘림(MAX_DAYS+)
+
+미처리 건의 경과 일수(aging)는 상태+날짜 인덱스로 바로 센다.
+
+    python doorlock_as_sla.py backfill doorlock_as.db
+    python doorlock_as_sla.py report doorlock_as.db --from 2024-01 --to 2024-06 --by 지점
+"""
+import argparse
+import sqlite3
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+MAX_DAYS = 180
+METRICS = {"lead": "처리(접수→완료)", "inspect": "검수(완료→검수완료)"}
+QUANTILES = (0.5, 0.9, 0.99)
+AGING_BUCKETS = ((0, 1, "0~1일"), (2, 3, "2~3일"), (4, 7, "4~7일"), (8, 14, "8~14일"),
+                 (15, 30, "15~30일"), (31, None, "30일 초과"))
+SLA_GROUPS = {"월": "month", "지점": "branch_id", "모델": "model_code"}
+
+_DONE = ("완료", "검수완료")
+
+def _days(start: Optional[str], end: Optional[str]) -> Optional[int]:
+    if not start or not end:
+        return None
+    return (date.fromisoformat(str(end)[:10]) - date.fromisoformat(str(start)[:10])).days
+
+def _bucket(days: int) -> int:
+    return min(max(days, 0), MAX_DAYS)
+
+# ==================== 기록 ====================
+
+_LEAD_COLUMNS = ("month", "branch_id", "model_code", "request_date", "complete_date",
+                 "inspect_date", "lead_days", "inspect_days")
+
+def _entry(row: tuple, old: Optional[tuple]) -> Optional[tuple]:
+    """as_reception 행 → sla_lead 값 (완료 전이면 None). 검수일은 처음 기록한 값을 유지"""
+    _, branch_id, model_code, request_date, complete_date, status, updated = row
+    lead = _days(request_date, complete_date)
+    if status not in _DONE or lead is None:
+        return None
+    inspect_date = None
+    if status == "검수완료":
+        kept = old[_LEAD_COLUMNS.index("inspect_date")] if old else None
+        inspect_date = kept or updated
+    return (str(complete_date)[:7], branch_id, model_code, str(request_date)[:10], str(complete_date)[:10],
+            inspect_date, lead, _days(complete_date, inspect_date))
+
+def _bump(conn: sqlite3.Connection, entry: tuple, delta: int):
+    month, branch_id, model_code = entry[:3]
+    lead, inspect = entry[6], entry[7]
+    rows = [("lead", month, branch_id, model_code, _bucket(lead), delta)]
+    if inspect is not None:
+        rows.append(("inspect", month, branch_id, model_code, _bucket(inspect), delta))
+    conn.executemany("""
+        INSERT INTO sla_hist (metric, month, branch_id, model_code, days, n) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (metric, month, branch_id, model_code, days) DO UPDATE SET n = n + excluded.n
+    """, rows)
+    if delta < 0:
+        conn.executemany(
+            "DELETE FROM sla_hist WHERE metric=? AND month=? AND branch_id=? AND model_code=? AND days=? AND n <= 0",
+            [r[:5] for r in rows],
+        )
+
+def sync(conn: sqlite3.Connection, reception_ids: Iterable[int]) -> int:
+    """
+    상태/완료일이 바뀐 접수건의 기록을 현재 값에 맞춤 (커밋은 호출 측). 바뀐 건수 반환.
+    '접수'로 되돌리면 기록을 지우고, 없는(보관된) 접수는 건드리지 않는다.
+    """
+    ids = [int(i) for i in reception_ids]
+    changed = 0
+    for i in range(0, len(ids), 900):
+        chunk = ids[i:i + 900]
+        marks = ",".join("?" * len(chunk))
+        rows = conn.execute(f"""
+            SELECT id, COALESCE(branch_id, 0), COALESCE(model_code, ''), request_date, complete_date, status,
+                   date(updated_at)
+            FROM as_reception WHERE id IN ({marks})
+        """, chunk).fetchall()
+        old = {r[0]: r[1:] for r in conn.execute(
+            f"SELECT reception_id, {', '.join(_LEAD_COLUMNS)} FROM sla_lead WHERE reception_id IN ({marks})", chunk)}
+        for row in rows:
+            prev = old.get(row[0])
+            new = _entry(row, prev)
+            if new == prev:
+                continue
+            if prev:
+                _bump(conn, prev, -1)
+            if new:
+                _bump(conn, new, +1)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO sla_lead (reception_id, {', '.join(_LEAD_COLUMNS)}) "
+                    f"VALUES (?{', ?' * len(_LEAD_COLUMNS)})", (row[0], *new))
+            else:
+                conn.execute("DELETE FROM sla_lead WHERE reception_id=?", (row[0],))
+            changed += 1
+    return changed
+
+def rebuild_histogram(conn: sqlite3.Connection):
+    """sla_lead 전체로 히스토그램 재생성 (커밋은 호출 측)"""
+    conn.execute("DELETE FROM sla_hist")
+    for metric, col in (("lead", "lead_days"), ("inspect", "inspect_days")):
+        conn.execute(f"""
+            INSERT INTO sla_hist (metric, month, branch_id, model_code, days, n)
+            SELECT ?, month, branch_id, model_code, MIN(MAX({col}, 0), ?), COUNT(*)
+            FROM sla_lead WHERE {col} IS NOT NULL
+            GROUP BY month, branch_id, model_code, MIN(MAX({col}, 0), ?)
+        """, (metric, MAX_DAYS, MAX_DAYS))
+
+def backfill(conn: sqlite3.Connection) -> int:
+    """기록이 없는 완료/검수완료 접수를 한 번에 채우고 히스토그램 재생성. 채운 건수 반환"""
+    cur = conn.execute("""
+        INSERT INTO sla_lead (reception_id, month, branch_id, model_code, request_date, complete_date,
+                              inspect_date, lead_days, inspect_days)
+        SELECT id, substr(complete_date, 1, 7), COALESCE(branch_id, 0), COALESCE(model_code, ''),
+               date(request_date), date(complete_date), insp,
+               CAST(julianday(date(complete_date)) - julianday(date(request_date)) AS INTEGER),
+               CAST(julianday(insp) - julianday(date(complete_date)) AS INTEGER)
+        FROM (SELECT ar.*, CASE WHEN ar.status = '검수완료' THEN date(ar.updated_at) END AS insp
+              FROM as_reception ar
+              WHERE ar.status IN ('완료', '검수완료') AND ar.complete_date IS NOT NULL AND ar.request_date IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM sla_lead s WHERE s.reception_id = ar.id))
+    """)
+    if cur.rowcount:
+        rebuild_histogram(conn)
+    conn.commit()
+    return cur.rowcount
+
+# ==================== 조회 ====================
+
+def months(conn: sqlite3.Connection) -> List[str]:
+    return [r[0] for r in conn.execute("SELECT DISTINCT month FROM sla_hist ORDER BY month")]
+
+def _where(month_from: str, month_to: str, branch_id: Optional[int], model_code: Optional[str]) -> Tuple[str, list]:
+    where, params = ["month >= ?", "month <= ?"], [month_from, month_to]
+    if branch_id is not None:
+        where.append("branch_id = ?"); params.append(branch_id)
+    if model_code:
+        where.append("model_code = ?"); params.append(model_code)
+    return " AND ".join(where), params
+
+def histogram(conn: sqlite3.Connection, metric: str, month_from: str, month_to: str,
+              branch_id: Optional[int] = None, model_code: Optional[str] = None) -> pd.Series:
+    """일수별 건수 (index=days, 마지막 칸 MAX_DAYS 는 그 이상 포함)"""
+    where, params = _where(month_from, month_to, branch_id, model_code)
+    rows = conn.execute(f"""
+        SELECT days, SUM(n) FROM sla_hist WHERE metric = ? AND {where} GROUP BY days ORDER BY days
+    """, [metric, *params]).fetchall()
+    return pd.Series({d: n for d, n in rows}, dtype="int64", name="건수")
+
+def _quantiles(days: pd.Series, counts: pd.Series) -> Dict[str, float]:
+    cum = counts.cumsum().to_numpy()
+    total = cum[-1]
+    out = {"건수": int(total), "평균": round(float((days * counts).sum() / total), 1)}
+    for q in QUANTILES:
+        # nearest-rank: 누적 건수가 q×전체 이상이 되는 첫 일수
+        out[f"p{int(q * 100)}"] = int(days.iloc[min(cum.searchsorted(q * total), len(cum) - 1)])
+    return out
+
+def summary(conn: sqlite3.Connection, metric: str, month_from: str, month_to: str,
+            branch_id: Optional[int] = None, model_code: Optional[str] = None,
+            group_by: Optional[str] = None) -> pd.DataFrame:
+    """건수/평균/p50/p90/p99 (group_by: SLA_GROUPS 키, None 이면 전체 1행)"""
+    key = SLA_GROUPS[group_by] if group_by else "''"
+    where, params = _where(month_from, month_to, branch_id, model_code)
+    hist = pd.read_sql_query(f"""
+        SELECT {key} AS grp, days, SUM(n) AS n
+        FROM sla_hist WHERE metric = ? AND {where}
+        GROUP BY grp, days ORDER BY grp, days
+    """, conn, params=[metric, *params])
+    rows = [{group_by or "구분": grp, **_quantiles(g["days"], g["n"])} for grp, g in hist.groupby("grp", sort=True)]
+    return pd.DataFrame(rows)
+
+def aging(conn: sqlite3.Connection, today: date, branch_id: Optional[int] = None) -> pd.DataFrame:
+    """미처리 경과 일수 구간별 건수: '접수'는 접수일부터, '완료'(검수 대기)는 완료일부터"""
+    case = " ".join(
+        f"WHEN age <= {hi} THEN '{label}'" if hi is not None else f"ELSE '{label}'"
+        for lo, hi, label in AGING_BUCKETS
+    )
+    scope, params = ("AND branch_id = ?", [branch_id]) if branch_id is not None else ("", [])
+    rows = conn.execute(f"""
+        SELECT status, CASE {case} END AS bucket, COUNT(*)
+        FROM (SELECT status, CAST(julianday(?) - julianday(date(
+                         CASE WHEN status = '완료' THEN COALESCE(complete_date, request_date) ELSE request_date END
+                     )) AS INTEGER) AS age
+              FROM as_reception
+              WHERE status IN ('접수', '완료') {scope})
+        GROUP BY status, bucket
+    """, [str(today), *params]).fetchall()
+    labels = [label for _, _, label in AGING_BUCKETS]
+    df = pd.DataFrame(0, index=labels, columns=["접수", "완료"])
+    for status, bucket, n in rows:
+        df.loc[bucket, status] = n
+    df.index.name = "경과"
+    return df.rename(columns={"접수": "처리 대기", "완료": "검수 대기"})
+
+# ==================== CLI ====================
+
+def main():
+    ap = argparse.ArgumentParser(description="처리 기간(SLA) 집계")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("backfill", help="기록 없는 완료 접수 채우기 + 히스토그램 재생성")
+    b.add_argument("db")
+    b.add_argument("--rebuild", action="store_true", help="sla_lead 전체로 히스토그램만 다시 만들기")
+    r = sub.add_parser("report", help="p50/p90/p99")
+    r.add_argument("db")
+    r.add_argument("--from", dest="month_from", required=True)
+    r.add_argument("--to", dest="month_to", required=True)
+    r.add_argument("--by", choices=list(SLA_GROUPS))
+    r.add_argument("--metric", choices=list(METRICS), default="lead")
+    args = ap.parse_args()
+
+    from doorlock_as_schema import migrate
+    conn = sqlite3.connect(args.db)
+    migrate(conn)
+    if args.cmd == "backfill":
+        n = backfill(conn)
+        if args.rebuild:
+            rebuild_histogram(conn); conn.commit()
+        print(f"✅ {n:,}건 기록")
+    else:
+        df = summary(conn, args.metric, args.month_from, args.month_to, group_by=args.by)
+        print(f"{METRICS[args.metric]} {args.month_from}~{args.month_to}")
+        print(df.to_string(index=False) if not df.empty else "(데이터 없음)")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,11 @@
 import os
 from typing import Any, Dict, List, Optional, Tuple, Union
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
 import pandas as pd
 from datetime import date
+import doorlock_as_metrics as metrics
+import doorlock_as_transport as transport
 
 def _read_supabase_credentials():
     """
@@ -41,9 +44,18 @@ if not url or not key:
         "로컬: .env 파일에 SUPABASE_URL, SUPABASE_KEY 설정"
     )
 
-supabase: Client = create_client(url, key)
+# 공유 keep-alive 풀 + 작업별 타임아웃 (doorlock_as_transport)
+supabase: Client = create_client(url, key, options=SyncClientOptions(httpx_client=transport.http_client))
 print("✅ Supabase 클라이언트 초기화 완료")
 
+# 로컬 미러 (선택): 조회는 로컬 SQLite, 쓰기는 Supabase → 응답 행을 로컬에 즉시 반영
+mirror = None
+if os.getenv("SUPABASE_MIRROR", "0") == "1":
+    from doorlock_as_mirror import Mirror
+    mirror = Mirror(supabase)
+    mirror.start()
+    print("✅ Supabase 로컬 미러 사용")
+
 # ==================== 내부 유틸 ====================
 
 def _apply_op(q, col: str, op: str, val: Any):
@@ -115,6 +127,38 @@ def _apply_pagination(q, limit: Optional[int], offset: Optional[int]):
         return q.range(offset, offset + 99)
     return q.range(offset, offset + max(0, limit - 1))
 
+def _describe(
+    columns: str = "",
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[Union[str, Tuple[str, str]]] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+) -> str:
+    """계측용 PostgREST 요청 정규화 (값은 빼고 컬럼/연산자만)"""
+    parts = [f"select={columns}"] if columns else []
+    for k, v in (filters or {}).items():
+        if isinstance(v, tuple) and len(v) == 2 and isinstance(v[0], str):
+            parts.append(f"{k}={v[0].lower()}.?")
+        elif "__" in k:
+            col, op = k.split("__", 1)
+            parts.append(f"{col}={op.lower()}.?")
+        else:
+            parts.append(f"{k}=eq.?")
+    if order:
+        parts.append(f"order={order if isinstance(order, str) else '.'.join(order)}")
+    if limit is not None or offset is not None:
+        parts.append("range")
+    return "?" + "&".join(parts) if parts else ""
+
+_OPERATIONS = {"GET": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+def _execute(q, method: str, table: str, detail: str = ""):
+    """PostgREST 요청 실행 (+ 쿼리 계측). 타임아웃/재시도/서킷 브레이커는 transport 에서"""
+    with metrics.track("supabase", f"{method} /{table}{detail}", normalize=False) as t:
+        resp = transport.transport.execute(q, _OPERATIONS[method])
+        t["rows"] = len(resp.data or [])
+    return resp
+
 # ==================== CRUD 래퍼 ====================
 
 def select_data(
@@ -128,19 +172,25 @@ def select_data(
 ):
     """데이터 조회"""
     col_expr = columns if isinstance(columns, str) else ",".join(columns)
+    if mirror is not None:
+        data = mirror.select(table, col_expr, filters, order, limit, offset)
+        if data is not None:
+            return pd.DataFrame(data) if to_df else data
     q = supabase.table(table).select(col_expr)
     q = _parse_filters(q, filters)
     q = _apply_order(q, order)
     q = _apply_pagination(q, limit, offset)
 
-    resp = q.execute()
+    resp = _execute(q, "GET", table, _describe(col_expr, filters, order, limit, offset))
     data = resp.data or []
     return pd.DataFrame(data) if to_df else data
 
 def insert_data(table: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """데이터 삽입"""
-    resp = supabase.table(table).insert(data).execute()
+    resp = _execute(supabase.table(table).insert(data), "POST", table)
     rows = resp.data or []
+    if mirror is not None:
+        mirror.apply(table, rows)
     return rows[0] if rows else None
 
 def update_data(
@@ -155,7 +205,9 @@ def update_data(
             q = _apply_op(q, k, v[0], v[1])
         else:
             q = q.eq(k, v)
-    resp = q.execute()
+    resp = _execute(q, "PATCH", table, _describe(filters=match))
+    if mirror is not None:
+        mirror.apply(table, resp.data or [])
     return resp.data or []
 
 def delete_data(table: str, match: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -166,7 +218,9 @@ def delete_data(table: str, match: Dict[str, Any]) -> List[Dict[str, Any]]:
             q = _apply_op(q, k, v[0], v[1])
         else:
             q = q.eq(k, v)
-    resp = q.execute()
+    resp = _execute(q, "DELETE", table, _describe(filters=match))
+    if mirror is not None:
+        mirror.remove(table, resp.data or [])
     return resp.data or []
 
 # ==================== 특화 함수 ====================
@@ -213,6 +267,12 @@ def get_receptions(
     if date_to:
         filters["request_date__lte"] = date_to
 
+    if mirror is not None:
+        search = (("customer_name", "phone"), keyword) if keyword else None
+        data = mirror.select("as_reception", "*", filters, ("created_at", "desc"), limit, offset, search=search)
+        if data is not None:
+            return pd.DataFrame(data) if to_df else data
+
     q = supabase.table("as_reception").select("*")
     q = _parse_filters(q, filters)
     q = _apply_order(q, ("created_at", "desc"))
@@ -222,7 +282,8 @@ def get_receptions(
         q = q.or_(f"customer_name.ilike.%{safe}%,phone.ilike.%{safe}%")
 
     q = _apply_pagination(q, limit, offset)
-    resp = q.execute()
+    detail = _describe("*", filters, ("created_at", "desc"), limit, offset)
+    resp = _execute(q, "GET", "as_reception", detail + ("&or=(customer_name.ilike,phone.ilike)" if keyword else ""))
     data = resp.data or []
     return pd.DataFrame(data) if to_df else data
 
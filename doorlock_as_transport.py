@@ -0,0 +1,214 @@
+# ==================== Supabase 전송 계층 ====================
+"""
+doorlock_as_supabase 의 PostgREST 요청이 지나는 층 (타임아웃·재시도·서킷 브레이커·공유 커넥션 풀).
+
+- 공유 httpx.Client: 프로세스당 1개. keep-alive 풀 크기/유지 시간을 정해 두고 supabase 클라이언트에 넘긴다
+- 작업별 타임아웃: 조회(read)/쓰기(write)마다 connect·read·write·pool 초. 요청 훅이 request.extensions 에 넣는다
+  (기본값 없이 기다리다 Streamlit 스레드가 쌓이는 것 방지)
+- 재시도: 일시 오류(전송 오류, HTTP 5xx/429, PGRST000~003, SQLSTATE 08/40/53/57)만, full jitter 지수 백오프.
+  멱등 작업(조회·수정·삭제·upsert)은 모두, INSERT 는 요청이 서버에 닿지 않은 것이 확실할 때(연결 실패, 연결/풀 대기 초과)만
+- 서킷 브레이커: 연속 일시 오류가 SUPABASE_BREAKER_THRESHOLD 회면 열림 → SUPABASE_BREAKER_COOLDOWN 초 동안 요청 없이 즉시
+  CircuitOpenError. 지나면 1건만 시험(half-open)해서 성공하면 닫고, 실패하면 다시 연다.
+  제약·권한 같은 요청 오류(4xx)는 서비스 장애가 아니므로 세지 않는다
+
+postgrest-py 자체 재시도(GET 503 에 1·2·4초 고정 대기)는 끄고 이 층에서만 재시도한다.
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import httpx
+from postgrest.exceptions import APIError
+
+import doorlock_as_metrics as metrics
+
+CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "10"))
+WRITE_TIMEOUT = float(os.getenv("SUPABASE_WRITE_TIMEOUT", "20"))
+POOL_TIMEOUT = float(os.getenv("SUPABASE_POOL_TIMEOUT", "5"))
+MAX_ATTEMPTS = int(os.getenv("SUPABASE_MAX_ATTEMPTS", "3"))
+BACKOFF_BASE = float(os.getenv("SUPABASE_BACKOFF_BASE", "0.2"))
+BACKOFF_CAP = float(os.getenv("SUPABASE_BACKOFF_CAP", "2"))
+BREAKER_THRESHOLD = int(os.getenv("SUPABASE_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("SUPABASE_BREAKER_COOLDOWN", "30"))
+POOL_MAX = int(os.getenv("SUPABASE_POOL_MAX", "20"))
+POOL_KEEPALIVE = int(os.getenv("SUPABASE_POOL_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "60"))
+HTTP2 = os.getenv("SUPABASE_HTTP2", "1") == "1"
+
+# 작업 종류 → (타임아웃 구분, 멱등 여부)
+OPERATIONS = {
+    "select": ("read", True),
+    "update": ("write", True),   # 같은 값으로 다시 PATCH 해도 결과가 같다
+    "delete": ("write", True),
+    "upsert": ("write", True),
+    "insert": ("write", False),  # 다시 보내면 행이 둘 생길 수 있음
+}
+
+# APIError.code 는 HTTP 상태가 아니라 PostgREST(PGRSTxxx)/Postgres(SQLSTATE 5자리) 오류 코드다.
+# HTTP 상태는 응답이 JSON 이 아닐 때(게이트웨이 502/503 등)만 정수로 들어온다.
+TRANSIENT_PGRST = {"PGRST000", "PGRST001", "PGRST002", "PGRST003"}  # DB 연결 실패, 스키마 캐시, 풀 대기 시간 초과
+UNSENT_PGRST = {"PGRST000", "PGRST001", "PGRST003"}  # PostgREST 가 DB 에 보내지도 못한 경우
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")  # 연결 끊김, 직렬화 실패/교착, 자원 부족, statement timeout 등
+
+class CircuitOpenError(RuntimeError):
+    """브레이커가 열려 있어 요청을 보내지 않음"""
+
+def is_transient(e: Exception) -> bool:
+    """재시도할 오류인지: 전송/타임아웃, HTTP 5xx/429, 일시적인 DB 오류. 제약/형식/권한 오류(23/22/42 등)는 즉시 실패"""
+    if isinstance(e, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    if not isinstance(e, APIError):
+        return False
+    code = e.code
+    if isinstance(code, int) or (isinstance(code, str) and len(code) == 3 and code.isdigit()):
+        status = int(code)
+        return status >= 500 or status == 429
+    code = str(code or "")
+    if code.startswith("PGRST"):
+        return code in TRANSIENT_PGRST
+    return len(code) == 5 and code[:2] in TRANSIENT_SQLSTATE_CLASSES
+
+def is_unsent(e: Exception) -> bool:
+    """요청이 처리되지 않은 것이 확실한지 (INSERT 재시도 가능): 연결 실패/연결·풀 대기 초과, PostgREST 의 DB 연결 실패"""
+    if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, CircuitOpenError)):
+        return True
+    return isinstance(e, APIError) and str(e.code or "") in UNSENT_PGRST
+
+# ==================== 커넥션 풀 / 타임아웃 ====================
+
+TIMEOUTS = {
+    "read": httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, pool=POOL_TIMEOUT),
+    "write": httpx.Timeout(WRITE_TIMEOUT, connect=CONNECT_TIMEOUT, pool=POOL_TIMEOUT),
+}
+
+_timeout: ContextVar[Optional[httpx.Timeout]] = ContextVar("supabase_timeout", default=None)
+
+def _apply_timeout(request: httpx.Request):
+    # 요청 훅: 현재 작업의 타임아웃을 이 요청에만 적용 (풀/클라이언트는 공유)
+    timeout = _timeout.get()
+    if timeout is not None:
+        request.extensions["timeout"] = timeout.as_dict()
+
+@contextmanager
+def timeout(value: httpx.Timeout):
+    """블록 안의 요청에 타임아웃 적용 (execute 밖에서 직접 부르는 요청용)"""
+    token = _timeout.set(value)
+    try:
+        yield
+    finally:
+        _timeout.reset(token)
+
+def create_http_client(**limits: Any) -> httpx.Client:
+    """공유 HTTP 클라이언트 (keep-alive 풀). base_url/헤더 없이 — postgrest 가 요청마다 전체 URL·헤더를 넣는다"""
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=limits.get("max_connections", POOL_MAX),
+                            max_keepalive_connections=limits.get("max_keepalive_connections", POOL_KEEPALIVE),
+                            keepalive_expiry=limits.get("keepalive_expiry", KEEPALIVE_EXPIRY)),
+        timeout=TIMEOUTS["read"],
+        http2=HTTP2,
+        follow_redirects=True,
+        event_hooks={"request": [_apply_timeout]},
+    )
+
+# ==================== 서킷 브레이커 ====================
+
+class CircuitBreaker:
+    """closed → (연속 실패 threshold 회) open → (cooldown) half_open → 시험 1건 성공 closed / 실패 open"""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trials = 0  # half-open 에서 나간 시험 요청 수
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open":
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(f"Supabase 연결 차단 중 ({remaining:.0f}초 후 재시도)")
+                self.state, self.trials = "half_open", 0
+            if self.state == "half_open":
+                if self.trials >= 1:
+                    raise CircuitOpenError("Supabase 연결 시험 중")
+                self.trials += 1
+
+    def success(self):
+        with self._lock:
+            self.state, self.failures = "closed", 0
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self.state, self.opened_at = "open", time.monotonic()
+
+# ==================== 실행 ====================
+
+class Transport:
+    """PostgREST 요청 빌더 실행: 브레이커 확인 → 타임아웃 적용 → 일시 오류 재시도"""
+
+    def __init__(self, breaker: Optional[CircuitBreaker] = None, max_attempts: int = MAX_ATTEMPTS,
+                 backoff_base: float = BACKOFF_BASE, backoff_cap: float = BACKOFF_CAP,
+                 timeouts: Optional[Dict[str, httpx.Timeout]] = None):
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeouts = timeouts or TIMEOUTS
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+
+    def execute(self, q, op: str = "select"):
+        """q.execute() 를 정책대로 실행. op: OPERATIONS 의 키"""
+        kind, idempotent = OPERATIONS[op]
+        if hasattr(q, "retry"):
+            q = q.retry(False)  # 재시도는 이 층에서만
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                self.stats["rejected"] += 1
+                self._publish()
+                raise
+            self.stats["requests"] += 1
+            try:
+                with timeout(self.timeouts[kind]):
+                    resp = q.execute()
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.success()  # 요청 오류 = 서비스는 응답함
+                    raise
+                self.breaker.failure()
+                self.stats["failures"] += 1
+                retry = attempt < self.max_attempts and (idempotent or is_unsent(e))
+                self._publish()
+                if not retry:
+                    raise
+                self.stats["retries"] += 1
+                time.sleep(self._backoff(attempt))
+                continue
+            self.breaker.success()
+            return resp
+
+    def _publish(self):
+        # 쿼리 메트릭 화면/Prometheus 로 노출
+        metrics.registry.set_gauge("doorlock_supabase_breaker_open", int(self.breaker.state != "closed"),
+                                   "Supabase 서킷 브레이커 열림(1)/닫힘(0)")
+        for stat, cnt in self.stats.items():
+            metrics.registry.set_gauge("doorlock_supabase_transport", cnt, "Supabase 요청/재시도/일시 오류/차단 누적",
+                                       stat=stat)
+
+# 프로세스당 1개 (doorlock_as_supabase 가 사용)
+http_client = create_http_client()
+transport = Transport()
@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.schema import create_schema
+from doorlock_as_schema import migrate
+
+@pytest.fixture
+def db_path(tmp_path):
+    """추가 스키마(migrate)만 올린 빈 DB — 기본 스키마는 migrate 가 건드리는 컬럼만 최소로 만든다"""
+    path = str(tmp_path / "doorlock_as.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE as_reception (
+            id INTEGER PRIMARY KEY, phone TEXT, model_code TEXT,
+            request_date DATE, complete_date DATE, status TEXT
+        )
+    """)
+    migrate(conn)
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def schema_db(tmp_path):
+    """앱과 같은 전체 스키마(기본 + migrate)만 올린 빈 DB — 테스트 데이터는 각 테스트 파일에서 넣는다"""
+    path = str(tmp_path / "doorlock_as.db")
+    conn = sqlite3.connect(path)
+    create_schema(conn)
+    conn.commit()
+    conn.close()
+    return path
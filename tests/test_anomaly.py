@@ -0,0 +1,71 @@
+import sqlite3
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import doorlock_as_anomaly as anomaly
+from doorlock_as_schema import migrate
+
+AS_OF = date(2024, 6, 30)
+SPAN = anomaly.LOOKBACK_DAYS + anomaly.BASELINE_DAYS + anomaly.GUARD_DAYS
+
+def _noise(n_series, rate, seed=1):
+    """조합 n_series 개, 하루 평균 rate 건 포아송 잡음 → daily 형식"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(AS_OF - timedelta(days=SPAN - 1), AS_OF).strftime("%Y-%m-%d")
+    counts = rng.poisson(rate, size=(n_series, len(days)))
+    s, d = np.nonzero(counts)
+    return pd.DataFrame({"day": days[d], "model_code": [f"M{i % 40:03d}" for i in s],
+                         "symptom_code": [f"S{i // 40:03d}" for i in s], "n": counts[s, d]})
+
+def _add(daily, model, symptom, day, n):
+    return pd.concat([daily, pd.DataFrame({"day": [str(day)], "model_code": [model],
+                                           "symptom_code": [symptom], "n": [n]})], ignore_index=True)
+
+def test_score_matches_per_series_loop():
+    counts = np.random.default_rng(3).poisson(2.0, size=(5, 60)).astype(float)
+    s = anomaly.score(counts, baseline=14, guard=3)
+    for i in range(5):
+        for t in range(17, 60):
+            window = counts[i, t - 17:t - 3]
+            sigma = max(np.sqrt(max(window.var(), window.mean())), anomaly.MIN_SIGMA)
+            assert np.isclose(s["z"][i, t], (counts[i, t] - window.mean()) / sigma)
+    assert np.isnan(s["z"][:, :17]).all()
+
+def test_detect_ranks_spike_and_wave_over_noise():
+    daily = _noise(400, 0.3)
+    assert anomaly.detect(daily, AS_OF).empty or anomaly.detect(daily, AS_OF)["점수"].max() < 5
+
+    daily = _add(daily, "M900", "S001", AS_OF - timedelta(days=2), 12)         # 하루 급증
+    for k in range(5):                                                        # 닷새 연속 증가
+        daily = _add(daily, "M901", "S002", AS_OF - timedelta(days=k), 3)
+    out = anomaly.detect(daily, AS_OF, symptom_names={"S001": "모터 불량"})
+    top = out.head(2).set_index("모델")
+    assert set(top.index) == {"M900", "M901"}
+    assert top.loc["M900", "구분"] == "하루 급증" and top.loc["M900", "최고일"] == str(AS_OF - timedelta(days=2))
+    assert top.loc["M900", "증상명"] == "모터 불량"
+    assert top.loc["M901", "구분"] == "연속 증가"
+
+def test_alerts_reads_daily_rollup_by_branch(tmp_path):
+    c = sqlite3.connect(str(tmp_path / "doorlock_as.db"))
+    c.executescript("""
+        CREATE TABLE as_reception (id INTEGER PRIMARY KEY, branch_id INTEGER, phone TEXT, model_code TEXT,
+                                   symptom_code TEXT, request_date DATE, complete_date DATE, status TEXT);
+        CREATE TABLE symptom_code (code TEXT, description TEXT);
+        INSERT INTO symptom_code VALUES ('S1', '잠김 불량');
+    """)
+    migrate(c)
+    rows = [(1, "M1", "S1", str(AS_OF - timedelta(days=d))) for d in range(SPAN) if d % 5 == 0]
+    rows += [(1, "M1", "S1", str(AS_OF - timedelta(days=1)))] * 8 + [(2, "M2", "S1", str(AS_OF))] * 8
+    c.executemany("INSERT INTO as_reception (branch_id, model_code, symptom_code, request_date) VALUES (?, ?, ?, ?)", rows)
+    out = anomaly.alerts(c, AS_OF, branch_id=1)
+    assert out[["모델", "증상명", "당일"]].values.tolist() == [["M1", "잠김 불량", 8]]
+    assert set(anomaly.alerts(c, AS_OF)["모델"]) == {"M1", "M2"}
+
+def test_scoring_thousands_of_series_is_fast():
+    counts = np.random.default_rng(5).poisson(0.5, size=(5000, 120)).astype(float)
+    t0 = time.perf_counter()
+    anomaly.score(counts)
+    assert time.perf_counter() - t0 < 1.0
@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+
+import pytest
+
+import doorlock_as_archive as archive
+
+@pytest.fixture
+def conn(schema_db, tmp_path):
+    """2022년 12개월치 검수완료 접수를 월별 보관 DB 로 옮긴 본 DB"""
+    path = schema_db
+    c = sqlite3.connect(path)
+    rows = [(i, 1, f"2022-{i % 12 + 1:02d}-10", f"2022-{i % 12 + 1:02d}-20") for i in range(1, 121)]
+    c.executemany("INSERT INTO as_reception (id, branch_id, request_date, complete_date, status) "
+                  "VALUES (?, ?, ?, ?, '검수완료')", rows)
+    c.execute("INSERT INTO as_reception (id, branch_id, request_date, status) VALUES (1000, 1, '2022-06-01', '접수')")
+    c.execute("INSERT INTO as_assignment (reception_id, technician_id, scheduled_date, status) VALUES (12, 1, '2022-01-05', '완료')")
+    c.commit()
+    archive.run_archive(path, older_than_days=0, archive_dir=str(tmp_path / "archive"))
+    c.close()
+    c = sqlite3.connect(path, check_same_thread=False)
+    yield c
+    c.close()
+
+def _count(conn, src):
+    return conn.execute(f"SELECT COUNT(*) FROM {src['as_reception']}").fetchone()[0]
+
+def test_spans_cover_every_month(conn):
+    assert sum(_count(conn, src) for src in archive.spans(conn, "request_date", "2022-01-01", "2022-12-31")) == 121
+
+def test_span_does_not_hold_lock_across_queries(conn):
+    """한 세션이 span 안에 머무는 동안 다른 세션의 span 이 막히지 않아야 한다"""
+    inside, finished = threading.Event(), threading.Event()
+    counts = []
+
+    def slow_session():
+        with archive.span(conn, "request_date", "2022-01-01", "2022-03-31") as src:
+            inside.set()
+            finished.wait(5)
+            counts.append(_count(conn, src))
+
+    def other_session():
+        with archive.span(conn, "request_date", "2022-07-01", "2022-09-30") as src:
+            counts.append(_count(conn, src))
+
+    slow = threading.Thread(target=slow_session)
+    slow.start()
+    assert inside.wait(5)
+    other = threading.Thread(target=other_session)
+    other.start()
+    other.join(2)
+    blocked = other.is_alive()
+    finished.set()
+    slow.join()
+    other.join()
+    assert not blocked
+    assert counts == [30 + 1, 30 + 1]  # 보관 3개월분 + 본 DB
+
+def test_months_in_use_are_not_detached(conn):
+    with archive.span(conn, "request_date", "2022-01-01", "2022-01-31") as first:
+        for src in archive.spans(conn, "request_date", "2022-02-01", "2022-12-31", limit=archive.MAX_ATTACHED - 1):
+            conn.execute(f"SELECT COUNT(*) FROM {src['as_reception']}").fetchone()
+        assert _count(conn, first) == 10 + 1  # 1월 보관분 + 본 DB
+    state = archive._attached[conn]
+    assert len(state.schemas) <= archive.MAX_ATTACHED
+    assert not any(state.refs.values())
+
+def test_nested_spans_over_the_limit_fail_instead_of_waiting_forever(conn):
+    with archive.span(conn, "request_date", "2022-01-01", "2022-01-31"):
+        with pytest.raises(RuntimeError):
+            list(archive.spans(conn, "request_date", "2022-02-01", "2022-12-31"))
+
+def test_closed_connections_are_dropped(conn, tmp_path):
+    other = sqlite3.connect(str(tmp_path / "doorlock_as.db"))
+    with archive.span(other, "request_date", "2022-01-01", "2022-01-31"):
+        pass
+    other.close()
+    with archive.span(conn, "request_date", "2022-01-01", "2022-01-31"):
+        pass
+    assert other not in archive._attached
+
+def test_assignments_move_with_archived_receptions(conn, tmp_path):
+    assert conn.execute("SELECT COUNT(*) FROM as_assignment").fetchone()[0] == 0
+    arc = sqlite3.connect(archive.archive_path("2022-01", str(tmp_path / "archive")))
+    assert arc.execute("SELECT reception_id, status FROM as_assignment").fetchall() == [(12, "완료")]
+    arc.close()
@@ -0,0 +1,69 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+import doorlock_as_audit as audit
+from doorlock_as_schema import migrate
+
+def _months_ago(n):
+    today = date.today()
+    y, m = divmod(today.year * 12 + today.month - 1 - n, 12)
+    return f"{y}-{m + 1:02d}"
+
+@pytest.fixture
+def db(tmp_path):
+    """최근 15개월, 달마다 40건 (레코드 1~4, 사용자 1~2)"""
+    path = str(tmp_path / "doorlock_as.db")
+    c = sqlite3.connect(path)
+    c.executescript("""
+        CREATE TABLE as_reception (id INTEGER PRIMARY KEY, phone TEXT, model_code TEXT,
+                                   request_date DATE, complete_date DATE, status TEXT);
+        CREATE TABLE audit_log (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, action TEXT, table_name TEXT,
+                                record_id INTEGER, old_value TEXT, new_value TEXT,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    """)
+    migrate(c)
+    rows = [(1 + i % 2, "UPDATE", "as_reception", 1 + i % 4, f'{{"n": {i}}}', f'{{"n": {i + 1}}}',
+             f"{_months_ago(n)}-{1 + i % 28:02d} 10:{i:02d}:00")
+            for n in range(15) for i in range(40)]
+    c.executemany("INSERT INTO audit_log (user_id, action, table_name, record_id, old_value, new_value, created_at) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    c.commit()
+    c.close()
+    return path
+
+def _all(fetch):
+    out, cursor = [], None
+    while True:
+        rows, cursor = fetch(cursor)
+        out += rows
+        if cursor is None:
+            return out
+
+def test_retention_moves_and_compacts(db, tmp_path):
+    conn = sqlite3.connect(db)
+    before = conn.execute("SELECT id, old_value, new_value FROM audit_log ORDER BY id").fetchall()
+    result = audit.run_retention(db, hot_days=60, compact_days=180, archive_dir=str(tmp_path / "archive"))
+    assert len(result["moved"]) >= 12 and len(result["compacted"]) >= 6
+    assert conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0] <= 3 * 40
+    statuses = {s for _, s, *_ in audit.partitions(conn)}
+    assert statuses == {"open", "compact"}
+    # 다시 실행해도 그대로
+    assert audit.run_retention(db, hot_days=60, compact_days=180, archive_dir=str(tmp_path / "archive")) == \
+        {"moved": {}, "compacted": {}}
+
+    rows = _all(lambda before: audit.history(conn, "as_reception", 3, before, limit=7))
+    expected = [r for r in before if (r[0] - 1) % 4 == 2]
+    assert sorted((r["id"], r["old_value"], r["new_value"]) for r in rows) == expected
+    keys = [(r["created_at"], r["id"]) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+
+def test_activity_filters_by_date_across_partitions(db, tmp_path):
+    audit.run_retention(db, hot_days=60, compact_days=180, archive_dir=str(tmp_path / "archive"))
+    conn = sqlite3.connect(db)
+    month = _months_ago(10)
+    rows = _all(lambda before: audit.activity(conn, 2, f"{month}-01", f"{month}-28", before, limit=6))
+    assert len(rows) == 20
+    assert {r["created_at"][:7] for r in rows} == {month}
+    assert all(r["user_id"] == 2 for r in rows)
@@ -0,0 +1,97 @@
+import multiprocessing
+import sqlite3
+import statistics
+import time
+
+import pytest
+
+import doorlock_as_cache as cache
+
+@pytest.fixture
+def db(schema_db):
+    c = sqlite3.connect(schema_db)
+    c.executescript("""
+        CREATE TABLE notes (id INTEGER PRIMARY KEY, action TEXT);
+        INSERT INTO branch (id, branch_name) VALUES (1, 'v0');
+        INSERT INTO product_model (model_code, model_name) VALUES ('M1', '모델1');
+    """)
+    c.close()
+    return schema_db
+
+def _loader(path, sql, calls, key):
+    def load():
+        calls[key] = calls.get(key, 0) + 1
+        with sqlite3.connect(path) as c:
+            return c.execute(sql).fetchone()[0]
+    return load
+
+def test_write_evicts_only_entries_of_changed_table(db):
+    vc, calls = cache.VersionedCache(db), {}
+    branch = lambda: vc.get("branch", ("branch",), _loader(db, "SELECT branch_name FROM branch", calls, "branch"))
+    model = lambda: vc.get("model", ("product_model",), _loader(db, "SELECT model_name FROM product_model", calls, "model"))
+    assert (branch(), model(), branch(), model()) == ("v0", "모델1", "v0", "모델1")
+    assert calls == {"branch": 1, "model": 1}
+
+    other = sqlite3.connect(db)  # 다른 프로세스/커넥션의 쓰기
+    with other:
+        other.execute("UPDATE branch SET branch_name = 'v1'")
+        other.execute("INSERT INTO notes (action) VALUES ('x')")  # 감시 대상 아닌 테이블
+    assert (branch(), model()) == ("v1", "모델1")
+    assert calls == {"branch": 2, "model": 1} and vc.stats["evicted"] == 1
+
+    with other:
+        other.execute("INSERT INTO notes (action) VALUES ('y')")
+    assert vc.poll() == set() and branch() == "v1" and calls["branch"] == 2
+    other.close()
+    vc.close()
+
+def _reader(path, started, out, stop):
+    vc, calls, seen = cache.VersionedCache(path), {}, set()
+    load = _loader(path, "SELECT branch_name FROM branch", calls, "branch")
+    vc.get("model", ("product_model",), _loader(path, "SELECT model_name FROM product_model", calls, "model"))
+    started.wait()
+    while not stop.is_set():
+        value = vc.get("branch", ("branch",), load)
+        if value not in seen:
+            seen.add(value)
+            out.put(("seen", value, time.monotonic()))
+        vc.get("model", ("product_model",), lambda: out.put(("model-reload",)))
+        time.sleep(0.002)
+    out.put(("done", calls["branch"]))
+
+def test_replicas_observe_writes_within_a_poll(db):
+    ctx = multiprocessing.get_context("fork")
+    started, stop, out = ctx.Event(), ctx.Event(), ctx.Queue()
+    readers = [ctx.Process(target=_reader, args=(db, started, out, stop)) for _ in range(3)]
+    for p in readers:
+        p.start()
+    started.set()
+    time.sleep(0.2)
+
+    writes, w = {}, sqlite3.connect(db)
+    for i in range(1, 21):
+        with w:
+            w.execute("UPDATE branch SET branch_name = ?", (f"v{i}",))
+        writes[f"v{i}"] = time.monotonic()
+        time.sleep(0.03)
+    time.sleep(0.2)
+    stop.set()
+
+    staleness, reloads, model_reloads = [], [], 0
+    while len(reloads) < len(readers):
+        msg = out.get(timeout=10)
+        if msg[0] == "seen" and msg[1] in writes:
+            staleness.append(msg[2] - writes[msg[1]])
+        elif msg[0] == "model-reload":
+            model_reloads += 1
+        elif msg[0] == "done":
+            reloads.append(msg[1])
+    for p in readers:
+        p.join(10)
+    w.close()
+
+    # 버전 20개 × 레플리카 3개를 모두 보고, 가장 늦게 본 경우도 폴링 몇 번 안쪽
+    assert len(staleness) == 20 * len(readers)
+    print(f"staleness p50 {statistics.median(staleness) * 1000:.1f}ms max {max(staleness) * 1000:.1f}ms")
+    assert max(staleness) < 0.25
+    assert model_reloads == 0 and all(21 <= r < 30 for r in reloads)  # 바뀐 테이블 항목만, 버전마다 한 번쯤 다시 읽음
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+import doorlock_as_dispatch as dispatch
+import doorlock_as_reception as reception
+
+@pytest.fixture
+def conn(schema_db):
+    c = sqlite3.connect(schema_db)
+    c.executemany("INSERT INTO users (id, name, role, branch_id, is_active) VALUES (?, ?, '기사', ?, 1)",
+                  [(1, "김기사", 1), (2, "이기사", 1), (3, "박기사", 2)])
+    areas = [("서울특별시", "강남구"), ("서울특별시", "송파구"), ("경기도", "수원시 영통구")]
+    c.executemany(
+        "INSERT INTO as_reception (id, branch_id, address, request_date, status, sido, sigungu) VALUES (?, 1, ?, ?, '접수', ?, ?)",
+        [(i, f"주소 {i}", f"2024-05-{i % 28 + 1:02d}", *areas[i % 3]) for i in range(1, 31)],
+    )
+    c.execute("INSERT INTO as_reception (id, branch_id, request_date, status) VALUES (99, 3, '2024-05-01', '접수')")
+    c.commit()
+    yield c
+    c.close()
+
+def _plan(conn, per_tech=8):
+    return dispatch.propose(dispatch.open_jobs(conn), dispatch.technicians(conn, "2024-06-01"), "2024-06-01", per_tech)
+
+def test_propose_respects_capacity_and_reasons(conn):
+    plan = _plan(conn)
+    assert {tid: len(items) for tid, items in plan.assigned.items()} == {1: 8, 2: 8}
+    reasons = [r for _, r in plan.unassigned]
+    assert reasons.count("일일 한도 초과") == 14 and reasons.count("지점 소속 기사 없음") == 1
+    # 오래된 접수부터 배정
+    picked = {j.reception_id for items in plan.assigned.values() for j, _, _ in items}
+    left = [j for j, r in plan.unassigned if r == "일일 한도 초과"]
+    assert max(j.request_date for items in plan.assigned.values() for j, _, _ in items) <= min(j.request_date for j in left)
+    assert 99 not in picked
+
+def test_propose_groups_areas_and_orders_slots(conn):
+    plan = _plan(conn, per_tech=15)
+    for items in plan.assigned.values():
+        keys = [(j.sido, j.sigungu) for j, _, _ in items]
+        assert keys == sorted(keys)
+        assert [seq for _, _, seq in items] == list(range(1, len(items) + 1))
+        assert [slot for _, slot, _ in items] == ["오전"] * 8 + ["오후"] * (len(items) - 8)
+    # 한 지역은 한 기사에게 몰린다 (한도가 허락하는 만큼)
+    areas = [{(j.sido, j.sigungu) for j, _, _ in items} for items in plan.assigned.values()]
+    assert sum(len(a) for a in areas) <= 4
+
+def test_apply_is_idempotent_and_queue_reads_back(conn):
+    plan = _plan(conn)
+    assert dispatch.apply(conn, plan, user_id=1) == 16
+    assert dispatch.apply(conn, plan, user_id=1) == 0  # 이미 진행 중 배정이 있는 접수는 건너뜀
+    assert conn.execute("SELECT COUNT(*) FROM audit_log WHERE action='ASSIGN'").fetchone()[0] == 16
+    assert len(dispatch.open_jobs(conn, 1)) == 14
+
+    queue = dispatch.technician_queue(conn, 1, "2024-06-01")
+    assert [q["seq"] for q in queue] == list(range(1, 9))
+    # 같은 날 다시 배정안을 만들면 기존 건수부터 센다
+    again = dispatch.technicians(conn, "2024-06-01", 1)
+    assert {t.id: t.load for t in again} == {1: 8, 2: 8}
+
+    first = conn.execute("SELECT reception_id FROM as_assignment WHERE id=?", (queue[0]["assignment_id"],)).fetchone()[0]
+    conn.execute("UPDATE as_reception SET status='검수완료' WHERE id=?", (first,))
+    dispatch.complete(conn, first)
+    conn.commit()
+    assert len(dispatch.technician_queue(conn, 1, "2024-06-01")) == 7
+    assert dispatch.cancel(conn, [q["assignment_id"] for q in dispatch.technician_queue(conn, 1)]) == 7
+    assert len(dispatch.open_jobs(conn, 1)) == 21
+
+def test_status_change_outside_result_dialog_closes_assignment(conn):
+    dispatch.apply(conn, _plan(conn), user_id=1)
+    queue = dispatch.technician_queue(conn, 1, "2024-06-01")
+    first, second = (conn.execute("SELECT reception_id FROM as_assignment WHERE id=?", (q["assignment_id"],)).fetchone()[0]
+                     for q in queue[:2])
+
+    # 수정 팝업에서 완료로
+    base = {"id": first, "version": conn.execute("SELECT version FROM as_reception WHERE id=?", (first,)).fetchone()[0]}
+    assert reception.update(conn, base, {"status": "완료"}, user_id=1)
+    # 일괄 상태 변경 (as_app.bulk_update_status 와 같은 순서, 한 트랜잭션)
+    with conn:
+        conn.execute("UPDATE as_reception SET status='검수완료' WHERE id IN (?, 99)", (second,))
+        assert dispatch.close_finished(conn, [second, 99]) == 1
+    statuses = dict(conn.execute("SELECT reception_id, status FROM as_assignment WHERE reception_id IN (?, ?)",
+                                 (first, second)))
+    assert statuses == {first: "완료", second: "완료"}
+    assert len(dispatch.technician_queue(conn, 1, "2024-06-01")) == 6
@@ -0,0 +1,94 @@
+import io
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import doorlock_as_import as imp
+from benchmarks.schema import create_schema
+
+@pytest.fixture
+def conn(tmp_path):
+    c = sqlite3.connect(str(tmp_path / "doorlock_as.db"), isolation_level=None)
+    create_schema(c)
+    c.executescript("""
+        INSERT INTO branch (id, branch_code, branch_name, phone) VALUES (1, 'B001', '서울지점', '02-000-0001'),
+                                                                        (2, 'B002', '부산지점', NULL);
+        INSERT INTO users (id, username, name) VALUES (1, 'admin', '관리자');
+        INSERT INTO product_model (model_code, model_name) VALUES ('DL-100', '모델100');
+        INSERT INTO symptom_code (category, code, description) VALUES ('전원', 'S001', '전원 안 켜짐');
+        INSERT INTO as_reception (order_number, reception_number, branch_id)
+        VALUES ('ORD-OLD', strftime('%Y%m%d', 'now', 'localtime') || '(7)', 1);
+    """)
+    yield c
+    c.close()
+
+ADMIN = {"id": 1, "name": "관리자"}
+
+def _rows():
+    ok = {"주문번호": "ORD-1", "수취인": "홍길동", "연락처": "1012345678", "배송지": "서울특별시 강남구 테헤란로 1",
+          "모델코드": "DL-100", "증상코드": "S001", "주문일": "2024.09.10", "지점코드": "B001"}
+    return [
+        ok,
+        {**ok, "주문번호": "ORD-2", "배송지": "부산광역시 해운대구 우동 1", "지점코드": "B002", "주문일": ""},
+        {**ok, "주문번호": "ORD-1"},                       # 파일 안 중복
+        {**ok, "주문번호": "ORD-OLD"},                     # 이미 등록됨
+        {**ok, "주문번호": "ORD-3", "모델코드": "XX-9"},    # 미등록 모델
+        {**ok, "주문번호": "ORD-4", "수취인": "", "연락처": "12"},
+        {**ok, "주문번호": "ORD-5", "주문일": "어제", "지점코드": "B999"},
+    ]
+
+def _xlsx(rows):
+    buf = io.BytesIO()
+    pd.DataFrame(rows).to_excel(buf, index=False)
+    buf.seek(0)
+    return buf
+
+def test_import_registers_valid_rows_and_reports_the_rest(conn):
+    result = imp.run(conn, _xlsx(_rows()), "orders.xlsx", ADMIN, chunk=2)
+    today = date.today().strftime("%Y%m%d")
+    assert (result["rows"], result["inserted"]) == (7, 2)
+    assert (result["first"], result["last"]) == (f"{today}(8)", f"{today}(9)")  # 기존 최대 번호 다음부터
+
+    got = conn.execute("""SELECT order_number, phone, phone_norm, sido, sigungu, symptom_category, branch_id, branch_name,
+                                 request_date, status FROM as_reception WHERE order_number LIKE 'ORD-_' ORDER BY id""").fetchall()
+    assert got == [
+        ("ORD-1", "01012345678", "01012345678", "서울특별시", "강남구", "전원", 1, "서울지점", "2024-09-10", "접수"),
+        ("ORD-2", "01012345678", "01012345678", "부산광역시", "해운대구", "전원", 2, "부산지점", str(date.today()), "접수"),
+    ]
+    errors = {(r["행"], r["필드"]): r["오류"] for _, r in result["errors"].iterrows()}
+    assert errors == {
+        (4, "주문번호"): "파일 안에서 중복된 주문번호",
+        (5, "주문번호"): "이미 등록된 주문번호",
+        (6, "모델코드"): "등록되지 않은 모델",
+        (7, "고객명"): "필수 값 없음",
+        (7, "전화번호"): "전화번호 형식 오류",
+        (8, "요청일"): "날짜 형식 오류",
+        (8, "지점코드"): "지점코드 없음/미등록",
+    }
+    assert conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'IMPORT'").fetchone()[0] == 2
+    # 알림은 지점 전화번호가 있는 지점만, 지점당 1건
+    assert conn.execute("SELECT recipient, message FROM notification_outbox").fetchall() == [
+        ("02-000-0001", "[AS접수] 일괄 등록 1건 (orders.xlsx)")]
+
+def test_dry_run_and_fixed_branch_from_cp949_csv(conn):
+    rows = pd.DataFrame(_rows()[:2]).drop(columns="지점코드")
+    source = io.BytesIO(rows.to_csv(index=False).encode("cp949"))
+    result = imp.run(conn, source, "orders.csv", ADMIN, branch_id=2, dry_run=True)
+    assert (result["rows"], result["valid"], result["inserted"]) == (2, 2, 0)
+    assert conn.execute("SELECT COUNT(*) FROM as_reception").fetchone()[0] == 1
+
+    source.seek(0)
+    imp.run(conn, source, "orders.csv", ADMIN, branch_id=2)
+    assert conn.execute("SELECT DISTINCT branch_name FROM as_reception WHERE order_number LIKE 'ORD-_'").fetchall() == [
+        ("부산지점",)]
+
+def test_missing_required_column_rejects_file(conn):
+    rows = pd.DataFrame(_rows()).drop(columns="증상코드")
+    with pytest.raises(ValueError, match="증상코드"):
+        imp.run(conn, _xlsx(rows.to_dict("records")), "orders.xlsx", ADMIN)
+
+def test_template_round_trips(conn):
+    df, total = next(imp.read_chunks(io.BytesIO(imp.template()), "t.xlsx"))
+    assert total == 1 and df.loc[0, "model_code"] == "DL-100" and df.loc[0, "_row"] == 2
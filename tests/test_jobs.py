@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import doorlock_as_jobs as jobs
+from doorlock_as_schema import migrate
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "doorlock_as.db")
+    c = sqlite3.connect(path)
+    c.execute("""CREATE TABLE as_reception (id INTEGER PRIMARY KEY, branch_id INTEGER, phone TEXT, model_code TEXT,
+                                            symptom_code TEXT, status TEXT, request_date DATE, complete_date DATE)""")
+    migrate(c)
+    c.close()
+    return path
+
+def _row(db, name):
+    c = sqlite3.connect(db)
+    try:
+        return dict(zip(("name", "description", "cron", "enabled", "next_run_at", "last_started_at", "last_finished_at",
+                         "last_status", "last_duration_ms", "runs", "failures", "consecutive_failures", "lease_owner",
+                         "lease_until", "last_error"),
+                        next(r for r in jobs.schedules(c) if r[0] == name)))
+    finally:
+        c.close()
+
+@pytest.mark.parametrize("expr, after, expected", [
+    ("0 2 1 * *", "2024-09-15 10:00", "2024-10-01 02:00"),
+    ("*/15 * * * *", "2024-09-15 10:07", "2024-09-15 10:15"),
+    ("30 3 * * 0", "2024-09-15 03:30", "2024-09-22 03:30"),       # 2024-09-15 는 일요일, 같은 시각은 제외
+    ("0 9 * * 1-5", "2024-09-13 18:00", "2024-09-16 09:00"),      # 금요일 저녁 → 월요일
+    ("0 0 13 * 5", "2024-09-01 00:00", "2024-09-06 00:00"),       # 일·요일 둘 다 지정 → 먼저 오는 쪽(금요일)
+    ("0 0 29 2 *", "2024-03-01 00:00", "2028-02-29 00:00"),
+    ("0 12 * * 7", "2024-09-15 13:00", "2024-09-22 12:00"),       # 7 도 일요일
+])
+def test_cron_next_after(expr, after, expected):
+    fmt = "%Y-%m-%d %H:%M"
+    assert jobs.Cron(expr).next_after(datetime.strptime(after, fmt)) == datetime.strptime(expected, fmt)
+
+def test_cron_rejects_bad_expression():
+    for expr in ("* * * *", "60 * * * *", "0 0 31 2 *"):
+        with pytest.raises(ValueError):
+            jobs.Cron(expr).next_after(datetime(2024, 1, 1))
+
+def test_lease_runs_job_on_one_replica_only(db):
+    calls, gate = [], threading.Event()
+
+    def slow(db_path):
+        calls.append(threading.current_thread().name)
+        gate.wait(5)
+        return {"ok": 1}
+
+    spec = {"slow": jobs.Job("slow", jobs.Cron("* * * * *"), slow)}
+    a = jobs.Scheduler(db, spec, owner="a", lease_seconds=60)
+    b = jobs.Scheduler(db, spec, owner="b", lease_seconds=60)
+    a.sync(); b.sync()
+    due = time.time() + 120
+    assert a.run_once(due) == ["slow"]
+    assert b.run_once(due) == [] and a.run_once(due) == []   # a 가 임대 중
+    assert _row(db, "slow")["lease_owner"] == "a"
+    gate.set()
+    a.pool.shutdown(wait=True); b.pool.shutdown(wait=True)
+
+    row = _row(db, "slow")
+    assert len(calls) == 1 and (row["runs"], row["last_status"], row["lease_owner"]) == (1, "ok", None)
+    assert row["next_run_at"] > time.time()  # 지난 실행은 몰아서 하지 않고 다음 cron 시각으로
+
+def test_expired_lease_is_taken_over_and_stale_owner_cannot_overwrite(db):
+    spec = {"j": jobs.Job("j", jobs.Cron("0 * * * *"), lambda p: None)}
+    a = jobs.Scheduler(db, spec, owner="a", lease_seconds=10)
+    b = jobs.Scheduler(db, spec, owner="b", lease_seconds=10)
+    a.sync()
+    now = time.time() + 3600
+    assert a._claim(now) == ["j"]                  # a 가 임대만 하고 죽었다고 가정
+    assert b._claim(now + 5) == []
+    assert b._claim(now + 11) == ["j"]             # 임대 만료 → b 가 가져감
+    a._running["j"] = now
+    a._run("j", now)                               # 늦게 끝난 a 의 결과는 반영되지 않음
+    assert _row(db, "j")["lease_owner"] == "b" and _row(db, "j")["runs"] == 0
+
+def test_failures_are_recorded_and_history_trimmed(db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_RUN_KEEP", 3)
+
+    def boom(db_path):
+        raise RuntimeError("디스크 가득 참")
+
+    s = jobs.Scheduler(db, {"boom": jobs.Job("boom", jobs.Cron("* * * * *"), boom)}, owner="a")
+    s.sync()
+    c = sqlite3.connect(db)
+    for _ in range(5):
+        jobs.run_now(c, "boom")
+        assert s._claim(time.time()) == ["boom"]
+        s._run("boom", time.time())
+    row = _row(db, "boom")
+    assert (row["runs"], row["failures"], row["consecutive_failures"], row["last_status"]) == (5, 5, 5, "failed")
+    assert "RuntimeError: 디스크 가득 참" in row["last_error"]
+    assert len(jobs.runs(c, "boom")) == 3 and jobs.runs(c, failed_only=True)[0][4] == "failed"
+
+    jobs.set_enabled(c, "boom", False)
+    jobs.run_now(c, "boom")
+    assert s.run_once(time.time() + 1) == []     # 사용 중지된 작업은 실행하지 않음
+    c.close()
+
+def test_sync_keeps_next_run_unless_cron_changes(db):
+    s = jobs.Scheduler(db, {"j": jobs.Job("j", jobs.Cron("0 2 * * *"), lambda p: None)}, owner="a")
+    s.sync()
+    c = sqlite3.connect(db)
+    jobs.run_now(c, "j")
+    pinned = _row(db, "j")["next_run_at"]
+    s.sync()
+    assert _row(db, "j")["next_run_at"] == pinned
+    s.jobs["j"] = jobs.Job("j", jobs.Cron("0 3 * * *"), lambda p: None)
+    s.sync()
+    assert datetime.fromtimestamp(_row(db, "j")["next_run_at"]).hour == 3
+    c.close()
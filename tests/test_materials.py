@@ -0,0 +1,70 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import doorlock_as_materials as materials
+from benchmarks.schema import create_schema
+
+@pytest.fixture
+def conn(tmp_path):
+    c = sqlite3.connect(str(tmp_path / "doorlock_as.db"))
+    create_schema(c)
+    c.executescript("""
+        INSERT INTO branch (id, branch_code, branch_name) VALUES (1, 'B001', '서울'), (2, 'B002', '부산');
+        INSERT INTO product_model (model_code, model_name) VALUES ('M1', '모델1'), ('M2', '모델2');
+        INSERT INTO symptom_code (category, code, description) VALUES ('전원', 'S1', '전원 불량'), ('모터', 'S2', '모터 소음');
+        INSERT INTO material_code (material_code, material_name, unit_price) VALUES ('P1', '배터리', 1000), ('P2', '모터', 5000);
+        INSERT INTO as_reception (id, branch_id, model_code, symptom_code, complete_date, payment_type) VALUES
+            (1, 1, 'M1', 'S1', '2024-05-03', '무상'), (2, 1, 'M1', 'S2', '2024-05-20', '유상'),
+            (3, 2, 'M2', 'S2', '2024-06-01', '무상');
+    """)
+    c.commit()
+    yield c
+    c.close()
+
+def _use(conn, reception_id, code, qty, price):
+    conn.execute("INSERT INTO as_material_usage (reception_id, material_code, quantity, unit_price) VALUES (?, ?, ?, ?)",
+                 (reception_id, code, qty, price))
+
+def test_incremental_sync_matches_rebuild(conn):
+    _use(conn, 1, "P1", 2, 0)
+    _use(conn, 2, "P2", 1, 5000)
+    assert materials.sync(conn) == 2
+    _use(conn, 2, "P1", 3, 1000)
+    _use(conn, 3, "P2", 2, 0)
+    assert materials.sync(conn) == 2 and materials.sync(conn) == 0
+    conn.commit()
+
+    incremental = conn.execute("SELECT * FROM material_cube ORDER BY 1, 2, 3, 4, 5").fetchall()
+    materials.rebuild(conn)
+    assert conn.execute("SELECT * FROM material_cube ORDER BY 1, 2, 3, 4, 5").fetchall() == incremental
+
+def test_summary_costs_free_work_at_list_price(conn):
+    _use(conn, 1, "P1", 2, 0)       # 무상: 청구 0, 정가 2,000
+    _use(conn, 2, "P2", 1, 5000)
+    _use(conn, 2, "P1", 3, 1000)
+    _use(conn, 3, "P2", 2, 0)       # 무상: 정가 10,000
+    materials.backfill(conn)
+    assert materials.months(conn) == ["2024-05", "2024-06"]
+
+    by_branch = materials.summary(conn, "2024-01", "2024-12", ["지점"])
+    assert by_branch[["지점명", "사용 건수", "수량", "청구액", "정가 원가", "무상 원가"]].values.tolist() == [
+        ["서울", 3, 6, 8000, 10000, 2000],
+        ["부산", 1, 2, 0, 10000, 10000],
+    ]
+    # 드릴다운: 서울 › 모델1 › 증상별
+    drill = materials.summary(conn, "2024-01", "2024-12", ["증상"], {"지점": 1, "모델": "M1"})
+    assert drill[["증상", "증상명", "수량", "무상 수량"]].values.tolist() == [["S2", "모터 소음", 4, 0],
+                                                                             ["S1", "전원 불량", 2, 2]]
+    assert materials.summary(conn, "2024-06", "2024-06", [], {"지점": 1}).empty
+
+def test_cube_keeps_usage_moved_to_archive(conn):
+    _use(conn, 3, "P2", 2, 0)
+    materials.backfill(conn)
+    conn.execute("DELETE FROM as_material_usage")  # doorlock_as_archive 가 보관 파일로 옮긴 경우
+    conn.execute("DELETE FROM as_reception WHERE id = 3")
+    _use(conn, 1, "P1", 1, 0)
+    materials.backfill(conn)
+    total = materials.summary(conn, "2024-01", "2024-12")
+    assert isinstance(total, pd.DataFrame) and total.loc[0, "수량"] == 3 and total.loc[0, "무상 원가"] == 11000
@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+import doorlock_as_media as media
+
+class _Pool:
+    """제출만 기록하고 결과는 테스트가 정하는 풀"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, path):
+        future = Future()
+        self.submitted.append((path, future))
+        return future
+
+@pytest.fixture
+def photo(tmp_path):
+    path = str(tmp_path / "a.jpg")
+    with open(path, "wb") as f:
+        f.write(b"not really a jpeg")
+    return path
+
+def test_pending_file_is_submitted_once(photo):
+    pool = _Pool()
+    jobs = media.DerivativeJobs(pool)
+    first = jobs.submit(photo)
+    assert jobs.submit(photo) is first and len(pool.submitted) == 1
+    assert jobs.status(photo) == "pending"
+    assert jobs.submit(str(photo) + ".txt") is None  # 미리보기 대상 아님
+
+def test_failure_is_reported_once_and_not_resubmitted_until_retry(photo):
+    pool = _Pool()
+    jobs = media.DerivativeJobs(pool)
+    jobs.submit(photo)
+    pool.submitted[0][1].set_exception(RuntimeError("손상된 이미지"))
+    assert jobs.status(photo) == "failed"
+    assert jobs.take_error(photo) == "손상된 이미지" and jobs.take_error(photo) is None
+    assert jobs.submit(photo) is None and len(pool.submitted) == 1
+
+    assert jobs.retry(photo) is pool.submitted[1][1]
+    assert jobs.status(photo) == "pending"
+
+def test_failures_expire_on_ttl_file_change_and_cap(tmp_path, photo):
+    pool = _Pool()
+    jobs = media.DerivativeJobs(pool, max_failed=2)
+    jobs.submit(photo)
+    pool.submitted[-1][1].set_result({})  # 대상이 아니었던 파일 → 실패로 기록
+    assert jobs.status(photo) == "failed"
+    os.utime(photo, (1, 1))  # 파일 교체
+    assert jobs.status(photo) == "missing"
+
+    others = []
+    for name in ("b.png", "c.png", "d.png"):
+        others.append(str(tmp_path / name))
+        open(others[-1], "wb").close()
+        jobs.submit(others[-1])
+        pool.submitted[-1][1].set_exception(ValueError())
+    assert [jobs.status(p) for p in others] == ["missing", "failed", "failed"]  # 오래된 것부터 버림
+    assert jobs.take_error(others[1]) == "ValueError"
+
+    jobs.failed_ttl = 0
+    assert jobs.status(others[2]) == "missing"
+
+def test_real_generation_failure_surfaces_error(photo):
+    pytest.importorskip("PIL")
+    with ThreadPoolExecutor(1) as pool:
+        jobs = media.DerivativeJobs(pool)
+        jobs.submit(photo).exception(timeout=10)
+    assert jobs.status(photo) == "failed" and jobs.take_error(photo)
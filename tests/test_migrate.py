@@ -0,0 +1,105 @@
+import json
+import shutil
+import sqlite3
+
+import httpx
+import pytest
+from postgrest import SyncPostgrestClient
+from postgrest.exceptions import APIError
+
+import doorlock_as_migrate as migrate
+from benchmarks.postgrest_stub import serve_in_thread
+
+@pytest.mark.parametrize("code, transient", [
+    (503, True), (502, True), (429, True), ("504", True),
+    (400, False), (404, False), ("409", False),
+    ("PGRST000", True), ("PGRST001", True), ("PGRST003", True),
+    ("PGRST116", False), ("PGRST204", False),
+    ("08006", True), ("40001", True), ("40P01", True), ("57014", True), ("53300", True),
+    ("23505", False), ("23503", False), ("22P02", False), ("22001", False), ("42501", False), ("42P01", False),
+    (None, False),
+])
+def test_api_error_classification(code, transient):
+    assert migrate._is_transient(APIError({"code": code, "message": "x"})) is transient
+
+def test_transport_errors_are_transient():
+    assert migrate._is_transient(httpx.ConnectError("refused"))
+    assert migrate._is_transient(httpx.ReadTimeout("slow"))
+    assert not migrate._is_transient(ValueError("bad row"))
+
+# ==================== 스텁 기반 ====================
+
+@pytest.fixture
+def setup(db_path, tmp_path, monkeypatch):
+    """원본 DB(접수 30건) + 같은 스키마의 빈 대상 DB 를 PostgREST 스텁으로 노출"""
+    target = str(tmp_path / "target.db")
+    shutil.copy(db_path, target)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO as_reception (id, phone, model_code, request_date, status) VALUES (?, ?, ?, ?, ?)",
+                     [(i, f"010-0000-{i:04d}", "DL-100", "2024-01-01", "접수") for i in range(1, 31)])
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(migrate.random, "uniform", lambda a, b: 0.0)  # 백오프 대기 없이
+    srv, url = serve_in_thread(target)
+    posts = []
+    with SyncPostgrestClient(f"{url}/rest/v1") as client:
+        m = migrate.Migrator(client, db_path, migrate.Checkpoint(str(tmp_path / "ckpt.json"), db_path),
+                             chunk=10, workers=1, max_attempts=4)
+        yield m, srv, target, posts
+    m.src.close()
+    srv.shutdown()
+    srv.server_close()
+
+def _inject(srv, posts, failures):
+    """POST 요청마다 failures 에서 하나씩 꺼내 (상태, 본문) 으로 응답, 소진되면 정상 처리"""
+    def before(handler):
+        if handler.command != "POST":
+            return None
+        posts.append(handler.path)
+        if not failures:
+            return None
+        handler.rfile.read(int(handler.headers.get("Content-Length", 0)))
+        status, body = failures.pop(0)
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json" if body.startswith(b"{") else "text/plain")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+        return False
+    srv.before_request = before
+
+def _pg_error(code, message):
+    return json.dumps({"code": code, "message": message, "details": None, "hint": None}).encode()
+
+def _count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM as_reception").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_transient_failures_are_retried(setup):
+    m, srv, target, posts = setup
+    _inject(srv, posts, [
+        (503, b"upstream unavailable"),
+        (503, _pg_error("PGRST001", "Database client error. Retrying the connection.")),
+        (500, _pg_error("57014", "canceling statement due to statement timeout")),
+    ])
+    assert m.migrate_table("as_reception") == 30
+    assert _count(target) == 30
+    assert len(posts) == 3 + 3  # 실패 3회 + 배치 3개
+
+def test_constraint_violation_fails_fast(setup):
+    m, srv, target, posts = setup
+    _inject(srv, posts, [(409, _pg_error("23505", "duplicate key value violates unique constraint"))])
+    with pytest.raises(APIError) as exc:  # 재시도했다면 두 번째 시도는 성공했을 것
+        m.migrate_table("as_reception")
+    assert exc.value.code == "23505"
+    assert not m.checkpoint.table("as_reception")["complete"]
+
+def test_local_state_and_derived_tables_are_skipped(setup):
+    m, *_ = setup
+    tables = m.tables()
+    assert tables[0] == "as_reception" and "as_assignment" in tables
+    present = {r[0] for r in m.src.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert {"sla_lead", "sla_hist", "material_cube", "material_cube_state", "job_run"} <= present - set(tables)
@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+from postgrest import SyncPostgrestClient
+
+import doorlock_as_mirror as mirror
+from benchmarks.postgrest_stub import serve_in_thread
+
+TABLES = [t for t in mirror.TABLES if t.name in ("as_reception", "as_result")]
+
+@pytest.fixture
+def remote(tmp_path):
+    """원격(Supabase) 역할의 PostgREST 스텁 DB"""
+    path = str(tmp_path / "remote.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE as_reception (id INTEGER PRIMARY KEY, reception_number TEXT, branch_id INTEGER, customer_name TEXT,
+                                   phone TEXT, status TEXT, request_date DATE, complete_date DATE,
+                                   created_at TIMESTAMP, updated_at TIMESTAMP);
+        CREATE TABLE as_result (id INTEGER PRIMARY KEY, reception_id INTEGER, labor_cost INTEGER);
+    """)
+    conn.executemany(
+        "INSERT INTO as_reception VALUES (?, ?, ?, ?, '010-0000-0000', '접수', '2024-05-01', NULL, ?, ?)",
+        [(i, f"20240501({i})", 1 + i % 2, f"고객{i}", f"2024-05-01 09:00:{i:02d}", f"2024-05-01 10:00:{i:02d}")
+         for i in range(1, 8)],
+    )
+    conn.executemany("INSERT INTO as_result (id, reception_id, labor_cost) VALUES (?, ?, 10000)", [(1, 1), (2, 2)])
+    conn.commit()
+    srv, url = serve_in_thread(path)
+    with SyncPostgrestClient(f"{url}/rest/v1") as client:
+        yield conn, client
+    srv.shutdown()
+    srv.server_close()
+    conn.close()
+
+@pytest.fixture
+def local(remote, tmp_path):
+    _, client = remote
+    # 페이지 3행: keyset 페이지 넘김, 주기마다 삭제 대조
+    return mirror.Mirror(client, path=str(tmp_path / "mirror.db"), tables=TABLES, page_size=3, reconcile_every=1)
+
+def _rows(conn, table, columns):
+    return [tuple(r) for r in conn.execute(f"SELECT {columns} FROM {table} ORDER BY id")]
+
+def test_incremental_sync_pulls_only_changes(remote, local):
+    conn, _ = remote
+    assert local.sync_once() == {"as_reception": 7, "as_result": 2}
+
+    conn.execute("UPDATE as_reception SET status='완료', updated_at='2024-05-02 08:00:00' WHERE id=3")
+    conn.execute("INSERT INTO as_reception (id, branch_id, status, created_at, updated_at) "
+                 "VALUES (8, 1, '접수', '2024-05-02 09:00:00', '2024-05-02 09:00:00')")
+    conn.execute("INSERT INTO as_result (id, reception_id, labor_cost) VALUES (3, 3, 0)")
+    conn.commit()
+    fetched = local.sync_once()
+    assert fetched["as_result"] == 1
+    assert fetched["as_reception"] < 7  # 워터마크(겹쳐 읽는 LOOKBACK 포함) 이후만
+    for table, columns in (("as_reception", "id, status, updated_at"), ("as_result", "id, reception_id")):
+        assert _rows(local._conn(), table, columns) == _rows(conn, table, columns)
+    assert [r["id"] for r in local.select("as_reception", "id", {"status": "완료"})] == [3]
+
+def test_remote_deletes_are_reconciled(remote, local):
+    conn, _ = remote
+    local.sync_once()
+    conn.execute("DELETE FROM as_reception WHERE id IN (2, 6)")
+    conn.commit()
+    local.sync_once()  # reconcile_every=1 → 두 번째 주기부터 id 대조
+    assert [r[0] for r in local._conn().execute("SELECT id FROM as_reception ORDER BY id")] == [1, 3, 4, 5, 7]
+
+    local.remove("as_reception", [{"id": 7}])  # 쓰기 응답 즉시 반영
+    assert local._conn().execute("SELECT COUNT(*) FROM as_reception WHERE id = 7").fetchone()[0] == 0
+
+def test_local_tables_get_lookup_indexes(local):
+    local.sync_once()
+    plan = local._conn().execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM as_reception WHERE branch_id = 1 ORDER BY created_at DESC LIMIT 20"
+    ).fetchall()
+    assert "USING INDEX" in " ".join(r[-1] for r in plan)
+    names = {r[1] for r in local._conn().execute("PRAGMA index_list(as_result)")}
+    assert "idx_mirror_as_result_reception_id" in names
+    # 원격에 없는 컬럼(phone_norm 등)의 인덱스는 건너뜀
+    assert not any("phone_norm" in r[1] for r in local._conn().execute("PRAGMA index_list(as_reception)"))
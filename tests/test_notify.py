@@ -0,0 +1,110 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import doorlock_as_notify as notify
+
+@pytest.fixture
+def gateway():
+    srv = notify.make_stub_gateway(port=0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+def _wait_until(cond, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.05)
+    return False
+
+def _statuses(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return notify.outbox_stats(conn)
+    finally:
+        conn.close()
+
+def test_provider_requires_send():
+    with pytest.raises(TypeError):
+        notify.Provider()
+
+def test_default_send_batch_loops_over_send():
+    class Flaky(notify.Provider):
+        def send(self, message):
+            if message.recipient == "bad":
+                raise ValueError("boom")
+            return notify.SENT, None
+
+    msgs = [notify.OutboxMessage(1, "x", "010", "a", 0), notify.OutboxMessage(2, "x", "bad", "b", 0)]
+    results = Flaky().send_batch(msgs)
+    assert results[1] == (notify.SENT, None)
+    assert results[2][0] == notify.RETRY
+
+def test_dispatch_through_stub_gateway(db_path, gateway):
+    url = f"http://127.0.0.1:{gateway.server_address[1]}"
+    provider = notify.HttpSmsProvider(url, batch_size=10, rate_per_sec=1000)
+    conn = sqlite3.connect(db_path)
+    for i in range(25):
+        notify.enqueue(conn, f"0101234{i:04d}", f"msg {i}", provider="gateway")
+    conn.close()
+
+    dispatcher = notify.Dispatcher(db_path, {"gateway": provider}, workers=2, poll_interval=0.05)
+    dispatcher.start()
+    try:
+        assert _wait_until(lambda: _statuses(db_path).get("sent") == 25)
+    finally:
+        dispatcher.stop()
+    assert gateway.batches == 3
+    assert sorted(m["text"] for m in gateway.received) == sorted(f"msg {i}" for i in range(25))
+
+def test_gateway_failures_are_retried_then_dead_lettered(db_path, gateway):
+    gateway.fail_rate = 1.0
+    url = f"http://127.0.0.1:{gateway.server_address[1]}"
+    provider = notify.HttpSmsProvider(url, batch_size=10, rate_per_sec=1000)
+    conn = sqlite3.connect(db_path)
+    notify.enqueue(conn, "01012345678", "hello", provider="gateway")
+    conn.close()
+
+    dispatcher = notify.Dispatcher(db_path, {"gateway": provider}, workers=1, poll_interval=0.05,
+                                   max_attempts=3, base_delay=0.01, max_delay=0.05)
+    dispatcher.start()
+    try:
+        assert _wait_until(lambda: _statuses(db_path).get("dead") == 1)
+    finally:
+        dispatcher.stop()
+    conn = sqlite3.connect(db_path)
+    attempts, error = conn.execute("SELECT attempts, last_error FROM notification_outbox").fetchone()
+    conn.close()
+    assert attempts == 3 and error == "HTTP 503"
+    assert gateway.received == []
+
+def test_expired_lease_taken_over_is_not_sent_twice(db_path):
+    class Recorder(notify.Provider):
+        def __init__(self):
+            super().__init__(batch_size=10, rate_per_sec=1000)
+            self.sent = []
+
+        def send(self, message):
+            self.sent.append(message.id)
+            return notify.SENT, None
+
+    conn = sqlite3.connect(db_path)
+    notify.enqueue(conn, "01012345678", "hello", provider="rec")
+    conn.close()
+
+    slow, fast = Recorder(), Recorder()
+    first = notify.Dispatcher(db_path, {"rec": slow}, claim_timeout=0.0)
+    second = notify.Dispatcher(db_path, {"rec": fast})
+    stale = first._claim()      # 선점 직후 만료 (속도 제한 대기가 선점 시간을 넘긴 상황)
+    assert second.run_once() == 1
+    second.stop()
+    first._send(slow, stale)    # 대기가 끝난 첫 디스패처는 발송하지 않아야 한다
+    first.stop()
+    assert fast.sent == [stale[0].id] and slow.sent == []
+    assert _statuses(db_path) == {"sent": 1}
@@ -0,0 +1,30 @@
+import sqlite3
+
+import pytest
+from postgrest import SyncPostgrestClient
+
+from benchmarks.postgrest_stub import serve_in_thread
+
+@pytest.fixture
+def client(tmp_path):
+    path = str(tmp_path / "stub.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE memo (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.executemany("INSERT INTO memo (body) VALUES (?)", [("할인 50%41",), ("할인 50A",), ("a+b c",), ("김민수",)])
+    conn.commit()
+    conn.close()
+    srv, url = serve_in_thread(path)
+    with SyncPostgrestClient(f"{url}/rest/v1") as c:
+        yield c
+    srv.shutdown()
+    srv.server_close()
+
+def test_filter_values_are_decoded_once(client):
+    rows = client.table("memo").select("body").eq("body", "할인 50%41").execute().data
+    assert rows == [{"body": "할인 50%41"}]
+    rows = client.table("memo").select("body").eq("body", "a+b c").execute().data
+    assert rows == [{"body": "a+b c"}]
+
+def test_ilike_keyword(client):
+    rows = client.table("memo").select("body").ilike("body", "%민수%").execute().data
+    assert rows == [{"body": "김민수"}]
@@ -0,0 +1,52 @@
+import json
+import sqlite3
+
+import pytest
+
+import doorlock_as_reception as reception
+
+@pytest.fixture
+def conn(schema_db):
+    c = sqlite3.connect(schema_db)
+    c.execute("""
+        INSERT INTO as_reception (id, reception_number, customer_name, phone, address, status, model_code, request_date)
+        VALUES (1, '20240501(1)', '홍길동', '010-1111-2222', '서울 강남구 테헤란로 1', '접수', 'M1', '2024-05-01')
+    """)
+    c.commit()
+    yield c
+    c.close()
+
+def test_diff_ignores_none_vs_empty(conn):
+    base = reception.load(conn, "20240501(1)")
+    assert reception.diff(base, {"customer_name": "홍길동", "order_number": "", "install_date": None}) == {}
+    assert reception.diff(base, {"customer_name": "홍길순", "phone": "010-1111-2222"}) == {"customer_name": "홍길순"}
+
+def test_update_writes_only_changes_and_bumps_version(conn):
+    base = reception.load(conn, "20240501(1)")
+    assert reception.update(conn, base, {"customer_name": "홍길순"}, user_id=7)
+    now = reception.load(conn, "20240501(1)")
+    assert (now["customer_name"], now["version"]) == ("홍길순", 1)
+    old, new = conn.execute("SELECT old_value, new_value FROM audit_log WHERE user_id=7").fetchone()
+    assert json.loads(old) == {"customer_name": "홍길동"} and json.loads(new) == {"customer_name": "홍길순"}
+
+def test_stale_version_is_rejected_and_merged(conn):
+    mine_base = reception.load(conn, "20240501(1)")
+    theirs_base = reception.load(conn, "20240501(1)")
+    assert reception.update(conn, theirs_base, {"phone": "010-3333-4444", "address": "서울 송파구"}, user_id=1)
+
+    mine = {"customer_name": "홍길순", "address": "서울 마포구", "phone": "010-3333-4444"}
+    assert not reception.update(conn, mine_base, mine, user_id=2)
+    assert reception.load(conn, "20240501(1)")["customer_name"] == "홍길동"  # 덮어쓰지 않음
+
+    current = reception.load(conn, "20240501(1)")
+    auto, conflicts = reception.merge(mine_base, current, mine)
+    assert auto == {"customer_name": "홍길순"}
+    assert conflicts == {"address": ("서울 송파구", "서울 마포구")}
+    assert reception.update(conn, current, auto, user_id=2)
+    final = reception.load(conn, "20240501(1)")
+    assert (final["customer_name"], final["address"], final["version"]) == ("홍길순", "서울 송파구", 2)
+
+def test_update_rejects_unknown_columns(conn):
+    base = reception.load(conn, "20240501(1)")
+    with pytest.raises(ValueError):
+        reception.update(conn, base, {"version": 99}, user_id=1)
@@ -0,0 +1,57 @@
+import os
+import sqlite3
+import zipfile
+
+import pytest
+
+import doorlock_as_reports as reports
+
+pymupdf = pytest.importorskip("pymupdf")
+
+@pytest.fixture
+def conn(schema_db):
+    c = sqlite3.connect(schema_db)
+    c.execute("""
+        INSERT INTO branch (id, branch_code, branch_name, billing_type)
+        VALUES (1, 'B001', '강남점', '세금계산서'), (2, 'B002', '수원점', '현금'), (3, 'B003', '빈지점', '현금')
+    """)
+    rows = [(i, f"20240910({i})", 1 + i % 2, f"고객{i}", "M1" if i % 3 else "M2", "S1", "모터 불량",
+             "검수완료" if i % 4 else "접수", "2024-09-10", "2024-09-12" if i % 4 else None) for i in range(1, 121)]
+    c.executemany("""INSERT INTO as_reception (id, reception_number, branch_id, customer_name, model_code, symptom_code,
+                     symptom_description, status, request_date, complete_date, created_at, updated_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '2024-09-10 09:00:00', '2024-09-13 09:00:00')""", rows)
+    c.executemany("INSERT INTO as_result (reception_id, labor_cost, labor_reason) VALUES (?, ?, ?)",
+                  [(i, 10_000, "야간1") for i in range(1, 121)])
+    c.commit()
+    yield c
+    c.close()
+
+def test_build_renders_every_branch_and_zips(conn, tmp_path):
+    seen = []
+    with reports.create_pool(2) as pool:
+        result = reports.build(conn, "2024-09", pool=pool, report_dir=str(tmp_path / "rep"),
+                               progress=lambda done, total, name: seen.append((done, total)))
+    assert result["failed"] == {} and result["files"] == result["rendered"] == 8  # 2지점 × 2보고서 × 2형식
+    assert seen[-1] == (8, 8)
+    with zipfile.ZipFile(result["zip"]) as z:
+        names = sorted(z.namelist())
+        assert "강남점/인건비 정산서_2024-09.pdf" in names and "수원점/VOC 요약_2024-09.xlsx" in names
+        assert not any(n.startswith("빈지점") for n in names)
+        gangnam = pymupdf.open(stream=z.read("강남점/인건비 정산서_2024-09.pdf"))
+        suwon = pymupdf.open(stream=z.read("수원점/인건비 정산서_2024-09.pdf"))
+    assert "330,000원" in gangnam[0].get_text()  # 30건 × 10,000원 + 부가세 10%
+    assert suwon.page_count == 2  # 60건은 첫 장에 다 들어가지 않는다
+    assert "최종 정산금액" in suwon[1].get_text() and "600,000원" in suwon[1].get_text()
+
+def test_cache_reuses_unchanged_branches(conn, tmp_path):
+    out = str(tmp_path / "rep")
+    first = reports.build(conn, "2024-09", kinds=["settlement"], formats=["xlsx"], report_dir=out)
+    again = reports.build(conn, "2024-09", kinds=["settlement"], formats=["xlsx"], report_dir=out)
+    assert (first["rendered"], again["rendered"], again["zip"]) == (2, 0, first["zip"])
+
+    conn.execute("UPDATE as_result SET labor_cost = 50000 WHERE reception_id = 2")  # 강남점만 바뀜
+    changed = reports.build(conn, "2024-09", kinds=["settlement"], formats=["xlsx"], report_dir=out)
+    assert changed["rendered"] == 1 and changed["zip"] != first["zip"]
+    assert sorted(os.listdir(os.path.join(out, "2024-09"))) == sorted(
+        [os.path.basename(reports.report_path(r, "xlsx", out)) for r in reports.collect(conn, "2024-09", ["settlement"])]
+        + [os.path.basename(changed["zip"])])
@@ -0,0 +1,54 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+import doorlock_as_sla as sla
+
+@pytest.fixture
+def conn(schema_db):
+    c = sqlite3.connect(schema_db)
+    # i 일 걸린 접수 (0~99일), 절반은 검수완료(완료 다음 날 검수)
+    c.executemany("""
+        INSERT INTO as_reception (id, branch_id, model_code, request_date, complete_date, status, updated_at)
+        VALUES (?, ?, 'M1', '2024-01-01', date('2024-01-01', '+' || ? || ' days'), ?,
+                date('2024-01-01', '+' || (? + 1) || ' days'))
+    """, [(i + 1, 1 + i % 2, i, "검수완료" if i % 2 else "완료", i) for i in range(100)])
+    c.execute("INSERT INTO as_reception (id, branch_id, request_date, status) VALUES (500, 1, '2024-01-01', '접수')")
+    c.commit()
+    yield c
+    c.close()
+
+def _hist(conn):
+    return sorted(conn.execute("SELECT metric, month, branch_id, model_code, days, n FROM sla_hist"))
+
+def test_backfill_quantiles(conn):
+    assert sla.backfill(conn) == 100
+    row = sla.summary(conn, "lead", "2024-01", "2024-12").iloc[0]
+    assert (row["건수"], row["p50"], row["p90"], row["p99"]) == (100, 49, 89, 98)
+    assert sla.summary(conn, "inspect", "2024-01", "2024-12").iloc[0]["p99"] == 1
+    by_branch = sla.summary(conn, "lead", "2024-01", "2024-12", group_by="지점")
+    assert by_branch["건수"].tolist() == [50, 50]
+    assert sla.backfill(conn) == 0
+
+def test_sync_matches_rebuild(conn):
+    sla.backfill(conn)
+    conn.execute("UPDATE as_reception SET status='접수', complete_date=NULL WHERE id IN (1, 2)")
+    conn.execute("UPDATE as_reception SET complete_date='2024-01-03', status='검수완료' WHERE id = 500")
+    conn.execute("UPDATE as_reception SET model_code='M2' WHERE id = 3")
+    assert sla.sync(conn, [1, 2, 3, 500, 9999]) == 4
+    incremental = _hist(conn)
+    sla.rebuild_histogram(conn)
+    assert incremental == _hist(conn)
+    assert conn.execute("SELECT COUNT(*) FROM sla_lead").fetchone()[0] == 99
+    assert not conn.execute("SELECT 1 FROM sla_hist WHERE n <= 0").fetchall()
+
+def test_inspect_date_kept_after_later_edit(conn):
+    sla.backfill(conn)
+    conn.execute("UPDATE as_reception SET updated_at='2025-01-01 00:00:00' WHERE id = 2")
+    assert sla.sync(conn, [2]) == 0
+
+def test_aging_buckets(conn):
+    df = sla.aging(conn, date(2024, 1, 11))
+    assert df.loc["8~14일", "처리 대기"] == 1
+    assert df["검수 대기"].sum() == 50
@@ -0,0 +1,144 @@
+import json
+import sqlite3
+import threading
+import time
+
+import httpx
+import pytest
+from postgrest import SyncPostgrestClient
+from postgrest.exceptions import APIError
+
+import doorlock_as_transport as transport
+from benchmarks.postgrest_stub import serve_in_thread
+
+@pytest.fixture
+def stub(db_path):
+    srv, url = serve_in_thread(db_path)
+    client = SyncPostgrestClient(f"{url}/rest/v1", http_client=transport.create_http_client())
+    yield srv, client
+    client.aclose()
+    srv.shutdown()
+    srv.server_close()
+
+def _transport(**kw):
+    kw.setdefault("breaker", transport.CircuitBreaker(threshold=100, cooldown=0.2))
+    fast = httpx.Timeout(0.3, connect=0.5, pool=0.5)
+    return transport.Transport(backoff_base=0, timeouts={"read": fast, "write": fast}, **kw)
+
+def _inject(srv, method, faults, seen=None):
+    """method 요청마다 faults 에서 하나씩 꺼내 적용. (상태, 본문) 이면 그대로 응답, 숫자면 그만큼 늦게 정상 처리"""
+    lock = threading.Lock()
+
+    def before(handler):
+        if seen is not None:
+            seen.append((handler.command, handler.client_address[1]))
+        if handler.command != method:
+            return None
+        with lock:
+            fault = faults.pop(0) if faults else None
+        if isinstance(fault, (int, float)):
+            time.sleep(fault)
+            return None
+        if fault is None:
+            return None
+        status, body = fault
+        handler.rfile.read(int(handler.headers.get("Content-Length", 0)))
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json" if body.startswith(b"{") else "text/plain")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+        return False
+    srv.before_request = before
+
+def _pg_error(code, message="x"):
+    return json.dumps({"code": code, "message": message, "details": None, "hint": None}).encode()
+
+def _count(db_path):
+    with sqlite3.connect(db_path) as c:
+        return c.execute("SELECT COUNT(*) FROM as_reception").fetchone()[0]
+
+def _insert(client, i):
+    return client.table("as_reception").insert({"id": i, "phone": "010", "status": "접수"})
+
+def test_select_retries_transient_errors(stub):
+    srv, client = stub
+    seen, t = [], _transport()
+    _inject(srv, "GET", [(503, b"upstream unavailable"), (503, _pg_error("PGRST001"))], seen)
+    assert t.execute(client.table("as_reception").select("*")).data == []
+    assert len(seen) == 3 and t.stats["retries"] == 2  # postgrest-py 자체 재시도는 꺼져 있음
+
+def test_insert_is_not_retried_when_it_may_have_landed(stub, db_path):
+    srv, client = stub
+    seen, t = [], _transport()
+    _inject(srv, "POST", [0.6], seen)  # 서버는 처리하지만 응답이 읽기 타임아웃보다 늦음
+    with pytest.raises(httpx.ReadTimeout):
+        t.execute(_insert(client, 1), "insert")
+    time.sleep(0.5)
+    assert len(seen) == 1 and _count(db_path) == 1
+
+def test_insert_is_retried_when_it_never_reached_the_database(stub, db_path):
+    srv, client = stub
+    t = _transport()
+    _inject(srv, "POST", [(503, _pg_error("PGRST000", "could not connect"))])
+    t.execute(_insert(client, 1), "insert")
+    assert _count(db_path) == 1 and t.stats["retries"] == 1
+
+def test_update_is_retried_after_timeout(stub, db_path):
+    srv, client = stub
+    t = _transport()
+    t.execute(_insert(client, 1), "insert")
+    _inject(srv, "PATCH", [0.6])
+    resp = t.execute(client.table("as_reception").update({"status": "완료"}).eq("id", 1), "update")
+    assert resp.data[0]["status"] == "완료" and t.stats["retries"] == 1
+
+def test_request_errors_fail_fast(stub):
+    srv, client = stub
+    seen, t = [], _transport(breaker=transport.CircuitBreaker(threshold=1, cooldown=10))
+    _inject(srv, "POST", [(409, _pg_error("23505", "duplicate key"))], seen)
+    with pytest.raises(APIError):
+        t.execute(_insert(client, 1), "insert")
+    assert len(seen) == 1 and t.breaker.state == "closed"
+
+def test_breaker_opens_fails_fast_and_recovers(stub):
+    srv, client = stub
+    seen, t = [], _transport(breaker=transport.CircuitBreaker(threshold=3, cooldown=0.3), max_attempts=1)
+    _inject(srv, "GET", [(503, b"down")] * 4, seen)
+    for _ in range(3):
+        with pytest.raises(APIError):
+            t.execute(client.table("as_reception").select("*"))
+    t0 = time.perf_counter()
+    with pytest.raises(transport.CircuitOpenError):
+        t.execute(client.table("as_reception").select("*"))
+    assert time.perf_counter() - t0 < 0.01 and len(seen) == 3  # 서버에 보내지 않고 즉시 실패
+
+    time.sleep(0.35)
+    with pytest.raises(APIError):  # half-open 시험 1건 실패 → 다시 열림
+        t.execute(client.table("as_reception").select("*"))
+    assert t.breaker.state == "open"
+    time.sleep(0.35)
+    assert t.execute(client.table("as_reception").select("*")).data == []
+    assert t.breaker.state == "closed" and t.stats["rejected"] == 1
+
+def test_breaker_admits_single_trial_while_half_open():
+    b = transport.CircuitBreaker(threshold=1, cooldown=0)
+    b.failure()
+    b.allow()
+    with pytest.raises(transport.CircuitOpenError):
+        b.allow()
+    b.success()
+    b.allow()
+
+def test_connections_are_kept_alive(stub):
+    srv, client = stub
+    seen, t = [], _transport()
+    _inject(srv, "GET", [], seen)
+    for _ in range(10):
+        t.execute(client.table("as_reception").select("*"))
+    assert len(seen) == 10 and len({port for _, port in seen}) == 1
+
+def test_unsent_classification():
+    assert transport.is_unsent(httpx.ConnectError("refused"))
+    assert transport.is_unsent(httpx.PoolTimeout("busy"))
+    assert not transport.is_unsent(httpx.ReadTimeout("slow"))
+    assert not transport.is_unsent(APIError({"code": "57014", "message": "statement timeout"}))